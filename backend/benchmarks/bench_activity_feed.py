@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+recent_orders / pending_approvals: the old per-row joins and item counts
+vs one read of the denormalized activity feed.
+
+    python benchmarks/bench_activity_feed.py [--transactions 20000] [--iterations 100]
+"""
+import argparse
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from django.contrib.auth import get_user_model
+from django.core.signals import request_started
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from cashierdashboard.activity import rebuild_activity_feed
+from cashierdashboard.caching import response_cache
+from cashierdashboard.models import Store, Customer, Product, Transaction, TransactionItem, Return
+
+
+def old_widgets():
+    orders = []
+    for order in Transaction.objects.filter(status__in=['completed', 'pending', 'processing']).order_by('-timestamp')[:10]:
+        orders.append((order.customer.name if order.customer else None, order.store_id.name if order.store_id else None,
+                       order.transactionitem_set.count()))
+    for return_item in Return.objects.filter(status='pending')[:10]:
+        orders.append((return_item.original_transaction.store_id.name, return_item.original_transaction.timestamp))
+    for transaction in Transaction.objects.filter(total__gt=500, status='pending_approval')[:5]:
+        orders.append((transaction.store_id.name, transaction.customer.name if transaction.customer else None))
+    return orders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=20000)
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        user = get_user_model().objects.create(username='bench-manager', role='manager')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        stores = Store.objects.bulk_create([Store(name=f'Store {i}', location='Lab') for i in range(5)])
+        customers = Customer.objects.bulk_create([
+            Customer(name=f'Customer {i}', email=f'c{i}@example.com', phone=str(i)) for i in range(200)
+        ])
+        product = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('5.00'), stock=10 ** 6)
+        now = timezone.now()
+        sales = Transaction.objects.bulk_create([
+            Transaction(receipt_number=f'B{i}', store_id=random.choice(stores), customer=random.choice(customers),
+                        subtotal=Decimal('600'), tax_amount=0, total=Decimal('600'), payment_method='cash',
+                        status='pending_approval' if i % 50 == 0 else 'completed',
+                        timestamp=now - timedelta(minutes=random.randrange(60 * 24 * 60)))
+            for i in range(args.transactions)
+        ], batch_size=2000)
+        TransactionItem.objects.bulk_create([
+            TransactionItem(transaction=sale, product=product, quantity=1, unit_price=Decimal('5'), total=Decimal('5'))
+            for sale in sales for _ in range(3)
+        ], batch_size=5000)
+        Return.objects.bulk_create([
+            Return(original_transaction=sale, reason='Damaged', refund_amount=Decimal('5')) for sale in sales[::200]
+        ])
+        rebuild_activity_feed()
+
+        cache = response_cache()
+
+        def feed_widgets(i):
+            cache.clear()
+            client.get('/api/cashier/manager-dashboard/recent_orders/')
+            client.get('/api/cashier/manager-dashboard/pending_approvals/')
+
+        request_started.disconnect(reset_queries)  # keep the test client from clearing the capture
+        counts = []
+        for refresh in (lambda: old_widgets(), lambda: feed_widgets(0)):
+            reset_queries()  # the capture log is capped; the setup inserts would fill it
+            with CaptureQueriesContext(connection) as queries:
+                refresh()
+            counts.append(len(queries.captured_queries))
+        print(f'queries per refresh: old {counts[0]}, feed {counts[1]}')
+        report('old per-row queries', args.iterations, timed(lambda i: old_widgets(), args.iterations), unit='refresh')
+        report('activity feed endpoints', args.iterations, timed(feed_widgets, args.iterations), unit='refresh')
+
+
+if __name__ == '__main__':
+    main()
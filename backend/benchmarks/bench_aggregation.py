@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+One-year sales series: the old one-aggregate-per-day loop vs bucketed(),
+plus query counts and latency of the endpoints that now use it.
+
+    python benchmarks/bench_aggregation.py [--transactions 2000] [--iterations 5]
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report
+
+from django.contrib.auth import get_user_model
+from django.core.signals import request_started
+from django.db import connection, reset_queries
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from cashierdashboard.models import Transaction
+from cashierdashboard.aggregation import bucketed
+
+
+def per_day_loop(start, end):
+    transactions = Transaction.objects.filter(timestamp__date__gte=start)
+    series = []
+    for i in range((end - start).days + 1):
+        day_transactions = transactions.filter(timestamp__date=start + timedelta(days=i))
+        series.append((day_transactions.aggregate(total=Sum('total'))['total'] or 0, day_transactions.count()))
+    return series
+
+
+def measure(label, fn, iterations):
+    reset_queries()
+    start = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        fn()
+    for _ in range(iterations - 1):
+        fn()
+    elapsed = time.perf_counter() - start
+    report(label, iterations, elapsed, unit='call')
+    print(f"{'':<40} {len(queries.captured_queries)} queries, {elapsed / iterations * 1e3:.1f} ms per call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=2000)
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    # Each request would otherwise clear the captured query log
+    request_started.disconnect(reset_queries)
+
+    with benchmark_database():
+        disable_throttling()
+        user = get_user_model().objects.create(username='bench-manager', role='manager')
+        now = timezone.now()
+        Transaction.objects.bulk_create([
+            Transaction(receipt_number=f'B{i}', subtotal=Decimal('1'), tax_amount=0, total=Decimal('1'),
+                        payment_method='cash', status='completed',
+                        timestamp=now - timedelta(minutes=random.randrange(365 * 24 * 60)))
+            for i in range(args.transactions)
+        ], batch_size=2000)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        today = timezone.localdate()
+        year_ago = today - timedelta(days=365)
+
+        print(f'-- one year, {args.transactions} transactions')
+        measure('per-day loop (old)', lambda: per_day_loop(year_ago, today), 1)
+        measure('bucketed(day)', lambda: bucketed(Transaction.objects.all(), 'day', year_ago, today), args.iterations)
+        measure('bucketed(week)', lambda: bucketed(Transaction.objects.all(), 'week', year_ago, today), args.iterations)
+        measure('bucketed(month)', lambda: bucketed(Transaction.objects.all(), 'month', year_ago, today), args.iterations)
+        measure('sales_analytics?period=year', lambda: client.get(
+            '/api/manager/dashboard/sales_analytics/', {'period': 'year'}), args.iterations)
+        measure('sales_report (365 days)', lambda: client.get('/api/manager/reports/sales_report/', {
+            'start_date': year_ago.isoformat(), 'end_date': today.isoformat()}), args.iterations)
+        measure('sales_data?period=monthly', lambda: client.get(
+            '/api/cashier/manager-dashboard/sales_data/', {'period': 'monthly'}), args.iterations)
+
+
+if __name__ == '__main__':
+    main()
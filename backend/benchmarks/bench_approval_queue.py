@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Approval queue: OFFSET paging vs keyset cursors deep in the queue, and
+per-request approve vs one bulk_resolve call.
+
+    python benchmarks/bench_approval_queue.py [--requests 20000] [--batch 200] [--iterations 50]
+"""
+import argparse
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from cashierdashboard.models import Store, Transaction
+from cashierdashboard.sales import record_sales
+from managerdashboard import approvals
+from managerdashboard.models import ApprovalRequest
+
+
+def seed(store, cashier, count):
+    sales = Transaction.objects.bulk_create([
+        Transaction(receipt_number=f'Q{store.pk}-{i}', store_id=store, cashier=cashier, subtotal=Decimal('900'),
+                    tax_amount=0, total=Decimal('900'), payment_method='card', status='pending_approval')
+        for i in range(count)
+    ], batch_size=2000)
+    record_sales(sales)
+    approvals.request_transactions(sales, cashier)
+    return sales
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=200)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        store = Store.objects.create(name='North', location='Lab')
+        cashier = get_user_model().objects.create(username='bench-cashier', role='CASHIER')
+        manager = get_user_model().objects.create(username='bench-manager', role='manager', store_id=store.pk)
+        client = APIClient()
+        client.force_authenticate(user=manager)
+        seed(store, cashier, args.requests)
+        print(f'{ApprovalRequest.objects.filter(status="pending").count()} pending requests')
+
+        # Page 90% of the way down the queue
+        depth = int(args.requests * 0.9)
+        pending = ApprovalRequest.objects.filter(status='pending', store_id=store.pk).select_related(
+            'store', 'requestor', 'manager'
+        ).order_by('-created_at', '-id')
+        marker = pending[depth - 1]
+        cursor = approvals.encode_cursor(marker)
+        assert [row.pk for row in pending[depth:depth + 20]] == [row.pk for row in approvals.page(store=store.pk, cursor=cursor)[0]]
+        report('offset page', args.iterations, timed(lambda i: list(pending[depth:depth + 20]), args.iterations), unit='page')
+        report('keyset page', args.iterations, timed(lambda i: approvals.page(store=store.pk, cursor=cursor), args.iterations),
+               unit='page')
+
+        def approve_one_by_one(i):
+            for approval in approvals.page(store=store.pk, limit=args.batch)[0]:
+                client.post('/api/cashier/manager-dashboard/approve_request/',
+                            {'approval_id': approval.pk}, format='json')
+
+        def approve_in_bulk(i):
+            ids = [approval.pk for approval in approvals.page(store=store.pk, limit=args.batch)[0]]
+            client.post('/api/manager/approvals/bulk_resolve/', {'ids': ids, 'decision': 'approve'}, format='json')
+
+        rounds = max(1, args.iterations // 10)
+        report(f'approve {args.batch} one by one', rounds, timed(approve_one_by_one, rounds), unit='batch')
+        report(f'bulk_resolve {args.batch}', rounds, timed(approve_in_bulk, rounds), unit='batch')
+
+
+if __name__ == '__main__':
+    main()
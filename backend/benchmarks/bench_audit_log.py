@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Audit trail: one INSERT per audited action vs the buffered writer, an
+indexed per-user query over a large log, and monthly compaction.
+
+    python benchmarks/bench_audit_log.py [--actions 5000] [--history 200000]
+"""
+import argparse
+import random
+from datetime import timedelta
+
+from common import benchmark_database, report, timed
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from managerdashboard import audit
+from managerdashboard.models import AuditLog, AuditArchive
+
+ACTIONS = ['stock.adjust', 'stock.transfer', 'user.approve', 'approval.approved', 'transaction.void']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--actions', type=int, default=5000)
+    parser.add_argument('--history', type=int, default=200000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        users = [get_user_model().objects.create(username=f'bench-manager-{i}', role='manager') for i in range(50)]
+
+        report('INSERT per action', args.actions, timed(
+            lambda i: AuditLog.objects.create(user=users[i % 50], action_type='stock.adjust', target=f'product:{i}'),
+            args.actions
+        ), unit='action')
+        # What the request path pays: queueing; the flush happens off the request
+        buffer = audit.AuditBuffer(interval=None, size=10 ** 9)
+        report('buffered record', args.actions, timed(
+            lambda i: buffer.add(AuditLog(user_id=users[i % 50].pk, action_type='stock.adjust', target=f'product:{i}',
+                                          timestamp=timezone.now())),
+            args.actions
+        ), unit='action')
+        report(f'flush of {len(buffer)}', 1, timed(lambda i: buffer.flush(), 1), unit='flush')
+
+        now = timezone.now()
+        AuditLog.objects.bulk_create([
+            AuditLog(user=random.choice(users), action_type=random.choice(ACTIONS), target=f'product:{i}',
+                     timestamp=now - timedelta(minutes=random.randrange(60 * 24 * 365)))
+            for i in range(args.history)
+        ], batch_size=5000)
+        user = users[7]
+        week_ago = now - timedelta(days=7)
+        report('user + action + last week', 200, timed(
+            lambda i: audit.search(user=user, action_type='stock.adjust', start=week_ago), 200
+        ), unit='query')
+        report('user, page 1', 200, timed(lambda i: audit.search(user=user), 200), unit='query')
+
+        total = AuditLog.objects.count()
+        elapsed = timed(lambda i: audit.compact(hot_months=3), 1)
+        print(f'compacted {total - AuditLog.objects.count()} rows into {AuditArchive.objects.count()} archives')
+        report('compaction', 1, elapsed, unit='run')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Cashier dashboard stats: the old aggregate over today's transactions vs the
+maintained per-cashier daily counter row, at growing transaction counts.
+
+    python benchmarks/bench_cashier_stats.py [--iterations 50]
+"""
+import argparse
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.test import APIClient
+from cashierdashboard.models import Transaction, OfflineTransaction
+from cashierdashboard.sales import rebuild_cashier_stats
+
+
+def old_stats(user):
+    today_transactions = Transaction.objects.filter(cashier=user, timestamp__date=timezone.localdate())
+    offline = OfflineTransaction.objects.filter(cashier=user)
+    return (
+        today_transactions.aggregate(total=Sum('total'))['total'] or 0,
+        today_transactions.count(),
+        offline.latest('timestamp').timestamp if offline.exists() else None,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        user = get_user_model().objects.create(username='bench-cashier', role='CASHIER')
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        written = 0
+        for target in (1000, 10000, 50000):
+            Transaction.objects.bulk_create([
+                Transaction(receipt_number=f'B{i}', cashier=user, subtotal=Decimal('1'), tax_amount=0,
+                            total=Decimal('1'), payment_method='cash', status='completed')
+                for i in range(written, target)
+            ], batch_size=2000)
+            written = target
+            rebuild_cashier_stats()
+
+            print(f'-- {target} transactions today')
+            report('aggregate + count + offline queries', args.iterations, timed(lambda i: old_stats(user), args.iterations), unit='req')
+            report('dashboard-stats (counter row)', args.iterations,
+                   timed(lambda i: client.get('/api/cashier/dashboard-stats/'), args.iterations), unit='req')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Checkouts per second: single-request `checkout` action vs the multi-call POS flow.
+
+The multi-call flow mirrors what the POS does today: POST the transaction,
+one write per line item, one PATCH per product for stock and a payment.
+Line items and the payment are written through the ORM because their
+endpoints cannot be driven from the API as-is, so the legacy numbers
+are, if anything, optimistic.
+
+    python benchmarks/bench_checkout.py [--carts 200] [--lines 5]
+"""
+import argparse
+import uuid
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, timed, report
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from cashierdashboard.models import Store, Product, Transaction, TransactionItem, Payment
+
+
+def legacy_checkout(client, user, products, lines):
+    cart = products[:lines]
+    subtotal = sum(p.price for p in cart)
+    response = client.post('/api/cashier/transactions/', {
+        'receipt_number': f"R-{uuid.uuid4().hex[:10]}",
+        'subtotal': str(subtotal),
+        'tax_amount': '0.00',
+        'total': str(subtotal),
+        'payment_method': 'cash',
+        'status': 'completed',
+    }, format='json')
+    sale = Transaction.objects.get(pk=response.data['id'])
+    for product in cart:
+        TransactionItem.objects.create(
+            transaction=sale, product=product, quantity=1,
+            unit_price=product.price, total=product.price
+        )
+        current = client.get(f'/api/cashier/products/{product.id}/').data['stock']
+        client.patch(f'/api/cashier/products/{product.id}/', {'stock': current - 1}, format='json')
+    Payment.objects.create(
+        transaction=sale, payment_method='cash', amount=subtotal,
+        status='completed', reference_number=f"PAY-{uuid.uuid4().hex[:12]}", processed_by=user
+    )
+
+
+def single_checkout(client, store, products, lines):
+    response = client.post('/api/cashier/transactions/checkout/', {
+        'store': store.id,
+        'payment_method': 'cash',
+        'items': [{'product': p.id, 'quantity': 1} for p in products[:lines]],
+    }, format='json')
+    assert response.status_code == 201, response.data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--carts', type=int, default=200)
+    parser.add_argument('--lines', type=int, default=5)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        user = get_user_model().objects.create(username='bench-cashier', role='CASHIER')
+        store = Store.objects.create(name='Bench', location='Lab', tax_rate=Decimal('0.00'))
+        products = [
+            Product.objects.create(name=f'Item {i}', sku=f'BENCH-{i}', price=Decimal('1.99'), stock=10 ** 6)
+            for i in range(args.lines)
+        ]
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        print(f"{args.carts} carts x {args.lines} lines")
+        elapsed = timed(lambda i: legacy_checkout(client, user, products, args.lines), args.carts)
+        report('multi-call flow', args.carts, elapsed, unit='checkouts')
+        elapsed = timed(lambda i: single_checkout(client, store, products, args.lines), args.carts)
+        report('checkout action', args.carts, elapsed, unit='checkouts')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Dashboard widgets on the columnar snapshot vs the grouped ORM queries
+they replaced: full load, incremental refresh after new sales, and the
+per-widget latency of each path.
+
+    python benchmarks/bench_columnar_analytics.py [--transactions 100000] [--lines 3] [--iterations 20]
+"""
+import argparse
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database, report, timed
+
+from django.db.models import Sum
+from django.utils import timezone
+from cashierdashboard.aggregation import bucketed
+from cashierdashboard.analytics import AnalyticsEngine
+from cashierdashboard.caching import invalidate_tags, SALES
+from cashierdashboard.models import Store, Product, Transaction, TransactionItem
+
+STATUSES = ['completed'] * 9 + ['voided']
+
+
+def seed(stores, products, count, lines, now, prefix):
+    sales = Transaction.objects.bulk_create([
+        Transaction(receipt_number=f'{prefix}{i}', store_id=random.choice(stores), subtotal=Decimal('10'),
+                    tax_amount=0, total=Decimal(random.randrange(100, 10000)) / 100, payment_method='cash',
+                    status=random.choice(STATUSES), timestamp=now - timedelta(minutes=random.randrange(365 * 24 * 60)))
+        for i in range(count)
+    ], batch_size=5000)
+    TransactionItem.objects.bulk_create([
+        TransactionItem(transaction=sale, product=random.choice(products), quantity=random.randint(1, 5),
+                        unit_price=Decimal('2'), total=Decimal(random.randrange(100, 5000)) / 100)
+        for sale in sales for _ in range(lines)
+    ], batch_size=5000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=100000)
+    parser.add_argument('--lines', type=int, default=3)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        stores = Store.objects.bulk_create([Store(name=f'Store {i}', location='-') for i in range(20)])
+        products = Product.objects.bulk_create([Product(name=f'Product {i}', sku=f'C{i}') for i in range(2000)])
+        now = timezone.now()
+        seed(stores, products, args.transactions, args.lines, now, 'C')
+        print(f'{args.transactions} transactions, {args.transactions * args.lines} lines over a year')
+
+        engine = AnalyticsEngine()
+        report('full snapshot load', 1, timed(lambda i: engine.snapshot(), 1), unit='load')
+        seed(stores, products, 500, args.lines, now, 'N')
+        invalidate_tags(SALES)
+        report('incremental refresh (+500 sales)', 1, timed(lambda i: engine.snapshot(), 1), unit='refresh')
+
+        today = timezone.localdate()
+        year_ago = today - timedelta(days=365)
+        month_ago = today - timedelta(days=30)
+        completed = Transaction.objects.filter(status='completed')
+        store = stores[3].id
+        widgets = [
+            ('sales by day, one store, year',
+             lambda: bucketed(completed.filter(store_id=store), 'day', year_ago, today),
+             lambda: engine.snapshot().series('day', year_ago, today, store, ['completed'])),
+            ('sales by month, all stores, year',
+             lambda: bucketed(completed, 'month', year_ago, today),
+             lambda: engine.snapshot().series('month', year_ago, today, None, ['completed'])),
+            ('sales by store, 30 days',
+             lambda: list(completed.filter(timestamp__date__gte=month_ago).values('store_id').annotate(
+                 total=Sum('total')).order_by('-total')),
+             lambda: engine.snapshot().by_store(month_ago, statuses=['completed'])),
+            ('top 10 products, 30 days',
+             lambda: list(TransactionItem.objects.filter(transaction__timestamp__date__gte=month_ago).values(
+                 'product_id').annotate(revenue=Sum('total')).order_by('-revenue')[:10]),
+             lambda: engine.snapshot().top_products(month_ago)),
+        ]
+        for label, orm, columnar in widgets:
+            print(f'-- {label}')
+            report('ORM grouped query', args.iterations, timed(lambda i: orm(), args.iterations), unit='call')
+            report('columnar snapshot', args.iterations, timed(lambda i: columnar(), args.iterations), unit='call')
+
+
+if __name__ == '__main__':
+    main()
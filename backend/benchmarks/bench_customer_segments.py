@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+RFM segmentation over a large customer base: the grouped query, the
+vectorized scoring, and run_segmentation() end to end (query, scoring and
+upsert of every CustomerSegment row).
+
+    python benchmarks/bench_customer_segments.py [--customers 1000000] [--orders 2]
+"""
+import argparse
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from common import benchmark_database, report
+
+from django.utils import timezone
+from cashierdashboard.models import Customer, Transaction, CustomerSegment
+from cashierdashboard.segmentation import customer_totals, rfm_scores, name_segments, run_segmentation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--customers', type=int, default=1000000)
+    parser.add_argument('--orders', type=int, default=2, help='Average orders per customer')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        rng = np.random.default_rng(11)
+        batch = 50000
+        for offset in range(0, args.customers, batch):
+            Customer.objects.bulk_create([
+                Customer(name=f'C{i}', phone=f'P{i}', email=f'c{i}@example.com')
+                for i in range(offset, min(offset + batch, args.customers))
+            ], batch_size=5000)
+        customer_ids = np.array(Customer.objects.order_by('id').values_list('id', flat=True))
+        now = timezone.now()
+        total = args.customers * args.orders
+        for offset in range(0, total, batch):
+            size = min(batch, total - offset)
+            buyers = rng.choice(customer_ids, size).tolist()
+            minutes = rng.integers(0, 700 * 24 * 60, size).tolist()
+            amounts = rng.integers(100, 20000, size).tolist()
+            Transaction.objects.bulk_create([
+                Transaction(receipt_number=f'R{offset + i}', customer_id=buyers[i], subtotal=0, tax_amount=0,
+                            total=Decimal(amounts[i]) / 100, payment_method='cash', status='completed',
+                            timestamp=now - timedelta(minutes=minutes[i]))
+                for i in range(size)
+            ], batch_size=5000)
+        print(f'{args.customers} customers, {total} transactions')
+
+        started = time.perf_counter()
+        ids, last, orders, spend = customer_totals(now - timedelta(days=730))
+        report('grouped R/F/M query', len(ids), time.perf_counter() - started, unit='customer')
+
+        count = len(ids)
+        started = time.perf_counter()
+        days = np.fromiter(((now.timestamp() - moment.timestamp()) / 86400 for moment in last), np.float64, count)
+        scores = rfm_scores(days, np.fromiter(orders, np.int64, count), np.fromiter(spend, np.float64, count))
+        name_segments(*scores)
+        report('vectorized scoring', count, time.perf_counter() - started, unit='customer')
+
+        for label in ('run_segmentation (first run)', 'run_segmentation (rerun, upsert)'):
+            started = time.perf_counter()
+            counts = run_segmentation(history_days=730, now=timezone.now())
+            report(label, sum(counts.values()), time.perf_counter() - started, unit='customer')
+        print(f'{CustomerSegment.objects.count()} segment rows: {counts}')
+
+
+if __name__ == '__main__':
+    main()
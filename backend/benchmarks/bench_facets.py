@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Storefront facet counts: the old way of getting a count per category and
+subcategory (one filtered count query each), against the single grouped
+facet_counts() pass, plus /api/customer/products/?facets=true end to end.
+
+    python benchmarks/bench_facets.py [--products 50000] [--categories 20] [--iterations 20]
+"""
+import argparse
+import random
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from rest_framework.test import APIClient
+from cashierdashboard.facets import PRICE_EDGES, facet_counts
+from cashierdashboard.models import Category, SubCategory, Product
+
+
+def per_facet_queries(queryset, categories, subcategories):
+    counts = [queryset.filter(category=category).count() for category in categories]
+    counts += [queryset.filter(subcategory=subcategory).count() for subcategory in subcategories]
+    for low, high in zip(PRICE_EDGES, PRICE_EDGES[1:] + (None,)):
+        bucket = queryset.filter(price__gte=low)
+        counts.append((bucket.filter(price__lt=high) if high is not None else bucket).count())
+    counts.append(queryset.filter(stock__gt=0).count())
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=50000)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        categories = [Category.objects.create(name=f'Category {i}') for i in range(args.categories)]
+        subcategories = [SubCategory.objects.create(name=f'Sub {i}', category=random.choice(categories))
+                         for i in range(args.categories * 4)]
+        products = []
+        for i in range(args.products):
+            subcategory = random.choice(subcategories)
+            products.append(Product(name=f'Product {i}', sku=f'S{i}', category_id=subcategory.category_id,
+                                    subcategory=subcategory, price=Decimal(random.randint(50, 20000)) / 100,
+                                    stock=random.choice((0, 5, 10))))
+        Product.objects.bulk_create(products, batch_size=5000)
+        queryset = Product.objects.filter(is_active=True)
+
+        queries = len(per_facet_queries(queryset, categories, subcategories))
+        report(f'count per facet value ({queries} queries)', args.iterations, timed(
+            lambda i: per_facet_queries(queryset, categories, subcategories), args.iterations), unit='listing')
+        report('facet_counts (1 grouped pass + 2 name lookups)', args.iterations, timed(
+            lambda i: facet_counts(queryset), args.iterations), unit='listing')
+        narrowed = queryset.filter(category=categories[0], stock__gt=0)
+        report('facet_counts, one category in stock', args.iterations, timed(
+            lambda i: facet_counts(narrowed), args.iterations), unit='listing')
+
+        client = APIClient()
+        report('GET /api/customer/products/', 5, timed(
+            lambda i: client.get('/api/customer/products/', {'category': categories[0].id}), 5), unit='call')
+        report('GET /api/customer/products/?facets=true', 5, timed(
+            lambda i: client.get('/api/customer/products/', {'category': categories[0].id, 'facets': 'true'}), 5),
+            unit='call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Demand forecasting: vectorized exponential smoothing over a (SKUs x days)
+matrix vs a per-SKU Python loop, plus an end-to-end run_forecast() on a
+generated sales history.
+
+    python benchmarks/bench_forecasting.py [--skus 100000] [--days 730] [--db-products 2000] [--db-days 180]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from common import benchmark_database, report
+
+from django.utils import timezone
+from cashierdashboard.forecasting import smooth, reorder_policy, run_forecast, ALPHA
+from cashierdashboard.models import Product, Transaction, TransactionItem
+
+
+def smooth_loop(series, alpha=ALPHA):
+    level = sum(series[:7]) / len(series[:7])
+    mad = sum(abs(value - level) for value in series[:7]) / len(series[:7])
+    for value in series:
+        error = value - level
+        mad += alpha * (abs(error) - mad)
+        level += alpha * error
+    return level, mad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--skus', type=int, default=100000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--db-products', type=int, default=2000)
+    parser.add_argument('--db-days', type=int, default=180)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    demand = rng.poisson(rng.gamma(1.0, 3.0, size=(args.skus, 1)), size=(args.skus, args.days)).astype(np.float32)
+    print(f'{args.skus} SKUs x {args.days} days ({demand.nbytes / 2 ** 20:.0f} MiB float32)')
+
+    started = time.perf_counter()
+    level, mad = smooth(demand)
+    reorder_policy(level, mad)
+    report('vectorized smoothing', args.skus, time.perf_counter() - started, unit='SKU')
+
+    sample = demand[:1000].tolist()
+    started = time.perf_counter()
+    for series in sample:
+        smooth_loop(series)
+    elapsed = time.perf_counter() - started
+    report('per-SKU loop (1000 SKUs)', len(sample), elapsed, unit='SKU')
+    print(f'per-SKU loop extrapolated to {args.skus} SKUs: {elapsed * args.skus / len(sample):.1f}s')
+    assert np.allclose(level[:1000], [smooth_loop(series)[0] for series in sample], rtol=1e-4, atol=1e-4)
+
+    with benchmark_database():
+        products = Product.objects.bulk_create([
+            Product(name=f'Product {i}', sku=f'F{i}', stock=100) for i in range(args.db_products)
+        ], batch_size=2000)
+        today = timezone.localdate()
+        sales, items = [], []
+        for day in range(1, args.db_days + 1):
+            noon = timezone.make_aware(datetime.combine(today - timedelta(days=day), datetime.min.time())) + timedelta(hours=12)
+            for n in range(20):
+                sales.append(Transaction(receipt_number=f'D{day}-{n}', subtotal=Decimal('10'), tax_amount=0,
+                                         total=Decimal('10'), payment_method='cash', status='completed', timestamp=noon))
+        sales = Transaction.objects.bulk_create(sales, batch_size=2000)
+        for sale in sales:
+            for product in random.sample(products, 15):
+                items.append(TransactionItem(transaction=sale, product=product, quantity=random.randint(1, 4),
+                                             unit_price=Decimal('1'), total=Decimal('1')))
+        TransactionItem.objects.bulk_create(items, batch_size=5000)
+        print(f'{len(items)} transaction lines over {args.db_days} days')
+
+        started = time.perf_counter()
+        run_forecast(history_days=args.db_days, apply=True, today=today)
+        report('run_forecast end to end', args.db_products, time.perf_counter() - started, unit='product')
+
+
+if __name__ == '__main__':
+    main()
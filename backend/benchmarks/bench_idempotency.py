@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Idempotency-Key overhead: cost of the lookup the middleware adds per request.
+
+Measures the store directly (local LRU hit, database hit, miss) and the
+end-to-end replay of a retried POST. Target: lookup < 1 ms.
+
+    python benchmarks/bench_idempotency.py [--keys 2000]
+"""
+import argparse
+import hashlib
+from datetime import timedelta
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from cashierdashboard.middleware import IdempotencyStore
+from cashierdashboard.models import IdempotencyRecord
+
+
+def key(i):
+    return hashlib.sha256(str(i).encode()).hexdigest()
+
+
+def per_lookup(label, iterations, elapsed):
+    report(label, iterations, elapsed, unit='lookup')
+    print(f"{'':<40} {elapsed / iterations * 1e3:.3f} ms per lookup")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=2000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        expires_at = timezone.now() + timedelta(hours=1)
+        IdempotencyRecord.objects.bulk_create([
+            IdempotencyRecord(key=key(i), fingerprint='f', status_code=201,
+                              content_type='application/json', body=b'{}', expires_at=expires_at)
+            for i in range(args.keys)
+        ])
+
+        store = IdempotencyStore(local_size=args.keys)
+        per_lookup('lookup (database hit)', args.keys, timed(lambda i: store.get(key(i)), args.keys))
+        per_lookup('lookup (local LRU hit)', args.keys, timed(lambda i: store.get(key(i)), args.keys))
+        per_lookup('lookup (miss)', args.keys, timed(lambda i: store.get(key(-i - 1)), args.keys))
+
+        user = get_user_model().objects.create(username='bench-cashier', role='CASHIER')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        sale = {'subtotal': '1.00', 'tax_amount': '0', 'total': '1.00', 'payment_method': 'cash', 'status': 'completed'}
+        client.post('/api/cashier/transactions/', sale, format='json', HTTP_IDEMPOTENCY_KEY='bench')
+        retries = 500
+        elapsed = timed(lambda i: client.post('/api/cashier/transactions/', sale, format='json',
+                                              HTTP_IDEMPOTENCY_KEY='bench'), retries)
+        report('replayed POST (end to end)', retries, elapsed, unit='req')
+
+
+if __name__ == '__main__':
+    main()
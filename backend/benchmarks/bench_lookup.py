@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Scanner lookups: product detail via ProductViewSet vs the in-memory lookup index.
+
+    python benchmarks/bench_lookup.py [--products 20000] [--scans 2000]
+"""
+import argparse
+import random
+import time
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from django.test import RequestFactory
+from cashierdashboard.models import Category, Product
+from cashierdashboard.lookup import product_index
+from cashierdashboard.views import ProductViewSet
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--scans', type=int, default=2000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        category = Category.objects.create(name='Bench')
+        Product.objects.bulk_create([
+            Product(name=f'Item {i}', sku=f'SKU-{i}', barcode=f'{4000000 + i}', price=1, category=category)
+            for i in range(args.products)
+        ])
+        ids = list(Product.objects.values_list('id', flat=True))
+        picks = [random.randrange(args.products) for _ in range(args.scans)]
+
+        factory = RequestFactory()
+        detail = ProductViewSet.as_view({'get': 'retrieve'})
+        lookup = ProductViewSet.as_view({'get': 'lookup'})
+
+        elapsed = timed(lambda i: detail(factory.get('/'), pk=ids[picks[i]]).render(), args.scans)
+        report('ProductViewSet.retrieve', args.scans, elapsed, unit='scan')
+
+        start = time.perf_counter()
+        product_index.get('warm-up')
+        print(f"{'index build':<40} {args.products:>7} in {time.perf_counter() - start:8.3f}s")
+
+        elapsed = timed(lambda i: lookup(factory.get('/', {'code': str(4000000 + picks[i])})).render(), args.scans)
+        report('lookup action (view + render)', args.scans, elapsed, unit='scan')
+        print(f"{'':<40} {elapsed / args.scans * 1e3:.3f} ms per scan")
+
+        elapsed = timed(lambda i: product_index.get(str(4000000 + picks[i])), args.scans)
+        report('index only', args.scans, elapsed, unit='scan')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Manager notifications: recomputing low-stock and daily-target alerts on
+every poll vs reading unread rows from the notification outbox.
+
+    python benchmarks/bench_notification_outbox.py [--transactions 50000] [--products 20000] [--iterations 200]
+"""
+import argparse
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from django.contrib.auth import get_user_model
+from django.db.models import F, Sum
+from django.utils import timezone
+from rest_framework.test import APIClient
+from cashierdashboard.models import Store, Product, Transaction, Notification
+
+
+def old_notifications():
+    alerts = [(product.name, product.stock) for product in
+              Product.objects.filter(stock__lte=F('min_stock_level'), is_active=True)[:5]]
+    alerts += list(Transaction.objects.filter(
+        timestamp__date=timezone.now().date(), status='completed'
+    ).values('store_id__name').annotate(daily_sales=Sum('total')).filter(daily_sales__gt=1000)[:3])
+    return alerts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=50000)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        user = get_user_model().objects.create(username='bench-manager', role='manager')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        stores = Store.objects.bulk_create([Store(name=f'Store {i}', location='Lab') for i in range(20)])
+        Product.objects.bulk_create([
+            Product(name=f'Product {i}', sku=f'P{i}', stock=random.randrange(200), min_stock_level=10)
+            for i in range(args.products)
+        ], batch_size=2000)
+        now = timezone.now()
+        Transaction.objects.bulk_create([
+            Transaction(receipt_number=f'N{i}', store_id=random.choice(stores), subtotal=Decimal('80'), tax_amount=0,
+                        total=Decimal('80'), payment_method='cash', status='completed',
+                        timestamp=now - timedelta(minutes=random.randrange(60 * 24 * 30)))
+            for i in range(args.transactions)
+        ], batch_size=2000)
+        # The outbox as it would look after a month of trading
+        Notification.objects.bulk_create([
+            Notification(kind='low_stock', level='warning', priority='medium', message=f'Low stock alert: Product {i}')
+            for i in range(5000)
+        ], batch_size=2000)
+
+        report('recompute per poll', args.iterations, timed(lambda i: old_notifications(), args.iterations), unit='poll')
+        report('outbox endpoint', args.iterations,
+               timed(lambda i: client.get('/api/cashier/manager-dashboard/notifications/'), args.iterations), unit='poll')
+
+
+if __name__ == '__main__':
+    main()
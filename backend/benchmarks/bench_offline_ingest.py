@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Offline sync throughput: NDJSON records ingested per second on one worker.
+
+Posts a single NDJSON body through the `ingest` endpoint (parsing, dedupe,
+bulk inserts, stock ledger) and then replays it to measure the duplicate
+path. Target: >= 10k transactions/s.
+
+    python benchmarks/bench_offline_ingest.py [--records 10000] [--lines 3]
+"""
+import argparse
+import json
+import time
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from cashierdashboard.models import Store, Product, Transaction
+
+
+def build_body(records, lines, product_ids):
+    rows = []
+    for i in range(records):
+        rows.append(json.dumps({
+            'idempotency_key': f'sale-{i}',
+            'timestamp': '2025-08-05T10:15:00Z',
+            'payment_method': 'cash',
+            'items': [
+                {'product': product_ids[(i + j) % len(product_ids)], 'quantity': 1 + j, 'unit_price': '1.99'}
+                for j in range(lines)
+            ],
+        }))
+    return '\n'.join(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument('--lines', type=int, default=3)
+    parser.add_argument('--products', type=int, default=500)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        user = get_user_model().objects.create(username='bench-cashier', role='CASHIER')
+        store = Store.objects.create(name='Bench', location='Lab')
+        Product.objects.bulk_create([
+            Product(name=f'Item {i}', sku=f'BENCH-{i}', price=Decimal('1.99'), stock=10 ** 6)
+            for i in range(args.products)
+        ])
+        product_ids = list(Product.objects.values_list('id', flat=True))
+        body = build_body(args.records, args.lines, product_ids)
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = f'/api/cashier/offline-transactions/ingest/?store={store.id}&device_id=BENCH-POS'
+
+        print(f"{args.records} records x {args.lines} lines, {len(body) / 1e6:.1f} MB body")
+        start = time.perf_counter()
+        response = client.post(url, body, content_type='application/x-ndjson')
+        report('ingest (new sales)', args.records, time.perf_counter() - start, unit='tx')
+        assert response.data['summary']['created'] == args.records, response.data['summary']
+        assert Transaction.objects.count() == args.records
+
+        start = time.perf_counter()
+        response = client.post(url, body, content_type='application/x-ndjson')
+        report('ingest (replayed duplicates)', args.records, time.perf_counter() - start, unit='tx')
+        assert response.data['summary']['duplicate'] == args.records
+
+
+if __name__ == '__main__':
+    main()
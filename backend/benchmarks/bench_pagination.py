@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Paging through /api/cashier/transactions/ at increasing depth: LIMIT/OFFSET
+(what page-number pagination would run) against the keyset cursor, first
+as raw queries and then end to end through the API. Also the old unpaginated
+response for comparison.
+
+    python benchmarks/bench_pagination.py [--transactions 200000] [--limit 50]
+"""
+import argparse
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from cashierdashboard.models import Transaction
+from cashierdashboard.pagination import paginate, encode_cursor, keyset_fields
+from cashierdashboard.serializers import TransactionSerializer
+
+KEYSET = ('-timestamp', '-id')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=200000)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        now = timezone.now()
+        Transaction.objects.bulk_create([
+            Transaction(receipt_number=f'R{i}', subtotal=Decimal('9.99'), tax_amount=0, total=Decimal('9.99'),
+                        payment_method='cash', status='completed',
+                        timestamp=now - timedelta(seconds=random.randrange(365 * 86400)))
+            for i in range(args.transactions)
+        ], batch_size=5000)
+        ordered = Transaction.objects.order_by(*KEYSET)
+        fields = keyset_fields(ordered, KEYSET)
+
+        pages = args.transactions // args.limit
+        for page in sorted({1, 100, pages // 4, pages // 2, pages - 1}):
+            offset = page * args.limit
+            # The cursor a client would hold after reading `page` pages
+            cursor = encode_cursor(ordered[offset - 1], fields)
+            report(f'OFFSET page {page}', 20, timed(
+                lambda i: list(ordered[offset:offset + args.limit]), 20), unit='page')
+            report(f'keyset page {page}', 20, timed(
+                lambda i: paginate(Transaction.objects.all(), cursor, args.limit, KEYSET), 20), unit='page')
+
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username='bench', password='x', role='CASHIER'))
+        client.get('/api/cashier/transactions/', {'limit': 1})  # first request loads URLconf and middleware
+        deep = encode_cursor(ordered[(pages - 1) * args.limit - 1], fields)
+        report('GET transactions/ first page', 20, timed(
+            lambda i: client.get('/api/cashier/transactions/', {'limit': args.limit}), 20), unit='call')
+        report('GET transactions/ last page', 20, timed(
+            lambda i: client.get('/api/cashier/transactions/', {'limit': args.limit, 'cursor': deep}), 20),
+            unit='call')
+        # Before: one response with every row
+        report('render every row (old unpaginated list)', 1, timed(
+            lambda i: JSONRenderer().render(TransactionSerializer(Transaction.objects.all(), many=True).data), 1),
+            unit='call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Catalog search: the old four-column icontains scan with two joins vs the
+ranked full-text query, for common and rare terms, plus the
+/api/customer/products/?search= endpoint end to end.
+
+    python benchmarks/bench_product_search.py [--products 50000] [--iterations 50]
+"""
+import argparse
+import random
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from django.db.models import Q
+from rest_framework.test import APIClient
+from cashierdashboard.models import Category, SubCategory, Product
+from cashierdashboard.search import search_products, rebuild_index, search_backend
+
+WORDS = ('fresh organic classic premium family value spicy sweet crunchy light dark smoked roasted '
+         'mild extra golden herbal citrus creamy wholegrain').split()
+NOUNS = 'milk bread cheese coffee tea rice beans soap juice yoghurt butter honey pasta sauce chips'.split()
+VOCABULARY = [f'term{i}' for i in range(5000)]  # descriptions draw from a realistically wide vocabulary
+
+
+def icontains(query):
+    return Product.objects.filter(
+        Q(name__icontains=query) | Q(description__icontains=query) |
+        Q(category__name__icontains=query) | Q(subcategory__name__icontains=query),
+        is_active=True
+    ).order_by('-id')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=50000)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        categories = [Category.objects.create(name=f'{noun.title()} aisle') for noun in NOUNS]
+        subcategories = [SubCategory.objects.create(name=f'{word.title()} range', category=random.choice(categories))
+                         for word in WORDS]
+        Product.objects.bulk_create([
+            Product(name=f'{random.choice(WORDS).title()} {random.choice(NOUNS)} {i}', sku=f'S{i}',
+                    category=random.choice(categories), subcategory=random.choice(subcategories),
+                    description=' '.join(random.choices(VOCABULARY, k=25) + random.choices(WORDS + NOUNS, k=2)),
+                    stock=10)
+            for i in range(args.products)
+        ], batch_size=5000)
+        elapsed = timed(lambda i: rebuild_index(), 1)
+        report('rebuild_search_index', args.products, elapsed, unit='product')
+        print(f'backend: {type(search_backend()).__name__}')
+
+        for query in ('coffee', 'smoked honey', 'term4217', f'S{args.products // 2}'):
+            print(f'-- "{query}": {icontains(query).count()} icontains / '
+                  f'{search_products(Product.objects.filter(is_active=True), query).count()} full-text matches')
+            report('icontains, first 20', args.iterations, timed(
+                lambda i: list(icontains(query)[:20]), args.iterations), unit='query')
+            report('full-text ranked, first 20', args.iterations, timed(
+                lambda i: list(search_products(Product.objects.filter(is_active=True), query)[:20]),
+                args.iterations), unit='query')
+
+        client = APIClient()
+        # Unpaginated: the response serializes every match
+        report('GET /api/customer/products/?search=term4217', 10, timed(
+            lambda i: client.get('/api/customer/products/', {'search': 'term4217'}), 10), unit='call')
+
+
+if __name__ == '__main__':
+    main()
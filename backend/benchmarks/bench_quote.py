@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Cart quote latency for 1, 50 and 500-line carts, through the quote action
+and through price_cart() alone.
+
+    python benchmarks/bench_quote.py [--iterations 200]
+"""
+import argparse
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from cashierdashboard.models import Store, Product, ProductVariant
+from cashierdashboard.pricing import price_cart
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        user = get_user_model().objects.create(username='bench-cashier', role='CASHIER')
+        store = Store.objects.create(name='Bench', location='Lab', tax_rate=Decimal('16.00'))
+        products = Product.objects.bulk_create([
+            Product(name=f'Item {i}', sku=f'BENCH-{i}', price=Decimal('1.99'))
+            for i in range(500)
+        ])
+        variants = ProductVariant.objects.bulk_create([
+            ProductVariant(product=product, name='Large', sku=f'BENCH-{i}-L', price_modifier=Decimal('0.50'))
+            for i, product in enumerate(products[::5])
+        ])
+        variant_of = {variant.product_id: variant.id for variant in variants}
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        for size in (1, 50, 500):
+            items = [
+                {'product': product.id, 'variant': variant_of.get(product.id), 'quantity': 2, 'discount': '0.10'}
+                for product in products[:size]
+            ]
+            payload = {'store': store.id, 'items': items}
+            elapsed = timed(lambda i: client.post('/api/cashier/transactions/quote/', payload, format='json'),
+                            args.iterations)
+            report(f'quote action, {size} lines', args.iterations, elapsed, unit='quote')
+            print(f"{'':<40} {elapsed / args.iterations * 1e3:.2f} ms per quote")
+
+            lines = [dict(item, discount=Decimal(item['discount'])) for item in items]
+            elapsed = timed(lambda i: price_cart(lines, store=store.id), args.iterations)
+            report(f'price_cart(), {size} lines', args.iterations, elapsed, unit='quote')
+
+
+if __name__ == '__main__':
+    main()
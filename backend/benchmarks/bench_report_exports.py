@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Manager inventory/sales reports: peak Python memory and time for the JSON
+response vs the streamed CSV/NDJSON export, as the catalog grows.
+
+    python benchmarks/bench_report_exports.py [--products 50000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from cashierdashboard.models import Store, Category, Product, Transaction
+
+
+def measure(label, fetch):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fetch()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<40} {elapsed:8.3f}s  peak {peak / 2**20:8.1f} MiB  body {size / 2**20:8.1f} MiB")
+
+
+def drain(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=50000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        user = get_user_model().objects.create(username='bench-manager', role='manager')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        store = Store.objects.create(name='Store', location='Lab')
+        categories = Category.objects.bulk_create([Category(name=f'Category {i}') for i in range(50)])
+        now = timezone.now()
+
+        written = 0
+        for target in (args.products // 10, args.products):
+            Product.objects.bulk_create([
+                Product(name=f'Product {i}', sku=f'SKU{i}', category=random.choice(categories), price=Decimal('2.50'),
+                        cost_price=Decimal('1.25'), stock=random.randrange(100))
+                for i in range(written, target)
+            ], batch_size=2000)
+            Transaction.objects.bulk_create([
+                Transaction(receipt_number=f'B{i}', store_id=store, subtotal=Decimal('1'), tax_amount=0,
+                            total=Decimal('1'), payment_method='cash', status='completed',
+                            timestamp=now - timedelta(minutes=random.randrange(30 * 24 * 60)))
+                for i in range(written, target)
+            ], batch_size=2000)
+            written = target
+
+            print(f'-- {target} products / transactions')
+            url = '/api/manager/reports/inventory_report/'
+            measure('inventory_report JSON', lambda: drain(client.get(url)))
+            measure('inventory_report ?format=csv', lambda: drain(client.get(url, {'format': 'csv'})))
+            measure('inventory_report ?format=ndjson', lambda: drain(client.get(url, {'format': 'ndjson'})))
+
+            period = {'start_date': (now - timedelta(days=31)).date().isoformat(), 'end_date': now.date().isoformat()}
+            url = '/api/manager/reports/sales_report/'
+            measure('sales_report ?format=csv', lambda: drain(client.get(url, {**period, 'format': 'csv'})))
+            measure('sales_report ?format=ndjson', lambda: drain(client.get(url, {**period, 'format': 'ndjson'})))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Rerunning a year-long sales report interactively vs downloading the
+artifact the scheduler stored for the same ReportConfig.
+
+    python benchmarks/bench_report_scheduler.py [--transactions 50000] [--iterations 20]
+"""
+import argparse
+import random
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from cashierdashboard.models import Store, Transaction
+from managerdashboard import scheduling
+from managerdashboard.models import Manager, ReportConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=50000)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    with benchmark_database(), tempfile.TemporaryDirectory() as artifacts:
+        disable_throttling()
+        scheduling.ARTIFACT_ROOT = artifacts
+        user = get_user_model().objects.create(username='bench-manager', role='manager')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        store = Store.objects.create(name='Store', location='Lab')
+        now = timezone.now()
+        Transaction.objects.bulk_create([
+            Transaction(receipt_number=f'B{i}', store_id=store, subtotal=Decimal('1'), tax_amount=0,
+                        total=Decimal('1'), payment_method='cash', status='completed',
+                        timestamp=now - timedelta(minutes=random.randrange(365 * 24 * 60)))
+            for i in range(args.transactions)
+        ], batch_size=2000)
+
+        config = ReportConfig.objects.create(
+            manager=Manager.objects.create(user=user, role='store_manager'), name='Yearly sales',
+            metrics=['sales', 'orders'], filters={'days': 365}, schedule='daily', export_format='csv'
+        )
+        period = {'start_date': (now - timedelta(days=365)).date().isoformat(), 'end_date': now.date().isoformat()}
+
+        print(f'-- {args.transactions} transactions over a year')
+        report('sales_report (interactive)', args.iterations, timed(
+            lambda i: client.get('/api/manager/reports/sales_report/', period), args.iterations
+        ), unit='req')
+        report('scheduler run_due()', 1, timed(lambda i: scheduling.run_due(), 1), unit='run')
+        report('download stored artifact', args.iterations, timed(
+            lambda i: b''.join(client.get(f'/api/manager/report-configs/{config.pk}/download/').streaming_content),
+            args.iterations
+        ), unit='req')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Dashboard polling with the response cache cold (every request recomputes)
+vs warm (tag versions unchanged between polls).
+
+    python benchmarks/bench_response_cache.py [--transactions 20000] [--iterations 20]
+"""
+import argparse
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from cashierdashboard.caching import response_cache
+from cashierdashboard.models import Store, Category, SubCategory, Product, Transaction
+
+ENDPOINTS = [
+    '/api/cashier/manager-dashboard/store_performance/',
+    '/api/cashier/manager-dashboard/inventory_alerts/',
+    '/api/cashier/manager-dashboard/notifications/',
+    '/api/cashier/realtime-data/category_updates/',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=20000)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        user = get_user_model().objects.create(username='bench-manager', role='manager')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        stores = Store.objects.bulk_create([Store(name=f'Store {i}', location='Lab') for i in range(5)])
+        categories = Category.objects.bulk_create([Category(name=f'Category {i}') for i in range(30)])
+        SubCategory.objects.bulk_create([SubCategory(name=f'Sub {i}', category=c) for c in categories for i in range(5)])
+        Product.objects.bulk_create([
+            Product(name=f'Product {i}', sku=f'SKU{i}', price=Decimal('2.50'), category=random.choice(categories),
+                    stock=random.randrange(50))
+            for i in range(2000)
+        ])
+        now = timezone.now()
+        Transaction.objects.bulk_create([
+            Transaction(receipt_number=f'B{i}', store_id=random.choice(stores), subtotal=Decimal('1'), tax_amount=0,
+                        total=Decimal('1'), payment_method='cash', status='completed',
+                        timestamp=now - timedelta(minutes=random.randrange(60 * 24 * 60)))
+            for i in range(args.transactions)
+        ], batch_size=2000)
+
+        cache = response_cache()
+        for url in ENDPOINTS:
+            name = url.rstrip('/').rsplit('/', 1)[-1]
+
+            def cold(i):
+                cache.clear()
+                client.get(url)
+
+            report(f'{name} (cold)', args.iterations, timed(cold, args.iterations), unit='req')
+            report(f'{name} (cached)', args.iterations, timed(lambda i: client.get(url), args.iterations), unit='req')
+
+
+if __name__ == '__main__':
+    main()
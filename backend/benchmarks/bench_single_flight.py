@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Thundering herd on an expensive dashboard aggregate: N threads ask for it
+at once right after a sale invalidates it. Compares every thread computing
+independently with cached_compute's single-flight and stale-while-revalidate.
+
+    python benchmarks/bench_single_flight.py [--transactions 20000] [--threads 16] [--rounds 5]
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database
+
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+from cashierdashboard.caching import cached_compute, invalidate_tags, response_cache, SALES
+from cashierdashboard.models import Store, Transaction
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        stores = Store.objects.bulk_create([Store(name=f'Store {i}', location='Lab') for i in range(5)])
+        now = timezone.now()
+        Transaction.objects.bulk_create([
+            Transaction(receipt_number=f'B{i}', store_id=random.choice(stores), subtotal=Decimal('1'), tax_amount=0,
+                        total=Decimal('1'), payment_method='cash', status='completed',
+                        timestamp=now - timedelta(minutes=random.randrange(60 * 24 * 60)))
+            for i in range(args.transactions)
+        ], batch_size=2000)
+        response_cache().clear()
+        computations = []
+
+        def store_performance():
+            computations.append(1)
+            since = timezone.now().date() - timedelta(days=30)
+            rows = list(Transaction.objects.filter(timestamp__date__gte=since, status='completed').values(
+                'store_id__name').annotate(total=Sum('total')))
+            connection.close()  # worker threads each open their own connection
+            return rows
+
+        def herd(fetch):
+            computations.clear()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.threads) as pool:
+                list(pool.map(lambda i: fetch(), range(args.threads)))
+            return time.perf_counter() - start, len(computations)
+
+        modes = [
+            ('independent', store_performance),
+            ('single-flight', lambda: cached_compute('bench', store_performance, 60, [SALES])),
+            ('single-flight + stale', lambda: cached_compute('bench', store_performance, 60, [SALES], stale_ttl=300)),
+        ]
+        for label, fetch in modes:
+            elapsed = computations_total = 0
+            fetch()  # warm: the stale mode needs a previous value
+            for _ in range(args.rounds):
+                invalidate_tags(SALES)
+                took, computed = herd(fetch)
+                elapsed += took
+                computations_total += computed
+            print(f'{label:<24} {args.threads} threads x {args.rounds} rounds: '
+                  f'{elapsed / args.rounds * 1000:8.1f} ms/round, {computations_total / args.rounds:5.1f} computations/round')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Manager dashboard_metrics: the old Transaction scans vs the DailyStoreSales
+rollup, as sales history grows (spread over a year and 5 stores).
+
+    python benchmarks/bench_store_rollup.py [--iterations 10]
+"""
+import argparse
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.test import APIClient
+from cashierdashboard.models import Store, Transaction
+from cashierdashboard.sales import rebuild_store_sales
+
+
+def old_metrics():
+    today = timezone.now().date()
+    week_ago = today - timedelta(days=7)
+    month_ago = today - timedelta(days=30)
+    current = Transaction.objects.filter(timestamp__date__gte=week_ago, status__in=['completed', 'paid'])
+    previous = Transaction.objects.filter(timestamp__date__gte=month_ago, timestamp__date__lt=week_ago,
+                                          status__in=['completed', 'paid'])
+    return (current.aggregate(total=Sum('total'))['total'], current.count(),
+            previous.aggregate(total=Sum('total'))['total'], previous.count())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=10)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        user = get_user_model().objects.create(username='bench-manager', role='MANAGER')
+        stores = Store.objects.bulk_create([Store(name=f'Store {i}', location='Lab') for i in range(5)])
+        client = APIClient()
+        client.force_authenticate(user=user)
+        now = timezone.now()
+
+        written = 0
+        for target in (5000, 50000, 200000):
+            Transaction.objects.bulk_create([
+                Transaction(receipt_number=f'B{i}', store_id=random.choice(stores), subtotal=Decimal('1'),
+                            tax_amount=0, total=Decimal('1'), payment_method='cash', status='completed',
+                            timestamp=now - timedelta(minutes=random.randrange(365 * 24 * 60)))
+                for i in range(written, target)
+            ], batch_size=2000)
+            written = target
+            rebuild_store_sales()
+
+            print(f'-- {target} transactions of history')
+            report('Transaction scans (old)', args.iterations, timed(lambda i: old_metrics(), args.iterations), unit='req')
+            report('dashboard_metrics (rollup)', args.iterations, timed(
+                lambda i: client.get('/api/cashier/manager-dashboard/dashboard_metrics/'), args.iterations
+            ), unit='req')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Autocomplete: building the in-memory suggest index, then per-keystroke
+latency of the index for exact prefixes, typos and misses, against the two
+icontains queries /api/customer/search/ ran per keystroke before.
+
+    python benchmarks/bench_suggest.py [--products 50000] [--iterations 2000]
+"""
+import argparse
+import random
+
+from common import benchmark_database, disable_throttling, report, timed
+
+from rest_framework.test import APIClient
+from cashierdashboard.models import Category, Product
+from cashierdashboard.suggest import suggester
+
+WORDS = ('fresh organic classic premium family value spicy sweet crunchy light dark smoked roasted '
+         'mild extra golden herbal citrus creamy wholegrain').split()
+NOUNS = 'milk bread cheese coffee tea rice beans soap juice yoghurt butter honey pasta sauce chips'.split()
+BRANDS = [f'brand{i}' for i in range(2000)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=50000)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        disable_throttling()
+        categories = [Category.objects.create(name=f'{noun.title()} aisle') for noun in NOUNS]
+        Product.objects.bulk_create([
+            Product(name=f'{random.choice(BRANDS).title()} {random.choice(WORDS).title()} {random.choice(NOUNS)}',
+                    sku=f'S{i}', category=random.choice(categories), stock=10)
+            for i in range(args.products)
+        ], batch_size=5000)
+
+        suggester.invalidate()
+        report('build suggest index', args.products, timed(lambda i: suggester.warm(), 1), unit='product')
+
+        for query in ('smo', 'brand1234 roas', 'S2500', 'smokd', 'smokd chese', 'wholegran', 'qqqq'):
+            print(f'-- "{query}": {[row["text"] for row in suggester.suggest(query, 5)]}')
+            report('suggest, top 8', args.iterations, timed(
+                lambda i: suggester.suggest(query, 8), args.iterations), unit='keystroke')
+
+        client = APIClient()
+        client.get('/api/customer/suggest/', {'q': 'warm'})  # first request loads URLconf and middleware
+        iterations = max(args.iterations // 100, 5)
+        report('GET /api/customer/suggest/?q=smokd', iterations, timed(
+            lambda i: client.get('/api/customer/suggest/', {'q': 'smokd'}), iterations), unit='call')
+        report('GET /api/customer/search/?q=smo (icontains)', iterations, timed(
+            lambda i: client.get('/api/customer/search/', {'q': 'smo'}), iterations), unit='call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Shared setup for the benchmark scripts in this directory.
+
+Every benchmark runs against a throwaway test database so it never touches
+db.sqlite3 or DATABASE_URL data. Run from the backend directory, e.g.
+
+    python benchmarks/bench_checkout.py
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Set up Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def benchmark_database():
+    """Create a fresh test database for the duration of the block"""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, keepdb=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def disable_throttling():
+    """The default 1000/hour user throttle would cut every benchmark short"""
+    from rest_framework.throttling import SimpleRateThrottle
+    SimpleRateThrottle.allow_request = lambda self, request, view: True
+
+
+def timed(fn, iterations):
+    """Run fn() `iterations` times and return elapsed seconds"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return time.perf_counter() - start
+
+
+def report(label, iterations, elapsed, unit='ops'):
+    rate = iterations / elapsed if elapsed else float('inf')
+    print(f"{label:<40} {iterations:>7} in {elapsed:8.3f}s  ->  {rate:10.1f} {unit}/s")
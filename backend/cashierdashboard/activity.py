@@ -0,0 +1,146 @@
+"""
+Activity feed behind the recent-orders and pending-approvals widgets.
+
+Each Transaction and Return gets one ActivityEvent row when it is written,
+carrying every field those widgets display (store and customer names,
+receipt number, item count), so a widget is a single indexed read of N
+rows with no per-row joins or counts. Status changes and edits update the
+row in place. The table is bounded: every PRUNE_EVERY writes, resolved
+events beyond the newest ACTIVITY_FEED_SIZE per kind are deleted; pending
+ones are always kept. rebuild_activity_feed backfills it from scratch.
+"""
+import itertools
+import threading
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Count, F
+
+from .models import ActivityEvent, Customer, Store, Transaction, Return
+
+FEED_SIZE = getattr(settings, 'ACTIVITY_FEED_SIZE', 500)
+PRUNE_EVERY = getattr(settings, 'ACTIVITY_FEED_PRUNE_EVERY', 100)
+PENDING_STATUSES = ('pending', 'pending_approval')
+
+TRANSACTION, RETURN = 'transaction', 'return'
+
+_writes = 0
+_writes_lock = threading.Lock()  # request threads share the counter
+
+
+def _names(model, ids):
+    ids = {pk for pk in ids if pk}
+    return dict(model.objects.filter(pk__in=ids).values_list('id', 'name')) if ids else {}
+
+
+def _transaction_events(sales, item_counts):
+    stores = _names(Store, (sale.store_id_id for sale in sales))
+    customers = _names(Customer, (sale.customer_id for sale in sales))
+    return [
+        ActivityEvent(
+            kind=TRANSACTION, object_id=sale.pk, status=sale.status, timestamp=sale.timestamp,
+            amount=sale.total, reference=sale.receipt_number, store_name=stores.get(sale.store_id_id, ''),
+            customer_name=customers.get(sale.customer_id, ''), items_count=item_counts.get(sale.pk, 0),
+        )
+        for sale in sales
+    ]
+
+
+def _written(count):
+    global _writes
+    with _writes_lock:
+        before, _writes = _writes, _writes + count
+        crossed = before // PRUNE_EVERY != _writes // PRUNE_EVERY
+    if crossed:
+        prune()
+
+
+def record_transactions(sales, item_counts=None):
+    """Add feed rows for newly saved Transactions; item_counts maps transaction id to line count"""
+    sales = list(sales)
+    if sales:
+        ActivityEvent.objects.bulk_create(_transaction_events(sales, item_counts or {}), ignore_conflicts=True)
+        _written(len(sales))
+
+
+def update_transaction(sale):
+    """Rewrite a transaction's row after an edit, keeping its item count"""
+    counts = dict(ActivityEvent.objects.filter(kind=TRANSACTION, object_id=sale.pk).values_list('object_id', 'items_count'))
+    forget(TRANSACTION, sale.pk)
+    record_transactions([sale], counts)
+
+
+def add_items(transaction_id, count):
+    ActivityEvent.objects.filter(kind=TRANSACTION, object_id=transaction_id).update(items_count=F('items_count') + count)
+
+
+def _return_events(returns):
+    originals = {
+        sale.pk: sale for sale in Transaction.objects.filter(
+            pk__in={ret.original_transaction_id for ret in returns}
+        ).select_related('store_id').only('id', 'receipt_number', 'timestamp', 'store_id__name')
+    }
+    events = []
+    for ret in returns:
+        original = originals[ret.original_transaction_id]
+        events.append(ActivityEvent(
+            kind=RETURN, object_id=ret.pk, status=ret.status, timestamp=original.timestamp,
+            amount=ret.refund_amount, reference=original.receipt_number,
+            store_name=original.store_id.name if original.store_id else '', reason=ret.reason,
+        ))
+    return events
+
+
+def record_returns(returns):
+    """Add or refresh feed rows for saved Returns"""
+    returns = list(returns)
+    if returns:
+        ActivityEvent.objects.filter(kind=RETURN, object_id__in=[ret.pk for ret in returns]).delete()
+        ActivityEvent.objects.bulk_create(_return_events(returns))
+        _written(len(returns))
+
+
+def set_status(kind, object_id, status):
+    set_statuses(kind, [object_id], status)
+
+
+def set_statuses(kind, object_ids, status):
+    ActivityEvent.objects.filter(kind=kind, object_id__in=object_ids).update(status=status)
+
+
+def forget(kind, object_id):
+    ActivityEvent.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def prune(keep=None):
+    """Delete resolved events older than the newest `keep` of each kind"""
+    keep = keep or FEED_SIZE
+    removed = 0
+    for kind in (TRANSACTION, RETURN):
+        cutoff = ActivityEvent.objects.filter(kind=kind).order_by('-timestamp').values_list('timestamp', flat=True)[keep:keep + 1]
+        if cutoff:
+            removed += ActivityEvent.objects.filter(kind=kind, timestamp__lt=cutoff[0]).exclude(
+                status__in=PENDING_STATUSES
+            ).delete()[0]
+    return removed
+
+
+def rebuild_activity_feed(size=None):
+    """Refill the feed from the newest transactions and returns plus everything still pending"""
+    size = size or FEED_SIZE
+    recent = list(Transaction.objects.order_by('-timestamp')[:size]) + list(
+        Transaction.objects.filter(status__in=PENDING_STATUSES).order_by('-timestamp')
+    )
+    sales = list({sale.pk: sale for sale in recent}.values())
+    item_counts = dict(Transaction.objects.filter(pk__in=[sale.pk for sale in sales]).annotate(
+        lines=Count('transactionitem')
+    ).values_list('id', 'lines'))
+    returns = {ret.pk: ret for ret in itertools.chain(
+        Return.objects.order_by('-id')[:size], Return.objects.filter(status__in=PENDING_STATUSES)
+    )}
+
+    with db_transaction.atomic():
+        ActivityEvent.objects.all().delete()
+        ActivityEvent.objects.bulk_create(_transaction_events(sales, item_counts), batch_size=1000)
+        ActivityEvent.objects.bulk_create(_return_events(list(returns.values())), batch_size=1000)
+    return len(sales) + len(returns)
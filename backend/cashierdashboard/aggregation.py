@@ -0,0 +1,109 @@
+"""
+Time-bucketed aggregation for dashboard charts and reports.
+
+bucketed() runs one grouped query (Trunc* on a datetime field, range
+filtered on the raw column so indexes apply) and fills empty buckets in
+Python, instead of one aggregate query per day or month.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncHour, TruncDay, TruncWeek, TruncMonth
+from django.utils import timezone
+
+TRUNCATORS = {
+    'hour': TruncHour,
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+SALES_METRICS = {'sales': Sum('total'), 'orders': Count('id')}
+
+
+def bucket_start(value, granularity):
+    """Start of the bucket holding `value` (a date or aware datetime), in local time"""
+    if isinstance(value, datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        if granularity == 'hour':
+            return value.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+        value = value.date()
+    if granularity == 'hour':
+        return datetime.combine(value, time.min)
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket(start, granularity):
+    if granularity == 'hour':
+        return start + timedelta(hours=1)
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    if granularity == 'month':
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def bucket_range(start, end, granularity):
+    """Every bucket start from the one holding `start` to the one holding `end`"""
+    current = bucket_start(start, granularity)
+    last = bucket_start(end, granularity)
+    buckets = []
+    while current <= last:
+        buckets.append(current)
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+def _local_bound(value):
+    if isinstance(value, datetime):
+        return value if timezone.is_aware(value) else timezone.make_aware(value)
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def day_bounds(field, start, end):
+    """Index-friendly filter kwargs for start..end; dates are whole local days, datetimes exact"""
+    if isinstance(end, datetime):
+        upper = {f'{field}__lte': _local_bound(end)}
+    else:
+        upper = {f'{field}__lt': _local_bound(end + timedelta(days=1))}
+    return {f'{field}__gte': _local_bound(start), **upper}
+
+
+def bucketed(queryset, granularity, start, end, field='timestamp', metrics=None):
+    """
+    Aggregate `queryset` into buckets covering start..end (inclusive; dates
+    or datetimes). Returns [{'bucket': date|datetime, <metric>: value}],
+    one entry per bucket in order, with empty buckets zero-filled.
+    """
+    if granularity not in TRUNCATORS:
+        raise ValueError(f'granularity must be one of {sorted(TRUNCATORS)}')
+    metrics = metrics or SALES_METRICS
+
+    rows = queryset.filter(**day_bounds(field, start, end)).annotate(
+        bucket=TRUNCATORS[granularity](field)
+    ).values('bucket').annotate(**metrics).order_by('bucket')
+
+    found = {}
+    for row in rows:
+        key = bucket_start(row.pop('bucket'), granularity)
+        # Trunc can split one local bucket across DST-shifted keys; merge them
+        if key in found:
+            for name, value in row.items():
+                found[key][name] = (found[key][name] or 0) + (value or 0)
+        else:
+            found[key] = row
+
+    series = []
+    for key in bucket_range(start, end, granularity):
+        row = found.get(key, {})
+        series.append({'bucket': key, **{name: row.get(name) or 0 for name in metrics}})
+    return series
+
+
+def totals(series, *names):
+    """Sum named metrics over a bucketed() series"""
+    return {name: sum(point[name] for point in series) for name in names}
@@ -0,0 +1,288 @@
+"""
+In-process columnar snapshot of recent sales for dashboard analytics.
+
+Each process keeps the last ANALYTICS_WINDOW_DAYS of Transactions and
+TransactionItems as NumPy columns: epoch seconds, store, cashier, status
+code and total per sale, and the same plus product, quantity and amount
+per line. Widgets filter with boolean masks, bucket with np.searchsorted
+over bucket edges and sum with np.bincount, so they never build model
+instances or hit the database.
+
+Refreshing is incremental and driven by the response cache's tags, so a
+widget never lags the responses it feeds. When the SALES tag has moved,
+rows whose primary key is above the snapshot's high-water mark (less an
+overlap, for ids that commit out of order) are appended. Edits, status
+changes and deletes of existing sales all pass through
+sales.record_sales(sign=-1), which also invalidates SALES_REWRITES;
+every process notices that version change and reloads in full.
+
+The overlap only catches a sale whose id was allocated before the
+high-water mark if it commits while fewer than ID_OVERLAP newer ids
+exist; one held open longer (a slow offline batch, say) is skipped by
+every later append. A full reload at least every ANALYTICS_RELOAD_SECONDS
+bounds how long such a sale stays out of the widgets.
+
+Periods that start before the snapshot's window are answered from the
+database instead (see source()).
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from .aggregation import bucketed, bucket_range, day_bounds, next_bucket, _local_bound
+from .caching import tag_versions, SALES, SALES_REWRITES
+from .models import Transaction, TransactionItem
+
+WINDOW_DAYS = getattr(settings, 'ANALYTICS_WINDOW_DAYS', 400)  # must cover the longest widget period
+ID_OVERLAP = getattr(settings, 'ANALYTICS_ID_OVERLAP', 1000)
+RELOAD_SECONDS = getattr(settings, 'ANALYTICS_RELOAD_SECONDS', 900)
+LOAD_CHUNK = 10000
+
+SALE_FIELDS = ('id', 'timestamp', 'store_id_id', 'cashier_id', 'status', 'total')
+SALE_NUMBERS = (('total', np.float64),)
+LINE_FIELDS = (
+    'id', 'transaction__timestamp', 'transaction__store_id_id', 'transaction__cashier_id', 'transaction__status',
+    'product_id', 'quantity', 'total',
+)
+LINE_NUMBERS = (('product', np.int32), ('quantity', np.int32), ('amount', np.float64))
+
+
+class Vocabulary:
+    """Small-integer codes for status strings"""
+
+    def __init__(self):
+        self.codes = {}
+
+    def code(self, value):
+        return self.codes.setdefault(value, len(self.codes))
+
+    def codes_for(self, values):
+        return [self.codes[value] for value in values if value in self.codes]
+
+
+def _columns(rows, statuses, numbers):
+    """Column arrays for (id, timestamp, store, cashier, status, *numbers) rows"""
+    count = len(rows)
+    columns = {
+        'id': np.fromiter((row[0] for row in rows), np.int64, count),
+        'ts': np.fromiter((row[1].timestamp() for row in rows), np.float64, count),
+        'store': np.fromiter((row[2] or 0 for row in rows), np.int32, count),
+        'cashier': np.fromiter((row[3] or 0 for row in rows), np.int32, count),
+        'status': np.fromiter((statuses.code(row[4]) for row in rows), np.int16, count),
+    }
+    for offset, (name, dtype) in enumerate(numbers, start=5):
+        columns[name] = np.fromiter((row[offset] or 0 for row in rows), dtype, count)
+    return columns
+
+
+def _load(queryset, fields, numbers, statuses):
+    """Columns for every row of `queryset`, converted LOAD_CHUNK rows at a time"""
+    chunks, rows = [], []
+    for row in queryset.values_list(*fields).iterator(chunk_size=LOAD_CHUNK):
+        rows.append(row)
+        if len(rows) == LOAD_CHUNK:
+            chunks.append(_columns(rows, statuses, numbers))
+            rows = []
+    chunks.append(_columns(rows, statuses, numbers))
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+def _select(columns, mask):
+    return {name: column[mask] for name, column in columns.items()}
+
+
+def _unseen(new, old, floor):
+    """Rows of `new` whose id is not already in `old`; only ids above `floor` can overlap"""
+    recent = old['id'][old['id'] > floor]
+    return _select(new, ~np.isin(new['id'], recent))
+
+
+def _concat(old, new):
+    return {name: np.concatenate([old[name], new[name]]) for name in old} if len(new['id']) else old
+
+
+class Snapshot:
+    """Immutable column arrays for sales and lines since `since`; queries never touch the database"""
+
+    def __init__(self, since, statuses, sales, lines):
+        self.since = since
+        self.statuses = statuses
+        self.sales = sales
+        self.lines = lines
+
+    @property
+    def high_water(self):
+        return (int(self.sales['id'].max()) if len(self.sales['id']) else 0,
+                int(self.lines['id'].max()) if len(self.lines['id']) else 0)
+
+    def covers(self, start):
+        return _local_bound(start) >= self.since
+
+    def _mask(self, columns, start, end, store, statuses):
+        ts = columns['ts']
+        mask = ts >= _local_bound(start).timestamp()
+        if end is not None:
+            if isinstance(end, datetime):
+                mask &= ts <= _local_bound(end).timestamp()
+            else:
+                mask &= ts < _local_bound(end + timedelta(days=1)).timestamp()
+        if store not in (None, '', 'all'):
+            mask &= columns['store'] == int(store)
+        if statuses is not None:
+            mask &= np.isin(columns['status'], self.statuses.codes_for(statuses))
+        return mask
+
+    def series(self, granularity, start, end, store=None, statuses=None):
+        """Same result as aggregation.bucketed() for sales and orders: one zero-filled entry per bucket"""
+        buckets = bucket_range(start, end, granularity)
+        edges = np.array([_local_bound(bucket).timestamp() for bucket in buckets]
+                         + [_local_bound(next_bucket(buckets[-1], granularity)).timestamp()])
+        mask = self._mask(self.sales, start, end, store, statuses)
+        position = np.searchsorted(edges, self.sales['ts'][mask], side='right') - 1
+        inside = (position >= 0) & (position < len(buckets))
+        position = position[inside]
+        sales = np.bincount(position, weights=self.sales['total'][mask][inside], minlength=len(buckets))
+        orders = np.bincount(position, minlength=len(buckets))
+        return [{'bucket': bucket, 'sales': round(float(total), 2), 'orders': int(count)}
+                for bucket, total, count in zip(buckets, sales, orders)]
+
+    def by_store(self, start, end=None, statuses=None):
+        """[(store_id or None, sales total)] for stores with sales, largest first"""
+        mask = self._mask(self.sales, start, end, None, statuses)
+        stores = self.sales['store'][mask]
+        totals = np.bincount(stores, weights=self.sales['total'][mask])
+        present = np.flatnonzero(np.bincount(stores))
+        order = present[np.argsort(-totals[present], kind='stable')]
+        return [(int(store) or None, round(float(totals[store]), 2)) for store in order]
+
+    def top_products(self, start, end=None, store=None, statuses=None, limit=10):
+        """[{'product_id', 'total_sold', 'revenue'}] by line revenue, largest first"""
+        mask = self._mask(self.lines, start, end, store, statuses)
+        products = self.lines['product'][mask]
+        revenue = np.bincount(products, weights=self.lines['amount'][mask])
+        sold = np.bincount(products, weights=self.lines['quantity'][mask])
+        present = np.flatnonzero(np.bincount(products))
+        order = present[np.argsort(-revenue[present], kind='stable')][:limit]
+        return [{'product_id': int(product) or None, 'total_sold': int(sold[product]),
+                 'revenue': round(float(revenue[product]), 2)} for product in order]
+
+
+def _bounds(field, start, end):
+    if end is None:
+        return {f'{field}__gte': _local_bound(start)}
+    return day_bounds(field, start, end)
+
+
+def _filtered(queryset, prefix, store, statuses):
+    if store not in (None, '', 'all'):
+        queryset = queryset.filter(**{f'{prefix}store_id': int(store)})
+    if statuses is not None:
+        queryset = queryset.filter(**{f'{prefix}status__in': statuses})
+    return queryset
+
+
+class DatabaseSales:
+    """Snapshot's queries answered with aggregate queries, for periods older than the window"""
+
+    def series(self, granularity, start, end, store=None, statuses=None):
+        series = bucketed(_filtered(Transaction.objects.all(), '', store, statuses), granularity, start, end)
+        return [{'bucket': point['bucket'], 'sales': round(float(point['sales']), 2), 'orders': point['orders']}
+                for point in series]
+
+    def by_store(self, start, end=None, statuses=None):
+        rows = _filtered(Transaction.objects.filter(**_bounds('timestamp', start, end)), '', None, statuses).values(
+            'store_id').annotate(sales=Sum('total')).order_by('-sales')
+        return [(row['store_id'], round(float(row['sales']), 2)) for row in rows]
+
+    def top_products(self, start, end=None, store=None, statuses=None, limit=10):
+        rows = _filtered(TransactionItem.objects.filter(**_bounds('transaction__timestamp', start, end)),
+                         'transaction__', store, statuses).values('product_id').annotate(
+            revenue=Sum('total'), sold=Sum('quantity')).order_by('-revenue')[:limit]
+        return [{'product_id': row['product_id'], 'total_sold': int(row['sold']),
+                 'revenue': round(float(row['revenue']), 2)} for row in rows]
+
+
+class AnalyticsEngine:
+    """Holds this process's Snapshot and keeps it current"""
+
+    def __init__(self, window_days=WINDOW_DAYS, reload_seconds=RELOAD_SECONDS):
+        self.window_days = window_days
+        self.reload_seconds = reload_seconds
+        self._snapshot = None
+        self._versions = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _reload_due(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.reload_seconds
+
+    def snapshot(self):
+        # Versions are read before loading: a write that lands mid-load moves them again
+        versions = tag_versions([SALES, SALES_REWRITES])
+        if versions != self._versions or self._reload_due():
+            with self._lock:
+                if versions != self._versions or self._reload_due():
+                    if self._reload_due() or versions[1] != self._versions[1]:
+                        loaded_at = time.monotonic()
+                        self._snapshot = self.load()
+                        self._loaded_at = loaded_at
+                    else:
+                        self._snapshot = self._extend(self._snapshot)
+                    self._versions = versions
+        return self._snapshot
+
+    def _window_start(self):
+        return timezone.now() - timedelta(days=self.window_days)
+
+    def load(self):
+        """A full snapshot of the window"""
+        since = self._window_start()
+        statuses = Vocabulary()
+        sales = _load(Transaction.objects.filter(timestamp__gte=since).order_by('id'),
+                      SALE_FIELDS, SALE_NUMBERS, statuses)
+        lines = _load(TransactionItem.objects.filter(transaction__timestamp__gte=since).order_by('id'),
+                      LINE_FIELDS, LINE_NUMBERS, statuses)
+        return Snapshot(since, statuses, sales, lines)
+
+    def _extend(self, snapshot):
+        since = self._window_start()
+        sale_mark, line_mark = snapshot.high_water
+        sales = _load(Transaction.objects.filter(
+            id__gt=sale_mark - ID_OVERLAP, timestamp__gte=since
+        ).order_by('id'), SALE_FIELDS, SALE_NUMBERS, snapshot.statuses)
+        lines = _load(TransactionItem.objects.filter(
+            id__gt=line_mark - ID_OVERLAP, transaction__timestamp__gte=since
+        ).order_by('id'), LINE_FIELDS, LINE_NUMBERS, snapshot.statuses)
+        sales = _unseen(sales, snapshot.sales, sale_mark - ID_OVERLAP)
+        lines = _unseen(lines, snapshot.lines, line_mark - ID_OVERLAP)
+
+        old_sales, old_lines = snapshot.sales, snapshot.lines
+        if since - snapshot.since > timedelta(days=1):
+            # Drop rows that slid out of the window, about once a day
+            old_sales = _select(old_sales, old_sales['ts'] >= since.timestamp())
+            old_lines = _select(old_lines, old_lines['ts'] >= since.timestamp())
+        else:
+            since = snapshot.since
+        return Snapshot(since, snapshot.statuses, _concat(old_sales, sales), _concat(old_lines, lines))
+
+
+engine = AnalyticsEngine()
+
+
+database = DatabaseSales()
+
+
+def snapshot():
+    """This process's current analytics snapshot"""
+    return engine.snapshot()
+
+
+def source(start):
+    """The snapshot if its window reaches back to `start`, otherwise the database"""
+    sales = engine.snapshot()
+    return sales if sales.covers(start) else database
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CashierdashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cashierdashboard'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,242 @@
+"""
+Tag-invalidated response cache for dashboard and catalog endpoints.
+
+Cached responses live in the Django cache named by RESPONSE_CACHE_ALIAS
+(settings.CACHES picks locmem, file-based or Redis through CACHE_URL).
+Each entry records the version token of every tag the endpoint depends
+on; invalidating a tag just replaces its token, so no backend needs key
+scanning. Tags are invalidated by post_save/post_delete receivers (see
+signals.py) and explicitly by the ledger and sales counters, whose F()
+updates and bulk inserts do not send model signals.
+
+Expensive widgets are protected from thundering herds two ways:
+
+* single-flight: concurrent requests for the same missing entry wait for
+  the one computing it and reuse its result. Threads coalesce on a
+  per-key lock; when the cache is shared between workers (file or Redis
+  backend) a per-key file lock coalesces gunicorn workers as well.
+* stale-while-revalidate (stale_ttl): once an entry is out of date, one
+  request recomputes it while concurrent ones are served the previous
+  value for up to stale_ttl seconds.
+"""
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction as db_transaction
+from rest_framework.response import Response
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalescing stays per process
+    fcntl = None
+
+CACHE_ALIAS = getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+LOCK_DIR = getattr(settings, 'RESPONSE_CACHE_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'linemart-cache-locks'))
+LOCK_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_LOCK_TIMEOUT', 30)
+KEY_PREFIX = 'resp'
+
+# Dependency tags
+CATALOG = 'catalog'        # products, variants, categories, prices
+INVENTORY = 'inventory'    # stock levels
+SALES = 'sales'            # transactions, returns, payments
+STORES = 'stores'
+CUSTOMERS = 'customers'
+SALES_REWRITES = 'sales-rewrites'  # existing sales edited or removed (not bumped for new sales)
+
+HIT, MISS, STALE = 'HIT', 'MISS', 'STALE'
+
+
+def response_cache():
+    return caches[CACHE_ALIAS]
+
+
+def _tag_key(tag):
+    return f'{KEY_PREFIX}:tag:{tag}'
+
+
+def tag_versions(tags):
+    """Current version token per tag; tags without one (new or evicted) get a fresh token"""
+    cache = response_cache()
+    keys = [_tag_key(tag) for tag in tags]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    for key in missing:
+        # add() keeps a token another worker set first; a random token never reuses an old one
+        cache.add(key, uuid.uuid4().hex[:12], None)
+    if missing:
+        found.update(cache.get_many(missing))
+    return [found.get(key, '') for key in keys]
+
+
+def _bump(tags):
+    response_cache().set_many({_tag_key(tag): uuid.uuid4().hex[:12] for tag in tags}, None)
+
+
+def invalidate_tags(*tags):
+    """Mark every cached response depending on any of `tags` out of date"""
+    _bump(tags)
+    # Again after commit, so a read that cached this transaction's pre-commit state is dropped too
+    db_transaction.on_commit(lambda: _bump(tags))
+
+
+class SingleFlight:
+    """Per-key locks shared by threads and, through flock, by processes"""
+
+    def __init__(self, lock_dir=LOCK_DIR):
+        self.lock_dir = lock_dir
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _thread_lock(self, key):
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+            return entry
+
+    def _release_thread_lock(self, key, entry):
+        with self._guard:
+            entry[1] -= 1
+            if not entry[1]:
+                self._locks.pop(key, None)
+
+    @contextmanager
+    def lock(self, key, blocking=True, timeout=LOCK_TIMEOUT, cross_process=False):
+        """Yields True when this caller holds the key's lock, False if it gave up"""
+        entry = self._thread_lock(key)
+        thread_lock = entry[0]
+        held = thread_lock.acquire(timeout=timeout) if blocking else thread_lock.acquire(blocking=False)
+        handle = None
+        try:
+            acquired = held
+            if held and cross_process and fcntl is not None:
+                handle = self._file_lock(key, blocking, timeout)
+                acquired = handle is not None
+            yield acquired
+        finally:
+            if handle is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+                handle.close()
+            if held:
+                thread_lock.release()
+            self._release_thread_lock(key, entry)
+
+    def _file_lock(self, key, blocking, timeout):
+        os.makedirs(self.lock_dir, exist_ok=True)
+        name = hashlib.md5(key.encode()).hexdigest()
+        handle = open(os.path.join(self.lock_dir, f'{name}.lock'), 'a+')
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return handle
+            except BlockingIOError:
+                if not blocking or time.monotonic() >= deadline:
+                    handle.close()
+                    return None
+                time.sleep(0.01)
+
+
+flight = SingleFlight()
+
+
+def _shared_between_processes(cache):
+    return not isinstance(cache, LocMemCache)
+
+
+def _fresh(entry, versions):
+    return entry is not None and entry['versions'] == versions and entry['fresh_until'] > time.time()
+
+
+class Uncacheable(Exception):
+    """Raised by a compute function to hand back `value` uncached (state None)"""
+
+    def __init__(self, value):
+        self.value = value
+
+
+def cached_compute(key, compute, ttl, tags=(), stale_ttl=0):
+    """
+    Return (value, state) for `key`, calling compute() at most once across
+    concurrent callers. state is HIT, MISS or STALE, or None when compute()
+    raised Uncacheable.
+    """
+    cache = response_cache()
+    cross_process = _shared_between_processes(cache)
+    versions = tag_versions(tags)
+    entry = cache.get(key)
+    if _fresh(entry, versions):
+        return entry['data'], HIT
+
+    def refresh():
+        try:
+            data = compute()
+        except Uncacheable as skip:
+            return skip.value, None
+        cache.set(key, {'data': data, 'versions': versions, 'fresh_until': time.time() + ttl}, ttl + stale_ttl)
+        return data, MISS
+
+    if entry is not None and stale_ttl:
+        # One caller revalidates; everyone else gets the previous value meanwhile
+        with flight.lock(key, blocking=False, cross_process=cross_process) as acquired:
+            if not acquired:
+                return entry['data'], STALE
+            return refresh()
+
+    with flight.lock(key, cross_process=cross_process) as acquired:
+        if acquired:
+            # Whoever held the lock may have just stored the value
+            entry = cache.get(key)
+            if _fresh(entry, versions):
+                return entry['data'], HIT
+        return refresh()
+
+
+def response_key(name, request, per_user):
+    params = sorted((key, tuple(request.query_params.getlist(key))) for key in request.query_params)
+    scope = request.user.pk if per_user and request.user.is_authenticated else ''
+    digest = hashlib.md5(repr((params, scope)).encode()).hexdigest()
+    return f'{KEY_PREFIX}:{name}:{digest}'
+
+
+def cache_response(ttl, tags=(), per_user=False, stale_ttl=0):
+    """
+    Cache a ViewSet action's successful GET response data for `ttl`
+    seconds, keyed by query string and invalidated through `tags`.
+    With stale_ttl, out-of-date data keeps being served for that long
+    while a single request recomputes it.
+
+    DRF permission_classes run before the action, so entries can be shared
+    between users; pass per_user=True for actions that check permissions
+    or filter by user inside the method. Place below @action.
+    """
+    def decorator(view):
+        name = f'{view.__module__}.{view.__qualname__}'
+
+        @functools.wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(self, request, *args, **kwargs)
+
+            def compute():
+                response = view(self, request, *args, **kwargs)
+                if isinstance(response, Response) and response.status_code == 200:
+                    return response.data
+                raise Uncacheable(response)
+
+            result, state = cached_compute(response_key(name, request, per_user), compute, ttl, tags, stale_ttl)
+            if state is None:
+                return result
+            response = Response(result)
+            response['X-Cache'] = state
+            return response
+        return wrapper
+    return decorator
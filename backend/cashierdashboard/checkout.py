@@ -0,0 +1,97 @@
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from .models import Store, Customer, Transaction, TransactionItem, Payment
+from .numbering import next_number, store_scope
+from .inventory import record_movements, sale_movements
+from .pricing import price_cart, PricingError
+from .sales import record_sales
+from .activity import record_transactions
+from managerdashboard import approvals
+
+
+class CheckoutError(Exception):
+    """Raised when a cart cannot be checked out; nothing is written"""
+
+
+def perform_checkout(cashier, data, allow_price_override=False):
+    """
+    Write a complete sale in one database transaction.
+
+    `data` is validated CheckoutSerializer data. Creates the Transaction,
+    bulk-creates its items, takes them out of stock through the movement
+    ledger and records the Payment. Returns (transaction, items, payment).
+    With allow_price_override, client unit prices replace catalog prices
+    and the sale records the cashier in price_overridden_by.
+    """
+    store = None
+    if data.get('store'):
+        store = Store.objects.filter(pk=data['store']).first()
+        if store is None:
+            raise CheckoutError('Unknown store')
+
+    customer = None
+    if data.get('customer'):
+        customer = Customer.objects.filter(pk=data['customer']).first()
+        if customer is None:
+            raise CheckoutError('Unknown customer')
+
+    # Same pricing as the quote endpoint
+    try:
+        quote = price_cart(data['items'], store=store, allow_price_override=allow_price_override)
+    except PricingError as e:
+        raise CheckoutError(str(e))
+    subtotal, tax_amount, total = quote.subtotal, quote.tax_amount, quote.total
+
+    # Numbers are drawn before the transaction opens so reserved blocks are durable
+    scope = store_scope(store)
+    receipt_number = data.get('receipt_number') or next_number('receipt', scope)
+    reference_number = next_number('payment', scope)
+
+    with db_transaction.atomic():
+        sale = Transaction.objects.create(
+            receipt_number=receipt_number,
+            cashier=cashier,
+            customer=customer,
+            store_id=store,
+            subtotal=subtotal,
+            tax_amount=tax_amount,
+            total=total,
+            payment_method=data['payment_method'],
+            status='completed',
+            is_offline=data.get('is_offline', False),
+            price_overridden_by=cashier if any(line.price_overridden for line in quote.lines) else None,
+        )
+
+        items = TransactionItem.objects.bulk_create([
+            TransactionItem(
+                transaction=sale,
+                product_id=line.product_id,
+                variant_id=line.variant_id,
+                quantity=line.quantity,
+                unit_price=line.unit_price,
+                discount=line.discount,
+                total=line.total,
+            )
+            for line in quote.lines
+        ])
+
+        record_sales([sale])
+        record_transactions([sale], {sale.pk: len(items)})
+        approvals.request_transactions([sale], cashier)
+
+        # Ledger rows plus one set-based F() update for the whole cart
+        record_movements(sale_movements(items, store=store, reference=receipt_number, user=cashier))
+
+        payment = Payment.objects.create(
+            transaction=sale,
+            payment_method=data['payment_method'],
+            amount=total,
+            status='completed',
+            reference_number=reference_number,
+            gateway_response=data.get('gateway_response') or {},
+            processed_at=timezone.now(),
+            processed_by=cashier,
+        )
+
+    return sale, items, payment
@@ -0,0 +1,70 @@
+"""
+Facet counts for a filtered product listing.
+
+facet_counts() runs one GROUP BY over the listing's own queryset. Each
+group is a (category id, subcategory id, price bucket, in stock)
+combination, so there are at most a few hundred rows however many
+products match. The groups are then folded into the four facets in
+Python. Names come afterwards from two primary-key lookups over the ids
+that occur. Joining them into the GROUP BY doubled its cost. This replaces
+the count query per category that the storefront used to make.
+
+Counts are over the filtered set. A facet whose filter is applied shows
+only the selected value.
+
+Price buckets are half-open ranges between FACET_PRICE_EDGES. The last
+bucket has no upper bound. Empty buckets are kept so that the histogram
+has a stable shape.
+"""
+from django.conf import settings
+from django.db.models import BooleanField, Case, Count, IntegerField, Value, When
+
+from .models import Category, SubCategory
+
+PRICE_EDGES = tuple(getattr(settings, 'FACET_PRICE_EDGES', (0, 5, 10, 20, 50, 100)))
+
+
+def _price_bucket():
+    return Case(
+        *[When(price__lt=edge, then=Value(i)) for i, edge in enumerate(PRICE_EDGES[1:])],
+        default=Value(len(PRICE_EDGES) - 1),
+        output_field=IntegerField(),
+    )
+
+
+def _ranked(model, counts):
+    names = dict(model.objects.filter(pk__in=list(counts)).values_list('id', 'name')) if counts else {}
+    return [{'id': pk, 'name': names.get(pk), 'count': count}
+            for pk, count in sorted(counts.items(), key=lambda item: (-item[1], names.get(item[0]) or ''))]
+
+
+def facet_counts(queryset):
+    """Category, subcategory, price bucket and in-stock counts for a Product queryset, in one grouped pass"""
+    groups = queryset.order_by().annotate(
+        price_bucket=_price_bucket(),
+        in_stock=Case(When(stock__gt=0, then=Value(True)), default=Value(False), output_field=BooleanField()),
+    ).values(
+        'category', 'subcategory', 'price_bucket', 'in_stock'
+    ).annotate(count=Count('id'))
+
+    total = in_stock = 0
+    categories, subcategories = {}, {}
+    prices = [0] * len(PRICE_EDGES)
+    for group in groups:
+        count = group['count']
+        total += count
+        in_stock += count if group['in_stock'] else 0
+        prices[group['price_bucket']] += count
+        if group['category'] is not None:
+            categories[group['category']] = categories.get(group['category'], 0) + count
+        if group['subcategory'] is not None:
+            subcategories[group['subcategory']] = subcategories.get(group['subcategory'], 0) + count
+
+    return {
+        'total': total,
+        'in_stock': in_stock,
+        'categories': _ranked(Category, categories),
+        'subcategories': _ranked(SubCategory, subcategories),
+        'price': [{'min': low, 'max': high, 'count': count}
+                  for low, high, count in zip(PRICE_EDGES, PRICE_EDGES[1:] + (None,), prices)],
+    }
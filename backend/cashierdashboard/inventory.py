@@ -0,0 +1,116 @@
+"""
+Stock movement ledger.
+
+Every stock change is written as StockMovement rows and applied to the
+StockBalance counters and Product.stock in the same database transaction
+with set-based F() updates, so concurrent writers never lose updates.
+Product.stock stays the figure the rest of the app reads and always
+equals StockBalance.on_hand; Product.stock_quantity is legacy and is not
+maintained here.
+"""
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Product, StockMovement, StockBalance
+from .caching import invalidate_tags, INVENTORY
+from .notifications import stock_moved
+
+
+def _by_delta(deltas):
+    """Group product ids by delta so each distinct delta is one UPDATE ... WHERE id IN"""
+    groups = {}
+    for pk, delta in deltas.items():
+        groups.setdefault(delta, []).append(pk)
+    return groups.items()
+
+
+def _apply_deltas(deltas):
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    # Products without a balance row yet start from their current stock
+    existing = set(StockBalance.objects.filter(product_id__in=deltas).values_list('product_id', flat=True))
+    missing = set(deltas) - existing
+    if missing:
+        StockBalance.objects.bulk_create([
+            StockBalance(product_id=pk, on_hand=stock)
+            for pk, stock in Product.objects.filter(pk__in=missing).values_list('id', 'stock')
+        ], ignore_conflicts=True)
+
+    now = timezone.now()
+    for delta, product_ids in _by_delta(deltas):
+        StockBalance.objects.filter(product_id__in=product_ids).update(on_hand=F('on_hand') + delta, updated_at=now)
+        Product.objects.filter(pk__in=product_ids).update(stock=F('stock') + delta)
+    stock_moved(deltas)
+    invalidate_tags(INVENTORY)
+
+
+def record_movements(movements):
+    """
+    Append unsaved StockMovement instances and apply them to on-hand stock.
+
+    Returns the saved movements. Safe to call inside an outer atomic block.
+    """
+    movements = list(movements)
+    if not movements:
+        return []
+
+    deltas = {}
+    for movement in movements:
+        deltas[movement.product_id] = deltas.get(movement.product_id, 0) + movement.quantity
+
+    with db_transaction.atomic():
+        created = StockMovement.objects.bulk_create(movements)
+        _apply_deltas(deltas)
+    return created
+
+
+def sale_movements(items, store=None, reference='', user=None):
+    """Movements that take sold TransactionItems out of stock"""
+    return [
+        StockMovement(
+            product_id=item.product_id, movement_type='sale', quantity=-item.quantity,
+            store=store, reference=reference, created_by=user
+        )
+        for item in items if item.product_id
+    ]
+
+
+def return_movements(items, store=None, reference='', user=None):
+    """Movements that put returned TransactionItems back into stock"""
+    return [
+        StockMovement(
+            product_id=item.product_id, movement_type='return', quantity=item.quantity,
+            store=store, reference=reference, created_by=user
+        )
+        for item in items if item.product_id
+    ]
+
+
+def transfer_movements(product_id, quantity, from_store, to_store, user=None, note=''):
+    """A transfer is a pair of movements that nets to zero for the product"""
+    return [
+        StockMovement(
+            product_id=product_id, movement_type='transfer', quantity=-quantity,
+            store=from_store, created_by=user, note=note
+        ),
+        StockMovement(
+            product_id=product_id, movement_type='transfer', quantity=quantity,
+            store=to_store, created_by=user, note=note
+        ),
+    ]
+
+
+def adjust_to_count(product, count, user=None, note='Manual stock update'):
+    """Record the adjustment that brings a product's stock to a counted value"""
+    with db_transaction.atomic():
+        # Measure from the row, not from a copy that a concurrent sale may have outdated
+        delta = count - Product.objects.select_for_update().values_list('stock', flat=True).get(pk=product.pk)
+        if delta:
+            record_movements([StockMovement(
+                product_id=product.pk, movement_type='adjustment', quantity=delta,
+                created_by=user, note=note
+            )])
+    product.refresh_from_db(fields=['stock'])
@@ -0,0 +1,153 @@
+"""
+Per-process barcode/SKU index for the scanner hot path.
+
+Each scan is one dict lookup returning a compact, already-serializable
+record instead of an ORM query plus ProductSerializer. The index is
+built lazily on the first scan. Product/ProductVariant/Category signals
+(see signals.py) re-read only the affected products once their change
+commits, and skip saves that touch none of the looked-up fields.
+Queryset.update() skips signals, so each process also rebuilds once the
+index is older than PRODUCT_INDEX_MAX_AGE seconds.
+
+Stock is deliberately not part of the record: it moves on every sale
+through the ledger's F() updates, which would invalidate the index
+constantly.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from .models import Product, ProductVariant
+
+MAX_AGE = getattr(settings, 'PRODUCT_INDEX_MAX_AGE', 300)
+
+PRODUCT_FIELDS = ('id', 'name', 'sku', 'barcode', 'price', 'category__name', 'is_active')
+VARIANT_FIELDS = ('id', 'product_id', 'name', 'sku', 'price_modifier')
+# Model fields the records are made of; saves limited to other fields (stock, cost, image) change nothing
+LOOKUP_FIELDS = frozenset(('name', 'sku', 'barcode', 'price', 'category', 'is_active'))
+VARIANT_LOOKUP_FIELDS = frozenset(('product', 'name', 'sku', 'price_modifier'))
+
+
+def _product_record(product):
+    return {
+        'id': product['id'],
+        'variant': None,
+        'name': product['name'],
+        'sku': product['sku'],
+        'barcode': product['barcode'],
+        'price': str(product['price']),
+        'category_name': product['category__name'],
+        'is_active': product['is_active'],
+    }
+
+
+def _entries(products, variants):
+    """(product id, code, record) for every code of `products` and of their `variants`"""
+    found = {}
+    for product in products.values(*PRODUCT_FIELDS).iterator(chunk_size=2000):
+        record = _product_record(product)
+        found[product['id']] = (product, record)
+        yield product['id'], product['sku'], record
+        if product['barcode']:
+            yield product['id'], product['barcode'], record
+
+    for variant in variants.values(*VARIANT_FIELDS).iterator(chunk_size=2000):
+        product, record = found[variant['product_id']]
+        yield product['id'], variant['sku'], dict(
+            record,
+            variant=variant['id'],
+            name=f"{product['name']} - {variant['name']}",
+            sku=variant['sku'],
+            price=str(product['price'] + variant['price_modifier']),
+        )
+
+
+def _put(codes, code, record):
+    """Product codes win over a variant SKU that happens to match; a variant replaces its own older record"""
+    current = codes.get(code)
+    if current is None or record['variant'] is None or current['variant'] == record['variant']:
+        codes[code] = record
+        return True
+    return False
+
+
+class ProductIndex:
+    """Maps barcodes, product SKUs and variant SKUs to compact product records"""
+
+    def __init__(self, max_age=MAX_AGE):
+        self.max_age = max_age
+        self._codes = None
+        self._product_codes = {}  # product id -> codes whose record it owns
+        self._built_at = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()  # installs and refreshes
+
+    def get(self, code):
+        return self._index().get(code)
+
+    def get_many(self, codes):
+        """Returns (found, missing) for a list of codes"""
+        index = self._index()
+        found, missing = {}, []
+        for code in codes:
+            record = index.get(code)
+            if record is None:
+                missing.append(code)
+            else:
+                found[code] = record
+        return found, missing
+
+    def invalidate(self, **kwargs):
+        """Signal-receiver friendly; the next lookup rebuilds"""
+        with self._update_lock:
+            self._generation += 1
+            self._codes = None
+
+    def refresh(self, product_ids):
+        """Re-read these products and their variants; codes of products that no longer exist are dropped"""
+        product_ids = set(product_ids)
+        if not product_ids:
+            return
+        with self._update_lock:
+            # A build already reading the tables may have missed this change
+            self._generation += 1
+            codes = self._codes
+            if codes is None:
+                return
+            entries = list(_entries(Product.objects.filter(pk__in=product_ids),
+                                    ProductVariant.objects.filter(product_id__in=product_ids)))
+            for pk in product_ids:
+                for code in self._product_codes.pop(pk, ()):
+                    if codes.get(code, {}).get('id') == pk:
+                        del codes[code]
+            for pk, code, record in entries:
+                if _put(codes, code, record):
+                    self._product_codes.setdefault(pk, set()).add(code)
+
+    def _index(self):
+        codes = self._codes
+        if codes is not None and time.monotonic() - self._built_at < self.max_age:
+            return codes
+        with self._lock:
+            codes = self._codes
+            if codes is None or time.monotonic() - self._built_at >= self.max_age:
+                generation = self._generation
+                codes, product_codes = self._build()
+                # A change that landed mid-build leaves the index as it was so the next scan rebuilds
+                with self._update_lock:
+                    if generation == self._generation:
+                        self._codes, self._product_codes = codes, product_codes
+                        self._built_at = time.monotonic()
+            return codes
+
+    def _build(self):
+        codes, product_codes = {}, {}
+        for pk, code, record in _entries(Product.objects.all(), ProductVariant.objects.all()):
+            if _put(codes, code, record):
+                product_codes.setdefault(pk, set()).add(code)
+        return codes, product_codes
+
+
+product_index = ProductIndex()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from cashierdashboard.forecasting import run_forecast
+
+
+class Command(BaseCommand):
+    help = 'Forecasts daily demand per product and writes reorder points and quantities'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--history-days', type=int, help='Days of sales history to fit (default FORECAST_HISTORY_DAYS)')
+        parser.add_argument('--apply', action='store_true', help='Also set Product.min_stock_level to the reorder point')
+
+    def handle(self, *args, **options):
+        forecast, changed = run_forecast(options['history_days'], apply=options['apply'])
+        message = f'Forecast {forecast} products'
+        if options['apply']:
+            message += f', updated min_stock_level on {changed}'
+        self.stdout.write(self.style.SUCCESS(message))
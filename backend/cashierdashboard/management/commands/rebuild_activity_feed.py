@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from cashierdashboard.activity import rebuild_activity_feed
+
+
+class Command(BaseCommand):
+    help = 'Refills the dashboard activity feed from recent transactions and returns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, help='Recent transactions and returns to keep (default ACTIVITY_FEED_SIZE)')
+
+    def handle(self, *args, **options):
+        count = rebuild_activity_feed(options['size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt activity feed with {count} events'))
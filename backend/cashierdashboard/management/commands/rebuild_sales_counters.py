@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from cashierdashboard.sales import rebuild_cashier_stats, rebuild_store_sales
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the incrementally maintained sales counters from transactions'
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_cashier_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} cashier/day counter rows'))
+        count = rebuild_store_sales()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} store/day sales rollup rows'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from cashierdashboard.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rewrites the full-text search document of every product (after bulk imports or updates)'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'Indexed {rebuild_index()} products'))
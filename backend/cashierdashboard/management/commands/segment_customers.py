@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from cashierdashboard.segmentation import run_segmentation
+
+
+class Command(BaseCommand):
+    help = 'Scores customers by recency, frequency and spend and writes their RFM segments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--history-days', type=int, help='Days of sales history to score (default SEGMENT_HISTORY_DAYS)')
+
+    def handle(self, *args, **options):
+        counts = run_segmentation(options['history_days'])
+        breakdown = ', '.join(f'{name} {count}' for name, count in sorted(counts.items()))
+        self.stdout.write(self.style.SUCCESS(f'Segmented {sum(counts.values())} customers ({breakdown or "none"})'))
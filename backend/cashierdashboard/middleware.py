@@ -0,0 +1,272 @@
+"""
+Idempotency-Key support for mutating API requests.
+
+A POS that retries a POST with the same Idempotency-Key header gets the
+stored response of the first attempt instead of a second sale, payment or
+delivery. Completed responses are kept in IdempotencyRecord for
+IDEMPOTENCY_TTL seconds and mirrored in a small per-process LRU so hot
+retries never touch the database. Expired keys are evicted lazily on
+lookup and in periodic sweeps.
+
+Keys are scoped to the user the request authenticates as. DRF
+authenticates inside the view, so bearer tokens are validated here. A
+refreshed token therefore replays the same keys, and a second till never
+collides with them. Bodies are fingerprinted so a reused key with a
+different body is refused. Streamed uploads such as the NDJSON offline
+ingest are hashed as the view reads them, never buffered.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction as db_transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .models import IdempotencyRecord
+
+HEADER = 'Idempotency-Key'
+MUTATING_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+STREAM_CHUNK = 64 * 1024
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class StoredResponse:
+    __slots__ = ('fingerprint', 'status_code', 'content_type', 'body', 'expires_at')
+
+    def __init__(self, fingerprint, status_code, content_type, body, expires_at):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.content_type = content_type
+        self.body = bytes(body or b'')
+        self.expires_at = expires_at
+
+    @property
+    def pending(self):
+        return self.status_code is None
+
+    def to_response(self):
+        response = HttpResponse(self.body, status=self.status_code, content_type=self.content_type or None)
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+
+class IdempotencyStore:
+    """IdempotencyRecord rows fronted by an in-process LRU of completed responses"""
+
+    def __init__(self, ttl=None, lock_timeout=None, local_size=None, sweep_interval=None):
+        self.ttl = ttl if ttl is not None else _setting('IDEMPOTENCY_TTL', 24 * 60 * 60)
+        self.lock_timeout = lock_timeout if lock_timeout is not None else _setting('IDEMPOTENCY_LOCK_TIMEOUT', 60)
+        self.local_size = local_size if local_size is not None else _setting('IDEMPOTENCY_LOCAL_CACHE_SIZE', 1024)
+        self.sweep_interval = sweep_interval if sweep_interval is not None else _setting('IDEMPOTENCY_SWEEP_INTERVAL', 300)
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = 0
+
+    def get(self, key):
+        """Live stored response for key, or None"""
+        now = timezone.now()
+        with self._lock:
+            stored = self._local.get(key)
+            if stored is not None:
+                if stored.expires_at > now:
+                    self._local.move_to_end(key)
+                    return stored
+                del self._local[key]
+
+        row = IdempotencyRecord.objects.filter(key=key).values_list(
+            'fingerprint', 'status_code', 'content_type', 'body', 'expires_at'
+        ).first()
+        if row is None:
+            return None
+        stored = StoredResponse(*row)
+        if stored.expires_at <= now:
+            IdempotencyRecord.objects.filter(key=key, expires_at__lte=now).delete()
+            return None
+        if not stored.pending:
+            self._remember(key, stored)
+        return stored
+
+    def begin(self, key, fingerprint):
+        """Claim key for a first attempt; False if another request holds it"""
+        self.sweep()
+        try:
+            with db_transaction.atomic():
+                IdempotencyRecord.objects.create(
+                    key=key, fingerprint=fingerprint,
+                    expires_at=timezone.now() + timedelta(seconds=self.lock_timeout)
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    def finish(self, key, response, fingerprint=None):
+        """Store the completed response; fingerprint is given when the body was hashed while the view read it"""
+        expires_at = timezone.now() + timedelta(seconds=self.ttl)
+        content_type = response.get('Content-Type', '')
+        fields = {'fingerprint': fingerprint} if fingerprint is not None else {}
+        IdempotencyRecord.objects.filter(key=key).update(
+            status_code=response.status_code, content_type=content_type,
+            body=response.content, expires_at=expires_at, **fields
+        )
+
+    def discard(self, key):
+        """Forget a key whose first attempt failed so the client can retry it"""
+        with self._lock:
+            self._local.pop(key, None)
+        IdempotencyRecord.objects.filter(key=key).delete()
+
+    def sweep(self):
+        """Delete expired rows, at most once per sweep interval per process"""
+        if time.monotonic() < self._next_sweep:
+            return 0
+        self._next_sweep = time.monotonic() + self.sweep_interval
+        deleted, _ = IdempotencyRecord.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def _remember(self, key, stored):
+        with self._lock:
+            self._local[key] = stored
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+
+store = IdempotencyStore()
+
+
+_jwt = JWTAuthentication()
+
+
+def _user_id(request):
+    """User id the request authenticates as: '' when anonymous, None when its credentials do not validate"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return str(user.pk)  # session
+    if not request.META.get('HTTP_AUTHORIZATION'):
+        return ''
+    try:
+        raw_token = _jwt.get_raw_token(_jwt.get_header(request))
+        if raw_token is not None:
+            # The claim of a validated token, without loading the user
+            return str(_jwt.get_validated_token(raw_token)[jwt_settings.USER_ID_CLAIM])
+        authenticated = TokenAuthentication().authenticate(request)
+    except (AuthenticationFailed, KeyError):
+        return None
+    return str(authenticated[0].pk) if authenticated else None
+
+
+def _request_key(request, header, user_id):
+    # Keys are per user: the same header value from two cashiers never collides
+    raw = '\n'.join([header, user_id, request.method, request.path])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class HashingStream:
+    """Wraps a request body stream and hashes what is read through it"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.digest = hashlib.sha256()
+
+    def read(self, *args):
+        data = self.stream.read(*args)
+        self.digest.update(data)
+        return data
+
+    def readline(self, *args):
+        data = self.stream.readline(*args)
+        self.digest.update(data)
+        return data
+
+    def hexdigest(self):
+        """Digest of the whole body, reading whatever the view left unread"""
+        while True:
+            data = self.stream.read(STREAM_CHUNK)
+            if not data:
+                return self.digest.hexdigest()
+            self.digest.update(data)
+
+
+class IdempotencyMiddleware:
+    """Replay the stored response for retried requests that carry an Idempotency-Key"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(_setting('IDEMPOTENCY_PATHS', ('/api/cashier/', '/api/customer/')))
+        self.stream_types = tuple(_setting('IDEMPOTENCY_STREAM_TYPES', ('application/x-ndjson',)))
+
+    def __call__(self, request):
+        header = request.headers.get(HEADER)
+        if not header or request.method not in MUTATING_METHODS or not request.path.startswith(self.paths):
+            return self.get_response(request)
+        if len(header) > 255:
+            return JsonResponse({'error': f'{HEADER} must be at most 255 characters'}, status=400)
+
+        user_id = _user_id(request)
+        if user_id is None:
+            return self.get_response(request)  # the view rejects the credentials
+        key = _request_key(request, header, user_id)
+        if self._streamed(request):
+            # Hashed as the view reads it; request.body would buffer the upload or raise RequestDataTooBig
+            stream = request._stream = HashingStream(request._stream)
+            fingerprint = None
+        else:
+            stream = None
+            fingerprint = hashlib.sha256(request.body).hexdigest()
+
+        # Two tries: the second covers a claim that expired between begin() and get()
+        for _ in range(2):
+            stored = store.get(key)
+            if stored is not None:
+                if stored.pending:
+                    return self._in_progress()
+                return self._replay(stored, fingerprint if stream is None else stream.hexdigest())
+            if store.begin(key, fingerprint or ''):
+                break
+        else:
+            return self._in_progress()
+
+        try:
+            response = self.get_response(request)
+        except Exception:
+            store.discard(key)
+            raise
+
+        # Server errors and streamed bodies are not stored; the retry runs the view again
+        if response.status_code >= 500 or response.streaming:
+            store.discard(key)
+        else:
+            store.finish(key, response, None if stream is None else stream.hexdigest())
+        return response
+
+    def _streamed(self, request):
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        max_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        return request.content_type in self.stream_types or (max_size is not None and length > max_size)
+
+    def _in_progress(self):
+        return JsonResponse({'error': 'A request with this Idempotency-Key is still in progress'}, status=409)
+
+    def _replay(self, stored, fingerprint):
+        if stored.fingerprint != fingerprint:
+            return JsonResponse({'error': f'{HEADER} was already used with a different request body'}, status=422)
+        return stored.to_response()
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashierdashboard', '0006_deliveryroute_delivery_deliveryupdate_payment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='store_id',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='store_transactions', to='cashierdashboard.store'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cashierdashboard', '0007_transaction_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumberBlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device_id', models.CharField(db_index=True, max_length=50)),
+                ('start', models.BigIntegerField()),
+                ('end', models.BigIntegerField()),
+                ('reserved_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-reserved_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='NumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('receipt', 'Receipt Number'), ('payment', 'Payment Reference'), ('tracking', 'Tracking Number')], max_length=20)),
+                ('scope', models.CharField(max_length=60)),
+                ('next_value', models.BigIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='numbersequence',
+            constraint=models.UniqueConstraint(fields=('kind', 'scope'), name='unique_number_sequence_scope'),
+        ),
+        migrations.AddField(
+            model_name='numberblock',
+            name='reserved_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='numberblock',
+            name='sequence',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocks', to='cashierdashboard.numbersequence'),
+        ),
+    ]
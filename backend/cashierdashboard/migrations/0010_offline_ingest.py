@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashierdashboard', '0009_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offlinetransaction',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='offlinetransaction',
+            name='transaction',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='offline_source', to='cashierdashboard.transaction'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddConstraint(
+            model_name='offlinetransaction',
+            constraint=models.UniqueConstraint(fields=('device_id', 'idempotency_key'), name='unique_offline_device_key'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashierdashboard', '0012_cashier_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStoreCustomer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cashierdashboard.customer')),
+                ('store', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cashierdashboard.store')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyStoreSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sales_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('customer_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('store', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='cashierdashboard.store')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'store'], name='daily_sales_day_store_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailystoresales',
+            constraint=models.UniqueConstraint(fields=('store', 'day'), name='unique_store_day_sales'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailystoresales',
+            constraint=models.UniqueConstraint(condition=models.Q(('store__isnull', True)), fields=('day',), name='unique_unassigned_day_sales'),
+        ),
+        migrations.AddIndex(
+            model_name='dailystorecustomer',
+            index=models.Index(fields=['day', 'store'], name='daily_customer_day_store_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailystorecustomer',
+            constraint=models.UniqueConstraint(fields=('store', 'day', 'customer'), name='unique_store_day_customer'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailystorecustomer',
+            constraint=models.UniqueConstraint(condition=models.Q(('store__isnull', True)), fields=('day', 'customer'), name='unique_unassigned_day_customer'),
+        ),
+    ]
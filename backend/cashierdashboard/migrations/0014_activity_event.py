@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashierdashboard', '0013_daily_store_sales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('transaction', 'Transaction'), ('return', 'Return')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('status', models.CharField(max_length=20)),
+                ('timestamp', models.DateTimeField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('reference', models.CharField(blank=True, max_length=20)),
+                ('store_name', models.CharField(blank=True, max_length=100)),
+                ('customer_name', models.CharField(blank=True, max_length=100)),
+                ('items_count', models.IntegerField(default=0)),
+                ('reason', models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'status', '-timestamp'], name='activity_kind_status_time_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='activityevent',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_activity_subject'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def seed_low_stock(apps, schema_editor):
+    """Products already at or below their minimum would never cross it again, so alert on them once now"""
+    Product = apps.get_model('cashierdashboard', 'Product')
+    Notification = apps.get_model('cashierdashboard', 'Notification')
+    Notification.objects.bulk_create([
+        Notification(kind='out_of_stock' if stock <= 0 else 'low_stock', level='warning',
+                     priority='high' if stock <= 0 else 'medium', object_id=pk,
+                     message=f'Out of stock: {name}' if stock <= 0 else f'Low stock alert: {name} ({stock} remaining)')
+        for pk, name, stock in Product.objects.filter(
+            is_active=True, stock__lte=models.F('min_stock_level')
+        ).values_list('id', 'name', 'stock')
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cashierdashboard', '0014_activity_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='daily_sales_target',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.CreateModel(
+            name='NotificationReadMark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_mark', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('low_stock', 'Low Stock'), ('out_of_stock', 'Out of Stock'), ('daily_target', 'Daily Target')], max_length=20)),
+                ('level', models.CharField(default='info', max_length=10)),
+                ('priority', models.CharField(default='low', max_length=10)),
+                ('message', models.CharField(max_length=255)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('store', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cashierdashboard.store')),
+            ],
+        ),
+        migrations.RunPython(seed_low_stock, migrations.RunPython.noop),
+    ]
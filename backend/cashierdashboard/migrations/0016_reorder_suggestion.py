@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashierdashboard', '0015_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReorderSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('daily_demand', models.FloatField()),
+                ('demand_deviation', models.FloatField()),
+                ('reorder_point', models.IntegerField()),
+                ('reorder_quantity', models.IntegerField()),
+                ('computed_at', models.DateTimeField()),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reorder_suggestion', to='cashierdashboard.product')),
+            ],
+        ),
+    ]
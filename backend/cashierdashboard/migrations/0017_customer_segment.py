@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashierdashboard', '0016_reorder_suggestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSegment',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='segment', serialize=False, to='cashierdashboard.customer')),
+                ('recency', models.PositiveSmallIntegerField()),
+                ('frequency', models.PositiveSmallIntegerField()),
+                ('monetary', models.PositiveSmallIntegerField()),
+                ('segment', models.CharField(max_length=20)),
+                ('orders', models.IntegerField()),
+                ('spend', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('last_purchase', models.DateTimeField()),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['segment', 'customer'], name='segment_customer_idx')],
+            },
+        ),
+    ]
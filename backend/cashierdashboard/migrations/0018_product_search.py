@@ -0,0 +1,79 @@
+# Generated by Django 4.2.30 on 2026-10-18 01:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+DOCUMENTS = 'cashierdashboard_productsearchdocument'
+FTS = 'cashierdashboard_product_fts'
+
+# External-content FTS5 table over the documents, kept in step by triggers
+SQLITE_INDEX = [
+    f"CREATE VIRTUAL TABLE {FTS} USING fts5(title, body, content='{DOCUMENTS}', content_rowid='product_id', "
+    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER {FTS}_insert AFTER INSERT ON {DOCUMENTS} BEGIN "
+    f"INSERT INTO {FTS}(rowid, title, body) VALUES (new.product_id, new.title, new.body); END",
+    f"CREATE TRIGGER {FTS}_delete AFTER DELETE ON {DOCUMENTS} BEGIN "
+    f"INSERT INTO {FTS}({FTS}, rowid, title, body) VALUES ('delete', old.product_id, old.title, old.body); END",
+    f"CREATE TRIGGER {FTS}_update AFTER UPDATE ON {DOCUMENTS} BEGIN "
+    f"INSERT INTO {FTS}({FTS}, rowid, title, body) VALUES ('delete', old.product_id, old.title, old.body); "
+    f"INSERT INTO {FTS}(rowid, title, body) VALUES (new.product_id, new.title, new.body); END",
+]
+SQLITE_DROP = [
+    f'DROP TRIGGER IF EXISTS {FTS}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS}_update',
+    f'DROP TABLE IF EXISTS {FTS}',
+]
+# Weighted tsvector generated from the document, GIN indexed
+POSTGRES_INDEX = [
+    f"ALTER TABLE {DOCUMENTS} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B')) STORED",
+    f'CREATE INDEX product_search_vector_idx ON {DOCUMENTS} USING GIN (search_vector)',
+]
+POSTGRES_DROP = [
+    'DROP INDEX IF EXISTS product_search_vector_idx',
+    f'ALTER TABLE {DOCUMENTS} DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def create_index(apps, schema_editor):
+    for sql in {'sqlite': SQLITE_INDEX, 'postgresql': POSTGRES_INDEX}.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_index(apps, schema_editor):
+    for sql in {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def build_documents(apps, schema_editor):
+    Product = apps.get_model('cashierdashboard', 'Product')
+    ProductSearchDocument = apps.get_model('cashierdashboard', 'ProductSearchDocument')
+    documents = [
+        ProductSearchDocument(
+            product_id=row['id'], title=f"{row['name']} {row['sku']}"[:255],
+            body=' '.join(filter(None, [row['category__name'], row['subcategory__name'], row['description']]))
+        )
+        for row in Product.objects.values('id', 'name', 'sku', 'description', 'category__name', 'subcategory__name')
+    ]
+    ProductSearchDocument.objects.bulk_create(documents, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashierdashboard', '0017_customer_segment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='cashierdashboard.product')),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.RunPython(create_index, drop_index),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
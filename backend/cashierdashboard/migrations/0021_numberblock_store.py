@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashierdashboard', '0020_transaction_price_overridden_by'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='numberblock',
+            name='store',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='cashierdashboard.store'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 # Use the unified CustomUser from member app
 # Remove duplicate User model - use settings.AUTH_USER_MODEL instead
@@ -11,6 +12,7 @@ class Store(models.Model):
     tax_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0.00)
     currency = models.CharField(max_length=3, default='USD')
     status = models.CharField(max_length=20, default='active')
+    daily_sales_target = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)  # falls back to settings.DAILY_SALES_TARGET
 
     users = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='stores')
     products = models.ManyToManyField('Product', related_name='stores')
@@ -86,13 +88,23 @@ class Transaction(models.Model):
     receipt_number = models.CharField(max_length=20, unique=True)
     cashier = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='cashier_transactions')
     customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, blank=True, related_name='customer_transactions')
+    store_id = models.ForeignKey(Store, on_delete=models.SET_NULL, null=True, blank=True, related_name='store_transactions')
     subtotal = models.DecimalField(max_digits=10, decimal_places=2)
     tax_amount = models.DecimalField(max_digits=10, decimal_places=2)
     total = models.DecimalField(max_digits=10, decimal_places=2)
     payment_method = models.CharField(max_length=20)
     status = models.CharField(max_length=20)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)  # offline sales keep their original sale time
     is_offline = models.BooleanField(default=False)
+    price_overridden_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='price_overrides')  # manager who replaced catalog prices
+
+    class Meta:
+        # Keyset pagination walks (timestamp, id); offline sales arrive out of timestamp order
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='transaction_time_idx'),
+            models.Index(fields=['store_id', 'timestamp', 'id'], name='transaction_store_time_idx'),
+            models.Index(fields=['customer', 'timestamp', 'id'], name='transaction_customer_time_idx'),
+        ]
 
     def __str__(self):
         return self.receipt_number
@@ -109,6 +121,50 @@ class TransactionItem(models.Model):
     def __str__(self):
         return f"{self.transaction.receipt_number} - {self.product.name}"
 
+class StockMovement(models.Model):
+    """Append-only stock ledger; quantity is signed (negative leaves stock)"""
+    MOVEMENT_TYPE_CHOICES = [
+        ('sale', 'Sale'),
+        ('return', 'Return'),
+        ('adjustment', 'Adjustment'),
+        ('transfer', 'Transfer'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
+    movement_type = models.CharField(max_length=20, choices=MOVEMENT_TYPE_CHOICES)
+    quantity = models.IntegerField()
+    store = models.ForeignKey(Store, on_delete=models.SET_NULL, null=True, blank=True)
+    reference = models.CharField(max_length=50, blank=True)  # receipt number, return id, ...
+    note = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['product', 'created_at'], name='stockmove_product_time_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError('Stock movements are append-only')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Stock movements are append-only')
+
+    def __str__(self):
+        return f"{self.movement_type} {self.quantity:+d} x {self.product_id}"
+
+class StockBalance(models.Model):
+    """Cached on-hand counter per product, maintained from StockMovement"""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='stock_balance')
+    on_hand = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.product_id}: {self.on_hand}"
+
 class Return(models.Model):
     original_transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name='returns')
     reason = models.CharField(max_length=100)
@@ -129,6 +185,13 @@ class OfflineTransaction(models.Model):
 
     store = models.ForeignKey(Store, on_delete=models.CASCADE)
     cashier = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+    transaction = models.OneToOneField(Transaction, on_delete=models.SET_NULL, null=True, blank=True, related_name='offline_source')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['device_id', 'idempotency_key'], name='unique_offline_device_key'),
+        ]
 
     def __str__(self):
         return f"Offline Tx - {self.device_id}"
@@ -190,6 +253,9 @@ class Payment(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     processed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'], name='payment_created_idx')]
+    
     def __str__(self):
         return f"Payment {self.reference_number} - {self.status}"
 
@@ -235,6 +301,12 @@ class Delivery(models.Model):
     assigned_to = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_deliveries')
     updated_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='delivery_updates')
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='delivery_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='delivery_status_created_idx'),
+        ]
+    
     def __str__(self):
         return f"Delivery {self.tracking_number} - {self.status}"
 
@@ -250,4 +322,200 @@ class DeliveryUpdate(models.Model):
         ordering = ['-timestamp']
     
     def __str__(self):
-        return f"{self.delivery.tracking_number} - {self.status} at {self.timestamp}"
\ No newline at end of file
+        return f"{self.delivery.tracking_number} - {self.status} at {self.timestamp}"
+
+class NumberSequence(models.Model):
+    """Monotonic counter for receipt/payment/tracking numbers within one scope"""
+    KIND_CHOICES = [
+        ('receipt', 'Receipt Number'),
+        ('payment', 'Payment Reference'),
+        ('tracking', 'Tracking Number'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    scope = models.CharField(max_length=60)  # e.g. "store:3", "device:POS-01", "global"
+    next_value = models.BigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'scope'], name='unique_number_sequence_scope'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} @ {self.scope}"
+
+class NumberBlock(models.Model):
+    """Range of numbers handed to an offline POS device, both ends inclusive"""
+    sequence = models.ForeignKey(NumberSequence, on_delete=models.CASCADE, related_name='blocks')
+    device_id = models.CharField(max_length=50, db_index=True)
+    store = models.ForeignKey(Store, on_delete=models.SET_NULL, null=True, blank=True)
+    start = models.BigIntegerField()
+    end = models.BigIntegerField()
+    reserved_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    reserved_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-reserved_at']
+
+    def __str__(self):
+        return f"{self.sequence} [{self.start}-{self.end}] -> {self.device_id}"
+
+class IdempotencyRecord(models.Model):
+    """Stored response for a mutating request sent with an Idempotency-Key header"""
+    key = models.CharField(max_length=64, unique=True)  # sha256 of header, credentials, method and path
+    fingerprint = models.CharField(max_length=64)  # sha256 of the request body
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)  # null while the first request runs
+    content_type = models.CharField(max_length=100, blank=True)
+    body = models.BinaryField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key[:12]} -> {self.status_code or 'pending'}"
+
+class CashierDailyStats(models.Model):
+    """Running sales counters for one cashier and day, kept by sales.record_sales()"""
+    cashier = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    sales_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+    last_sync = models.DateTimeField(null=True, blank=True)  # latest offline upload, carried over from earlier days
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cashier', 'day'], name='unique_cashier_day_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.cashier} {self.day}: {self.transaction_count} sales"
+
+class DailyStoreSales(models.Model):
+    """Completed-sale rollup per store and day, kept by sales.record_sales(); store is null for unassigned sales"""
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, null=True, blank=True, related_name='daily_sales')
+    day = models.DateField()
+    sales_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    order_count = models.PositiveIntegerField(default=0)
+    customer_count = models.PositiveIntegerField(default=0)  # distinct customers that day
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['store', 'day'], name='unique_store_day_sales'),
+            models.UniqueConstraint(fields=['day'], condition=models.Q(store__isnull=True), name='unique_unassigned_day_sales'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'store'], name='daily_sales_day_store_idx'),
+        ]
+
+    @property
+    def avg_order_value(self):
+        return self.sales_total / self.order_count if self.order_count else 0
+
+    def __str__(self):
+        return f"{self.store or 'Unassigned'} {self.day}: {self.sales_total}"
+
+class DailyStoreCustomer(models.Model):
+    """One row per customer who bought at a store on a day; backs distinct-customer counts"""
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, null=True, blank=True)
+    day = models.DateField()
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['store', 'day', 'customer'], name='unique_store_day_customer'),
+            models.UniqueConstraint(fields=['day', 'customer'], condition=models.Q(store__isnull=True), name='unique_unassigned_day_customer'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'store'], name='daily_customer_day_store_idx'),
+        ]
+
+class ActivityEvent(models.Model):
+    """Denormalized recent transactions and returns for dashboard feeds, kept by activity.py"""
+    kind = models.CharField(max_length=20, choices=[
+        ('transaction', 'Transaction'),
+        ('return', 'Return'),
+    ])
+    object_id = models.BigIntegerField()
+    status = models.CharField(max_length=20)
+    timestamp = models.DateTimeField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    reference = models.CharField(max_length=20, blank=True)  # receipt number
+    store_name = models.CharField(max_length=100, blank=True)
+    customer_name = models.CharField(max_length=100, blank=True)
+    items_count = models.IntegerField(default=0)
+    reason = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_activity_subject'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'status', '-timestamp'], name='activity_kind_status_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.status}"
+
+class Notification(models.Model):
+    """Manager notification outbox, written by notifications.py when a threshold is crossed"""
+    kind = models.CharField(max_length=20, choices=[
+        ('low_stock', 'Low Stock'),
+        ('out_of_stock', 'Out of Stock'),
+        ('daily_target', 'Daily Target'),
+    ])
+    level = models.CharField(max_length=10, default='info')  # warning / success / info
+    priority = models.CharField(max_length=10, default='low')
+    message = models.CharField(max_length=255)
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, null=True, blank=True)  # null: every manager sees it
+    object_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind}: {self.message}"
+
+class NotificationReadMark(models.Model):
+    """Id of the newest notification a user has read; everything after it is unread"""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notification_mark')
+    last_read_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+class ReorderSuggestion(models.Model):
+    """Forecast demand and reorder policy for a product, written by forecasting.run_forecast()"""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='reorder_suggestion')
+    daily_demand = models.FloatField()     # smoothed units per day
+    demand_deviation = models.FloatField()  # smoothed absolute forecast error, units per day
+    reorder_point = models.IntegerField()
+    reorder_quantity = models.IntegerField()
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.product_id}: reorder {self.reorder_quantity} at {self.reorder_point}"
+
+class CustomerSegment(models.Model):
+    """RFM scores and segment for a customer who bought in the history window, written by segmentation.run_segmentation()"""
+    customer = models.OneToOneField(Customer, on_delete=models.CASCADE, primary_key=True, related_name='segment')
+    recency = models.PositiveSmallIntegerField()    # 1-5 quintile scores, 5 = best
+    frequency = models.PositiveSmallIntegerField()
+    monetary = models.PositiveSmallIntegerField()
+    segment = models.CharField(max_length=20)
+    orders = models.IntegerField()
+    spend = models.DecimalField(max_digits=12, decimal_places=2)
+    last_purchase = models.DateTimeField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=['segment', 'customer'], name='segment_customer_idx')]
+
+    def __str__(self):
+        return f"{self.customer_id}: {self.segment} ({self.recency}{self.frequency}{self.monetary})"
+
+class ProductSearchDocument(models.Model):
+    """Denormalized search text for a product, indexed by the database's full-text engine (see search.py)"""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    title = models.CharField(max_length=255)  # name and SKU, ranked above the body
+    body = models.TextField(blank=True)       # category, subcategory and description
+
+    def __str__(self):
+        return self.title
@@ -0,0 +1,119 @@
+"""
+Manager notification outbox.
+
+Alerts are written once, when the event that triggers them happens, instead
+of being recomputed on every dashboard poll:
+
+* inventory._apply_deltas passes the stock decreases it applied; products
+  that just fell to or below min_stock_level (or to zero) get a row.
+* sales.record_sales passes the amounts it added to today's DailyStoreSales
+  rows; a store whose total just went over its daily target gets a row.
+
+Ids only grow, so readers page through the outbox with an id cursor and
+the endpoint is an indexed range read. A user's read position is their
+NotificationReadMark. Rows older than NOTIFICATION_RETENTION_DAYS are
+pruned every PRUNE_EVERY writes.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Product, Store, DailyStoreSales, Notification, NotificationReadMark
+
+DAILY_TARGET = Decimal(str(getattr(settings, 'DAILY_SALES_TARGET', 1000)))
+RETENTION_DAYS = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 30)
+PRUNE_EVERY = getattr(settings, 'NOTIFICATION_PRUNE_EVERY', 500)
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+_writes = 0
+
+
+def _emit(notifications):
+    global _writes
+    if not notifications:
+        return
+    Notification.objects.bulk_create(notifications)
+    before, _writes = _writes, _writes + len(notifications)
+    if before // PRUNE_EVERY != _writes // PRUNE_EVERY:
+        prune()
+
+
+def stock_alert(product_id, name, stock, min_stock_level, before):
+    """The Notification for a product whose stock went from `before` to `stock`, or None"""
+    if stock <= 0 < before:
+        return Notification(kind='out_of_stock', level='warning', priority='high', object_id=product_id,
+                            message=f'Out of stock: {name}')
+    if stock <= min_stock_level < before:
+        return Notification(kind='low_stock', level='warning', priority='high' if stock <= 0 else 'medium',
+                            object_id=product_id, message=f'Low stock alert: {name} ({stock} remaining)')
+    return None
+
+
+def stock_moved(deltas):
+    """Alert on products whose stock just crossed min_stock_level or zero; deltas maps product id to change"""
+    decreases = {pk: delta for pk, delta in deltas.items() if delta < 0}
+    if not decreases:
+        return
+    alerts = [
+        stock_alert(pk, name, stock, minimum, stock - decreases[pk])
+        for pk, name, stock, minimum in Product.objects.filter(pk__in=decreases, is_active=True).values_list(
+            'id', 'name', 'stock', 'min_stock_level'
+        )
+    ]
+    _emit([alert for alert in alerts if alert])
+
+
+def sales_added(store_totals):
+    """Alert on stores whose sales today just passed their daily target; store_totals maps (store_id, day) to the amount added"""
+    today = timezone.localdate()
+    added = {store_id: amount for (store_id, day), amount in store_totals.items() if store_id and day == today and amount > 0}
+    if not added:
+        return
+    totals = dict(DailyStoreSales.objects.filter(store_id__in=added, day=today).values_list('store_id', 'sales_total'))
+    alerts = []
+    for store_id, name, target in Store.objects.filter(pk__in=added).values_list('id', 'name', 'daily_sales_target'):
+        target = DAILY_TARGET if target is None else target
+        total = totals.get(store_id, 0)
+        if total - added[store_id] <= target < total:
+            alerts.append(Notification(kind='daily_target', level='success', priority='low', store_id=store_id,
+                                       object_id=store_id, message=f'{name} exceeded daily target (${total:.0f})'))
+    _emit(alerts)
+
+
+def read_mark(user):
+    return NotificationReadMark.objects.filter(user=user).values_list('last_read_id', flat=True).first() or 0
+
+
+def unread_notifications(user, after=None, limit=PAGE_SIZE):
+    """
+    Notifications for the user's store after the id cursor `after`
+    (default: their read mark), oldest first. Returns (rows, cursor) where
+    cursor is the id to pass as `after` for the next page.
+    """
+    after = read_mark(user) if after is None else int(after)
+    rows = Notification.objects.filter(id__gt=after)
+    if user.store_id:
+        rows = rows.filter(Q(store__isnull=True) | Q(store_id=user.store_id))
+    rows = list(rows.order_by('id')[:max(1, min(int(limit), MAX_PAGE_SIZE))])
+    return rows, rows[-1].pk if rows else after
+
+
+def mark_notifications_read(user, up_to=None):
+    """Move the user's read mark forward to `up_to` (default: the newest notification)"""
+    if up_to is None:
+        up_to = Notification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    mark, _ = NotificationReadMark.objects.get_or_create(user=user)
+    NotificationReadMark.objects.filter(pk=mark.pk, last_read_id__lt=up_to).update(
+        last_read_id=up_to, updated_at=timezone.now()
+    )
+    return max(mark.last_read_id, int(up_to))
+
+
+def prune(days=None):
+    """Delete notifications older than `days` (NOTIFICATION_RETENTION_DAYS)"""
+    cutoff = timezone.now() - timedelta(days=days or RETENTION_DAYS)
+    return Notification.objects.filter(created_at__lt=cutoff).delete()[0]
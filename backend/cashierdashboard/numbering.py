@@ -0,0 +1,192 @@
+"""
+Block-allocated receipt, payment reference and tracking numbers.
+
+Numbers come from a NumberSequence row per (kind, scope). Instead of one
+write per number, a whole block is reserved with a single
+`UPDATE ... SET next_value = next_value + size` and then handed out from
+memory. Offline POS devices reserve their own blocks through the API and
+format numbers locally with the same prefix/width.
+
+Formatted numbers look like ``RCP-0003-000000123``: kind prefix, the
+sequence id and a zero-padded counter, so they are unique across scopes
+and sort in issue order within a scope. Gaps are possible (unused parts
+of a block are dropped on restart); duplicates are not. Both fields are
+fixed width so a number is always 18 characters and fits
+Transaction.receipt_number; a sequence id or counter that would need
+more digits raises NumberingError instead of growing the number.
+
+Device blocks belong to the store of the user who first reserved them;
+other stores cannot reserve numbers for that device.
+"""
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction as db_transaction
+from django.db.models import F
+
+from .models import NumberSequence, NumberBlock
+
+PREFIXES = {
+    'receipt': 'RCP',
+    'payment': 'PAY',
+    'tracking': 'TRK',
+}
+SEQUENCE_WIDTH = 4
+COUNTER_WIDTH = 9
+MAX_SEQUENCE_ID = 10 ** SEQUENCE_WIDTH - 1
+MAX_VALUE = 10 ** COUNTER_WIDTH - 1
+
+DEFAULT_BLOCK_SIZE = getattr(settings, 'NUMBER_BLOCK_SIZE', 100)
+MAX_DEVICE_BLOCK_SIZE = getattr(settings, 'NUMBER_MAX_DEVICE_BLOCK_SIZE', 10000)
+
+
+class NumberingError(ValueError):
+    """A number that cannot be issued, e.g. because its sequence is exhausted"""
+
+
+class DeviceStoreError(NumberingError):
+    """Numbers requested for a device that belongs to another store"""
+
+
+def store_scope(store):
+    """Scope key for numbers issued on behalf of a store (or globally)"""
+    store_pk = getattr(store, 'pk', store)
+    return f'store:{store_pk}' if store_pk else 'global'
+
+
+def device_scope(device_id):
+    return f'device:{device_id}'
+
+
+def number_prefix(kind, sequence_id):
+    if not 0 < sequence_id <= MAX_SEQUENCE_ID:
+        raise NumberingError(f'Sequence id {sequence_id} does not fit in {SEQUENCE_WIDTH} digits')
+    return f"{PREFIXES[kind]}-{sequence_id:0{SEQUENCE_WIDTH}d}-"
+
+
+def format_number(kind, sequence_id, value):
+    if not 0 < value <= MAX_VALUE:
+        raise NumberingError(f'Counter value {value} does not fit in {COUNTER_WIDTH} digits')
+    return f"{number_prefix(kind, sequence_id)}{value:0{COUNTER_WIDTH}d}"
+
+
+def reserve_block(kind, scope, size):
+    """
+    Reserve `size` consecutive values for (kind, scope) with one write.
+
+    Returns (sequence_id, start, end) with both ends inclusive. The UPDATE
+    takes the row lock before the value is read back, so concurrent
+    reservations can never overlap. Raises NumberingError, and rolls the
+    reservation back, if the block would not fit the number format.
+    """
+    if kind not in PREFIXES:
+        raise ValueError(f'Unknown number kind: {kind}')
+    if size < 1:
+        raise ValueError('Block size must be positive')
+
+    with db_transaction.atomic():
+        sequences = NumberSequence.objects.filter(kind=kind, scope=scope)
+        if not sequences.update(next_value=F('next_value') + size):
+            try:
+                with db_transaction.atomic():
+                    NumberSequence.objects.create(kind=kind, scope=scope, next_value=1 + size)
+            except IntegrityError:
+                # Another worker created the row first; take a block from it instead
+                sequences.update(next_value=F('next_value') + size)
+        sequence_id, next_value = sequences.values_list('id', 'next_value').get()
+        if sequence_id > MAX_SEQUENCE_ID:
+            raise NumberingError(f'No {kind} sequence ids left for scope {scope}')
+        if next_value - 1 > MAX_VALUE:
+            raise NumberingError(f'The {kind} sequence for {scope} is exhausted')
+    return sequence_id, next_value - size, next_value - 1
+
+
+class _Block:
+    __slots__ = ('sequence_id', 'next', 'end')
+
+    def __init__(self, sequence_id, start, end):
+        self.sequence_id = sequence_id
+        self.next = start
+        self.end = end
+
+    def remaining(self):
+        return self.end - self.next + 1
+
+
+class NumberAllocator:
+    """Per-process cache of reserved blocks, one per (kind, scope)"""
+
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE):
+        self.block_size = block_size
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def next_number(self, kind, scope):
+        return self.next_numbers(kind, scope, 1)[0]
+
+    def next_numbers(self, kind, scope, count):
+        """Return `count` formatted numbers, reserving new blocks as needed"""
+        key = (kind, scope)
+        numbers = []
+        with self._lock:
+            block = self._blocks.get(key)
+            while block and block.remaining() > 0 and len(numbers) < count:
+                numbers.append(format_number(kind, block.sequence_id, block.next))
+                block.next += 1
+
+        missing = count - len(numbers)
+        if missing:
+            sequence_id, start, end = reserve_block(kind, scope, max(missing, self.block_size))
+            numbers.extend(format_number(kind, sequence_id, value) for value in range(start, start + missing))
+            leftover = _Block(sequence_id, start + missing, end)
+            if leftover.remaining() > 0:
+                if connection.in_atomic_block:
+                    # Only reuse the block once its reservation is durable
+                    db_transaction.on_commit(lambda: self._install(key, leftover))
+                else:
+                    self._install(key, leftover)
+        return numbers
+
+    def _install(self, key, block):
+        with self._lock:
+            current = self._blocks.get(key)
+            if current is None or current.remaining() <= 0:
+                self._blocks[key] = block
+
+    def reset(self):
+        with self._lock:
+            self._blocks.clear()
+
+
+allocator = NumberAllocator()
+
+
+def next_number(kind, scope='global'):
+    return allocator.next_number(kind, scope)
+
+
+def next_numbers(kind, scope, count):
+    return allocator.next_numbers(kind, scope, count)
+
+
+def reserve_device_block(kind, device_id, size, user=None, store=None):
+    """
+    Reserve a block for an offline device and record who holds it.
+
+    With a store, the device must not already hold blocks for another
+    store; store=None (admin managers) may reserve for any device.
+    """
+    size = min(size, MAX_DEVICE_BLOCK_SIZE)
+    store_pk = getattr(store, 'pk', store)
+    if store_pk and NumberBlock.objects.filter(device_id=device_id, store__isnull=False).exclude(
+            store_id=store_pk).exists():
+        raise DeviceStoreError(f'Device {device_id} belongs to another store')
+    sequence_id, start, end = reserve_block(kind, device_scope(device_id), size)
+    return NumberBlock.objects.create(
+        sequence_id=sequence_id,
+        device_id=device_id,
+        store_id=store_pk,
+        start=start,
+        end=end,
+        reserved_by=user,
+    )
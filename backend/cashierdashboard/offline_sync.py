@@ -0,0 +1,431 @@
+"""
+Bulk ingest of sales queued on offline POS devices.
+
+Records arrive as NDJSON, one sale per line:
+
+    {"idempotency_key": "a1", "device_id": "POS-01", "store": 3,
+     "timestamp": "2025-08-05T10:15:00Z", "payment_method": "cash",
+     "items": [{"product": 12, "quantity": 2, "unit_price": "1.50"}]}
+
+Lines are parsed as they are read and written in chunks: duplicates are
+dropped by (device_id, idempotency_key), then Transactions, items, the
+OfflineTransaction audit rows and stock movements are bulk-created in one
+database transaction per chunk. Every input line gets a result entry.
+"""
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import DecimalValidator
+from django.db import DatabaseError, IntegrityError, connection, transaction as db_transaction
+from django.utils import timezone
+
+from .models import Store, Product, ProductVariant, Customer, Transaction, TransactionItem, OfflineTransaction, StockMovement
+from .numbering import next_numbers, device_scope
+from .inventory import record_movements
+from .sales import record_sales, record_sync
+from .activity import record_transactions
+from managerdashboard import approvals
+
+CHUNK_SIZE = getattr(settings, 'OFFLINE_INGEST_CHUNK_SIZE', 1000)
+ZERO = Decimal('0')
+
+# Column limits, checked per record so a bad value never reaches bulk_create
+_money = Transaction._meta.get_field('total')  # every money column is max_digits=10, decimal_places=2
+MONEY = DecimalValidator(_money.max_digits, _money.decimal_places)
+MAX_QUANTITY = connection.ops.integer_field_range('IntegerField')[1] or 2 ** 31 - 1
+MAX_LENGTHS = {name: Transaction._meta.get_field(name).max_length
+               for name in ('receipt_number', 'payment_method', 'status')}
+
+
+class RecordError(ValueError):
+    """A single record is malformed; the rest of the batch continues"""
+
+
+def iter_ndjson(lines):
+    """Yield (line_number, record or RecordError) for each non-blank line"""
+    for line_number, raw in enumerate(lines, start=1):
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8')
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            record = json.loads(raw)
+        except ValueError as e:
+            yield line_number, RecordError(f'Invalid JSON: {e}')
+            continue
+        if not isinstance(record, dict):
+            yield line_number, RecordError('Each line must be a JSON object')
+            continue
+        yield line_number, record
+
+
+def _fits(value):
+    try:
+        MONEY(value)
+    except ValidationError:
+        return False
+    return True
+
+
+def _decimal(value, field):
+    """A finite amount that fits the money columns"""
+    try:
+        parsed = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise RecordError(f'Invalid {field}')
+    if not parsed.is_finite() or not _fits(parsed):
+        raise RecordError(f'Invalid {field}')
+    return parsed
+
+
+def _text(value, field, default=None):
+    if value is None or value == '':
+        return default
+    value = str(value)
+    if len(value) > MAX_LENGTHS[field]:
+        raise RecordError(f'{field} must be at most {MAX_LENGTHS[field]} characters')
+    return value
+
+
+def _timestamp(value):
+    if not value:
+        return timezone.now()
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise RecordError('Invalid timestamp')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class _Sale:
+    __slots__ = ('line', 'key', 'device_id', 'store_id', 'customer_id', 'receipt_number',
+                 'timestamp', 'payment_method', 'status', 'subtotal', 'tax_amount', 'total',
+                 'items', 'raw', 'offline_row')
+
+
+class OfflineIngestor:
+    """Turns offline sale records into Transaction rows, chunk by chunk"""
+
+    def __init__(self, cashier=None, store=None, device_id=None, chunk_size=CHUNK_SIZE):
+        self.cashier = cashier
+        self.default_store_id = getattr(store, 'pk', store)
+        self.default_device_id = device_id
+        self.chunk_size = chunk_size
+
+    # ---- entry points ----
+
+    def ingest_lines(self, lines):
+        """Parse NDJSON lines incrementally; yields one result dict per record"""
+        chunk = []
+        for line_number, record in iter_ndjson(lines):
+            chunk.append((line_number, record))
+            if len(chunk) >= self.chunk_size:
+                yield from self._process(chunk)
+                chunk = []
+        if chunk:
+            yield from self._process(chunk)
+
+    def sync_pending(self, offline_rows):
+        """Convert pending OfflineTransaction rows in place; yields one result per row"""
+        pending_ids = list(offline_rows.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(pending_ids), self.chunk_size):
+            rows = OfflineTransaction.objects.filter(
+                pk__in=pending_ids[start:start + self.chunk_size]
+            ).select_related('cashier').order_by('pk')
+
+            chunk = []
+            for row in rows:
+                record = dict(row.transaction_data or {})
+                record.setdefault('device_id', row.device_id)
+                record.setdefault('store', row.store_id)
+                record.setdefault('idempotency_key', row.idempotency_key or f'offline-{row.pk}')
+                chunk.append((row.pk, record, row))
+
+            failed = []
+            for (_, _, row), result in zip(chunk, self._process(chunk)):
+                if result['status'] != 'created':
+                    row.sync_status = 'failed' if result['status'] == 'error' else 'duplicate'
+                    row.conflict_resolution = result
+                    failed.append(row)
+                yield result
+            OfflineTransaction.objects.bulk_update(failed, ['sync_status', 'conflict_resolution'])
+
+    # ---- pipeline ----
+
+    def _process(self, chunk):
+        results = {}
+        sales = []
+        for entry in chunk:
+            line_number, record = entry[0], entry[1]
+            if isinstance(record, RecordError):
+                results[line_number] = {'line': line_number, 'status': 'error', 'error': str(record)}
+                continue
+            try:
+                sale = self._parse(line_number, record, entry[2] if len(entry) > 2 else None)
+            except RecordError as e:
+                results[line_number] = {'line': line_number, 'idempotency_key': record.get('idempotency_key'),
+                                        'status': 'error', 'error': str(e)}
+                continue
+            sales.append(sale)
+
+        sales = self._drop_duplicates(sales, results)
+        sales = self._check_references(sales, results)
+        if sales:
+            sales = self._write_isolating(sales, results)
+            for sale in sales:
+                results[sale.line] = {
+                    'line': sale.line,
+                    'idempotency_key': sale.key,
+                    'status': 'created',
+                    'receipt_number': sale.receipt_number,
+                }
+
+        for entry in chunk:
+            yield results[entry[0]]
+
+    def _write_isolating(self, sales, results):
+        """Write the chunk in one go; if that fails, record by record so one bad line keeps its neighbours"""
+        try:
+            self._write(sales)
+            return sales
+        except IntegrityError:
+            # A concurrent upload may have won the race for some keys; re-check them
+            sales = self._check_references(self._drop_duplicates(sales, results), results)
+        except (DatabaseError, ValidationError):
+            pass
+
+        written = []
+        for sale in sales:
+            try:
+                self._write([sale])
+            except (DatabaseError, ValidationError) as e:
+                results[sale.line] = {'line': sale.line, 'idempotency_key': sale.key, 'status': 'error',
+                                      'error': f'Could not be saved: {e}'}
+                continue
+            written.append(sale)
+        return written
+
+    def _parse(self, line_number, record, offline_row=None):
+        sale = _Sale()
+        sale.line = line_number
+        sale.offline_row = offline_row
+        sale.raw = record
+        sale.key = record.get('idempotency_key')
+        if not sale.key:
+            raise RecordError('idempotency_key is required')
+        sale.key = str(sale.key)[:64]
+        sale.device_id = str(record.get('device_id') or self.default_device_id or '')[:50]
+        if not sale.device_id:
+            raise RecordError('device_id is required')
+        try:
+            sale.store_id = int(record.get('store') or self.default_store_id or 0)
+            sale.customer_id = int(record['customer']) if record.get('customer') else None
+        except (TypeError, ValueError):
+            raise RecordError('store and customer must be ids')
+        if not sale.store_id:
+            raise RecordError('store is required')
+        sale.receipt_number = _text(record.get('receipt_number'), 'receipt_number')
+        sale.timestamp = _timestamp(record.get('timestamp'))
+        sale.payment_method = _text(record.get('payment_method'), 'payment_method', 'cash')
+        sale.status = _text(record.get('status'), 'status', 'completed')
+
+        items = record.get('items')
+        if not isinstance(items, list) or not items:
+            raise RecordError('items must be a non-empty list')
+        sale.items = []
+        for item in items:
+            try:
+                product_id = int(item['product'])
+                variant_id = int(item['variant']) if item.get('variant') is not None else None
+                quantity = int(item.get('quantity', 1))
+            except (KeyError, TypeError, ValueError):
+                raise RecordError('Each item needs a product id and an integer quantity, and variants must be ids')
+            if not 1 <= quantity <= MAX_QUANTITY:
+                raise RecordError('Item quantity out of range')
+            unit_price = _decimal(item['unit_price'], 'unit_price') if item.get('unit_price') is not None else None
+            discount = _decimal(item.get('discount') or 0, 'discount')
+            total = _decimal(item['total'], 'total') if item.get('total') is not None else None
+            sale.items.append([product_id, variant_id, quantity, unit_price, discount, total])
+
+        sale.subtotal = _decimal(record['subtotal'], 'subtotal') if record.get('subtotal') is not None else None
+        sale.tax_amount = _decimal(record.get('tax_amount') or 0, 'tax_amount')
+        sale.total = _decimal(record['total'], 'total') if record.get('total') is not None else None
+        return sale
+
+    def _drop_duplicates(self, sales, results):
+        seen = set()
+        existing = {}
+        if sales:
+            for device_id, key, pk in OfflineTransaction.objects.filter(
+                device_id__in={sale.device_id for sale in sales},
+                idempotency_key__in={sale.key for sale in sales}
+            ).values_list('device_id', 'idempotency_key', 'pk'):
+                existing[(device_id, key)] = pk
+
+        kept = []
+        for sale in sales:
+            identity = (sale.device_id, sale.key)
+            own_pk = sale.offline_row.pk if sale.offline_row is not None else None
+            if existing.get(identity, own_pk) != own_pk or identity in seen:
+                results[sale.line] = {'line': sale.line, 'idempotency_key': sale.key, 'status': 'duplicate'}
+                continue
+            seen.add(identity)
+            kept.append(sale)
+        return kept
+
+    def _check_references(self, sales, results):
+        """Resolve products, variants, stores, customers and receipt numbers with one query each"""
+        product_ids = {item[0] for sale in sales for item in sale.items}
+        prices = dict(Product.objects.filter(pk__in=product_ids).values_list('id', 'price'))
+        variant_products = dict(ProductVariant.objects.filter(
+            pk__in={item[1] for sale in sales for item in sale.items if item[1] is not None}
+        ).values_list('id', 'product_id'))
+        store_ids = set(Store.objects.filter(pk__in={sale.store_id for sale in sales}).values_list('id', flat=True))
+        customer_ids = set(Customer.objects.filter(
+            pk__in={sale.customer_id for sale in sales if sale.customer_id}
+        ).values_list('id', flat=True))
+        used_receipts = set(Transaction.objects.filter(
+            receipt_number__in={sale.receipt_number for sale in sales if sale.receipt_number}
+        ).values_list('receipt_number', flat=True))
+
+        kept = []
+        for sale in sales:
+            error = None
+            if sale.store_id not in store_ids:
+                error = f'Unknown store {sale.store_id}'
+            elif any(item[0] not in prices for item in sale.items):
+                error = 'Unknown product in items'
+            elif any(item[1] is not None and variant_products.get(item[1]) != item[0] for item in sale.items):
+                error = 'Unknown variant in items, or variant of another product'
+            elif sale.receipt_number and sale.receipt_number in used_receipts:
+                error = f'Receipt number {sale.receipt_number} already used'
+            if error:
+                results[sale.line] = {'line': sale.line, 'idempotency_key': sale.key, 'status': 'error', 'error': error}
+                continue
+
+            if sale.customer_id not in customer_ids:
+                sale.customer_id = None
+            subtotal = ZERO
+            for item in sale.items:
+                if item[3] is None:
+                    item[3] = prices[item[0]]
+                if item[5] is None:
+                    item[5] = item[3] * item[2] - item[4]
+                subtotal += item[5]
+            if sale.subtotal is None:
+                sale.subtotal = subtotal
+            if sale.total is None:
+                sale.total = sale.subtotal + sale.tax_amount
+            if not all(_fits(value) for value in [sale.subtotal, sale.total, *(item[5] for item in sale.items)]):
+                results[sale.line] = {'line': sale.line, 'idempotency_key': sale.key, 'status': 'error',
+                                      'error': 'Sale totals out of range'}
+                continue
+            if sale.receipt_number:
+                used_receipts.add(sale.receipt_number)
+            kept.append(sale)
+        return kept
+
+    def _write(self, sales):
+        # Devices normally bring receipt numbers from a pre-fetched block; fill gaps per device
+        by_device = {}
+        for sale in sales:
+            if not sale.receipt_number:
+                by_device.setdefault(sale.device_id, []).append(sale)
+        for device_id, unnumbered in by_device.items():
+            for sale, number in zip(unnumbered, next_numbers('receipt', device_scope(device_id), len(unnumbered))):
+                sale.receipt_number = number
+
+        with db_transaction.atomic():
+            transactions = Transaction.objects.bulk_create([
+                Transaction(
+                    receipt_number=sale.receipt_number,
+                    cashier=sale.offline_row.cashier if sale.offline_row else self.cashier,
+                    customer_id=sale.customer_id,
+                    store_id_id=sale.store_id,
+                    subtotal=sale.subtotal,
+                    tax_amount=sale.tax_amount,
+                    total=sale.total,
+                    payment_method=sale.payment_method,
+                    status=sale.status,
+                    timestamp=sale.timestamp,
+                    is_offline=True,
+                )
+                for sale in sales
+            ], batch_size=self.chunk_size)
+
+            items = TransactionItem.objects.bulk_create([
+                TransactionItem(
+                    transaction=sale_tx,
+                    product_id=product_id,
+                    variant_id=variant_id,
+                    quantity=quantity,
+                    unit_price=unit_price,
+                    discount=discount,
+                    total=total,
+                )
+                for sale, sale_tx in zip(sales, transactions)
+                for product_id, variant_id, quantity, unit_price, discount, total in sale.items
+            ], batch_size=self.chunk_size)
+
+            new_rows, synced_rows = [], []
+            for sale, sale_tx in zip(sales, transactions):
+                if sale.offline_row is not None:
+                    sale.offline_row.transaction = sale_tx
+                    sale.offline_row.idempotency_key = sale.key
+                    sale.offline_row.sync_status = 'synced'
+                    synced_rows.append(sale.offline_row)
+                else:
+                    new_rows.append(OfflineTransaction(
+                        device_id=sale.device_id,
+                        idempotency_key=sale.key,
+                        transaction_data=sale.raw,
+                        sync_status='synced',
+                        store_id=sale.store_id,
+                        cashier=self.cashier,
+                        transaction=sale_tx,
+                    ))
+            OfflineTransaction.objects.bulk_create(new_rows, batch_size=self.chunk_size)
+            OfflineTransaction.objects.bulk_update(
+                synced_rows, ['transaction', 'idempotency_key', 'sync_status'], batch_size=self.chunk_size
+            )
+
+            record_sales(transactions)
+            record_transactions(transactions, {
+                sale_tx.pk: len(sale.items) for sale, sale_tx in zip(sales, transactions)
+            })
+            approvals.request_transactions(transactions)
+            if new_rows:
+                record_sync(getattr(self.cashier, 'pk', None))
+
+            # One ledger row per product, store and device for the chunk; the
+            # per-receipt detail is already in TransactionItem
+            sold = {}
+            for sale in sales:
+                for product_id, _, quantity, _, _, _ in sale.items:
+                    key = (product_id, sale.store_id, sale.device_id)
+                    sold[key] = sold.get(key, 0) + quantity
+            record_movements([
+                StockMovement(
+                    product_id=product_id,
+                    movement_type='sale',
+                    quantity=-quantity,
+                    store_id=store_id,
+                    reference=f'offline:{device_id}'[:50],
+                    created_by=self.cashier,
+                )
+                for (product_id, store_id, device_id), quantity in sold.items()
+            ])
+        return transactions
+
+
+def summarize(results):
+    summary = {'created': 0, 'duplicate': 0, 'error': 0}
+    for result in results:
+        summary[result['status']] += 1
+    return summary
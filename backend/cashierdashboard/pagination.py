@@ -0,0 +1,131 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is `?limit=` rows in a fixed, unique order: the view's `keyset`,
+e.g. ('-timestamp', '-id'). The last field must be the primary key, so
+ties never repeat or skip rows. The response's `next` cursor encodes the
+last row's keyset values. The next page filters on them ("rows after this
+one") instead of OFFSET, so with a composite index on the keyset, page
+1,000 costs the same as page 1. Rows inserted while a client pages do not
+shift later pages.
+
+Responses have the same shape as the approval queue and audit log:
+{"results": [...], "next": "<cursor>" or null}. Cursors encode integers
+as-is and datetimes as microseconds since the epoch, joined by "_".
+
+A view whose order is computed per request, such as search relevance,
+returns None from get_keyset(). It is then paged by offset: relevance
+ranks cannot be compared across pages, and result sets are short.
+paginate() is the same thing for views that build their own response.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+PAGE_SIZE = getattr(settings, 'API_PAGE_SIZE', 50)
+MAX_PAGE_SIZE = getattr(settings, 'API_MAX_PAGE_SIZE', 500)
+DEFAULT_KEYSET = ('-id',)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+OFFSET_PREFIX = 'o'
+
+
+def page_size(limit):
+    if limit in (None, ''):
+        return PAGE_SIZE
+    try:
+        return max(1, min(int(limit), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ParseError({'error': 'limit must be a number'})
+
+
+def keyset_fields(queryset, keyset):
+    return [(name.lstrip('-'), name.startswith('-'), queryset.model._meta.get_field(name.lstrip('-')))
+            for name in keyset]
+
+
+def encode_cursor(row, fields):
+    values = []
+    for _, _, field in fields:
+        value = getattr(row, field.attname)
+        values.append((value - EPOCH) // timedelta(microseconds=1) if isinstance(field, models.DateTimeField)
+                      else value)
+    return '_'.join(str(value) for value in values)
+
+
+def decode_cursor(cursor, fields):
+    try:
+        parts = cursor.split('_')
+        if len(parts) != len(fields):
+            raise ValueError
+        return [EPOCH + timedelta(microseconds=int(part)) if isinstance(field, models.DateTimeField) else int(part)
+                for part, (_, _, field) in zip(parts, fields)]
+    except ValueError:
+        raise ParseError({'error': 'Invalid cursor'})
+
+
+def after(queryset, fields, values):
+    """Rows strictly after `values` in keyset order"""
+    (first, descending, _), first_value = fields[0], values[0]
+    # The leading bound lets the index range-scan; the OR chain breaks ties field by field
+    bound = Q(**{f"{first}__{'lte' if descending else 'gte'}": first_value})
+    later = Q()
+    for i, (name, descending, _) in enumerate(fields):
+        equal = {fields[j][0]: values[j] for j in range(i)}
+        later |= Q(**equal, **{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+    return queryset.filter(bound, later)
+
+
+def paginate(queryset, cursor=None, limit=None, keyset=DEFAULT_KEYSET):
+    """One page of `queryset` in `keyset` order (None keeps its order, paged by offset); returns (rows, next_cursor)"""
+    limit = page_size(limit)
+    if keyset is None:
+        return _offset_page(queryset, cursor, limit)
+    fields = keyset_fields(queryset, keyset)
+    if cursor:
+        queryset = after(queryset, fields, decode_cursor(cursor, fields))
+    rows = list(queryset.order_by(*keyset)[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1], fields) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def _offset_page(queryset, cursor, limit):
+    offset = 0
+    if cursor:
+        if not cursor.startswith(OFFSET_PREFIX) or not cursor[len(OFFSET_PREFIX):].isdigit():
+            raise ParseError({'error': 'Invalid cursor'})
+        offset = int(cursor[len(OFFSET_PREFIX):])
+    rows = list(queryset[offset:offset + limit + 1])
+    next_cursor = f'{OFFSET_PREFIX}{offset + limit}' if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+class KeysetPagination(BasePagination):
+    """?limit= rows after ?cursor=, in the view's keyset order (default -id)"""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if hasattr(view, 'get_keyset'):
+            keyset = view.get_keyset()
+        else:
+            keyset = getattr(view, 'keyset', DEFAULT_KEYSET)
+        rows, self.next_cursor = paginate(
+            queryset, request.query_params.get('cursor'), request.query_params.get('limit'), keyset
+        )
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({'results': data, 'next': self.next_cursor})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'results': schema,
+                'next': {'type': 'string', 'nullable': True},
+            },
+        }
@@ -0,0 +1,144 @@
+"""
+Server-side cart pricing shared by the quote endpoint and checkout.
+
+A cart is priced in one pass: one values() query for the cart's products,
+one for its variants (only when the cart has any) and one for the store's
+tax rate. Nothing is written, so the POS can call it on every cart change.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+
+from .models import Store, Product, ProductVariant
+
+CENTS = Decimal('0.01')
+ZERO = Decimal('0')
+# Largest line discount, as a percentage of the line, a cashier may give without a manager
+CASHIER_MAX_DISCOUNT = Decimal(str(getattr(settings, 'POS_CASHIER_MAX_DISCOUNT_PERCENT', 20)))
+
+
+class PricingError(Exception):
+    """Raised when a cart references unknown products, variants or stores"""
+
+
+def money(value):
+    return Decimal(value).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+class PricedLine:
+    __slots__ = ('product_id', 'variant_id', 'name', 'quantity', 'unit_price', 'discount', 'total', 'price_overridden')
+
+    def as_dict(self):
+        return {
+            'product': self.product_id,
+            'variant': self.variant_id,
+            'name': self.name,
+            'quantity': self.quantity,
+            'unit_price': str(self.unit_price),
+            'discount': str(self.discount),
+            'total': str(self.total),
+            'price_overridden': self.price_overridden,
+        }
+
+
+class Quote:
+    """Result of price_cart: priced lines plus cart totals"""
+
+    def __init__(self, lines, store_id, tax_rate):
+        self.lines = lines
+        self.store_id = store_id
+        self.tax_rate = tax_rate
+        self.subtotal = sum((line.total for line in lines), ZERO)
+        self.discount_total = sum((line.discount for line in lines), ZERO)
+        self.tax_amount = money(self.subtotal * tax_rate / 100)
+        self.total = self.subtotal + self.tax_amount
+
+    def as_dict(self):
+        return {
+            'store': self.store_id,
+            'lines': [line.as_dict() for line in self.lines],
+            'item_count': sum(line.quantity for line in self.lines),
+            'subtotal': str(self.subtotal),
+            'discount_total': str(self.discount_total),
+            'tax_rate': str(self.tax_rate),
+            'tax_amount': str(self.tax_amount),
+            'total': str(self.total),
+        }
+
+
+def store_tax_rate(store_id):
+    if not store_id:
+        return ZERO
+    rates = Store.objects.filter(pk=store_id).values_list('tax_rate', flat=True)
+    if not rates:
+        raise PricingError('Unknown store')
+    return rates[0]
+
+
+def price_cart(items, store=None, allow_price_override=False):
+    """
+    Price validated cart lines ({product, variant, quantity, unit_price,
+    discount}) against the catalog and the store's tax rate.
+
+    A line's unit_price overrides catalog price + variant modifier only when
+    allow_price_override is set, which callers reserve for managers;
+    otherwise it is ignored. Discounts are per line, must not be negative
+    and are capped at the line amount. Without allow_price_override a
+    discount above CASHIER_MAX_DISCOUNT percent of the line is refused.
+    Lines with an override, or a discount beyond that limit, are flagged
+    price_overridden.
+    """
+    product_ids = {line['product'] for line in items}
+    variant_ids = {line['variant'] for line in items if line.get('variant')}
+
+    products = {
+        row['id']: row
+        for row in Product.objects.filter(pk__in=product_ids).values('id', 'name', 'price')
+    }
+    missing = product_ids - set(products)
+    if missing:
+        raise PricingError(f'Unknown product(s): {sorted(missing)}')
+
+    variants = {}
+    if variant_ids:
+        variants = {
+            row['id']: row
+            for row in ProductVariant.objects.filter(pk__in=variant_ids).values('id', 'product_id', 'name', 'price_modifier')
+        }
+        missing = variant_ids - set(variants)
+        if missing:
+            raise PricingError(f'Unknown variant(s): {sorted(missing)}')
+
+    store_id = getattr(store, 'pk', store)
+    tax_rate = store.tax_rate if isinstance(store, Store) else store_tax_rate(store_id)
+
+    lines = []
+    for item in items:
+        product = products[item['product']]
+        variant = variants.get(item.get('variant'))
+        if variant is not None and variant['product_id'] != product['id']:
+            raise PricingError(f"Variant {variant['id']} does not belong to product {product['id']}")
+
+        line = PricedLine()
+        line.product_id = product['id']
+        line.variant_id = variant['id'] if variant else None
+        line.name = f"{product['name']} - {variant['name']}" if variant else product['name']
+        line.quantity = item['quantity']
+        override = item.get('unit_price') if allow_price_override else None
+        line.price_overridden = override is not None
+        if override is None:
+            override = product['price'] + (variant['price_modifier'] if variant else ZERO)
+        line.unit_price = money(override)
+        gross = line.unit_price * line.quantity
+        discount = money(item.get('discount') or 0)
+        if discount < ZERO:
+            raise PricingError('Discounts cannot be negative')
+        line.discount = min(discount, gross)
+        if line.discount * 100 > gross * CASHIER_MAX_DISCOUNT:
+            if not allow_price_override:
+                raise PricingError(f'Discounts above {CASHIER_MAX_DISCOUNT}% of a line need a manager')
+            line.price_overridden = True
+        line.total = gross - line.discount
+        lines.append(line)
+
+    return Quote(lines, store_id, tax_rate)
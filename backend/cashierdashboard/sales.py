@@ -0,0 +1,251 @@
+"""
+Incrementally maintained sales counters: CashierDailyStats for the cashier
+dashboard and the DailyStoreSales rollup for manager dashboards.
+
+Every code path that writes Transactions calls record_sales() inside the
+same database transaction, so the counters commit or roll back together
+with the sale. Counters are bumped with F() updates and never re-read, so
+concurrent checkouts cannot lose increments. The rebuild_sales_counters
+management command recomputes them from Transactions if they ever drift.
+"""
+import copy
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import F, Sum, Count, Max
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Transaction, OfflineTransaction, CashierDailyStats, DailyStoreSales, DailyStoreCustomer
+from .caching import invalidate_tags, SALES, SALES_REWRITES
+from .notifications import sales_added
+from . import activity
+
+ZERO = Decimal('0')
+COUNTED_STATUSES = ('completed', 'paid')  # statuses that count as sales on dashboards
+
+
+def sale_day(sale):
+    return timezone.localdate(sale.timestamp) if sale.timestamp else timezone.localdate()
+
+
+def _ensure_cashier_days(keys):
+    """Create missing (cashier, day) rows; new rows carry the cashier's last sync forward"""
+    cashier_ids = {cashier_id for cashier_id, _ in keys}
+    existing = set(CashierDailyStats.objects.filter(
+        cashier_id__in=cashier_ids, day__in={day for _, day in keys}
+    ).values_list('cashier_id', 'day'))
+    missing = [key for key in keys if key not in existing]
+    if not missing:
+        return
+
+    last_sync = {}
+    for cashier_id, synced_at in CashierDailyStats.objects.filter(
+        cashier_id__in={cashier_id for cashier_id, _ in missing}, last_sync__isnull=False
+    ).order_by('cashier_id', 'day').values_list('cashier_id', 'last_sync'):
+        last_sync[cashier_id] = synced_at
+    CashierDailyStats.objects.bulk_create([
+        CashierDailyStats(cashier_id=cashier_id, day=day, last_sync=last_sync.get(cashier_id))
+        for cashier_id, day in missing
+    ], ignore_conflicts=True)
+
+
+def _ensure_store_days(keys):
+    """Create missing (store, day) rollup rows"""
+    existing = set(DailyStoreSales.objects.filter(day__in={day for _, day in keys}).values_list('store_id', 'day'))
+    DailyStoreSales.objects.bulk_create([
+        DailyStoreSales(store_id=store_id, day=day) for store_id, day in keys if (store_id, day) not in existing
+    ], ignore_conflicts=True)
+
+
+def _add(totals, key, amount):
+    total, count = totals.get(key, (ZERO, 0))
+    totals[key] = (total + amount, count + 1)
+
+
+def record_sales(sales, sign=1):
+    """
+    Fold saved Transactions into the per-cashier daily counters and the
+    per-store daily rollup (completed sales only).
+
+    Call inside the transaction that wrote the sales; pass sign=-1 to take
+    deleted sales back out.
+    """
+    cashier_totals, store_totals, buyers = {}, {}, set()
+    # Covers bulk-created sales, which send no post_save; removals also force analytics snapshots to reload
+    invalidate_tags(*((SALES,) if sign > 0 else (SALES, SALES_REWRITES)))
+    for sale in sales:
+        day = sale_day(sale)
+        amount = Decimal(sale.total)
+        if sale.cashier_id:
+            _add(cashier_totals, (sale.cashier_id, day), amount)
+        if sale.status in COUNTED_STATUSES:
+            _add(store_totals, (sale.store_id_id, day), amount)
+            if sale.customer_id:
+                buyers.add((sale.store_id_id, day, sale.customer_id))
+
+    if cashier_totals:
+        _ensure_cashier_days(list(cashier_totals))
+        for (cashier_id, day), (total, count) in cashier_totals.items():
+            CashierDailyStats.objects.filter(cashier_id=cashier_id, day=day).update(
+                sales_total=F('sales_total') + sign * total,
+                transaction_count=F('transaction_count') + sign * count,
+            )
+
+    if store_totals:
+        _ensure_store_days(list(store_totals))
+        for (store_id, day), (total, count) in store_totals.items():
+            DailyStoreSales.objects.filter(store_id=store_id, day=day).update(
+                sales_total=F('sales_total') + sign * total,
+                order_count=F('order_count') + sign * count,
+            )
+        if sign > 0:
+            sales_added({key: total for key, (total, _) in store_totals.items()})
+    # Removed sales leave their customer rows; rebuild_sales_counters trims them
+    if buyers and sign > 0:
+        DailyStoreCustomer.objects.bulk_create([
+            DailyStoreCustomer(store_id=store_id, day=day, customer_id=customer_id)
+            for store_id, day, customer_id in buyers
+        ], ignore_conflicts=True)
+        for store_id, day in {(store_id, day) for store_id, day, _ in buyers}:
+            DailyStoreSales.objects.filter(store_id=store_id, day=day).update(
+                customer_count=DailyStoreCustomer.objects.filter(store_id=store_id, day=day).count()
+            )
+
+
+def _contribution(sale):
+    return (sale.cashier_id, sale.store_id_id, sale.customer_id, sale.status, sale_day(sale), Decimal(sale.total))
+
+
+def revise_sale(before, after):
+    """Move a sale's contribution when an edit changes its total, status, store, cashier or time"""
+    if _contribution(before) != _contribution(after):
+        record_sales([before], sign=-1)
+        record_sales([after])
+
+
+def change_status(sale, new_status):
+    """Save a Transaction status change and move the sale in or out of the rollups"""
+    before = copy.copy(sale)
+    with db_transaction.atomic():
+        sale.status = new_status
+        sale.save(update_fields=['status'])
+        revise_sale(before, sale)
+        activity.set_status(activity.TRANSACTION, sale.pk, new_status)
+
+
+def change_statuses(sales, new_status):
+    """Set-based change_status() for many Transactions: one UPDATE plus grouped rollup moves"""
+    before = list(sales)
+    if not before:
+        return
+    after = [copy.copy(sale) for sale in before]
+    for sale in after:
+        sale.status = new_status
+    moved = [(old, new) for old, new in zip(before, after) if _contribution(old) != _contribution(new)]
+    with db_transaction.atomic():
+        Transaction.objects.filter(pk__in=[sale.pk for sale in before]).update(status=new_status)
+        record_sales([old for old, _ in moved], sign=-1)
+        record_sales([new for _, new in moved])
+        activity.set_statuses(activity.TRANSACTION, [sale.pk for sale in before], new_status)
+
+
+def record_sync(cashier_id, synced_at=None):
+    """Stamp an offline upload on the cashier's counters for today"""
+    if not cashier_id:
+        return
+    synced_at = synced_at or timezone.now()
+    key = (cashier_id, timezone.localdate(synced_at))
+    _ensure_cashier_days([key])
+    CashierDailyStats.objects.filter(cashier_id=cashier_id, day=key[1]).update(last_sync=synced_at)
+
+
+def cashier_stats(cashier, day=None):
+    """Counters for one cashier and day from a single indexed read"""
+    day = day or timezone.localdate()
+    row = CashierDailyStats.objects.filter(cashier=cashier, day__lte=day).order_by('-day').values(
+        'day', 'sales_total', 'transaction_count', 'last_sync'
+    ).first()
+    if row is None:
+        return {'total_sales': ZERO, 'transaction_count': 0, 'last_sync': None}
+    today = row['day'] == day
+    return {
+        'total_sales': row['sales_total'] if today else ZERO,
+        'transaction_count': row['transaction_count'] if today else 0,
+        'last_sync': row['last_sync'],
+    }
+
+
+def rebuild_cashier_stats():
+    """Recompute every CashierDailyStats row from Transactions and OfflineTransactions"""
+    rows = {}
+    for row in Transaction.objects.filter(cashier__isnull=False).annotate(day=TruncDate('timestamp')).values(
+        'cashier_id', 'day'
+    ).annotate(total=Sum('total'), count=Count('id')):
+        rows[(row['cashier_id'], row['day'])] = CashierDailyStats(
+            cashier_id=row['cashier_id'], day=row['day'], sales_total=row['total'], transaction_count=row['count']
+        )
+    for row in OfflineTransaction.objects.filter(cashier__isnull=False).annotate(day=TruncDate('timestamp')).values(
+        'cashier_id', 'day'
+    ).annotate(synced=Max('timestamp')):
+        key = (row['cashier_id'], row['day'])
+        rows.setdefault(key, CashierDailyStats(cashier_id=key[0], day=key[1])).last_sync = row['synced']
+
+    # Carry each cashier's last sync forward onto later days
+    last_sync = {}
+    for key in sorted(rows):
+        stats = rows[key]
+        if stats.last_sync is None:
+            stats.last_sync = last_sync.get(key[0])
+        last_sync[key[0]] = stats.last_sync
+
+    with db_transaction.atomic():
+        CashierDailyStats.objects.all().delete()
+        CashierDailyStats.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
+
+
+def rebuild_store_sales():
+    """Recompute DailyStoreSales and DailyStoreCustomer from completed Transactions"""
+    completed = Transaction.objects.filter(status__in=COUNTED_STATUSES).annotate(day=TruncDate('timestamp'))
+    rows = [
+        DailyStoreSales(store_id=row['store_id'], day=row['day'], sales_total=row['total'],
+                        order_count=row['orders'], customer_count=row['customers'])
+        for row in completed.values('store_id', 'day').annotate(
+            total=Sum('total'), orders=Count('id'), customers=Count('customer', distinct=True)
+        )
+    ]
+    buyers = [
+        DailyStoreCustomer(store_id=row['store_id'], day=row['day'], customer_id=row['customer_id'])
+        for row in completed.filter(customer__isnull=False).values('store_id', 'day', 'customer_id').distinct()
+    ]
+    with db_transaction.atomic():
+        DailyStoreCustomer.objects.all().delete()
+        DailyStoreSales.objects.all().delete()
+        DailyStoreSales.objects.bulk_create(rows, batch_size=1000)
+        DailyStoreCustomer.objects.bulk_create(buyers, batch_size=1000)
+    return len(rows)
+
+
+def store_sales_summary(start, end=None, store=None):
+    """
+    Totals for days start..end (inclusive) from the rollup; cost depends
+    on days x stores, not on how many transactions they hold.
+    """
+    rows = DailyStoreSales.objects.filter(day__gte=start)
+    buyers = DailyStoreCustomer.objects.filter(day__gte=start)
+    if end is not None:
+        rows = rows.filter(day__lte=end)
+        buyers = buyers.filter(day__lte=end)
+    if store not in (None, '', 'all'):
+        rows = rows.filter(store_id=store)
+        buyers = buyers.filter(store_id=store)
+    totals = rows.aggregate(sales=Sum('sales_total'), orders=Sum('order_count'))
+    sales = totals['sales'] or ZERO
+    orders = totals['orders'] or 0
+    return {
+        'sales': sales,
+        'orders': orders,
+        'avg_order_value': sales / orders if orders else ZERO,
+        'customers': buyers.values('customer_id').distinct().count(),
+    }
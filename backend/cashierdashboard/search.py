@@ -0,0 +1,145 @@
+"""
+Full-text product search.
+
+Every Product has a ProductSearchDocument: its name and SKU as the title,
+and its category, subcategory and description as the body. The document is
+rewritten by Product/Category/SubCategory signals (see signals.py), so
+search never joins the catalog tables.
+
+The database indexes the documents (migration 0018). SQLite uses an
+external-content FTS5 table that triggers keep in step with the documents.
+Postgres uses a generated, weighted tsvector column with a GIN index.
+search_backend() picks the backend for the connection. Its search() turns
+user input into one ranked join against that index, and the result
+composes with further queryset filters. Other databases fall back to
+icontains over the document table.
+
+Bulk writes (bulk_create, queryset.update) send no signals; run
+`manage.py rebuild_search_index` after them.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import Product, ProductSearchDocument
+
+FTS_TABLE = 'cashierdashboard_product_fts'
+TITLE_WEIGHT = getattr(settings, 'SEARCH_TITLE_WEIGHT', 10.0)  # bm25 weight of title matches vs body
+MAX_TERMS = 8
+BATCH_SIZE = 2000
+
+_TERM = re.compile(r'\w+')
+
+
+def terms(query):
+    """
+    Lower-cased word tokens of a user query; punctuation and operators are
+    dropped. Backends match the last token as a prefix, since it is usually
+    still being typed.
+    """
+    return _TERM.findall((query or '').lower())[:MAX_TERMS]
+
+
+class SearchBackend:
+    """Restricts a Product queryset to matches for a query, best match first"""
+
+    def search(self, queryset, query):
+        words = terms(query)
+        if not words:
+            return queryset.none()
+        return self._search(queryset, words)
+
+    def _search(self, queryset, words):
+        raise NotImplementedError
+
+
+class ContainsBackend(SearchBackend):
+    """Any database: every word must appear in the title or body"""
+
+    def _search(self, queryset, words):
+        for word in words:
+            queryset = queryset.filter(
+                Q(search_document__title__icontains=word) | Q(search_document__body__icontains=word)
+            )
+        return queryset.order_by('-id')
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """FTS5 match on every word (the last as a prefix), ranked by bm25 with title matches weighted up"""
+
+    def _search(self, queryset, words):
+        products = Product._meta.db_table
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {products}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[' '.join(f'"{word}"' for word in words) + '*'],
+            select={'search_rank': f'bm25({FTS_TABLE}, {float(TITLE_WEIGHT)}, 1.0)'},
+            order_by=['search_rank', '-id'],
+        )
+
+
+class PostgresBackend(SearchBackend):
+    """tsquery match on every word (the last as a prefix) against the GIN-indexed search_vector, ranked by ts_rank"""
+
+    def _search(self, queryset, words):
+        products = Product._meta.db_table
+        documents = ProductSearchDocument._meta.db_table
+        tsquery = ' & '.join(words) + ':*'
+        return queryset.extra(
+            tables=[documents],
+            where=[f'{documents}.product_id = {products}.id',
+                   f"{documents}.search_vector @@ to_tsquery('simple', %s)"],
+            params=[tsquery],
+            select={'search_rank': f"ts_rank({documents}.search_vector, to_tsquery('simple', %s))"},
+            select_params=[tsquery],
+            order_by=['-search_rank', '-id'],
+        )
+
+
+BACKENDS = {'sqlite': SQLiteFTSBackend, 'postgresql': PostgresBackend}
+
+
+def search_backend():
+    return BACKENDS.get(connection.vendor, ContainsBackend)()
+
+
+def search_products(queryset, query):
+    """`queryset` narrowed to products matching `query`, ranked"""
+    return search_backend().search(queryset, query)
+
+
+def _document(row):
+    return ProductSearchDocument(
+        product_id=row['id'],
+        title=f"{row['name']} {row['sku']}"[:255],
+        body=' '.join(filter(None, [row['category__name'], row['subcategory__name'], row['description']])),
+    )
+
+
+def index_products(products):
+    """Rewrite the search documents of `products` (a Product queryset or ids); returns how many"""
+    if not hasattr(products, 'values'):
+        products = Product.objects.filter(pk__in=list(products))
+    rows = products.order_by().values('id', 'name', 'sku', 'description', 'category__name', 'subcategory__name')
+    count = 0
+    batch = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(_document(row))
+        if len(batch) == BATCH_SIZE:
+            count += _write(batch)
+            batch = []
+    return count + _write(batch)
+
+
+def _write(documents):
+    ProductSearchDocument.objects.bulk_create(
+        documents, update_conflicts=True, unique_fields=['product'], update_fields=['title', 'body']
+    )
+    return len(documents)
+
+
+def rebuild_index():
+    """Rewrite every product's document; deleted products take theirs with them (CASCADE)"""
+    return index_products(Product.objects.all())
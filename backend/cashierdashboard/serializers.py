@@ -2,8 +2,9 @@ from rest_framework import serializers
 from .models import (
     Store, Product, ProductVariant, Customer, Transaction, TransactionItem, Return, 
     OfflineTransaction, HardwareDevice, Category, SubCategory, Advertisement,
-    Payment, DeliveryRoute, Delivery, DeliveryUpdate
+    Payment, DeliveryRoute, Delivery, DeliveryUpdate, NumberBlock, StockMovement
 )
+from .numbering import number_prefix, format_number, COUNTER_WIDTH
 from member.models import CustomUser
 
 # Note: UserSerializer moved to member.serializers as CustomUserSerializer
@@ -11,7 +12,7 @@ from member.models import CustomUser
 class StoreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Store
-        fields = ['id', 'name', 'location', 'timezone', 'tax_rate', 'currency', 'status']
+        fields = ['id', 'name', 'location', 'timezone', 'tax_rate', 'currency', 'status', 'daily_sales_target']
 
 class CategorySerializer(serializers.ModelSerializer):
     subcategories = serializers.SerializerMethodField()
@@ -41,6 +42,17 @@ class ProductSerializer(serializers.ModelSerializer):
                  'description', 'price', 'base_price', 'cost_price', 'stock', 'stock_quantity', 'min_stock_level', 
                  'image', 'is_active']
 
+    def update(self, instance, validated_data):
+        # stock only changes through the ledger's F() updates (views pass edits to
+        # inventory.adjust_to_count), so the copy read with the instance is never written back
+        validated_data.pop('stock', None)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[field.name for field in instance._meta.concrete_fields
+                                     if not field.primary_key and field.name != 'stock'])
+        instance.refresh_from_db(fields=['stock'])
+        return instance
+
 class ProductVariantSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductVariant
@@ -60,7 +72,9 @@ class TransactionSerializer(serializers.ModelSerializer):
     items = TransactionItemSerializer(many=True, read_only=True)
     class Meta:
         model = Transaction
-        fields = ['id', 'receipt_number', 'cashier', 'customer', 'subtotal', 'tax_amount', 'total', 'payment_method', 'status', 'timestamp', 'is_offline', 'items']
+        fields = ['id', 'receipt_number', 'cashier', 'customer', 'store_id', 'subtotal', 'tax_amount', 'total', 'payment_method', 'status', 'timestamp', 'is_offline', 'price_overridden_by', 'items']
+        # Only offline ingest may back-date a sale; live sales take the server clock
+        read_only_fields = ['timestamp', 'price_overridden_by']
 
 class ReturnSerializer(serializers.ModelSerializer):
     class Meta:
@@ -70,7 +84,9 @@ class ReturnSerializer(serializers.ModelSerializer):
 class OfflineTransactionSerializer(serializers.ModelSerializer):
     class Meta:
         model = OfflineTransaction
-        fields = ['id', 'device_id', 'transaction_data', 'timestamp', 'sync_status', 'conflict_resolution', 'store', 'cashier']
+        fields = ['id', 'device_id', 'idempotency_key', 'transaction_data', 'timestamp', 'sync_status',
+                  'conflict_resolution', 'store', 'cashier', 'transaction']
+        read_only_fields = ['transaction']
 
 class HardwareDeviceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -131,4 +147,76 @@ class DeliverySerializer(serializers.ModelSerializer):
             'delivery_fee', 'delivery_notes', 'created_at', 'updated_at',
             'assigned_to', 'assigned_to_name', 'updated_by', 'updated_by_name', 'updates'
         ]
-        read_only_fields = ['tracking_number', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['tracking_number', 'created_at', 'updated_at']
+
+class CheckoutItemSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    variant = serializers.IntegerField(required=False, allow_null=True)
+    quantity = serializers.IntegerField(min_value=1)
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    discount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False, default=0)
+
+class CheckoutSerializer(serializers.Serializer):
+    """Whole-cart payload for the single-request POS checkout"""
+    receipt_number = serializers.CharField(max_length=20, required=False)
+    store = serializers.IntegerField(required=False, allow_null=True)
+    customer = serializers.IntegerField(required=False, allow_null=True)
+    payment_method = serializers.ChoiceField(choices=Payment.PAYMENT_METHOD_CHOICES)
+    gateway_response = serializers.JSONField(required=False, default=dict)
+    is_offline = serializers.BooleanField(required=False, default=False)
+    items = CheckoutItemSerializer(many=True, allow_empty=False)
+
+class QuoteSerializer(serializers.Serializer):
+    """Cart to price without writing anything"""
+    store = serializers.IntegerField(required=False, allow_null=True)
+    items = CheckoutItemSerializer(many=True, allow_empty=False)
+
+
+class NumberBlockSerializer(serializers.ModelSerializer):
+    kind = serializers.CharField(source='sequence.kind', read_only=True)
+    prefix = serializers.SerializerMethodField()
+    width = serializers.SerializerMethodField()
+    first = serializers.SerializerMethodField()
+    last = serializers.SerializerMethodField()
+
+    class Meta:
+        model = NumberBlock
+        fields = ['id', 'kind', 'device_id', 'start', 'end', 'prefix', 'width', 'first', 'last', 'reserved_at']
+
+    def get_prefix(self, obj):
+        return number_prefix(obj.sequence.kind, obj.sequence_id)
+
+    def get_width(self, obj):
+        return COUNTER_WIDTH
+
+    def get_first(self, obj):
+        return format_number(obj.sequence.kind, obj.sequence_id, obj.start)
+
+    def get_last(self, obj):
+        return format_number(obj.sequence.kind, obj.sequence_id, obj.end)
+
+class NumberBlockRequestSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=['receipt', 'payment', 'tracking'])
+    device_id = serializers.CharField(max_length=50)
+    size = serializers.IntegerField(min_value=1, default=1000)
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source='product.name', read_only=True)
+
+    class Meta:
+        model = StockMovement
+        fields = ['id', 'product', 'product_name', 'movement_type', 'quantity', 'store', 'reference',
+                  'note', 'created_by', 'created_at']
+        read_only_fields = ['created_by', 'created_at']
+
+class StockAdjustmentSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField()
+    note = serializers.CharField(max_length=255, required=False, default='')
+
+class StockTransferSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+    from_store = serializers.IntegerField()
+    to_store = serializers.IntegerField()
+    note = serializers.CharField(max_length=255, required=False, default='')
@@ -0,0 +1,124 @@
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import (
+    Product, ProductVariant, Category, SubCategory, Store, Customer,
+    Transaction, TransactionItem, Return, Payment
+)
+from .lookup import product_index, LOOKUP_FIELDS, VARIANT_LOOKUP_FIELDS
+from .search import index_products
+from .suggest import suggester
+from .caching import invalidate_tags, CATALOG, INVENTORY, SALES, STORES, CUSTOMERS
+
+# Response cache tags each model's rows feed into
+CACHE_TAGS = {
+    Product: (CATALOG, INVENTORY),
+    ProductVariant: (CATALOG,),
+    Category: (CATALOG,),
+    SubCategory: (CATALOG,),
+    Store: (STORES,),
+    Customer: (CUSTOMERS,),
+    Transaction: (SALES,),
+    TransactionItem: (SALES,),
+    Return: (SALES,),
+    Payment: (SALES,),
+}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def refresh_product_lookup(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Scanner lookups must never see an old price or a deleted code; only this product is re-read"""
+    if not raw and _touches(update_fields, LOOKUP_FIELDS):
+        pk = instance.pk
+        # After commit, so the index never holds rows a rollback undoes
+        db_transaction.on_commit(lambda: product_index.refresh([pk]))
+
+
+@receiver([post_save, post_delete], sender=ProductVariant)
+def refresh_variant_lookup(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and _touches(update_fields, VARIANT_LOOKUP_FIELDS):
+        product_id = instance.product_id
+        db_transaction.on_commit(lambda: product_index.refresh([product_id]))
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_lookup(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Category names are part of lookup records"""
+    if not created and not raw and _touches(update_fields, {'name'}):
+        pk = instance.pk
+        db_transaction.on_commit(lambda: product_index.refresh(
+            Product.objects.filter(category_id=pk).values_list('id', flat=True)))
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_products([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=SubCategory)
+def index_category_products(sender, instance, created=False, raw=False, **kwargs):
+    """Category names are part of product documents"""
+    if not created and not raw:
+        index_products(instance.product_set.all())
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=SubCategory)
+def remember_category_products(sender, instance, **kwargs):
+    # Deleting sets product.category to NULL without signals; note whose documents to rewrite
+    instance._search_product_ids = list(instance.product_set.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=SubCategory)
+def index_orphaned_products(sender, instance, **kwargs):
+    index_products(getattr(instance, '_search_product_ids', []))
+
+
+@receiver(post_delete, sender=Category)
+def refresh_orphaned_lookups(sender, instance, **kwargs):
+    product_ids = getattr(instance, '_search_product_ids', [])
+    db_transaction.on_commit(lambda: product_index.refresh(product_ids))
+
+
+@receiver(post_save, sender=Product)
+def suggest_product(sender, instance, raw=False, **kwargs):
+    if not raw:
+        pk, name, sku, is_active = instance.pk, instance.name, instance.sku, instance.is_active
+        # After commit, so a rolled-back save never reaches the index
+        db_transaction.on_commit(lambda: suggester.product_changed(pk, name, sku, is_active))
+
+
+@receiver(post_delete, sender=Product)
+def unsuggest_product(sender, instance, **kwargs):
+    pk = instance.pk
+    db_transaction.on_commit(lambda: suggester.product_removed(pk))
+
+
+@receiver(post_save, sender=Category)
+def suggest_category(sender, instance, raw=False, **kwargs):
+    if not raw:
+        pk, name = instance.pk, instance.name
+        db_transaction.on_commit(lambda: suggester.category_changed(pk, name))
+
+
+@receiver(post_delete, sender=Category)
+def unsuggest_category(sender, instance, **kwargs):
+    pk = instance.pk
+    db_transaction.on_commit(lambda: suggester.category_removed(pk))
+
+
+def invalidate_response_cache(sender, **kwargs):
+    invalidate_tags(*CACHE_TAGS[sender])
+
+
+for model in CACHE_TAGS:
+    post_save.connect(invalidate_response_cache, sender=model, dispatch_uid=f'response_cache_{model.__name__}')
+    post_delete.connect(invalidate_response_cache, sender=model, dispatch_uid=f'response_cache_{model.__name__}')
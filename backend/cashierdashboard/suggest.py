@@ -0,0 +1,348 @@
+"""
+Per-process autocomplete index for the customer search box.
+
+Suggestions are active product names, product SKUs and category names. Two
+structures answer a keystroke without touching the database:
+
+- A prefix trie over every word-suffix of each text, so "whole milk" is
+  reachable from "whole", "whole mi" and "milk". Each node caches the
+  TOP_K best entries beneath it, so a lookup walks len(prefix) nodes and
+  reads one short list.
+- A trigram index over the vocabulary (trigram -> words) for typo
+  tolerance. When the prefix yields fewer than k results, each word the
+  trie does not know is checked against the MAX_CANDIDATES vocabulary
+  words sharing the most trigrams with it; those within one edit (two for
+  words over four letters; adjacent swaps count once) replace it, and the
+  corrected prefixes fill the rest. The last word may be unfinished, so it
+  is also compared with the same-length start of each candidate.
+
+The index is built on first use; wsgi.py and asgi.py warm it at startup.
+Product/Category signals (signals.py) keep it current incrementally after
+commit: a save re-indexes that one entry and a delete removes it.
+Queryset.update() and bulk_create() skip signals, so each process also
+rebuilds once the index is older than SUGGEST_MAX_AGE seconds.
+"""
+import heapq
+import re
+import threading
+import time
+from collections import Counter
+from operator import itemgetter
+
+from django.conf import settings
+
+from .models import Category, Product
+
+MAX_AGE = getattr(settings, 'SUGGEST_MAX_AGE', 600)
+TOP_K = getattr(settings, 'SUGGEST_TOP_K', 10)
+MAX_CANDIDATES = 200
+MAX_CORRECTIONS = 3
+MIN_CORRECTION_LENGTH = 3
+KIND_ORDER = {'category': 0, 'product': 1, 'sku': 2}
+
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    return ' '.join(_WORD.findall((text or '').lower()))
+
+
+def trigrams(word):
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b):
+    """Optimal string alignment distance: insertions, deletions, substitutions and adjacent swaps cost 1"""
+    before, previous = None, list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, other in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other))
+            if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == other:
+                current[j] = min(current[j], before[j - 2] + 1)
+        before, previous = previous, current
+    return previous[-1]
+
+
+class _Node:
+    __slots__ = ('children', 'here', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.here = None  # set of entries with a key ending at this node, if any
+        self.top = ()     # best TOP_K entries at or below this node, best first
+
+
+class SuggestIndex:
+    """Prefix trie plus vocabulary trigram index over product, SKU and category texts"""
+
+    def __init__(self):
+        self.root = _Node()
+        self.entries = {}       # (kind, id) -> {'kind', 'id', 'text', 'sku', 'keys', 'rank'}
+        self.words = Counter()  # vocabulary word -> number of entries using it
+        self.grams = {}         # trigram -> vocabulary words containing it
+
+    # -- writes
+
+    def add(self, kind, pk, text, sku=None, ranked=True):
+        """Index one entry, replacing any previous version of it; bulk loads pass ranked=False, then rank_all()"""
+        self.remove(kind, pk)
+        key_text = normalize(sku if kind == 'sku' else text)
+        if not key_text:
+            return
+        eid = (kind, pk)
+        words = key_text.split()
+        keys = {' '.join(words[i:]) for i in range(len(words))}
+        self.entries[eid] = {'kind': kind, 'id': pk, 'text': text, 'sku': sku, 'keys': keys,
+                             'rank': (KIND_ORDER[kind], len(text), text.lower(), pk)}
+        for key in keys:
+            self._insert(key, eid, ranked)
+        if kind == 'sku':
+            return  # codes are typed exactly; keep them out of the typo vocabulary
+        for word in set(words):
+            if not self.words[word]:
+                for gram in trigrams(word):
+                    self.grams.setdefault(gram, set()).add(word)
+            self.words[word] += 1
+
+    def remove(self, kind, pk):
+        entry = self.entries.get((kind, pk))
+        if entry is None:
+            return
+        for key in entry['keys']:
+            self._delete(key, (kind, pk))
+        del self.entries[(kind, pk)]
+        if kind == 'sku':
+            return
+        for word in {word for key in entry['keys'] for word in key.split()}:
+            self.words[word] -= 1
+            if not self.words[word]:
+                del self.words[word]
+                for gram in trigrams(word):
+                    self.grams[gram].discard(word)
+                    if not self.grams[gram]:
+                        del self.grams[gram]
+
+    def _rank(self, eid):
+        return self.entries[eid]['rank']
+
+    def _insert(self, key, eid, ranked=True):
+        node = self.root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+            if ranked and eid not in node.top:
+                node.top = tuple(heapq.nsmallest(TOP_K, node.top + (eid,), key=self._rank))
+        if node.here is None:
+            node.here = set()
+        node.here.add(eid)
+
+    def rank_all(self):
+        """Recompute every node's best entries bottom-up, once, after unranked adds"""
+        stack = [(self.root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                candidates = set(node.here or ())
+                for child in node.children.values():
+                    candidates.update(child.top)
+                node.top = tuple(heapq.nsmallest(TOP_K, candidates, key=self._rank))
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+
+    def _delete(self, key, eid):
+        path = [self.root]
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        if path[-1].here:
+            path[-1].here.discard(eid)
+        # Bottom-up: a node's best entries come from its own keys and its children's best
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if not node.here and not node.children:
+                del path[depth - 1].children[key[depth - 1]]
+            elif eid in node.top:
+                candidates = set(node.here or ())
+                for child in node.children.values():
+                    candidates.update(child.top)
+                candidates.discard(eid)  # even if another of its keys, deleted next, still ends here
+                node.top = tuple(heapq.nsmallest(TOP_K, candidates, key=self._rank))
+
+    # -- reads
+
+    def _prefix(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def similar_words(self, word, limit=MAX_CORRECTIONS, partial=False):
+        """Vocabulary words a typo away from `word` (or from its start, if partial), closest and most used first"""
+        if len(word) < MIN_CORRECTION_LENGTH:
+            return []
+        grams = trigrams(word)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.grams.get(gram, ()))
+        allowed = 1 if len(word) <= 4 else 2
+        # Each edit breaks at most three trigrams; an unfinished word also lacks its closing one
+        needed = len(grams) - 3 * allowed - partial
+        scored = []
+        for candidate, count in heapq.nlargest(MAX_CANDIDATES, shared.items(), key=itemgetter(1)):
+            if count < needed:
+                break
+            if partial:
+                distance = min(edit_distance(word, candidate), edit_distance(word, candidate[:len(word)]))
+            elif abs(len(candidate) - len(word)) <= allowed:
+                distance = edit_distance(word, candidate)
+            else:
+                continue
+            if distance <= allowed:
+                scored.append((distance, -self.words[candidate], candidate))
+        return [candidate for _, _, candidate in heapq.nsmallest(limit, scored)]
+
+    def _corrections(self, words):
+        """Prefixes to try with unknown words replaced by their nearest vocabulary words"""
+        options = []
+        for position, word in enumerate(words):
+            last = position == len(words) - 1
+            if word in self.words or (last and self._prefix(word) is not None):
+                options.append([word])
+            else:
+                options.append(self.similar_words(word, partial=last) or [word])
+        prefixes = ['']
+        for choices in options:
+            prefixes = [f'{prefix} {choice}'.strip() for prefix in prefixes for choice in choices][:MAX_CORRECTIONS]
+        return prefixes
+
+    def suggest(self, query, limit=TOP_K):
+        """Up to `limit` suggestions for a partial query, typo-tolerant, best first"""
+        query = normalize(query)
+        if not query:
+            return []
+        limit = min(limit, TOP_K)
+        found, seen = [], set()
+
+        def collect(prefix):
+            node = self._prefix(prefix)
+            for eid in node.top if node else ():
+                entry = self.entries[eid]
+                shown = ('category' if entry['kind'] == 'category' else 'product', entry['id'])
+                if shown not in seen and len(found) < limit:
+                    seen.add(shown)
+                    found.append(entry)
+
+        collect(query)
+        if len(found) < limit:
+            for prefix in self._corrections(query.split()):
+                if prefix != query:
+                    collect(prefix)
+        return [{
+            'type': 'category' if entry['kind'] == 'category' else 'product',
+            'id': entry['id'],
+            'text': entry['text'],
+            'sku': entry['sku'],
+        } for entry in found]
+
+
+def build_index():
+    index = SuggestIndex()
+    for category in Category.objects.values('id', 'name').iterator(chunk_size=2000):
+        index.add('category', category['id'], category['name'], ranked=False)
+    for product in Product.objects.filter(is_active=True).values('id', 'name', 'sku').iterator(chunk_size=2000):
+        index.add('product', product['id'], product['name'], product['sku'], ranked=False)
+        index.add('sku', product['id'], product['name'], product['sku'], ranked=False)
+    index.rank_all()
+    return index
+
+
+class Suggester:
+    """This process's SuggestIndex: built lazily, updated in place by signals, rebuilt after max_age"""
+
+    def __init__(self, max_age=MAX_AGE):
+        self.max_age = max_age
+        self._index = None
+        self._built_at = 0
+        self._pending = None  # changes that arrive while a rebuild runs, replayed onto the new index
+        self._lock = threading.Lock()
+        self._building = threading.Lock()
+
+    def warm(self):
+        self._current()
+
+    def invalidate(self):
+        """Drop the index; the next suggestion rebuilds it"""
+        with self._lock:
+            self._index = None
+
+    def _current(self):
+        index = self._index
+        if index is not None and time.monotonic() - self._built_at < self.max_age:
+            return index
+        # One thread rebuilds; the others keep serving the old index rather than wait
+        if not self._building.acquire(blocking=index is None):
+            return index
+        try:
+            if self._index is not index:
+                return self._index
+            with self._lock:
+                self._pending = []
+            fresh = build_index()
+            with self._lock:
+                for change in self._pending:
+                    change(fresh)
+                self._pending = None
+                self._index, self._built_at = fresh, time.monotonic()
+            return fresh
+        finally:
+            self._building.release()
+
+    def suggest(self, query, limit=TOP_K):
+        index = self._current()
+        with self._lock:
+            return index.suggest(query, limit)
+
+    def _apply(self, change):
+        with self._lock:
+            if self._index is not None:
+                change(self._index)
+            if self._pending is not None:
+                self._pending.append(change)
+
+    def product_changed(self, pk, name, sku, is_active):
+        if not is_active:
+            return self.product_removed(pk)
+
+        def change(index):
+            index.add('product', pk, name, sku)
+            index.add('sku', pk, name, sku)
+        self._apply(change)
+
+    def product_removed(self, pk):
+        def change(index):
+            index.remove('product', pk)
+            index.remove('sku', pk)
+        self._apply(change)
+
+    def category_changed(self, pk, name):
+        self._apply(lambda index: index.add('category', pk, name))
+
+    def category_removed(self, pk):
+        self._apply(lambda index: index.remove('category', pk))
+
+
+suggester = Suggester()
+
+
+def warm_in_background():
+    """Build this process's index off the startup path; called from wsgi.py/asgi.py"""
+    threading.Thread(target=suggester.warm, name='suggest-warm', daemon=True).start()
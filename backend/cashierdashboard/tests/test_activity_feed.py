@@ -0,0 +1,96 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import threading
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from cashierdashboard import activity
+from cashierdashboard.activity import rebuild_activity_feed
+from cashierdashboard.caching import response_cache
+from cashierdashboard.models import Store, Product, Customer, ActivityEvent
+
+@pytest.fixture
+def cashier_client(db):
+    response_cache().clear()
+    user = get_user_model().objects.create_user(username='cashier', password='password', role='CASHIER')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+def feed():
+    return sorted(ActivityEvent.objects.values_list(
+        'kind', 'object_id', 'status', 'amount', 'reference', 'store_name', 'customer_name', 'items_count', 'reason'
+    ))
+
+@pytest.mark.django_db
+def test_widgets_read_the_feed(cashier_client):
+    north = Store.objects.create(name='North', location='A')
+    alice = Customer.objects.create(name='Alice', email='alice@example.com', phone='1')
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('5.00'), stock=100)
+    brush = Product.objects.create(name='Brush', sku='BRUSH', price=Decimal('3.00'), stock=100)
+
+    for _ in range(3):
+        response = cashier_client.post('/api/cashier/transactions/checkout/', {
+            'store': north.id, 'customer': alice.id, 'payment_method': 'cash',
+            'items': [{'product': soap.id, 'quantity': 2}, {'product': brush.id, 'quantity': 1}]
+        }, format='json')
+        assert response.status_code == 201
+    sale_id = response.data['transaction']['id']
+
+    with CaptureQueriesContext(connection) as queries:
+        orders = cashier_client.get('/api/cashier/manager-dashboard/recent_orders/').data
+    assert len(orders) == 3
+    assert orders[0]['store'] == 'North' and orders[0]['customer'] == 'Alice' and orders[0]['items_count'] == 2
+    assert not any('cashierdashboard_transaction' in query['sql'] for query in queries.captured_queries)
+
+    large = cashier_client.post('/api/cashier/transactions/', {
+        'store_id': north.id, 'subtotal': '800.00', 'tax_amount': '0.00', 'total': '800.00',
+        'payment_method': 'card', 'status': 'pending_approval'
+    }, format='json').data
+    refund = cashier_client.post('/api/cashier/returns/', {
+        'original_transaction': sale_id, 'reason': 'Damaged', 'refund_amount': '13.00'
+    }, format='json').data
+
+    approvals = cashier_client.get('/api/cashier/manager-dashboard/pending_approvals/').data
+    assert [(a['type'], a['store']) for a in approvals] == [('Return', 'North'), ('Large Transaction', 'North')]
+    assert approvals[0]['details'] == {'reason': 'Damaged', 'transaction_id': response.data['transaction']['receipt_number']}
+
+    cashier_client.post('/api/cashier/manager-dashboard/approve_request/', {'id': refund['id'], 'type': 'Return'}, format='json')
+    cashier_client.post('/api/cashier/manager-dashboard/reject_request/',
+                        {'id': f"transaction_{large['id']}", 'type': 'Large Transaction'}, format='json')
+    assert cashier_client.get('/api/cashier/manager-dashboard/pending_approvals/').data == []
+
+    # The backfill reproduces the incrementally maintained rows
+    incremental = feed()
+    rebuild_activity_feed()
+    assert feed() == incremental
+
+def test_prune_runs_once_per_interval_across_threads(monkeypatch):
+    pruned = []
+    monkeypatch.setattr(activity, '_writes', 0)
+    monkeypatch.setattr(activity, 'prune', lambda: pruned.append(1))
+
+    def write():
+        for _ in range(activity.PRUNE_EVERY):
+            activity._written(1)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert activity._writes == 8 * activity.PRUNE_EVERY
+    assert len(pruned) == 8
@@ -0,0 +1,70 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from cashierdashboard.models import Transaction
+from cashierdashboard.aggregation import bucketed
+
+def sale(number, when, total='10.00', status='completed'):
+    return Transaction.objects.create(
+        receipt_number=f'R{number}', subtotal=Decimal(total), tax_amount=0, total=Decimal(total),
+        payment_method='cash', status=status, timestamp=timezone.make_aware(when)
+    )
+
+@pytest.mark.django_db
+def test_bucketed_groups_in_one_query_and_fills_gaps(django_assert_num_queries):
+    sale(1, datetime(2025, 3, 3, 9))
+    sale(2, datetime(2025, 3, 3, 17), total='5.00')
+    sale(3, datetime(2025, 3, 5, 12))
+    sale(4, datetime(2025, 4, 1, 8))
+
+    with django_assert_num_queries(1):
+        days = bucketed(Transaction.objects.all(), 'day', date(2025, 3, 2), date(2025, 3, 5))
+    assert [(point['bucket'], point['sales'], point['orders']) for point in days] == [
+        (date(2025, 3, 2), 0, 0),
+        (date(2025, 3, 3), Decimal('15.00'), 2),
+        (date(2025, 3, 4), 0, 0),
+        (date(2025, 3, 5), Decimal('10.00'), 1),
+    ]
+
+    months = bucketed(Transaction.objects.all(), 'month', date(2025, 2, 10), date(2025, 4, 30))
+    assert [(point['bucket'], point['orders']) for point in months] == [
+        (date(2025, 2, 1), 0), (date(2025, 3, 1), 3), (date(2025, 4, 1), 1)
+    ]
+
+    weeks = bucketed(Transaction.objects.all(), 'week', date(2025, 3, 3), date(2025, 3, 16))
+    assert [(point['bucket'], point['orders']) for point in weeks] == [(date(2025, 3, 3), 3), (date(2025, 3, 10), 0)]
+
+    hours = bucketed(Transaction.objects.all(), 'hour', datetime(2025, 3, 3, 8), datetime(2025, 3, 3, 10))
+    assert [point['orders'] for point in hours] == [0, 1, 0]
+
+@pytest.mark.django_db
+def test_weekly_sales_data_uses_last_seven_days():
+    user = get_user_model().objects.create_user(username='manager', password='password', role='MANAGER')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    today = timezone.localtime().replace(hour=12, minute=0, second=0, microsecond=0, tzinfo=None)
+    sale(1, today)
+    sale(2, today - timedelta(days=2), total='4.00')
+    sale(3, today - timedelta(days=2), status='voided')
+
+    data = client.get(reverse('manager-dashboard-sales-data'), {'period': 'weekly'}).data
+
+    assert len(data) == 7
+    assert data[-1]['date'] == today.date().isoformat()
+    assert [point['orders'] for point in data] == [0, 0, 0, 0, 1, 0, 1]
+    assert data[4]['sales'] == 4.0
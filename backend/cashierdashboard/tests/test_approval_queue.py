@@ -0,0 +1,125 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from cashierdashboard.caching import response_cache
+from cashierdashboard.models import Store, Product, Transaction, TransactionItem, Return, StockMovement, DailyStoreSales
+from managerdashboard.models import ApprovalRequest
+
+@pytest.fixture
+def store(db):
+    response_cache().clear()
+    return Store.objects.create(name='North', location='A')
+
+def client_for(username, role, store_id=None):
+    user = get_user_model().objects.create_user(username=username, password='password', role=role, store_id=store_id)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+def large_sale(cashier, store, total='800.00'):
+    response = cashier.post('/api/cashier/transactions/', {
+        'store_id': store.id, 'subtotal': total, 'tax_amount': '0.00', 'total': total,
+        'payment_method': 'card', 'status': 'pending_approval'
+    }, format='json')
+    assert response.status_code == 201
+    return response.data['id']
+
+@pytest.mark.django_db
+def test_queue_pages_with_cursor(store):
+    cashier = client_for('cashier', 'CASHIER')
+    manager = client_for('boss', 'manager', store_id=store.id)
+    ids = [large_sale(cashier, store) for _ in range(5)]
+    large_sale(cashier, store, total='100.00')  # under the threshold, no approval needed
+
+    seen = []
+    url = '/api/manager/approvals/?limit=2'
+    while True:
+        page = manager.get(url).data
+        seen += [row['target_id'] for row in page['results']]
+        assert len(page['results']) <= 2
+        if not page['next']:
+            break
+        url = f"/api/manager/approvals/?limit=2&cursor={page['next']}"
+    assert seen == list(reversed(ids))
+
+    assert manager.get('/api/manager/approvals/?cursor=garbage').status_code == 400
+
+@pytest.mark.django_db
+def test_bulk_approve_applies_side_effects(store):
+    cashier = client_for('cashier', 'CASHIER')
+    manager = client_for('boss', 'manager', store_id=store.id)
+    soap = Product.objects.create(name='Soap', sku='SOAP', stock=5)
+    sale = Transaction.objects.create(
+        receipt_number='R1', store_id=store, subtotal=Decimal('5'), tax_amount=0, total=Decimal('5'),
+        payment_method='cash', status='completed'
+    )
+    TransactionItem.objects.create(transaction=sale, product=soap, quantity=2, unit_price=Decimal('2.5'), total=Decimal('5'))
+    refund = cashier.post('/api/cashier/returns/', {
+        'original_transaction': sale.id, 'reason': 'Damaged', 'refund_amount': '5.00'
+    }, format='json')
+    assert refund.status_code == 201
+    sale_ids = [large_sale(cashier, store) for _ in range(2)]
+
+    queue = manager.get('/api/manager/approvals/').data['results']
+    assert {row['type'] for row in queue} == {'return_approval', 'large_transaction'}
+    assert all(row['store_name'] == 'North' for row in queue)
+
+    request_ids = [row['id'] for row in queue]
+    response = manager.post('/api/manager/approvals/bulk_resolve/', {
+        'ids': request_ids + [999], 'decision': 'approve', 'comment': 'ok'
+    }, format='json')
+    assert response.status_code == 200
+    assert sorted(response.data['resolved']) == sorted(request_ids)
+    assert response.data['skipped'] == [999]
+
+    soap.refresh_from_db()
+    assert soap.stock == 7
+    assert StockMovement.objects.filter(reference=f"return:{refund.data['id']}").count() == 1
+    assert Return.objects.get(pk=refund.data['id']).status == 'approved'
+    assert set(Transaction.objects.filter(pk__in=sale_ids).values_list('status', flat=True)) == {'completed'}
+    assert DailyStoreSales.objects.get(store=store).sales_total == Decimal('1600.00')
+    assert manager.get('/api/manager/approvals/').data['results'] == []
+
+    # Already resolved requests are skipped, nothing is applied twice
+    again = manager.post('/api/manager/approvals/bulk_resolve/', {'ids': request_ids, 'decision': 'approve'}, format='json')
+    assert again.data['resolved'] == []
+    soap.refresh_from_db()
+    assert soap.stock == 7
+
+@pytest.mark.django_db
+def test_bulk_reject_and_store_scope(store):
+    south = Store.objects.create(name='South', location='B')
+    cashier = client_for('cashier', 'CASHIER')
+    north_manager = client_for('boss', 'manager', store_id=store.id)
+    north_sale = large_sale(cashier, store)
+    south_sale = large_sale(cashier, south)
+    south_request = ApprovalRequest.objects.get(target_id=south_sale)
+
+    queue = north_manager.get('/api/manager/approvals/').data['results']
+    assert [row['target_id'] for row in queue] == [north_sale]
+
+    response = north_manager.post('/api/manager/approvals/bulk_resolve/', {
+        'ids': [queue[0]['id'], south_request.id], 'decision': 'reject'
+    }, format='json')
+    assert response.data['resolved'] == [queue[0]['id']]
+    assert response.data['skipped'] == [south_request.id]
+    assert Transaction.objects.get(pk=north_sale).status == 'cancelled'
+    assert Transaction.objects.get(pk=south_sale).status == 'pending_approval'
+
+    resolved = north_manager.get('/api/manager/approvals/?status=rejected').data['results']
+    assert [row['target_id'] for row in resolved] == [north_sale]
+    assert north_manager.post('/api/manager/approvals/bulk_resolve/', {'ids': [1], 'decision': 'maybe'},
+                              format='json').status_code == 400
+    assert client_for('other', 'CASHIER').get('/api/manager/approvals/').status_code == 403
@@ -0,0 +1,107 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from datetime import date, datetime
+
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction as db_transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from managerdashboard import audit
+from managerdashboard.models import AuditLog, AuditArchive
+
+@pytest.fixture
+def manager(db, monkeypatch):
+    # A synchronous buffer: flushes only when full or when asked
+    monkeypatch.setattr(audit, 'buffer', audit.AuditBuffer(size=3, interval=None))
+    return get_user_model().objects.create_user(username='boss', password='password', role='manager')
+
+@pytest.mark.django_db
+def test_entries_are_buffered_and_written_in_batches(manager, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        audit.record(manager, 'stock.adjust', 'product:1')
+        audit.record(manager, 'stock.adjust', 'product:2')
+    assert AuditLog.objects.count() == 0 and len(audit.buffer) == 2
+
+    with CaptureQueriesContext(connection) as queries, django_capture_on_commit_callbacks(execute=True):
+        audit.record(manager, 'user.approve', 'user:7')
+    assert AuditLog.objects.count() == 3 and len(audit.buffer) == 0
+    assert len([query for query in queries.captured_queries if query['sql'].startswith('INSERT')]) == 1
+
+    # Actions that roll back are not audited
+    with django_capture_on_commit_callbacks(execute=True):
+        try:
+            with db_transaction.atomic():
+                audit.record(manager, 'transaction.void', 'transaction:1')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+    assert len(audit.buffer) == 0
+
+@pytest.mark.django_db
+def test_api_actions_are_audited_and_searchable(manager, django_capture_on_commit_callbacks):
+    client = APIClient()
+    client.force_authenticate(user=manager)
+    cashier = get_user_model().objects.create_user(username='cashier', password='password', role='CASHIER')
+    with django_capture_on_commit_callbacks(execute=True):
+        assert client.post(f'/api/manager/users/{cashier.id}/approve_user/').status_code == 200
+        assert client.post(f'/api/manager/users/{cashier.id}/deactivate_user/').status_code == 200
+    audit.buffer.flush()
+
+    page = client.get('/api/manager/audit-log/?limit=1').data
+    assert [row['action_type'] for row in page['results']] == ['user.deactivate']
+    rest = client.get(f"/api/manager/audit-log/?limit=1&cursor={page['next']}").data
+    assert [row['action_type'] for row in rest['results']] == ['user.approve'] and rest['next'] is None
+    filtered = client.get('/api/manager/audit-log/?action_type=user.approve').data['results']
+    assert [row['target'] for row in filtered] == [f'user:{cashier.id}']
+
+@pytest.mark.django_db
+def test_store_managers_only_see_their_stores_trail(manager, django_capture_on_commit_callbacks):
+    users = get_user_model().objects
+    north = users.create_user(username='north', password='password', role='manager', store_id=1)
+    south = users.create_user(username='south', password='password', role='manager', store_id=2)
+    with django_capture_on_commit_callbacks(execute=True):
+        for user in (north, south, manager):
+            audit.record(user, 'stock.adjust', f'by:{user.username}')
+    audit.buffer.flush()
+
+    client = APIClient()
+    client.force_authenticate(user=north)
+    assert [row['target'] for row in client.get('/api/manager/audit-log/').data['results']] == ['by:north']
+    assert client.get(f'/api/manager/audit-log/?user={south.id}').data['results'] == []
+    for bad in ('cursor=nonsense', 'limit=many', 'user=someone'):
+        response = client.get(f'/api/manager/audit-log/?{bad}')
+        assert response.status_code == 400 and 'Invalid' in response.data['error']
+
+    client.force_authenticate(user=manager)
+    assert len(client.get('/api/manager/audit-log/').data['results']) == 3
+
+@pytest.mark.django_db
+def test_compaction_archives_old_months(manager):
+    def at(year, month, day):
+        return timezone.make_aware(datetime(year, month, day, 12))
+    AuditLog.objects.bulk_create([
+        AuditLog(user=manager, action_type='stock.adjust', target='product:1', timestamp=at(2026, 1, 5)),
+        AuditLog(user=manager, action_type='stock.adjust', target='product:2', timestamp=at(2026, 1, 20)),
+        AuditLog(user=manager, action_type='user.approve', target='user:3', timestamp=at(2026, 2, 1)),
+        AuditLog(user=manager, action_type='user.approve', target='user:4', timestamp=at(2026, 9, 1)),
+    ])
+    AuditArchive.objects.create(month=date(2023, 1, 1), user=manager, action_type='old', count=1,
+                                first_at=at(2023, 1, 1), last_at=at(2023, 1, 1), entries=b'')
+
+    moved, dropped = audit.compact(hot_months=3, retention_months=24, today=date(2026, 10, 18))
+    assert (moved, dropped) == (3, 1)
+    assert list(AuditLog.objects.values_list('target', flat=True)) == ['user:4']
+    january = AuditArchive.objects.get(month=date(2026, 1, 1))
+    assert january.count == 2 and january.action_type == 'stock.adjust'
+    assert [entry['target'] for entry in audit.archived_entries(january)] == ['product:1', 'product:2']
+    assert AuditArchive.objects.filter(month=date(2026, 2, 1), action_type='user.approve').exists()
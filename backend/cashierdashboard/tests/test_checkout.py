@@ -0,0 +1,110 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from cashierdashboard.models import Store, Product, Transaction, TransactionItem, Payment
+from managerdashboard import audit
+from managerdashboard.models import AuditLog
+
+@pytest.fixture
+def cashier_client(db):
+    user = get_user_model().objects.create_user(username='cashier', password='password', role='CASHIER')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+@pytest.fixture
+def store(db):
+    return Store.objects.create(name='Main', location='Town', tax_rate=Decimal('10.00'))
+
+@pytest.mark.django_db
+def test_checkout_writes_whole_sale(cashier_client, store):
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('2.50'), stock=10)
+    milk = Product.objects.create(name='Milk', sku='MILK', price=Decimal('1.20'), stock=5)
+
+    response = cashier_client.post(reverse('transaction-checkout'), {
+        'store': store.id,
+        'payment_method': 'cash',
+        'items': [
+            {'product': soap.id, 'quantity': 2},
+            {'product': milk.id, 'quantity': 1, 'discount': '0.20'},
+            {'product': soap.id, 'quantity': 1},
+        ]
+    }, format='json')
+
+    assert response.status_code == 201
+    sale = Transaction.objects.get()
+    assert sale.subtotal == Decimal('8.50')
+    assert sale.tax_amount == Decimal('0.85')
+    assert sale.total == Decimal('9.35')
+    assert sale.store_id == store
+    assert TransactionItem.objects.filter(transaction=sale).count() == 3
+    assert Payment.objects.get(transaction=sale).amount == Decimal('9.35')
+
+    soap.refresh_from_db()
+    milk.refresh_from_db()
+    assert soap.stock == 7
+    assert milk.stock == 4
+
+@pytest.mark.django_db
+def test_checkout_with_unknown_product_writes_nothing(cashier_client):
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('2.50'), stock=10)
+
+    response = cashier_client.post(reverse('transaction-checkout'), {
+        'payment_method': 'cash',
+        'items': [
+            {'product': soap.id, 'quantity': 1},
+            {'product': soap.id + 100, 'quantity': 1},
+        ]
+    }, format='json')
+
+    assert response.status_code == 400
+    assert not Transaction.objects.exists()
+    soap.refresh_from_db()
+    assert soap.stock == 10
+
+@pytest.mark.django_db
+def test_only_managers_override_prices(cashier_client, store, django_capture_on_commit_callbacks, monkeypatch):
+    monkeypatch.setattr(audit, 'buffer', audit.AuditBuffer(size=100, interval=None))
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('2.50'), stock=10)
+    cart = {'store': store.id, 'payment_method': 'cash', 'items': [{'product': soap.id, 'quantity': 2, 'unit_price': '0.01'}]}
+
+    # A cashier's unit price is ignored in the quote and at checkout
+    quote = cashier_client.post(reverse('transaction-quote'), cart, format='json').data
+    assert quote['lines'][0]['unit_price'] == '2.50' and not quote['lines'][0]['price_overridden']
+    assert cashier_client.post(reverse('transaction-checkout'), cart, format='json').status_code == 201
+    sale = Transaction.objects.get()
+    assert sale.subtotal == Decimal('5.00') and sale.price_overridden_by is None
+
+    manager = get_user_model().objects.create_user(username='boss', password='password', role='manager')
+    client = APIClient()
+    client.force_authenticate(user=manager)
+    quote = client.post(reverse('transaction-quote'), cart, format='json').data
+    assert quote['lines'][0]['unit_price'] == '0.01' and quote['lines'][0]['price_overridden']
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(reverse('transaction-checkout'), cart, format='json')
+    assert response.status_code == 201
+    assert response.data['transaction']['price_overridden_by'] == manager.id
+    sale = Transaction.objects.get(pk=response.data['transaction']['id'])
+    assert sale.subtotal == Decimal('0.02') and sale.price_overridden_by == manager
+    audit.buffer.flush()
+    assert AuditLog.objects.filter(user=manager, action_type='transaction.price_override').count() == 1
+
+    # A discount beyond the cashier limit is a manager override too
+    discounted = dict(cart, items=[{'product': soap.id, 'quantity': 2, 'discount': '2.50'}])
+    assert cashier_client.post(reverse('transaction-checkout'), discounted, format='json').status_code == 400
+    response = client.post(reverse('transaction-checkout'), discounted, format='json')
+    assert response.data['transaction']['price_overridden_by'] == manager.id
+    assert Decimal(response.data['transaction']['subtotal']) == Decimal('2.50')
@@ -0,0 +1,131 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.utils import timezone
+from cashierdashboard.aggregation import bucketed
+from cashierdashboard import analytics
+from cashierdashboard.analytics import AnalyticsEngine, Snapshot, database
+from cashierdashboard.caching import response_cache
+from cashierdashboard.models import Store, Product, Transaction, TransactionItem
+from cashierdashboard.sales import record_sales, change_status
+
+def _sale(number, store, product, quantity, days_ago, status='completed'):
+    sale = Transaction.objects.create(
+        receipt_number=f'A{number}', store_id=store, subtotal=Decimal(quantity * 5), tax_amount=0,
+        total=Decimal(quantity * 5), payment_method='cash', status=status,
+        timestamp=timezone.now() - timedelta(days=days_ago)
+    )
+    TransactionItem.objects.create(transaction=sale, product=product, quantity=quantity,
+                                   unit_price=Decimal('5'), total=Decimal(quantity * 5))
+    record_sales([sale])
+    return sale
+
+@pytest.fixture
+def seeded(db):
+    response_cache().clear()
+    north = Store.objects.create(name='North', location='A')
+    south = Store.objects.create(name='South', location='B')
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('5.00'), stock=100)
+    milk = Product.objects.create(name='Milk', sku='MILK', price=Decimal('5.00'), stock=100)
+    for n in range(20):
+        _sale(n, north if n % 3 else south, soap if n % 2 else milk, n % 4 + 1, n * 2,
+              status='pending' if n % 5 == 0 else 'completed')
+    return north, south, soap, milk
+
+def test_snapshot_matches_the_database(seeded):
+    north, south, soap, milk = seeded
+    snapshot = AnalyticsEngine().snapshot()
+    today = timezone.localdate()
+    completed = Transaction.objects.filter(status='completed')
+
+    for granularity, start in (('day', today - timedelta(days=13)), ('week', today - timedelta(days=40))):
+        expected = bucketed(completed.filter(store_id=north), granularity, start, today)
+        got = snapshot.series(granularity, start, today, north.id, ['completed'])
+        assert [(p['bucket'], float(p['sales']), p['orders']) for p in expected] == \
+            [(p['bucket'], p['sales'], p['orders']) for p in got]
+
+    start = today - timedelta(days=30)
+    expected = completed.filter(timestamp__date__gte=start).values('store_id').annotate(total=Sum('total'))
+    assert sorted(snapshot.by_store(start, statuses=['completed'])) == \
+        sorted((row['store_id'], float(row['total'])) for row in expected)
+
+    expected = TransactionItem.objects.filter(transaction__timestamp__date__gte=start).values('product_id').annotate(
+        revenue=Sum('total'), sold=Sum('quantity')).order_by('-revenue')
+    assert [(row['product_id'], row['total_sold'], row['revenue']) for row in snapshot.top_products(start)] == \
+        [(row['product_id'], row['sold'], float(row['revenue'])) for row in expected]
+
+def test_new_sales_append_and_rewrites_reload(seeded, monkeypatch):
+    north, south, soap, milk = seeded
+    engine = AnalyticsEngine()
+    first = engine.snapshot()
+    assert engine.snapshot() is first  # nothing changed, nothing queried
+
+    loads = []
+    monkeypatch.setattr(engine, 'load', lambda: loads.append(1) or AnalyticsEngine.load(engine))
+    sale = _sale(99, north, soap, 10, 0)
+    second = engine.snapshot()
+    assert not loads and len(second.sales['id']) == len(first.sales['id']) + 1
+    assert second.top_products(timezone.localdate())[0] == {'product_id': soap.id, 'total_sold': 10, 'revenue': 50.0}
+
+    change_status(sale, 'voided')
+    third = engine.snapshot()
+    assert loads == [1]
+    assert third.series('day', timezone.localdate(), timezone.localdate(), statuses=['completed'])[0]['sales'] == 0
+
+def test_dashboard_widgets_read_the_snapshot(seeded):
+    north, south, soap, milk = seeded
+    manager = get_user_model().objects.create_user(username='boss', password='password', role='manager',
+                                                   store_id=north.id)
+    client = APIClient()
+    client.force_authenticate(user=manager)
+    data = client.get('/api/manager/dashboard/sales_analytics/', {'period': 'month'}).data
+    expected = Transaction.objects.filter(store_id=north, timestamp__gte=timezone.now() - timedelta(days=30))
+    assert data['total_orders'] == expected.count()
+    assert data['total_revenue'] == float(expected.aggregate(total=Sum('total'))['total'])
+    assert {row['product__name'] for row in data['top_products']} == {'Soap', 'Milk'}
+
+    performance = client.get('/api/cashier/manager-dashboard/store_performance/').data
+    assert [row['name'] for row in performance] == ['North', 'South']
+    weekly = client.get('/api/cashier/manager-dashboard/sales_data/', {'store': south.id}).data
+    assert len(weekly) == 7 and sum(day['orders'] for day in weekly) == Transaction.objects.filter(
+        store_id=south, status='completed', timestamp__date__gte=timezone.localdate() - timedelta(days=6)).count()
+
+def test_periods_before_the_window_come_from_the_database(seeded):
+    north, south, soap, milk = seeded
+    snapshot = AnalyticsEngine(window_days=10).snapshot()
+    today = timezone.localdate()
+    start = today - timedelta(days=30)
+    assert snapshot.covers(today - timedelta(days=5)) and not snapshot.covers(start)
+
+    assert database.series('day', start, today, north.id, ['completed']) == \
+        AnalyticsEngine().snapshot().series('day', start, today, north.id, ['completed'])
+    assert sorted(database.by_store(start, statuses=['completed'])) == \
+        sorted(AnalyticsEngine().snapshot().by_store(start, statuses=['completed']))
+    assert database.top_products(start, store=north.id) == AnalyticsEngine().snapshot().top_products(start, store=north.id)
+
+def test_late_commits_behind_the_overlap_appear_after_a_full_reload(seeded, monkeypatch):
+    north, south, soap, milk = seeded
+    engine = AnalyticsEngine()
+    first = engine.snapshot()
+    late = _sale(98, north, soap, 1, 0)
+    monkeypatch.setattr(analytics, 'ID_OVERLAP', 0)
+    monkeypatch.setattr(Snapshot, 'high_water', property(lambda self: (late.id, late.transactionitem_set.get().id)))
+    assert late.id not in engine.snapshot().sales['id']  # below the mark, skipped by the append
+
+    engine.reload_seconds = 0
+    assert late.id in engine.snapshot().sales['id']
+    assert len(first.sales['id']) + 1 == len(engine.snapshot().sales['id'])
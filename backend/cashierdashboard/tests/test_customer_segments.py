@@ -0,0 +1,97 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from cashierdashboard.caching import response_cache
+from cashierdashboard.models import Customer, Transaction, CustomerSegment
+from cashierdashboard.segmentation import quintile_scores, rfm_scores, name_segments, run_segmentation
+
+def test_quintile_scores_keep_ties_together():
+    assert quintile_scores(np.arange(1, 11)).tolist() == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+    # Most customers bought once: they all share the bottom frequency score
+    assert quintile_scores([1] * 8 + [2, 9]).tolist() == [1] * 8 + [5, 5]
+
+    recency, frequency, monetary = rfm_scores(days_since=[1, 300, 2, 400], orders=[9, 8, 1, 1], spend=[900, 800, 5, 5],
+                                              bins=2)
+    assert (recency.tolist(), frequency.tolist(), monetary.tolist()) == ([2, 1, 2, 1], [2, 2, 1, 1], [2, 2, 1, 1])
+    assert name_segments(np.array([5, 3, 5, 4, 1, 1]), np.array([5, 5, 1, 3, 4, 1]),
+                         np.array([5, 1, 1, 1, 4, 1])).tolist() == \
+        ['champions', 'loyal', 'new', 'promising', 'at_risk', 'hibernating']
+
+def _buy(customer, days_ago, total, n, status='completed'):
+    Transaction.objects.create(
+        receipt_number=f'{customer.pk}-{n}', customer=customer, subtotal=Decimal(total), tax_amount=0,
+        total=Decimal(total), payment_method='cash', status=status,
+        timestamp=timezone.now() - timedelta(days=days_ago)
+    )
+
+@pytest.mark.django_db
+def test_run_segmentation_persists_and_serves_segments():
+    response_cache().clear()
+    customers = [Customer.objects.create(name=f'C{i}', phone=f'07{i}', email=f'c{i}@example.com') for i in range(10)]
+    for i, customer in enumerate(customers[:8]):
+        # Lower index: more recent, more frequent, bigger spender
+        for n in range(8 - i):
+            _buy(customer, days_ago=i * 30 + n, total=100 - i * 10, n=n)
+    _buy(customers[8], days_ago=1, total=500, n=0, status='voided')     # not counted
+    _buy(customers[9], days_ago=900, total=500, n=0)                    # outside the window
+
+    counts = run_segmentation(history_days=730)
+    assert sum(counts.values()) == 8
+    best, worst = CustomerSegment.objects.get(customer=customers[0]), CustomerSegment.objects.get(customer=customers[7])
+    assert (best.recency, best.frequency, best.monetary, best.segment) == (5, 5, 5, 'champions')
+    assert (worst.recency, worst.frequency, worst.monetary, worst.segment) == (1, 1, 1, 'hibernating')
+    assert best.orders == 8 and best.spend == Decimal('800')
+
+    # A customer who stops buying drops out on the next run
+    Transaction.objects.filter(customer=customers[7]).update(status='voided')
+    run_segmentation(history_days=730)
+    assert not CustomerSegment.objects.filter(customer=customers[7]).exists()
+
+    manager = get_user_model().objects.create_user(username='boss', password='password', role='manager')
+    client = APIClient()
+    client.force_authenticate(user=manager)
+    summary = client.get('/api/manager/customer-segments/').data
+    assert sum(row['customers'] for row in summary) == 7
+    page = client.get('/api/manager/customer-segments/champions/', {'limit': 1}).data
+    assert page['results'][0]['id'] == customers[0].pk and page['results'][0]['rfm'] == '555'
+    assert client.get('/api/manager/customer-segments/nonsense/').status_code == 404
+
+    shopper = get_user_model().objects.create_user(username='c0', email='c0@example.com', password='password',
+                                                   role='customer')
+    client.force_authenticate(user=shopper)
+    assert client.get('/api/customer/profile/segment/').data['segment'] == 'champions'
+    lapsed = get_user_model().objects.create_user(username='c9', email='c9@example.com', password='password',
+                                                  role='customer')
+    client.force_authenticate(user=lapsed)
+    assert client.get('/api/customer/profile/segment/').data['segment'] == 'inactive'
+
+@pytest.mark.django_db
+def test_cached_segment_summary_stays_manager_only():
+    response_cache().clear()
+    manager = get_user_model().objects.create_user(username='boss', password='password', role='manager')
+    cashier = get_user_model().objects.create_user(username='till', password='password', role='CASHIER')
+    client = APIClient()
+    client.force_authenticate(user=cashier)
+    assert client.get('/api/manager/customer-segments/').status_code == 403
+    client.force_authenticate(user=manager)
+    assert client.get('/api/manager/customer-segments/').status_code == 200
+    # The cached summary must not reach the cashier
+    client.force_authenticate(user=cashier)
+    response = client.get('/api/manager/customer-segments/')
+    assert response.status_code == 403 and 'X-Cache' not in response
+    assert client.get('/api/manager/customer-segments/champions/').status_code == 403
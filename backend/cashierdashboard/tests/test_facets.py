@@ -0,0 +1,69 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from cashierdashboard.caching import response_cache
+from cashierdashboard.facets import facet_counts
+from cashierdashboard.models import Category, SubCategory, Product
+
+@pytest.fixture
+def catalog(db):
+    response_cache().clear()
+    dairy = Category.objects.create(name='Dairy')
+    cheese = SubCategory.objects.create(name='Cheese', category=dairy)
+    bakery = Category.objects.create(name='Bakery')
+    for name, category, subcategory, price, stock in [
+        ('Whole Milk', dairy, None, '2.00', 5),
+        ('Cheddar', dairy, cheese, '5.00', 0),
+        ('Brie', dairy, cheese, '12.50', 3),
+        ('Sourdough', bakery, None, '4.99', 2),
+        ('Wedding Cake', bakery, None, '250.00', 1),
+        ('Mystery Box', None, None, '9.99', 0),
+    ]:
+        Product.objects.create(name=name, sku=name.upper(), category=category, subcategory=subcategory,
+                               price=Decimal(price), stock=stock)
+    Product.objects.create(name='Old Milk', sku='OLD', category=dairy, is_active=False)
+    return dairy, cheese, bakery
+
+def test_facet_counts_fold_one_grouped_query(catalog):
+    dairy, cheese, bakery = catalog
+    with CaptureQueriesContext(connection) as queries:
+        facets = facet_counts(Product.objects.filter(is_active=True))
+    assert len(queries.captured_queries) == 3  # the grouped pass, then names for the ids it found
+    assert 'GROUP BY' in queries.captured_queries[0]['sql']
+    assert facets['total'] == 6 and facets['in_stock'] == 4
+    assert facets['categories'] == [
+        {'id': dairy.id, 'name': 'Dairy', 'count': 3}, {'id': bakery.id, 'name': 'Bakery', 'count': 2},
+    ]
+    assert facets['subcategories'] == [{'id': cheese.id, 'name': 'Cheese', 'count': 2}]
+    assert [(bucket['min'], bucket['max'], bucket['count']) for bucket in facets['price']] == [
+        (0, 5, 2), (5, 10, 2), (10, 20, 1), (20, 50, 0), (50, 100, 0), (100, None, 1),
+    ]
+
+def test_product_listing_returns_facets_for_its_filters(catalog):
+    dairy, cheese, bakery = catalog
+    client = APIClient()
+    assert 'facets' not in client.get('/api/customer/products/').data
+
+    with CaptureQueriesContext(connection) as queries:
+        data = client.get('/api/customer/products/', {'facets': 'true', 'category': dairy.id, 'in_stock': 'true'}).data
+    assert len(queries.captured_queries) == 4
+    assert [row['name'] for row in data['results']] == ['Brie', 'Whole Milk']
+    assert data['facets']['total'] == 2 and data['facets']['in_stock'] == 2
+    assert data['facets']['categories'] == [{'id': dairy.id, 'name': 'Dairy', 'count': 2}]
+
+    data = client.get('/api/customer/products/', {'facets': 'true', 'search': 'milk'}).data
+    assert [row['name'] for row in data['results']] == ['Whole Milk']
+    assert data['facets']['total'] == 1 and data['facets']['price'][0]['count'] == 1
@@ -0,0 +1,72 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from cashierdashboard.caching import response_cache
+from cashierdashboard.forecasting import smooth, reorder_policy, daily_units, run_forecast
+from cashierdashboard.models import Product, Transaction, TransactionItem, ReorderSuggestion
+
+def test_smoothing_is_vectorized_per_row():
+    demand = np.array([
+        [4.0] * 60,                       # steady
+        [0.0] * 30 + [10.0] * 30,         # demand picked up
+        [0.0, 8.0] * 30,                  # lumpy
+    ])
+    level, mad = smooth(demand, alpha=0.2)
+    assert level[0] == pytest.approx(4.0) and mad[0] == pytest.approx(0.0)
+    assert level[1] == pytest.approx(10.0, abs=0.05)
+    assert level[2] == pytest.approx(4.0, abs=1.0) and mad[2] > 3
+
+    points, quantities = reorder_policy(level, mad, lead_time=7, z=1.65, cover_days=14)
+    assert points[0] == 28 and quantities[0] == 56
+    assert points[2] > 7 * level[2]  # lumpy demand carries safety stock
+
+@pytest.mark.django_db
+def test_run_forecast_writes_suggestions_and_tunes_min_stock():
+    response_cache().clear()
+    today = timezone.localdate()
+    soap = Product.objects.create(name='Soap', sku='SOAP', stock=10, min_stock_level=0)
+    idle = Product.objects.create(name='Idle', sku='IDLE', stock=10, min_stock_level=5)
+    for days_ago in range(1, 31):
+        moment = timezone.make_aware(datetime.combine(today - timedelta(days=days_ago), datetime.min.time())) + timedelta(hours=12)
+        sale = Transaction.objects.create(
+            receipt_number=f'F{days_ago}', subtotal=Decimal('9'), tax_amount=0, total=Decimal('9'),
+            payment_method='cash', status='completed', timestamp=moment
+        )
+        TransactionItem.objects.create(transaction=sale, product=soap, quantity=3, unit_price=Decimal('3'), total=Decimal('9'))
+    Transaction.objects.create(receipt_number='VOID', subtotal=0, tax_amount=0, total=0, payment_method='cash',
+                               status='voided', timestamp=timezone.now() - timedelta(days=2)).transactionitem_set.create(
+        product=soap, quantity=100, unit_price=0, total=0)
+
+    demand = daily_units([soap.id, idle.id], today - timedelta(days=30), 30)
+    assert demand.shape == (2, 30) and demand[0].sum() == 90 and demand[1].sum() == 0
+
+    assert run_forecast(history_days=30, apply=True, today=today) == (2, 2)
+    suggestion = ReorderSuggestion.objects.get(product=soap)
+    assert suggestion.daily_demand == pytest.approx(3.0)
+    assert (suggestion.reorder_point, suggestion.reorder_quantity) == (21, 42)
+    soap.refresh_from_db()
+    idle.refresh_from_db()
+    assert (soap.min_stock_level, idle.min_stock_level) == (21, 0)
+
+    manager = get_user_model().objects.create_user(username='boss', password='password', role='manager')
+    client = APIClient()
+    client.force_authenticate(user=manager)
+    rows = client.get('/api/manager/products/reorder/').data
+    assert [(row['sku'], row['reorder_quantity']) for row in rows] == [('SOAP', 42)]
+    alerts = client.get('/api/cashier/manager-dashboard/inventory_alerts/').data
+    assert {alert['sku']: alert['reorder'] for alert in alerts}['SOAP'] == 42
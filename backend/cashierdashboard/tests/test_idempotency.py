@@ -0,0 +1,109 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import json
+from datetime import timedelta
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from cashierdashboard.models import Store, Product, Transaction, IdempotencyRecord
+from cashierdashboard.middleware import store
+
+@pytest.fixture
+def cashier_client(db):
+    store.clear_local()
+    user = get_user_model().objects.create_user(username='cashier', password='password', role='CASHIER')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+SALE = {'subtotal': '10.00', 'tax_amount': '0.00', 'total': '10.00', 'payment_method': 'cash', 'status': 'completed'}
+
+@pytest.mark.django_db
+def test_retried_post_replays_first_response(cashier_client):
+    url = reverse('transaction-list')
+
+    first = cashier_client.post(url, SALE, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+    retry = cashier_client.post(url, SALE, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+
+    assert first.status_code == 201
+    assert retry.status_code == 201
+    assert retry['Idempotent-Replayed'] == 'true'
+    assert retry.content == first.content
+    assert Transaction.objects.count() == 1
+
+    # Same key with a different body is rejected instead of replayed
+    changed = cashier_client.post(url, dict(SALE, total='12.00'), format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+    assert changed.status_code == 422
+
+    # A new key is a new sale
+    cashier_client.post(url, SALE, format='json', HTTP_IDEMPOTENCY_KEY='retry-2')
+    assert Transaction.objects.count() == 2
+
+@pytest.mark.django_db
+def test_expired_keys_are_evicted(cashier_client):
+    url = reverse('transaction-list')
+    cashier_client.post(url, SALE, format='json', HTTP_IDEMPOTENCY_KEY='old')
+    IdempotencyRecord.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    store.clear_local()
+
+    again = cashier_client.post(url, SALE, format='json', HTTP_IDEMPOTENCY_KEY='old')
+
+    assert again.status_code == 201
+    assert not again.has_header('Idempotent-Replayed')
+    assert Transaction.objects.count() == 2
+    assert IdempotencyRecord.objects.count() == 1
+
+def bearer(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+@pytest.mark.django_db
+def test_keys_are_scoped_to_the_token_user_not_the_header(cashier_client):
+    url = reverse('transaction-list')
+    first, second = (get_user_model().objects.create_user(username=name, password='password', role='CASHIER')
+                     for name in ('till-1', 'till-2'))
+
+    assert bearer(first).post(url, SALE, format='json', HTTP_IDEMPOTENCY_KEY='shared').status_code == 201
+    assert bearer(second).post(url, SALE, format='json', HTTP_IDEMPOTENCY_KEY='shared').status_code == 201
+    assert Transaction.objects.count() == 2
+
+    # A refreshed token is the same user, so the retry replays
+    retry = bearer(first).post(url, SALE, format='json', HTTP_IDEMPOTENCY_KEY='shared')
+    assert retry['Idempotent-Replayed'] == 'true'
+    assert Transaction.objects.count() == 2
+
+    # Credentials that do not validate are left to the view
+    invalid = APIClient()
+    invalid.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+    assert invalid.post(url, SALE, format='json', HTTP_IDEMPOTENCY_KEY='shared').status_code == 401
+
+@pytest.mark.django_db
+def test_streamed_ingest_is_hashed_without_buffering(cashier_client, settings):
+    settings.DATA_UPLOAD_MAX_MEMORY_SIZE = 64
+    store_row = Store.objects.create(name='Main', location='Town')
+    soap = Product.objects.create(name='Soap', sku='SOAP', price='2.00', stock=10)
+    lines = [json.dumps({'idempotency_key': f'k{i}', 'items': [{'product': soap.id, 'quantity': 1}]}) for i in range(3)]
+    url = reverse('offlinetransaction-ingest') + f'?store={store_row.id}&device_id=POS-1'
+
+    def upload(body):
+        return cashier_client.post(url, body, content_type='application/x-ndjson', HTTP_IDEMPOTENCY_KEY='upload-1')
+
+    first = upload('\n'.join(lines))
+    assert first.status_code == 200 and first.data['summary']['created'] == 3
+    retry = upload('\n'.join(lines))
+    assert retry['Idempotent-Replayed'] == 'true' and retry.content == first.content
+    assert upload('\n'.join(lines[:2])).status_code == 422
+    assert Transaction.objects.count() == 3
@@ -0,0 +1,91 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from cashierdashboard.models import Category, Product, ProductVariant
+from cashierdashboard.lookup import product_index
+
+@pytest.fixture
+def client(db):
+    product_index.invalidate()
+    return APIClient()
+
+@pytest.mark.django_db
+def test_lookup_by_barcode_sku_and_variant(client):
+    drinks = Category.objects.create(name='Drinks')
+    cola = Product.objects.create(name='Cola', sku='COLA', barcode='5000112', price=Decimal('1.20'), category=drinks)
+    ProductVariant.objects.create(product=cola, name='Zero', sku='COLA-Z', price_modifier=Decimal('0.10'))
+    url = reverse('product-lookup')
+
+    by_barcode = client.get(url, {'code': '5000112'})
+    assert by_barcode.status_code == 200
+    assert by_barcode.data['id'] == cola.id
+    assert by_barcode.data['price'] == '1.20'
+    assert by_barcode.data['category_name'] == 'Drinks'
+
+    batch = client.post(url, {'codes': ['COLA', 'COLA-Z', 'nope']}, format='json')
+    assert batch.data['results']['COLA-Z']['price'] == '1.30'
+    assert batch.data['results']['COLA-Z']['name'] == 'Cola - Zero'
+    assert batch.data['missing'] == ['nope']
+
+    assert client.get(url, {'code': 'nope'}).status_code == 404
+
+@pytest.mark.django_db
+def test_saving_a_product_invalidates_the_index(client, django_capture_on_commit_callbacks):
+    cola = Product.objects.create(name='Cola', sku='COLA', barcode='5000112', price=Decimal('1.20'))
+    url = reverse('product-lookup')
+    assert client.get(url, {'code': '5000112'}).data['price'] == '1.20'
+
+    cola.price = Decimal('1.50')
+    cola.barcode = '5000113'
+    with django_capture_on_commit_callbacks(execute=True):
+        cola.save()
+
+    assert client.get(url, {'code': '5000113'}).data['price'] == '1.50'
+    assert client.get(url, {'code': '5000112'}).status_code == 404
+
+@pytest.mark.django_db
+def test_changes_refresh_only_the_products_they_touch(client, django_capture_on_commit_callbacks, monkeypatch):
+    drinks = Category.objects.create(name='Drinks')
+    cola = Product.objects.create(name='Cola', sku='COLA', price=Decimal('1.20'), category=drinks)
+    zero = ProductVariant.objects.create(product=cola, name='Zero', sku='COLA-Z', price_modifier=Decimal('0.10'))
+    tea = Product.objects.create(name='Tea', sku='TEA', price=Decimal('2.00'))
+    tea_id = tea.id
+    url = reverse('product-lookup')
+    assert client.get(url, {'code': 'TEA'}).status_code == 200
+
+    builds, refreshed = [], []
+    monkeypatch.setattr(product_index, '_build', lambda: builds.append(1))
+    refresh = product_index.refresh
+    monkeypatch.setattr(product_index, 'refresh', lambda ids: refreshed.append(set(ids)) or refresh(ids))
+    with django_capture_on_commit_callbacks(execute=True):
+        cola.stock = 5
+        cola.save(update_fields=['stock'])
+    assert refreshed == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        zero.price_modifier = Decimal('0.30')
+        zero.save()
+        drinks.name = 'Soft drinks'
+        drinks.save()
+        tea.delete()
+    assert client.get(url, {'code': 'COLA-Z'}).data['price'] == '1.50'
+    assert client.get(url, {'code': 'COLA'}).data['category_name'] == 'Soft drinks'
+    assert client.get(url, {'code': 'TEA'}).status_code == 404
+    assert refreshed == [{cola.id}, {cola.id}, {tea_id}]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        zero.delete()
+    assert client.get(url, {'code': 'COLA-Z'}).status_code == 404
+    assert builds == []
@@ -0,0 +1,75 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from cashierdashboard.caching import response_cache
+from cashierdashboard.models import Store, Product, Notification
+
+@pytest.fixture
+def client(db):
+    response_cache().clear()
+    user = get_user_model().objects.create_user(username='cashier', password='password', role='CASHIER')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+def checkout(client, store, product, quantity):
+    response = client.post('/api/cashier/transactions/checkout/', {
+        'store': store.id, 'payment_method': 'cash', 'items': [{'product': product.id, 'quantity': quantity}]
+    }, format='json')
+    assert response.status_code == 201
+
+@pytest.mark.django_db
+def test_alerts_written_when_thresholds_are_crossed(client):
+    north = Store.objects.create(name='North', location='A', daily_sales_target=Decimal('100'))
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('30.00'), stock=6, min_stock_level=3)
+
+    checkout(client, north, soap, 2)   # 4 left, $60 today
+    assert not Notification.objects.exists()
+    checkout(client, north, soap, 2)   # 2 left: crosses the minimum; $120 passes the target
+    checkout(client, north, soap, 1)   # already low, still over target: nothing new
+    checkout(client, north, soap, 1)   # 0 left
+    assert sorted(Notification.objects.values_list('kind', 'object_id')) == [
+        ('daily_target', north.id), ('low_stock', soap.id), ('out_of_stock', soap.id)
+    ]
+    assert Notification.objects.get(kind='daily_target').store == north
+
+@pytest.mark.django_db
+def test_endpoint_reads_outbox_with_cursor(client):
+    north = Store.objects.create(name='North', location='A')
+    manager = get_user_model().objects.create_user(username='boss', password='password', role='manager', store_id=north.id)
+    south = Store.objects.create(name='South', location='B')
+    for i in range(3):
+        Notification.objects.create(kind='low_stock', level='warning', priority='medium', message=f'Low {i}')
+    Notification.objects.create(kind='daily_target', level='success', message='South', store=south)
+    client.force_authenticate(user=manager)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/api/cashier/manager-dashboard/notifications/?limit=2')
+    assert [row['message'] for row in response.data] == ['Low 0', 'Low 1']
+    assert response.data[0]['time'] == 'Just now'
+    assert not any('cashierdashboard_product' in query['sql'] or 'cashierdashboard_transaction' in query['sql']
+                   for query in queries.captured_queries)
+
+    cursor = response['X-Notification-Cursor']
+    rest = client.get(f'/api/cashier/manager-dashboard/notifications/?after={cursor}').data
+    assert [row['message'] for row in rest] == ['Low 2']  # other stores' alerts are not shown
+
+    client.post('/api/cashier/manager-dashboard/mark_notifications_read/', {'up_to': int(cursor)}, format='json')
+    assert [row['message'] for row in client.get('/api/cashier/manager-dashboard/notifications/').data] == ['Low 2']
+    client.post('/api/cashier/manager-dashboard/mark_notifications_read/', {}, format='json')
+    assert client.get('/api/cashier/manager-dashboard/notifications/').data == []
+    assert client.get('/api/cashier/manager-dashboard/notifications/?after=x').status_code == 400
@@ -0,0 +1,98 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from cashierdashboard.models import NumberSequence, Store
+from cashierdashboard.numbering import (
+    NumberAllocator, NumberingError, reserve_block, format_number, MAX_SEQUENCE_ID, MAX_VALUE
+)
+
+@pytest.mark.django_db
+def test_reserve_block_hands_out_disjoint_ranges():
+    first = reserve_block('receipt', 'store:1', 10)
+    second = reserve_block('receipt', 'store:1', 5)
+    other_scope = reserve_block('receipt', 'store:2', 10)
+
+    assert first[1:] == (1, 10)
+    assert second[1:] == (11, 15)
+    assert other_scope[1:] == (1, 10)
+    assert first[0] == second[0] != other_scope[0]
+    assert NumberSequence.objects.get(scope='store:1').next_value == 16
+
+@pytest.mark.django_db
+def test_allocator_numbers_are_unique_and_sortable():
+    allocator = NumberAllocator(block_size=4)
+    numbers = [allocator.next_number('payment', 'global') for _ in range(10)]
+    numbers += allocator.next_numbers('payment', 'global', 7)
+
+    assert len(set(numbers)) == 17
+    assert numbers == sorted(numbers)
+    assert all(number.startswith('PAY-') for number in numbers)
+
+@pytest.mark.django_db
+def test_device_block_endpoint():
+    store = Store.objects.create(name='North', location='A')
+    user = get_user_model().objects.create_user(username='pos', password='password', role='CASHIER',
+                                                store_id=store.id)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    url = reverse('numberblock-list')
+    first = client.post(url, {'kind': 'receipt', 'device_id': 'POS-01', 'size': 50}, format='json')
+    second = client.post(url, {'kind': 'receipt', 'device_id': 'POS-01', 'size': 50}, format='json')
+
+    assert first.status_code == 201
+    assert (first.data['start'], first.data['end']) == (1, 50)
+    assert (second.data['start'], second.data['end']) == (51, 100)
+    assert first.data['last'] < second.data['first']
+    assert second.data['first'] == second.data['prefix'] + '51'.zfill(second.data['width'])
+    assert len(client.get(url, {'device_id': 'POS-01'}).data) == 2
+
+@pytest.mark.django_db
+def test_numbers_never_outgrow_the_receipt_column():
+    assert len(format_number('receipt', MAX_SEQUENCE_ID, MAX_VALUE)) <= 20
+    with pytest.raises(NumberingError):
+        format_number('receipt', MAX_SEQUENCE_ID + 1, 1)
+    with pytest.raises(NumberingError):
+        format_number('receipt', 1, MAX_VALUE + 1)
+
+    reserve_block('receipt', 'store:1', MAX_VALUE - 10)
+    with pytest.raises(NumberingError, match='exhausted'):
+        reserve_block('receipt', 'store:1', 20)
+    assert NumberSequence.objects.get(scope='store:1').next_value == MAX_VALUE - 9  # rolled back
+    assert reserve_block('receipt', 'store:1', 10)[1:] == (MAX_VALUE - 9, MAX_VALUE)
+
+    NumberSequence.objects.create(id=MAX_SEQUENCE_ID + 1, kind='receipt', scope='store:2')
+    with pytest.raises(NumberingError):
+        reserve_block('receipt', 'store:2', 1)
+
+@pytest.mark.django_db
+def test_device_blocks_are_scoped_to_the_callers_store():
+    north = Store.objects.create(name='North', location='A')
+    south = Store.objects.create(name='South', location='B')
+    users = get_user_model().objects
+    clients = {}
+    for name, store_id in (('north', north.id), ('south', south.id), ('nostore', None)):
+        clients[name] = APIClient()
+        clients[name].force_authenticate(user=users.create_user(username=name, password='password',
+                                                                role='CASHIER', store_id=store_id))
+    url = reverse('numberblock-list')
+
+    assert clients['north'].post(url, {'kind': 'receipt', 'device_id': 'POS-01'}, format='json').status_code == 201
+    assert clients['south'].post(url, {'kind': 'receipt', 'device_id': 'POS-01'}, format='json').status_code == 403
+    assert clients['nostore'].post(url, {'kind': 'receipt', 'device_id': 'POS-09'}, format='json').status_code == 403
+    assert clients['south'].post(url, {'kind': 'receipt', 'device_id': 'POS-02'}, format='json').status_code == 201
+
+    assert [block['device_id'] for block in clients['north'].get(url).data] == ['POS-01']
+    assert [block['device_id'] for block in clients['south'].get(url).data] == ['POS-02']
+    assert clients['nostore'].get(url).data == []
@@ -0,0 +1,151 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import json
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.db import DataError
+from cashierdashboard import offline_sync
+from cashierdashboard.models import Store, Product, ProductVariant, Transaction, TransactionItem, OfflineTransaction
+
+@pytest.fixture
+def cashier_client(db):
+    user = get_user_model().objects.create_user(username='cashier', password='password', role='CASHIER')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+def ndjson(*records):
+    return '\n'.join(record if isinstance(record, str) else json.dumps(record) for record in records)
+
+@pytest.mark.django_db
+def test_ingest_creates_sales_and_reports_each_line(cashier_client):
+    store = Store.objects.create(name='Main', location='Town')
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('2.00'), stock=10)
+    body = ndjson(
+        {'idempotency_key': 'k1', 'timestamp': '2025-08-05T10:15:00Z', 'items': [{'product': soap.id, 'quantity': 2}]},
+        {'idempotency_key': 'k2', 'receipt_number': 'POS1-0001', 'items': [{'product': soap.id, 'quantity': 1, 'unit_price': '1.50'}]},
+        {'idempotency_key': 'k1', 'items': [{'product': soap.id, 'quantity': 5}]},
+        'not json',
+        {'idempotency_key': 'k3', 'items': [{'product': soap.id + 99, 'quantity': 1}]},
+    )
+
+    url = reverse('offlinetransaction-ingest') + f'?store={store.id}&device_id=POS-1'
+    response = cashier_client.post(url, body, content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    assert [r['status'] for r in response.data['results']] == ['created', 'created', 'duplicate', 'error', 'error']
+    assert response.data['summary'] == {'created': 2, 'duplicate': 1, 'error': 2}
+
+    first = Transaction.objects.get(offline_source__idempotency_key='k1')
+    assert first.is_offline and first.total == Decimal('4.00')
+    assert first.timestamp.isoformat().startswith('2025-08-05T10:15')
+    assert Transaction.objects.get(receipt_number='POS1-0001').total == Decimal('1.50')
+    assert TransactionItem.objects.count() == 2
+    soap.refresh_from_db()
+    assert soap.stock == 7
+
+    # Replaying the whole upload is a no-op
+    replay = cashier_client.post(url, body, content_type='application/x-ndjson')
+    assert replay.data['summary'] == {'created': 0, 'duplicate': 3, 'error': 2}
+    assert Transaction.objects.count() == 2
+
+@pytest.mark.django_db
+def test_ingest_rejects_only_records_with_bad_variants(cashier_client):
+    store = Store.objects.create(name='Main', location='Town')
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('2.00'), stock=10)
+    salt = Product.objects.create(name='Salt', sku='SALT', price=Decimal('1.00'), stock=10)
+    lavender = ProductVariant.objects.create(product=soap, name='Lavender', sku='SOAP-LAV')
+    body = ndjson(
+        {'idempotency_key': 'v1', 'items': [{'product': soap.id, 'variant': lavender.id, 'quantity': 1}]},
+        {'idempotency_key': 'v2', 'items': [{'product': soap.id, 'variant': 999, 'quantity': 1}]},
+        {'idempotency_key': 'v3', 'items': [{'product': salt.id, 'variant': lavender.id, 'quantity': 1}]},
+        {'idempotency_key': 'v4', 'items': [{'product': soap.id, 'variant': 'big', 'quantity': 1}]},
+        {'idempotency_key': 'v5', 'items': [{'product': salt.id, 'quantity': 1}]},
+    )
+
+    url = reverse('offlinetransaction-ingest') + f'?store={store.id}&device_id=POS-1'
+    response = cashier_client.post(url, body, content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    assert [r['status'] for r in response.data['results']] == ['created', 'error', 'error', 'error', 'created']
+    assert 'variant' in response.data['results'][1]['error']
+    assert TransactionItem.objects.get(transaction__offline_source__idempotency_key='v1').variant == lavender
+
+@pytest.mark.django_db
+def test_bad_values_fail_only_their_own_record(cashier_client, monkeypatch):
+    store = Store.objects.create(name='Main', location='Town')
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('2.00'), stock=10)
+    item = {'product': soap.id, 'quantity': 1}
+    body = ndjson(
+        {'idempotency_key': 'ok-1', 'items': [item]},
+        {'idempotency_key': 'nan', 'total': 'NaN', 'items': [item]},
+        {'idempotency_key': 'inf', 'items': [dict(item, unit_price='Infinity')]},
+        {'idempotency_key': 'big', 'subtotal': '123456789012.00', 'items': [item]},
+        {'idempotency_key': 'cents', 'items': [dict(item, discount='0.001')]},
+        {'idempotency_key': 'long', 'receipt_number': 'R' * 21, 'items': [item]},
+        {'idempotency_key': 'many', 'items': [dict(item, quantity=10 ** 12)]},
+        {'idempotency_key': 'sum', 'items': [dict(item, unit_price='99999999.99', quantity=50)]},
+        {'idempotency_key': 'ok-2', 'items': [item]},
+    )
+    url = reverse('offlinetransaction-ingest') + f'?store={store.id}&device_id=POS-1'
+
+    response = cashier_client.post(url, body, content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    assert [r['status'] for r in response.data['results']] == ['created'] + ['error'] * 7 + ['created']
+    assert Transaction.objects.count() == 2
+
+    # A failure inside the write is retried record by record
+    def poisoned(transactions):
+        if any(sale.total == Decimal('6.00') for sale in transactions):
+            raise DataError('value too long')
+    monkeypatch.setattr(offline_sync, 'record_sales', poisoned)
+    body = ndjson(
+        {'idempotency_key': 'ok-3', 'items': [item]},
+        {'idempotency_key': 'poison', 'items': [dict(item, quantity=3)]},
+        {'idempotency_key': 'ok-4', 'items': [item]},
+    )
+    response = cashier_client.post(url, body, content_type='application/x-ndjson')
+    assert [r['status'] for r in response.data['results']] == ['created', 'error', 'created']
+    assert Transaction.objects.count() == 4
+    assert not OfflineTransaction.objects.filter(idempotency_key='poison').exists()
+
+@pytest.mark.django_db
+def test_live_sales_cannot_be_back_dated(cashier_client):
+    store = Store.objects.create(name='Main', location='Town')
+    response = cashier_client.post(reverse('transaction-list'), {
+        'store_id': store.id, 'subtotal': '1.00', 'tax_amount': '0.00', 'total': '1.00',
+        'payment_method': 'cash', 'status': 'completed', 'timestamp': '2020-01-01T00:00:00Z'
+    }, format='json')
+
+    assert response.status_code == 201
+    assert Transaction.objects.get(pk=response.data['id']).timestamp.year != 2020
+
+@pytest.mark.django_db
+def test_sync_offline_converts_pending_rows(cashier_client):
+    store = Store.objects.create(name='Main', location='Town')
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('2.00'), stock=10)
+    row = OfflineTransaction.objects.create(
+        device_id='POS-2', store=store,
+        transaction_data={'items': [{'product': soap.id, 'quantity': 3}]}
+    )
+
+    response = cashier_client.post(reverse('offlinetransaction-sync-offline'))
+
+    assert response.status_code == 200
+    assert response.data['summary']['created'] == 1
+    row.refresh_from_db()
+    assert row.sync_status == 'synced'
+    assert row.transaction.total == Decimal('6.00')
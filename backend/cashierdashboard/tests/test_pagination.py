@@ -0,0 +1,94 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from cashierdashboard.caching import response_cache
+from cashierdashboard.models import Product, Transaction
+from cashierdashboard.pagination import paginate, MAX_PAGE_SIZE
+
+@pytest.fixture
+def sales(db):
+    response_cache().clear()
+    now = timezone.now()
+    # Offline sales share timestamps and arrive out of time order
+    moments = [now, now - timedelta(hours=1), now, now - timedelta(hours=1), now - timedelta(days=1), now]
+    return [Transaction.objects.create(
+        receipt_number=f'R{i}', subtotal=Decimal('1'), tax_amount=0, total=Decimal('1'),
+        payment_method='cash', status='completed', timestamp=moment
+    ) for i, moment in enumerate(moments)]
+
+def walk(queryset, limit, keyset):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = paginate(queryset, cursor, limit, keyset)
+        seen.extend(row.receipt_number for row in rows)
+        if cursor is None:
+            return seen
+
+def test_pages_cover_every_row_once_in_keyset_order(sales):
+    expected = [row.receipt_number for row in Transaction.objects.order_by('-timestamp', '-id')]
+    for limit in (1, 2, 4, 6, 10):
+        assert walk(Transaction.objects.all(), limit, ('-timestamp', '-id')) == expected
+    assert walk(Transaction.objects.all(), 4, ('timestamp', 'id')) == expected[::-1]
+
+    # A row written mid-walk does not shift the next page
+    first, cursor = paginate(Transaction.objects.all(), None, 3, ('-timestamp', '-id'))
+    Transaction.objects.create(receipt_number='NEW', subtotal=0, tax_amount=0, total=0,
+                               payment_method='cash', status='completed')
+    rest, _ = paginate(Transaction.objects.all(), cursor, 10, ('-timestamp', '-id'))
+    assert [row.receipt_number for row in first + rest] == expected
+
+    with pytest.raises(ParseError):
+        paginate(Transaction.objects.all(), '123', 2, ('-timestamp', '-id'))
+    with pytest.raises(ParseError):
+        paginate(Transaction.objects.all(), None, 'ten')
+
+def test_list_endpoints_page_with_cursor_and_limit(sales):
+    cashier = get_user_model().objects.create_user(username='till', password='x', role='CASHIER')
+    client = APIClient()
+    client.force_authenticate(cashier)
+
+    page = client.get('/api/cashier/transactions/', {'limit': 4}).data
+    assert [row['receipt_number'] for row in page['results']] == ['R5', 'R2', 'R0', 'R3']
+    page = client.get('/api/cashier/transactions/', {'limit': 4, 'cursor': page['next']}).data
+    assert [row['receipt_number'] for row in page['results']] == ['R1', 'R4'] and page['next'] is None
+    assert len(client.get('/api/cashier/transactions/', {'limit': 10 ** 6}).data['results']) == len(sales)
+    assert MAX_PAGE_SIZE < 10 ** 6
+
+    response = client.get('/api/cashier/transactions/', {'cursor': 'garbage'})
+    assert response.status_code == 400 and response.data == {'error': 'Invalid cursor'}
+
+    manager = get_user_model().objects.create_user(username='boss', password='x', role='MANAGER')
+    client.force_authenticate(manager)
+    page = client.get('/api/member/users/', {'limit': 1}).data
+    assert [row['username'] for row in page['users']] == ['boss']
+    assert page['total'] == 2  # the whole filtered set, for the staff screen's count
+    assert [row['username'] for row in client.get('/api/member/users/', {'cursor': page['next']}).data['users']] == ['till']
+
+def test_search_results_page_in_relevance_order(db):
+    response_cache().clear()
+    for i in range(5):
+        Product.objects.create(name=f'Milk {i}' if i % 2 else f'Bread {i} with milk', sku=f'S{i}', stock=1)
+    client = APIClient()
+    ranked = [row['sku'] for row in client.get('/api/customer/products/', {'search': 'milk'}).data['results']]
+    page = client.get('/api/customer/products/', {'search': 'milk', 'limit': 2}).data
+    pages = [row['sku'] for row in page['results']]
+    while page['next']:
+        page = client.get('/api/customer/products/', {'search': 'milk', 'limit': 2, 'cursor': page['next']}).data
+        pages += [row['sku'] for row in page['results']]
+    assert pages == ranked and len(ranked) == 5
+    assert [row['sku'] for row in client.get('/api/customer/products/').data['results']] == [f'S{i}' for i in range(4, -1, -1)]
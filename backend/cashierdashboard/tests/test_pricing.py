@@ -0,0 +1,86 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from cashierdashboard.models import Store, Product, ProductVariant, Transaction
+from cashierdashboard.pricing import price_cart, PricingError
+
+@pytest.fixture
+def cashier_client(db):
+    user = get_user_model().objects.create_user(username='cashier', password='password', role='CASHIER')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+@pytest.mark.django_db
+def test_quote_prices_cart_server_side(cashier_client):
+    store = Store.objects.create(name='Main', location='Town', tax_rate=Decimal('16.00'))
+    shirt = Product.objects.create(name='Shirt', sku='SHIRT', price=Decimal('10.00'))
+    large = ProductVariant.objects.create(product=shirt, name='L', sku='SHIRT-L', price_modifier=Decimal('1.50'))
+    socks = Product.objects.create(name='Socks', sku='SOCKS', price=Decimal('3.00'))
+
+    response = cashier_client.post(reverse('transaction-quote'), {
+        'store': store.id,
+        'items': [
+            {'product': shirt.id, 'variant': large.id, 'quantity': 2},
+            {'product': socks.id, 'quantity': 3, 'discount': '1.00'},
+        ]
+    }, format='json')
+
+    assert response.status_code == 200
+    assert [line['total'] for line in response.data['lines']] == ['23.00', '8.00']
+    assert response.data['lines'][0]['name'] == 'Shirt - L'
+    assert response.data['subtotal'] == '31.00'
+    assert response.data['discount_total'] == '1.00'
+    assert response.data['tax_amount'] == '4.96'
+    assert response.data['total'] == '35.96'
+    assert not Transaction.objects.exists()
+
+@pytest.mark.django_db
+def test_quote_rejects_variant_of_another_product(cashier_client):
+    shirt = Product.objects.create(name='Shirt', sku='SHIRT', price=Decimal('10.00'))
+    socks = Product.objects.create(name='Socks', sku='SOCKS', price=Decimal('3.00'))
+    large = ProductVariant.objects.create(product=shirt, name='L', sku='SHIRT-L')
+
+    response = cashier_client.post(reverse('transaction-quote'), {
+        'items': [{'product': socks.id, 'variant': large.id, 'quantity': 1}]
+    }, format='json')
+
+    assert response.status_code == 400
+
+@pytest.mark.django_db
+def test_discounts_are_capped_and_large_ones_need_a_manager(cashier_client):
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('10.00'))
+    url = reverse('transaction-quote')
+
+    def quote(client, discount):
+        return client.post(url, {'items': [{'product': soap.id, 'quantity': 2, 'discount': discount}]}, format='json')
+
+    response = quote(cashier_client, '4.00')  # 20% of the line: a cashier may give it
+    assert response.status_code == 200 and response.data['total'] == '16.00'
+    assert not response.data['lines'][0]['price_overridden']
+    assert quote(cashier_client, '-1.00').status_code == 400
+    response = quote(cashier_client, '20.00')
+    assert response.status_code == 400 and 'manager' in response.data['error']
+    with pytest.raises(PricingError):
+        price_cart([{'product': soap.id, 'quantity': 1, 'discount': Decimal('-1')}], allow_price_override=True)
+
+    manager = get_user_model().objects.create_user(username='boss', password='password', role='manager')
+    client = APIClient()
+    client.force_authenticate(user=manager)
+    response = quote(client, '50.00')  # more than the line: capped, and counted as applied
+    assert response.status_code == 200 and response.data['lines'][0]['price_overridden']
+    assert response.data['lines'][0]['discount'] == '20.00'
+    assert (response.data['discount_total'], response.data['total']) == ('20.00', '0.00')
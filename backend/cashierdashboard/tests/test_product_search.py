@@ -0,0 +1,73 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from cashierdashboard.caching import response_cache
+from cashierdashboard.models import Category, SubCategory, Product, ProductSearchDocument
+from cashierdashboard.search import terms, search_products, rebuild_index, ContainsBackend
+
+@pytest.fixture
+def catalog(db):
+    response_cache().clear()
+    dairy = Category.objects.create(name='Dairy')
+    cheese = SubCategory.objects.create(name='Cheese', category=dairy)
+    cleaning = Category.objects.create(name='Cleaning')
+    products = {
+        'milk': Product.objects.create(name='Whole Milk', sku='MILK-1', category=dairy, price=Decimal('2.00'), stock=5),
+        'cheddar': Product.objects.create(name='Cheddar', sku='CHD-1', category=dairy, subcategory=cheese,
+                                          description='Aged milk cheese', price=Decimal('6.00'), stock=5),
+        'soap': Product.objects.create(name='Dish Soap', sku='SOAP-1', category=cleaning,
+                                       description='Cuts grease', price=Decimal('3.00'), stock=0),
+    }
+    return dairy, cheese, products
+
+def test_terms_drop_operators():
+    assert terms('milk" OR *drop* -- NEAR(') == ['milk', 'or', 'drop', 'near']
+    assert terms('') == []
+
+def test_documents_follow_signals_and_rank_title_matches_first(catalog):
+    dairy, cheese, products = catalog
+    assert ProductSearchDocument.objects.get(product=products['cheddar']).body == 'Dairy Cheese Aged milk cheese'
+
+    # Title hit ranks above a description hit; prefixes match
+    assert [p.sku for p in search_products(Product.objects.all(), 'mil')] == ['MILK-1', 'CHD-1']
+    assert [p.sku for p in search_products(Product.objects.all(), 'dairy cheese')] == ['CHD-1']
+    assert [p.sku for p in search_products(Product.objects.all(), 'soap-1')] == ['SOAP-1']
+    assert not search_products(Product.objects.all(), '"*').exists()
+
+    dairy.name = 'Chilled'
+    dairy.save()
+    assert {p.sku for p in search_products(Product.objects.all(), 'chilled')} == {'CHD-1', 'MILK-1'}
+    cheese.delete()
+    assert ProductSearchDocument.objects.get(product=products['cheddar']).body == 'Chilled Aged milk cheese'
+    products['milk'].delete()
+    assert [p.sku for p in search_products(Product.objects.all(), 'chilled')] == ['CHD-1']
+
+    # Bulk writes skip signals until the index is rebuilt
+    Product.objects.filter(pk=products['soap'].pk).update(name='Hand Soap')
+    assert rebuild_index() == 2
+    assert [p.name for p in search_products(Product.objects.all(), 'hand')] == ['Hand Soap']
+    assert [p.sku for p in ContainsBackend().search(Product.objects.all(), 'hand soap')] == ['SOAP-1']
+
+def test_customer_endpoints_use_one_ranked_query(catalog):
+    client = APIClient()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/api/customer/products/', {'search': 'milk', 'in_stock': 'true'})
+    assert [row['sku'] for row in response.data['results']] == ['MILK-1', 'CHD-1']
+    assert len(queries.captured_queries) == 1
+    assert 'MATCH' in queries.captured_queries[0]['sql'] and 'LIKE' not in queries.captured_queries[0]['sql']
+
+    data = client.get('/api/customer/search/', {'q': 'grease'}).data
+    assert [row['sku'] for row in data['products']] == ['SOAP-1'] and data['total_results'] == 1
@@ -0,0 +1,88 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import csv
+import io
+import json
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from cashierdashboard.models import Store, Category, Product, Customer, Transaction
+
+@pytest.fixture
+def manager_client(db):
+    user = get_user_model().objects.create_user(username='manager', password='password', role='manager')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+def body(response):
+    return b''.join(response.streaming_content).decode()
+
+@pytest.mark.django_db
+def test_sales_report_streams_csv_and_ndjson(manager_client):
+    store = Store.objects.create(name='North', location='A')
+    alice = Customer.objects.create(name='Alice', email='alice@example.com', phone='1')
+    for number, total in enumerate(['10.00', '20.00', '30.00']):
+        Transaction.objects.create(
+            store_id=store, customer=alice if number == 0 else None, receipt_number=f'R-{number}',
+            payment_method='cash', status='completed', subtotal=Decimal(total), tax_amount=0, total=Decimal(total)
+        )
+    # Outside the requested range
+    Transaction.objects.create(
+        store_id=store, receipt_number='R-OLD', payment_method='cash', status='completed',
+        subtotal=Decimal('5.00'), tax_amount=0, total=Decimal('5.00'), timestamp=timezone.now() - timezone.timedelta(days=60)
+    )
+
+    today = timezone.localdate()
+    period = {'start_date': (today - timezone.timedelta(days=7)).isoformat(), 'end_date': today.isoformat()}
+
+    response = manager_client.get('/api/manager/reports/sales_report/', {**period, 'format': 'csv'})
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/csv')
+    assert 'attachment' in response['Content-Disposition']
+    rows = list(csv.DictReader(io.StringIO(body(response))))
+    assert [row['receipt_number'] for row in rows] == ['R-0', 'R-1', 'R-2']
+    assert rows[0]['store'] == 'North' and rows[0]['customer'] == 'Alice'
+
+    response = manager_client.get('/api/manager/reports/sales_report/', {**period, 'format': 'ndjson'})
+    records = [json.loads(line) for line in body(response).splitlines()]
+    assert [record['total'] for record in records] == [10.0, 20.0, 30.0]
+
+    # JSON mode is unchanged
+    response = manager_client.get('/api/manager/reports/sales_report/', period)
+    assert response.data['summary']['total_orders'] == 3
+
+@pytest.mark.django_db
+def test_inventory_report_stream_matches_json(manager_client):
+    drinks = Category.objects.create(name='Drinks')
+    Product.objects.create(name='Cola', sku='COLA', category=drinks, price=Decimal('2.00'),
+                           cost_price=Decimal('1.00'), stock=3, min_stock_level=5)
+    Product.objects.create(name='Soap', sku='SOAP', price=Decimal('5.00'), cost_price=Decimal('2.50'), stock=40)
+
+    response = manager_client.get('/api/manager/reports/inventory_report/', {'format': 'ndjson'})
+    assert response.status_code == 200
+    streamed = [json.loads(line) for line in body(response).splitlines()]
+    expected = manager_client.get('/api/manager/reports/inventory_report/').data['products']
+
+    assert [(row['name'], row['category'], row['inventory_value'], row['status']) for row in streamed] == [
+        (row['name'], row['category'], row['inventory_value'], row['status']) for row in expected
+    ]
+    assert streamed[0]['status'] == 'Low Stock'
+
+@pytest.mark.django_db
+def test_export_requires_manager(db):
+    user = get_user_model().objects.create_user(username='cashier', password='password', role='CASHIER')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    assert client.get('/api/manager/reports/sales_report/', {'format': 'csv'}).status_code == 403
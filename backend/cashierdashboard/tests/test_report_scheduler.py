@@ -0,0 +1,117 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from cashierdashboard.models import Store, Transaction
+from managerdashboard import scheduling
+from managerdashboard.models import Manager, ReportConfig
+from managerdashboard.scheduling import previous_slot, parse_schedule, ScheduleError, run_due
+
+def at(*args):
+    return timezone.make_aware(datetime(*args))
+
+def test_schedule_slots():
+    now = at(2026, 10, 14, 12, 30)  # a Wednesday
+    assert previous_slot('hourly@45', now) == at(2026, 10, 14, 11, 45)
+    assert previous_slot('daily', now) == at(2026, 10, 14, 2, 0)
+    assert previous_slot('daily@13:00', now) == at(2026, 10, 13, 13, 0)
+    assert previous_slot('weekly@wed 14:00', now) == at(2026, 10, 7, 14, 0)
+    assert previous_slot('weekly@mon', now) == at(2026, 10, 12, 2, 0)
+    assert previous_slot('monthly@20', now) == at(2026, 9, 20, 2, 0)
+    assert previous_slot('', now) is None
+    # Early on the scheduled day, before its time: last month's slot, never a future one
+    assert previous_slot('monthly@15 04:00', at(2026, 10, 15, 1, 0)) == at(2026, 9, 15, 4, 0)
+    assert previous_slot('monthly@1 04:00', at(2026, 10, 1, 1, 0)) == at(2026, 9, 1, 4, 0)
+    assert previous_slot('monthly@1 04:00', at(2026, 3, 1, 1, 0)) == at(2026, 2, 1, 4, 0)
+    assert previous_slot('monthly@15 04:00', at(2026, 10, 15, 4, 0)) == at(2026, 10, 15, 4, 0)
+    for bad in ('fortnightly', 'daily@25:00', 'weekly@someday', 'monthly@31'):
+        with pytest.raises(ScheduleError):
+            parse_schedule(bad)
+
+@pytest.mark.django_db
+def test_scheduler_runs_due_reports_and_serves_artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduling, 'ARTIFACT_ROOT', str(tmp_path))
+    user = get_user_model().objects.create_user(username='manager', password='password', role='manager')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    store = Store.objects.create(name='North', location='A')
+    for total in ('10.00', '15.00'):
+        Transaction.objects.create(store_id=store, receipt_number=f'R-{total}', payment_method='cash',
+                                   status='completed', subtotal=Decimal(total), tax_amount=0, total=Decimal(total))
+
+    response = client.post('/api/manager/report-configs/', {
+        'name': 'Weekly sales', 'metrics': ['sales', 'orders'], 'filters': {'days': 7},
+        'schedule': 'daily@01:00', 'export_format': 'csv'
+    }, format='json')
+    assert response.status_code == 201
+    config_id = response.data['id']
+    assert client.post('/api/manager/report-configs/', {'name': 'Bad', 'schedule': 'sometimes'},
+                       format='json').status_code == 400
+    assert client.get(f'/api/manager/report-configs/{config_id}/download/').status_code == 404
+
+    assert run_due() == (1, 0)
+    assert run_due() == (0, 0)  # already ran for this slot
+    config = ReportConfig.objects.get(pk=config_id)
+    assert config.last_run is not None
+
+    response = client.get(f'/api/manager/report-configs/{config_id}/download/')
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+    assert len(rows) == 8
+    assert Decimal(rows[-1]['sales']) == Decimal('25.00') and rows[-1]['orders'] == '2'
+    assert client.get(f'/api/manager/report-configs/{config_id}/download/',
+                      HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+
+    # A later slot writes a new version; old versions beyond the limit are pruned
+    monkeypatch.setattr(scheduling, 'KEEP_VERSIONS', 2)
+    for days in (1, 2, 3):
+        assert run_due(timezone.now() + timezone.timedelta(days=days)) == (1, 0)
+    versions = [a['version'] for a in client.get(f'/api/manager/report-configs/{config_id}/artifacts/').data]
+    assert versions == [4, 3]
+    assert sorted(os.listdir(tmp_path / str(config_id))) == ['v3.csv', 'v4.csv']
+    assert client.get(f'/api/manager/report-configs/{config_id}/download/', {'version': 1}).status_code == 404
+
+@pytest.mark.django_db
+def test_report_filters_are_validated_and_pinned_to_the_managers_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduling, 'ARTIFACT_ROOT', str(tmp_path))
+    north, south = Store.objects.create(name='North', location='A'), Store.objects.create(name='South', location='B')
+    Transaction.objects.create(store_id=south, receipt_number='S-1', payment_method='cash', status='completed',
+                               subtotal=Decimal('99.00'), tax_amount=0, total=Decimal('99.00'))
+    user = get_user_model().objects.create_user(username='north', password='password', role='manager', store_id=north.id)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = '/api/manager/report-configs/'
+
+    for filters in ({'store': south.id}, {'days': 'soon'}, {'days': 0}, {'report': 'payroll'},
+                    {'granularity': 'fortnight'}, {'start_date': '2026-13-01'}, {'end_date': '2026-01-01'},
+                    {'start_date': '2026-02-01', 'end_date': '2026-01-01'}, ['days']):
+        response = client.post(url, {'name': 'Bad', 'filters': filters}, format='json')
+        assert response.status_code == 400 and 'filters' in response.data, filters
+
+    # A config saved before validation still cannot reach another store
+    config_id = client.post(url, {'name': 'Mine', 'filters': {'report': 'transactions'}}, format='json').data['id']
+    ReportConfig.objects.filter(pk=config_id).update(filters={'report': 'transactions', 'store': south.id})
+    scheduling.run_report(ReportConfig.objects.get(pk=config_id))
+    response = client.get(f'{url}{config_id}/download/')
+    assert b'S-1' not in b''.join(response.streaming_content)
+
+    # Admin managers (no store) may pick one
+    admin = get_user_model().objects.create_user(username='admin', password='password', role='manager')
+    client.force_authenticate(user=admin)
+    assert client.post(url, {'name': 'South', 'filters': {'store': south.id}}, format='json').status_code == 201
+    assert client.post(url, {'name': 'Nowhere', 'filters': {'store': 10 ** 6}}, format='json').status_code == 400
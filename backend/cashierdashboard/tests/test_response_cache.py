@@ -0,0 +1,83 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from cashierdashboard.caching import response_cache, invalidate_tags, tag_versions, SALES
+from cashierdashboard.models import Store, Category, Product
+
+@pytest.fixture
+def cashier_client(db):
+    response_cache().clear()
+    user = get_user_model().objects.create_user(username='cashier', password='password', role='CASHIER')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+@pytest.mark.django_db
+def test_cached_until_a_tagged_model_changes(cashier_client):
+    client = APIClient()
+    drinks = Category.objects.create(name='Drinks')
+
+    first = client.get('/api/cashier/realtime-data/category_updates/')
+    assert first['X-Cache'] == 'MISS'
+    second = client.get('/api/cashier/realtime-data/category_updates/')
+    assert second['X-Cache'] == 'HIT'
+    assert second.data == first.data
+
+    drinks.name = 'Beverages'
+    drinks.save()
+    third = client.get('/api/cashier/realtime-data/category_updates/')
+    assert third['X-Cache'] == 'MISS'
+    assert third.data['categories'][0]['name'] == 'Beverages'
+
+@pytest.mark.django_db
+def test_ledger_and_checkout_invalidate_without_model_signals(cashier_client):
+    store = Store.objects.create(name='North', location='A')
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('5.00'), stock=8, min_stock_level=2)
+    alerts = lambda: cashier_client.get('/api/cashier/manager-dashboard/inventory_alerts/')
+    performance = lambda: cashier_client.get('/api/cashier/manager-dashboard/store_performance/')
+
+    assert alerts().data[0]['stock'] == 8
+    assert alerts()['X-Cache'] == 'HIT'
+    assert performance().data == []
+
+    # Checkout moves stock with F() updates and records the sale
+    response = cashier_client.post('/api/cashier/transactions/checkout/', {
+        'store': store.id, 'payment_method': 'cash', 'items': [{'product': soap.id, 'quantity': 3}]
+    }, format='json')
+    assert response.status_code == 201
+    assert alerts().data[0]['stock'] == 5
+    assert performance().data[0]['sales'] == 15.0
+
+@pytest.mark.django_db
+def test_manager_endpoints_are_cached_per_user(cashier_client):
+    User = get_user_model()
+    manager = APIClient()
+    manager.force_authenticate(User.objects.create_user(username='manager', password='password', role='manager'))
+
+    assert manager.get('/api/manager/dashboard/').status_code == 200
+    assert manager.get('/api/manager/dashboard/')['X-Cache'] == 'HIT'
+    # A cashier must not be served the manager's cached overview
+    assert cashier_client.get('/api/manager/dashboard/').status_code == 403
+
+@pytest.mark.django_db
+def test_tag_versions_on_file_backend(tmp_path):
+    with override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': str(tmp_path)
+    }}):
+        before = tag_versions([SALES])
+        assert tag_versions([SALES]) == before
+        invalidate_tags(SALES)
+        assert tag_versions([SALES]) != before
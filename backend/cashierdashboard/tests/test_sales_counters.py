@@ -0,0 +1,76 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import json
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from cashierdashboard.models import Store, Product, CashierDailyStats
+from cashierdashboard.sales import rebuild_cashier_stats
+
+@pytest.fixture
+def cashier(db):
+    return get_user_model().objects.create_user(username='cashier', password='password', role='CASHIER')
+
+@pytest.fixture
+def cashier_client(cashier):
+    client = APIClient()
+    client.force_authenticate(user=cashier)
+    return client
+
+def stats(client):
+    response = client.get(reverse('dashboard-stats-list'))
+    assert response.status_code == 200
+    return response.data
+
+@pytest.mark.django_db
+def test_sales_update_todays_counters(cashier_client):
+    store = Store.objects.create(name='Main', location='Town')
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('2.00'), stock=10)
+    assert stats(cashier_client) == {'total_sales': Decimal('0'), 'transaction_count': 0, 'last_sync': None}
+
+    cashier_client.post(reverse('transaction-checkout'), {
+        'payment_method': 'cash', 'items': [{'product': soap.id, 'quantity': 2}]
+    }, format='json')
+    created = cashier_client.post(reverse('transaction-list'), {
+        'subtotal': '5.00', 'tax_amount': '0.00', 'total': '5.00', 'payment_method': 'cash', 'status': 'completed'
+    }, format='json')
+    ingest_url = reverse('offlinetransaction-ingest') + f'?store={store.id}&device_id=POS-1'
+    cashier_client.post(ingest_url, json.dumps({'idempotency_key': 'k1', 'items': [{'product': soap.id, 'quantity': 1}]}),
+                        content_type='application/x-ndjson')
+
+    today = stats(cashier_client)
+    assert today['transaction_count'] == 3
+    assert today['total_sales'] == Decimal('11.00')
+    assert today['last_sync'] is not None
+
+    # Edits and deletes move the counters too
+    cashier_client.patch(reverse('transaction-detail', args=[created.data['id']]), {'total': '7.00'}, format='json')
+    assert stats(cashier_client)['total_sales'] == Decimal('13.00')
+    cashier_client.delete(reverse('transaction-detail', args=[created.data['id']]))
+    assert stats(cashier_client)['transaction_count'] == 2
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_counters(cashier_client, cashier):
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('2.00'), stock=10)
+    for quantity in (1, 2, 3):
+        cashier_client.post(reverse('transaction-checkout'), {
+            'payment_method': 'cash', 'items': [{'product': soap.id, 'quantity': quantity}]
+        }, format='json')
+    incremental = list(CashierDailyStats.objects.values_list('cashier_id', 'day', 'sales_total', 'transaction_count'))
+
+    CashierDailyStats.objects.update(sales_total=0, transaction_count=0)
+    rebuild_cashier_stats()
+
+    assert list(CashierDailyStats.objects.values_list('cashier_id', 'day', 'sales_total', 'transaction_count')) == incremental
+    assert incremental[0][2:] == (Decimal('12.00'), 3)
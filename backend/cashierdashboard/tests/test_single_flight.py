@@ -0,0 +1,64 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from cashierdashboard.caching import (
+    SingleFlight, cached_compute, invalidate_tags, response_cache, HIT, MISS, STALE, SALES
+)
+
+@pytest.fixture
+def cache(db):
+    response_cache().clear()
+    return response_cache()
+
+def slow(calls, value, delay=0.2):
+    def compute():
+        calls.append(value)
+        time.sleep(delay)
+        return value
+    return compute
+
+def test_concurrent_misses_share_one_computation(cache):
+    calls = []
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda i: cached_compute('widget', slow(calls, 42), 60, [SALES]), range(8)))
+    assert calls == [42]
+    assert sorted(state for _, state in results) == [HIT] * 7 + [MISS]
+    assert {value for value, _ in results} == {42}
+
+def test_stale_value_served_while_one_request_revalidates(cache):
+    calls = []
+    assert cached_compute('widget', slow(calls, 1, delay=0), 60, [SALES], stale_ttl=300) == (1, MISS)
+    invalidate_tags(SALES)
+
+    refreshing = threading.Thread(target=cached_compute, args=('widget', slow(calls, 2, delay=0.3), 60, [SALES], 300))
+    refreshing.start()
+    time.sleep(0.1)
+    # The refresh is in flight: concurrent callers get the old value immediately
+    assert cached_compute('widget', slow(calls, 3), 60, [SALES], stale_ttl=300) == (1, STALE)
+    refreshing.join()
+    assert cached_compute('widget', slow(calls, 4), 60, [SALES], stale_ttl=300) == (2, HIT)
+    assert calls == [1, 2]
+
+def test_file_lock_coalesces_separate_processes(tmp_path):
+    # Two SingleFlight instances stand in for two workers sharing a lock directory
+    first, second = SingleFlight(str(tmp_path)), SingleFlight(str(tmp_path))
+    with first.lock('widget', cross_process=True) as held:
+        assert held
+        with second.lock('widget', blocking=False, cross_process=True) as other:
+            assert not other
+        with second.lock('widget', timeout=0.05, cross_process=True) as other:
+            assert not other
+    with second.lock('widget', blocking=False, cross_process=True) as other:
+        assert other
@@ -0,0 +1,113 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from cashierdashboard.models import Product, Store, Transaction, TransactionItem, Return, StockMovement, StockBalance
+from cashierdashboard.inventory import record_movements, adjust_to_count
+from cashierdashboard.serializers import ProductSerializer
+
+@pytest.fixture
+def client(db):
+    user = get_user_model().objects.create_user(username='manager', password='password', role='MANAGER')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+@pytest.mark.django_db
+def test_movements_seed_and_update_balances():
+    soap = Product.objects.create(name='Soap', sku='SOAP', stock=10)
+    milk = Product.objects.create(name='Milk', sku='MILK', stock=3)
+
+    record_movements([
+        StockMovement(product=soap, movement_type='sale', quantity=-2),
+        StockMovement(product=soap, movement_type='sale', quantity=-1),
+        StockMovement(product=milk, movement_type='adjustment', quantity=5),
+    ])
+
+    assert StockBalance.objects.get(product=soap).on_hand == 7
+    assert StockBalance.objects.get(product=milk).on_hand == 8
+    soap.refresh_from_db()
+    assert soap.stock == 7
+
+    movement = StockMovement.objects.filter(product=soap).first()
+    movement.quantity = 100
+    with pytest.raises(ValueError):
+        movement.save()
+
+@pytest.mark.django_db
+def test_approved_return_restocks_through_ledger(client):
+    soap = Product.objects.create(name='Soap', sku='SOAP', stock=5)
+    sale = Transaction.objects.create(
+        receipt_number='R1', subtotal=Decimal('5'), tax_amount=0, total=Decimal('5'),
+        payment_method='cash', status='completed'
+    )
+    TransactionItem.objects.create(transaction=sale, product=soap, quantity=2, unit_price=Decimal('2.5'), total=Decimal('5'))
+    return_item = Return.objects.create(original_transaction=sale, reason='Damaged', refund_amount=Decimal('5'))
+
+    response = client.post(reverse('manager-dashboard-approve-request'), {'id': return_item.id, 'type': 'Return'}, format='json')
+
+    assert response.status_code == 200
+    soap.refresh_from_db()
+    assert soap.stock == 7
+    movement = StockMovement.objects.get(product=soap)
+    assert (movement.movement_type, movement.quantity) == ('return', 2)
+
+@pytest.mark.django_db
+def test_product_edits_never_write_back_stale_stock(client):
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('2.00'), stock=10)
+    stale = Product.objects.get(pk=soap.pk)
+    record_movements([StockMovement(product=soap, movement_type='sale', quantity=-3)])
+
+    # Saving other fields from a copy read before the sale keeps the sale
+    serializer = ProductSerializer(stale, data={'price': '2.50'}, partial=True)
+    assert serializer.is_valid()
+    serializer.save()
+    soap.refresh_from_db()
+    assert (soap.price, soap.stock) == (Decimal('2.50'), 7)
+    assert serializer.data['stock'] == 7
+
+    # A count sets stock to the counted value, measured against the current row
+    adjust_to_count(stale, 12)
+    assert stale.stock == 12
+    assert StockMovement.objects.filter(product=soap, movement_type='adjustment').get().quantity == 5
+
+    manager = APIClient()
+    manager.force_authenticate(get_user_model().objects.create_user(username='boss', password='x', role='manager'))
+    response = client.patch(f'/api/cashier/products/{soap.id}/', {'stock': 6}, format='json')
+    assert response.status_code == 200 and response.data['stock'] == 6
+    response = manager.patch(f'/api/manager/products/{soap.id}/', {'name': 'Bar soap', 'stock': 4}, format='json')
+    assert response.status_code == 200 and response.data['stock'] == 4
+    soap.refresh_from_db()
+    assert (soap.name, soap.stock) == ('Bar soap', 4)
+    assert StockBalance.objects.get(product=soap).on_hand == 4
+
+@pytest.mark.django_db
+def test_stock_adjust_and_transfer_need_a_manager(client):
+    soap = Product.objects.create(name='Soap', sku='SOAP', stock=10)
+    north, south = Store.objects.create(name='North', location='A'), Store.objects.create(name='South', location='B')
+    cashier = APIClient()
+    cashier.force_authenticate(get_user_model().objects.create_user(username='till', password='x', role='CASHIER'))
+    adjust = {'adjustments': [{'product': soap.id, 'quantity': -2}]}
+    transfer = {'product': soap.id, 'quantity': 1, 'from_store': north.id, 'to_store': south.id}
+
+    assert cashier.post('/api/cashier/stock-movements/adjust/', adjust, format='json').status_code == 403
+    assert cashier.post('/api/cashier/stock-movements/transfer/', transfer, format='json').status_code == 403
+    assert cashier.get('/api/cashier/stock-movements/').status_code == 200
+    assert not StockMovement.objects.exists()
+
+    assert client.post('/api/cashier/stock-movements/adjust/', adjust, format='json').status_code == 201
+    assert client.post('/api/cashier/stock-movements/transfer/', transfer, format='json').status_code == 201
+    soap.refresh_from_db()
+    assert soap.stock == 8
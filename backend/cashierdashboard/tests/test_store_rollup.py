@@ -0,0 +1,62 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from cashierdashboard.models import Store, Product, Customer, Transaction, DailyStoreSales
+from cashierdashboard.sales import rebuild_store_sales, change_status
+
+@pytest.fixture
+def cashier_client(db):
+    user = get_user_model().objects.create_user(username='cashier', password='password', role='CASHIER')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+def rollup():
+    return sorted(DailyStoreSales.objects.values_list('store_id', 'sales_total', 'order_count', 'customer_count'))
+
+@pytest.mark.django_db
+def test_sales_maintain_store_rollup_and_dashboard(cashier_client):
+    north = Store.objects.create(name='North', location='A')
+    south = Store.objects.create(name='South', location='B')
+    alice = Customer.objects.create(name='Alice', email='alice@example.com', phone='1')
+    soap = Product.objects.create(name='Soap', sku='SOAP', price=Decimal('5.00'), stock=100)
+
+    def sell(store, customer=None, quantity=1):
+        return cashier_client.post(reverse('transaction-checkout'), {
+            'store': store.id, 'customer': customer.id if customer else None,
+            'payment_method': 'cash', 'items': [{'product': soap.id, 'quantity': quantity}]
+        }, format='json').data['transaction']['id']
+
+    sell(north, alice)
+    sell(north, alice, quantity=2)
+    sell(south)
+    voided = sell(south, quantity=4)
+
+    assert rollup() == sorted([(north.id, Decimal('15.00'), 2, 1), (south.id, Decimal('25.00'), 2, 0)])
+
+    change_status(Transaction.objects.get(pk=voided), 'voided')
+    assert rollup() == sorted([(north.id, Decimal('15.00'), 2, 1), (south.id, Decimal('5.00'), 1, 0)])
+
+    metrics = cashier_client.get(reverse('manager-dashboard-dashboard-metrics'), {'store': north.id}).data
+    assert metrics['totalSales'] == 15.0
+    assert metrics['totalOrders'] == 2
+    assert metrics['uniqueCustomers'] == 1
+
+    # The rebuild command reproduces the incrementally maintained rows
+    incremental = rollup()
+    DailyStoreSales.objects.all().delete()
+    rebuild_store_sales()
+    assert rollup() == incremental
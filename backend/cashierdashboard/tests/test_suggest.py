@@ -0,0 +1,89 @@
+import os
+import sys
+import django
+
+# Add project root directory to sys.path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+import pytest
+from rest_framework.test import APIClient
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from cashierdashboard.models import Category, Product
+from cashierdashboard.suggest import SuggestIndex, suggester, trigrams
+
+@pytest.fixture
+def catalog(db):
+    suggester.invalidate()
+    dairy = Category.objects.create(name='Dairy')
+    Category.objects.create(name='Bakery')
+    products = {
+        'milk': Product.objects.create(name='Whole Milk', sku='MILK-1', category=dairy, stock=5),
+        'choc': Product.objects.create(name='Chocolate Milk', sku='CHM-2', category=dairy, stock=5),
+        'bread': Product.objects.create(name='Sourdough Bread', sku='BRD-7', stock=5),
+        'old': Product.objects.create(name='Milk Powder', sku='MP-1', is_active=False),
+    }
+    yield dairy, products
+    suggester.invalidate()
+
+def texts(results):
+    return [row['text'] for row in results]
+
+def test_index_prefix_typo_and_removal():
+    index = SuggestIndex()
+    index.add('category', 1, 'Dairy')
+    index.add('product', 1, 'Whole Milk', 'MILK-1')
+    index.add('sku', 1, 'Whole Milk', 'MILK-1')
+    index.add('product', 2, 'Chocolate Milk', 'CHM-2')
+    assert trigrams('ab') == {'  a', ' ab', 'ab '}
+
+    # Any word of the name is a prefix; shorter names rank first and a SKU hit shows its product once
+    assert texts(index.suggest('mil')) == ['Whole Milk', 'Chocolate Milk']
+    assert texts(index.suggest('whole m')) == ['Whole Milk']
+    assert index.suggest('milk-', 1) == [{'type': 'product', 'id': 1, 'text': 'Whole Milk', 'sku': 'MILK-1'}]
+    # Typos in finished and unfinished words
+    assert texts(index.suggest('chocolat mlk')) == ['Chocolate Milk']
+    assert texts(index.suggest('diary')) == ['Dairy']
+    assert index.suggest('zzzz') == [] and index.suggest('  ') == []
+
+    index.remove('product', 1)
+    index.remove('sku', 1)
+    assert texts(index.suggest('mil')) == ['Chocolate Milk']
+    assert 'whole' not in index.words and not index.similar_words('whole')
+    index.remove('product', 2)
+    index.remove('category', 1)
+    assert not index.root.children and not index.grams
+
+def test_signals_update_the_index_after_commit(catalog, django_capture_on_commit_callbacks):
+    dairy, products = catalog
+    assert texts(suggester.suggest('milk')) == ['Whole Milk', 'Chocolate Milk']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        products['old'].is_active = True
+        products['old'].save()
+        products['milk'].delete()
+        dairy.name = 'Chilled'
+        dairy.save()
+    assert texts(suggester.suggest('milk')) == ['Milk Powder', 'Chocolate Milk']
+    assert texts(suggester.suggest('chil')) == ['Chilled']
+    assert suggester.suggest('dairy') == []
+
+    # Until commit the index is unchanged
+    with django_capture_on_commit_callbacks(execute=False):
+        Product.objects.create(name='Milk Bread', sku='MB-1')
+    assert 'Milk Bread' not in texts(suggester.suggest('milk'))
+
+def test_suggest_endpoint_answers_without_queries(catalog):
+    client = APIClient()
+    client.get('/api/customer/suggest/', {'q': 'x'})  # builds the index
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/api/customer/suggest/', {'q': 'sourdogh', 'limit': 3})
+    assert len(queries.captured_queries) == 0
+    assert response.data['suggestions'] == [
+        {'type': 'product', 'id': catalog[1]['bread'].id, 'text': 'Sourdough Bread', 'sku': 'BRD-7'}
+    ]
+    assert client.get('/api/customer/suggest/', {'q': 'b', 'limit': 'many'}).status_code == 400
+    assert client.get('/api/customer/suggest/').data == {'suggestions': []}
@@ -6,7 +6,8 @@ from .views import (
     ReturnViewSet, OfflineTransactionViewSet, HardwareDeviceViewSet,
     CashierDashboardStatsViewSet, CategoryViewSet, SubCategoryViewSet,
     AdvertisementViewSet, ManagerDashboardViewSet, RealTimeDataViewSet,
-    PaymentViewSet, DeliveryRouteViewSet, DeliveryViewSet, DeliveryUpdateViewSet
+    PaymentViewSet, DeliveryRouteViewSet, DeliveryViewSet, DeliveryUpdateViewSet,
+    NumberBlockViewSet, StockMovementViewSet
 )
 
 router = DefaultRouter()
@@ -22,6 +23,8 @@ router.register(r'transaction-items', TransactionItemViewSet)
 router.register(r'returns', ReturnViewSet)
 router.register(r'offline-transactions', OfflineTransactionViewSet)
 router.register(r'hardware-devices', HardwareDeviceViewSet)
+router.register(r'number-blocks', NumberBlockViewSet)
+router.register(r'stock-movements', StockMovementViewSet)
 router.register(r'dashboard-stats', CashierDashboardStatsViewSet, basename='dashboard-stats')
 router.register(r'advertisements', AdvertisementViewSet)
 router.register(r'manager-dashboard', ManagerDashboardViewSet, basename='manager-dashboard')
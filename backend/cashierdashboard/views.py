@@ -3,26 +3,46 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
+from django.db import transaction as db_transaction
 from django.db.models import Sum, Count, Avg, Q, F
 from django.utils import timezone
 from .models import (
     Store, Product, ProductVariant, Customer, Transaction, TransactionItem, Return, 
     OfflineTransaction, HardwareDevice, Category, SubCategory, Advertisement,
-    Payment, DeliveryRoute, Delivery, DeliveryUpdate
+    Payment, DeliveryRoute, Delivery, DeliveryUpdate, NumberBlock, StockMovement, ActivityEvent,
+    ReorderSuggestion
 )
 from .serializers import (
     StoreSerializer, ProductSerializer, ProductVariantSerializer, CustomerSerializer, 
     TransactionSerializer, TransactionItemSerializer, ReturnSerializer, OfflineTransactionSerializer, 
     HardwareDeviceSerializer, CategorySerializer, SubCategorySerializer, AdvertisementSerializer,
-    PaymentSerializer, DeliveryRouteSerializer, DeliverySerializer, DeliveryUpdateSerializer
+    PaymentSerializer, DeliveryRouteSerializer, DeliverySerializer, DeliveryUpdateSerializer,
+    CheckoutSerializer, QuoteSerializer, NumberBlockSerializer, NumberBlockRequestSerializer,
+    StockMovementSerializer, StockAdjustmentSerializer, StockTransferSerializer
 )
+from .checkout import perform_checkout, CheckoutError
+from .pricing import price_cart, PricingError
+from .numbering import next_number, store_scope, reserve_device_block, NumberingError, DeviceStoreError
+from .inventory import record_movements, transfer_movements, adjust_to_count
+from .offline_sync import OfflineIngestor, summarize
+from .lookup import product_index
+from .pagination import KeysetPagination
+from .caching import cache_response, invalidate_tags, CATALOG, INVENTORY, SALES, SALES_REWRITES, STORES, CUSTOMERS
+from . import activity, analytics
+from .sales import record_sales, revise_sale, change_status, record_sync, cashier_stats, store_sales_summary
+from .notifications import unread_notifications, mark_notifications_read, PAGE_SIZE as NOTIFICATION_PAGE_SIZE
+from managerdashboard import approvals, audit
+from managerdashboard.models import ApprovalRequest
 from member.models import CustomUser
+from member.permissions import IsManagerRole, is_manager
 from member.serializers import CustomUserSerializer
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = CustomUserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-id',)
     
     def get_queryset(self):
         # Filter users based on role permissions
@@ -75,6 +95,36 @@ class ProductViewSet(viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = []  # Temporarily disable authentication for testing
+    pagination_class = KeysetPagination
+    keyset = ('-id',)
+
+    def perform_update(self, serializer):
+        # Stock edits go through the ledger as adjustments
+        if 'stock' in serializer.validated_data:
+            user = self.request.user if self.request.user.is_authenticated else None
+            adjust_to_count(serializer.instance, serializer.validated_data.pop('stock'), user=user)
+        serializer.save()
+
+    @action(detail=False, methods=['get', 'post'])
+    def lookup(self, request):
+        """Resolve scanned barcodes/SKUs from the in-memory index (?code=, ?codes=a,b or {"codes": [...]})"""
+        if request.method == 'POST':
+            codes = request.data.get('codes')
+        elif 'codes' in request.query_params:
+            codes = request.query_params['codes'].split(',')
+        else:
+            code = request.query_params.get('code')
+            if not code:
+                return Response({'error': 'code is required'}, status=status.HTTP_400_BAD_REQUEST)
+            record = product_index.get(code)
+            if record is None:
+                return Response({'error': f'No product for code {code}'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(record)
+
+        if not isinstance(codes, list):
+            return Response({'error': 'codes must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        found, missing = product_index.get_many([str(code) for code in codes])
+        return Response({'results': found, 'missing': missing})
 
 class ProductVariantViewSet(viewsets.ModelViewSet):
     queryset = ProductVariant.objects.all()
@@ -85,24 +135,87 @@ class CustomerViewSet(viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-id',)
 
 class TransactionViewSet(viewsets.ModelViewSet):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-timestamp', '-id')
 
     def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
+        data = request.data.copy()
+        if not data.get('receipt_number'):
+            data['receipt_number'] = next_number('receipt', store_scope(data.get('store_id')))
+        serializer = self.get_serializer(data=data)
         if serializer.is_valid():
-            serializer.save(cashier=request.user)
+            with db_transaction.atomic():
+                sale = serializer.save(cashier=request.user)
+                record_sales([sale])
+                activity.record_transactions([sale])
+                approvals.request_transactions([sale], request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def perform_update(self, serializer):
+        before = Transaction.objects.get(pk=serializer.instance.pk)
+        with db_transaction.atomic():
+            sale = serializer.save()
+            revise_sale(before, sale)
+            activity.update_transaction(sale)
+            approvals.request_transactions([sale], self.request.user)
+
+    def perform_destroy(self, instance):
+        with db_transaction.atomic():
+            record_sales([instance], sign=-1)
+            activity.forget(activity.TRANSACTION, instance.pk)
+            instance.delete()
+
+    @action(detail=False, methods=['post'])
+    def checkout(self, request):
+        """Create transaction, items, stock decrements and payment in one request"""
+        serializer = CheckoutSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            sale, items, payment = perform_checkout(
+                request.user, serializer.validated_data, allow_price_override=is_manager(request.user)
+            )
+        except CheckoutError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        if sale.price_overridden_by_id:
+            audit.record_request(request, 'transaction.price_override', f'transaction:{sale.pk}',
+                                 receipt_number=sale.receipt_number, total=str(sale.total))
+        return Response({
+            'transaction': TransactionSerializer(sale).data,
+            'items': TransactionItemSerializer(items, many=True).data,
+            'payment': PaymentSerializer(payment).data
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def quote(self, request):
+        """Price a cart with catalog prices, variant modifiers, discounts and store tax"""
+        serializer = QuoteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            quote = price_cart(serializer.validated_data['items'], store=serializer.validated_data.get('store'),
+                               allow_price_override=is_manager(request.user))
+        except PricingError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(quote.as_dict())
+
     def void_transaction(self, request, pk=None):
         transaction = self.get_object()
         if request.user.role == 'manager':
-            transaction.status = 'voided'
-            transaction.save()
+            change_status(transaction, 'voided')
+            audit.record_request(request, 'transaction.void', f'transaction:{transaction.pk}')
             return Response({'status': 'Transaction voided'}, status=status.HTTP_200_OK)
         return Response({'error': 'Manager permission required'}, status=status.HTTP_403_FORBIDDEN)
 
@@ -110,24 +223,196 @@ class TransactionItemViewSet(viewsets.ModelViewSet):
     queryset = TransactionItem.objects.all()
     serializer_class = TransactionItemSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-id',)
+
+    def perform_create(self, serializer):
+        with db_transaction.atomic():
+            item = serializer.save()
+            activity.add_items(item.transaction_id, 1)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        invalidate_tags(SALES_REWRITES)
+
+    def perform_destroy(self, instance):
+        with db_transaction.atomic():
+            activity.add_items(instance.transaction_id, -1)
+            instance.delete()
+            invalidate_tags(SALES_REWRITES)
 
 class ReturnViewSet(viewsets.ModelViewSet):
     queryset = Return.objects.all()
     serializer_class = ReturnSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-id',)
+
+    def perform_create(self, serializer):
+        with db_transaction.atomic():
+            ret = serializer.save()
+            activity.record_returns([ret])
+            if ret.status == 'pending':
+                approvals.request_return(ret, self.request.user)
+
+    def perform_update(self, serializer):
+        with db_transaction.atomic():
+            activity.record_returns([serializer.save()])
+
+    def perform_destroy(self, instance):
+        with db_transaction.atomic():
+            activity.forget(activity.RETURN, instance.pk)
+            instance.delete()
 
 class OfflineTransactionViewSet(viewsets.ModelViewSet):
     queryset = OfflineTransaction.objects.all()
     serializer_class = OfflineTransactionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-id',)
+
+    def perform_create(self, serializer):
+        with db_transaction.atomic():
+            row = serializer.save()
+            record_sync(row.cashier_id, row.timestamp)
 
+    @action(detail=False, methods=['post'])
     def sync_offline(self, request):
-        offline_tx = self.get_queryset().filter(sync_status='pending')
-        for tx in offline_tx:
-            # Simulate sync logic (to be expanded with Kafka)
-            tx.sync_status = 'synced'
-            tx.save()
-        return Response({'status': 'Offline transactions synced'}, status=status.HTTP_200_OK)
+        """Turn pending offline rows into real transactions in bulk"""
+        try:
+            results = []
+            for result in OfflineIngestor().sync_pending(self.get_queryset().filter(sync_status='pending')):
+                result['offline_id'] = result.pop('line')
+                results.append(result)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({
+            'status': 'Offline transactions synced',
+            'summary': summarize(results),
+            'results': results
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def ingest(self, request):
+        """Stream-ingest an NDJSON body of offline sales (one JSON object per line)"""
+        ingestor = OfflineIngestor(
+            cashier=request.user,
+            store=request.query_params.get('store'),
+            device_id=request.query_params.get('device_id')
+        )
+        try:
+            results = list(ingestor.ingest_lines(request.stream or []))
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({'summary': summarize(results), 'results': results}, status=status.HTTP_200_OK)
+
+class NumberBlockViewSet(viewsets.ReadOnlyModelViewSet):
+    """Number blocks pre-fetched by offline POS devices"""
+    queryset = NumberBlock.objects.select_related('sequence')
+    serializer_class = NumberBlockSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = NumberBlock.objects.select_related('sequence')
+        # Admin managers (no store) see every device; everyone else only their store's
+        user = self.request.user
+        if user.store_id:
+            queryset = queryset.filter(store_id=user.store_id)
+        elif not is_manager(user):
+            return queryset.none()
+        device_id = self.request.query_params.get('device_id', None)
+        if device_id:
+            queryset = queryset.filter(device_id=device_id)
+        return queryset
+
+    def create(self, request):
+        """Reserve a new block of numbers for one of the caller's store's devices"""
+        if not request.user.store_id and not is_manager(request.user):
+            return Response({'error': 'Number blocks can only be reserved for a store'},
+                            status=status.HTTP_403_FORBIDDEN)
+        serializer = NumberBlockRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            block = reserve_device_block(
+                serializer.validated_data['kind'],
+                serializer.validated_data['device_id'],
+                serializer.validated_data['size'],
+                user=request.user,
+                store=request.user.store_id or None
+            )
+        except DeviceStoreError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except NumberingError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(NumberBlockSerializer(block).data, status=status.HTTP_201_CREATED)
+
+class StockMovementViewSet(viewsets.ReadOnlyModelViewSet):
+    """Stock ledger history plus manual adjustments and transfers"""
+    queryset = StockMovement.objects.all()
+    serializer_class = StockMovementSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-id',)  # the ledger is append-only, so id order is time order
+
+    def get_queryset(self):
+        queryset = StockMovement.objects.select_related('product')
+        product = self.request.query_params.get('product', None)
+        if product:
+            queryset = queryset.filter(product=product)
+        movement_type = self.request.query_params.get('movement_type', None)
+        if movement_type:
+            queryset = queryset.filter(movement_type=movement_type)
+        since = self.request.query_params.get('since', None)
+        if since:
+            queryset = queryset.filter(created_at__gte=since)
+        return queryset
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsManagerRole])
+    def adjust(self, request):
+        """Apply signed stock adjustments, e.g. after a stock count"""
+        serializer = StockAdjustmentSerializer(data=request.data.get('adjustments', []), many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        product_ids = {row['product'] for row in serializer.validated_data}
+        missing = product_ids - set(Product.objects.filter(pk__in=product_ids).values_list('id', flat=True))
+        if missing:
+            return Response({'error': f'Unknown product(s): {sorted(missing)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        movements = record_movements([
+            StockMovement(
+                product_id=row['product'], movement_type='adjustment', quantity=row['quantity'],
+                note=row['note'], created_by=request.user
+            )
+            for row in serializer.validated_data
+        ])
+        audit.record_request(request, 'stock.adjust', f'{len(movements)} product(s)',
+                             adjustments=[[row['product'], row['quantity']] for row in serializer.validated_data])
+        return Response(StockMovementSerializer(movements, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsManagerRole])
+    def transfer(self, request):
+        """Move stock between stores"""
+        serializer = StockTransferSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        stores = Store.objects.in_bulk([data['from_store'], data['to_store']])
+        if data['from_store'] not in stores or data['to_store'] not in stores:
+            return Response({'error': 'Unknown store'}, status=status.HTTP_400_BAD_REQUEST)
+        if not Product.objects.filter(pk=data['product']).exists():
+            return Response({'error': 'Unknown product'}, status=status.HTTP_400_BAD_REQUEST)
+
+        movements = record_movements(transfer_movements(
+            data['product'], data['quantity'], stores[data['from_store']], stores[data['to_store']],
+            user=request.user, note=data['note']
+        ))
+        audit.record_request(request, 'stock.transfer', f"product:{data['product']}", quantity=data['quantity'],
+                             from_store=data['from_store'], to_store=data['to_store'])
+        return Response(StockMovementSerializer(movements, many=True).data, status=status.HTTP_201_CREATED)
 
 class HardwareDeviceViewSet(viewsets.ModelViewSet):
     queryset = HardwareDevice.objects.all()
@@ -138,14 +423,8 @@ class CashierDashboardStatsViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
     def list(self, request):
-        today_transactions = Transaction.objects.filter(cashier=request.user, timestamp__date=date.today())
-        total_sales = today_transactions.aggregate(total=Sum('total'))['total'] or 0
-        transaction_count = today_transactions.count()
-        return Response({
-            'total_sales': total_sales,
-            'transaction_count': transaction_count,
-            'last_sync': OfflineTransaction.objects.filter(cashier=request.user).latest('timestamp').timestamp if OfflineTransaction.objects.filter(cashier=request.user).exists() else None
-        })
+        # Counters are maintained with each sale (see sales.py), so this is one indexed read
+        return Response(cashier_stats(request.user))
 
 class AdvertisementViewSet(viewsets.ModelViewSet):
     queryset = Advertisement.objects.filter(is_active=True)
@@ -165,6 +444,7 @@ class ManagerDashboardViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=['get'])
+    @cache_response(60, tags=[SALES, STORES, CUSTOMERS], stale_ttl=300)
     def dashboard_metrics(self, request):
         """Get main dashboard metrics"""
         try:
@@ -173,30 +453,14 @@ class ManagerDashboardViewSet(viewsets.ViewSet):
             week_ago = today - timedelta(days=7)
             month_ago = today - timedelta(days=30)
             
-            # Filter by store if specified
-            store_filter = {}
+            # Sales figures come from the DailyStoreSales rollup, not a Transaction scan
             selected_store = request.query_params.get('store', 'all')
-            if selected_store != 'all':
-                store_filter['store_id'] = selected_store
-
-            # Current period metrics
-            current_transactions = Transaction.objects.filter(
-                timestamp__date__gte=week_ago,
-                status__in=['completed', 'paid'],
-                **store_filter
-            )
-            
-            # Previous period for comparison
-            previous_transactions = Transaction.objects.filter(
-                timestamp__date__gte=month_ago,
-                timestamp__date__lt=week_ago,
-                status__in=['completed', 'paid'],
-                **store_filter
-            )
+            current = store_sales_summary(week_ago, store=selected_store)
+            previous = store_sales_summary(month_ago, week_ago - timedelta(days=1), store=selected_store)
 
             # Calculate metrics
-            total_sales = current_transactions.aggregate(total=Sum('total'))['total'] or 0
-            total_orders = current_transactions.count()
+            total_sales = current['sales']
+            total_orders = current['orders']
             active_stores = Store.objects.filter(status='active').count()
             total_customers = Customer.objects.count()
             
@@ -207,8 +471,8 @@ class ManagerDashboardViewSet(viewsets.ViewSet):
             avg_order_value = total_sales / max(total_orders, 1)
             
             # Calculate growth percentages
-            prev_sales = previous_transactions.aggregate(total=Sum('total'))['total'] or 1
-            prev_orders = previous_transactions.count() or 1
+            prev_sales = previous['sales'] or 1
+            prev_orders = previous['orders'] or 1
             
             sales_growth = ((total_sales - prev_sales) / prev_sales) * 100
             orders_growth = ((total_orders - prev_orders) / prev_orders) * 100
@@ -218,6 +482,7 @@ class ManagerDashboardViewSet(viewsets.ViewSet):
                 'totalOrders': total_orders,
                 'activeStores': active_stores,
                 'totalCustomers': total_customers,
+                'uniqueCustomers': current['customers'],
                 'conversionRate': round(conversion_rate, 1),
                 'avgOrderValue': round(float(avg_order_value), 2),
                 'salesGrowth': round(sales_growth, 1),
@@ -229,185 +494,115 @@ class ManagerDashboardViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=['get'])
     def notifications(self, request):
-        """Get system notifications"""
+        """Unread notifications from the outbox; ?after=<id> reads from a cursor instead of the read mark"""
         try:
-            notifications = []
-            
-            # Low stock alerts
-            low_stock_products = Product.objects.filter(
-                stock__lte=F('min_stock_level'),
-                is_active=True
-            )[:5]
-            
-            for product in low_stock_products:
-                notifications.append({
-                    'id': f'stock_{product.id}',
-                    'type': 'warning',
-                    'message': f'Low stock alert: {product.name} ({product.stock} remaining)',
-                    'time': 'Real-time',
-                    'priority': 'high' if product.stock == 0 else 'medium'
-                })
-            
-            # Recent high-performing stores
-            today = timezone.now().date()
-            high_performing_stores = Transaction.objects.filter(
-                timestamp__date=today,
-                status='completed'
-            ).values('store_id__name').annotate(
-                daily_sales=Sum('total')
-            ).filter(daily_sales__gt=1000)[:3]
-            
-            for store in high_performing_stores:
-                notifications.append({
-                    'id': f'performance_{store["store_id__name"]}',
-                    'type': 'success',
-                    'message': f'{store["store_id__name"]} exceeded daily target (${store["daily_sales"]:.0f})',
-                    'time': '1 hour ago',
-                    'priority': 'low'
-                })
-            
-            # System updates
-            notifications.append({
-                'id': 'system_update',
-                'type': 'info',
-                'message': 'System synchronized successfully',
-                'time': '5 min ago',
-                'priority': 'low'
-            })
-
-            return Response(notifications)
+            rows, cursor = unread_notifications(
+                request.user, after=request.query_params.get('after'),
+                limit=request.query_params.get('limit', NOTIFICATION_PAGE_SIZE)
+            )
+            response = Response([{
+                'id': notification.id,
+                'type': notification.level,
+                'message': notification.message,
+                'time': self._time_ago(notification.created_at),
+                'priority': notification.priority,
+                'created_at': notification.created_at,
+            } for notification in rows])
+            response['X-Notification-Cursor'] = cursor
+            return response
+        except ValueError:
+            return Response({'error': 'after and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'])
+    def mark_notifications_read(self, request):
+        """Mark notifications up to `up_to` (default: all) as read"""
+        try:
+            return Response({'last_read_id': mark_notifications_read(request.user, request.data.get('up_to'))})
+        except (TypeError, ValueError):
+            return Response({'error': 'up_to must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
     @action(detail=False, methods=['get'])
+    @cache_response(30, tags=[SALES, STORES, CUSTOMERS])
     def pending_approvals(self, request):
         """Get pending approvals"""
         try:
-            approvals = []
-            
-            # Pending returns
-            pending_returns = Return.objects.filter(status='pending')[:10]
-            for return_item in pending_returns:
-                approvals.append({
-                    'id': return_item.id,
-                    'type': 'Return',
-                    'amount': float(return_item.refund_amount),
-                    'store': return_item.original_transaction.store_id.name if return_item.original_transaction.store_id else 'Unknown',
-                    'time': self._time_ago(return_item.original_transaction.timestamp),
-                    'details': {
-                        'reason': return_item.reason,
-                        'transaction_id': return_item.original_transaction.receipt_number
-                    }
-                })
-            
-            # Large transactions needing approval (over $500)
-            large_transactions = Transaction.objects.filter(
-                total__gt=500,
-                status='pending_approval'
-            )[:5]
-            
-            for transaction in large_transactions:
-                approvals.append({
-                    'id': f'transaction_{transaction.id}',
-                    'type': 'Large Transaction',
-                    'amount': float(transaction.total),
-                    'store': transaction.store_id.name if transaction.store_id else 'Unknown',
-                    'time': self._time_ago(transaction.timestamp),
-                    'details': {
-                        'receipt_number': transaction.receipt_number,
-                        'customer': transaction.customer.name if transaction.customer else 'Walk-in'
-                    }
+            # First page of the approval queue (returns and large transactions)
+            requests, _ = approvals.page(
+                limit=15, types=[approvals.RETURN_APPROVAL, approvals.LARGE_TRANSACTION]
+            )
+            pending = []
+            for approval in requests:
+                is_return = approval.type == approvals.RETURN_APPROVAL
+                pending.append({
+                    'id': approval.target_id if is_return else f'transaction_{approval.target_id}',
+                    'approval_id': approval.id,
+                    'type': 'Return' if is_return else 'Large Transaction',
+                    'amount': float(approval.amount),
+                    'store': approval.store.name if approval.store else 'Unknown',
+                    'time': self._time_ago(approval.created_at),
+                    'details': approval.details
                 })
 
-            return Response(approvals)
+            return Response(pending)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=False, methods=['get'])
+    @cache_response(60, tags=[SALES], stale_ttl=300)
     def sales_data(self, request):
         """Get sales data for charts"""
         try:
             period = request.query_params.get('period', 'weekly')
-            store_filter = {}
             selected_store = request.query_params.get('store', 'all')
-            if selected_store != 'all':
-                store_filter['store_id'] = selected_store
 
+            # Columnar snapshot when its window covers the period: no query, buckets summed in NumPy
+            today = timezone.localdate()
             if period == 'weekly':
                 # Last 7 days
-                sales_data = []
-                for i in range(7):
-                    day = timezone.now().date() - timedelta(days=6-i)
-                    day_transactions = Transaction.objects.filter(
-                        timestamp__date=day,
-                        status='completed',
-                        **store_filter
-                    )
-                    
-                    daily_sales = day_transactions.aggregate(total=Sum('total'))['total'] or 0
-                    daily_orders = day_transactions.count()
-                    
-                    sales_data.append({
-                        'name': day.strftime('%a'),
-                        'sales': float(daily_sales),
-                        'orders': daily_orders,
-                        'date': day.isoformat()
-                    })
+                granularity, start, label = 'day', today - timedelta(days=6), '%a'
             else:  # monthly
-                # Last 12 months
-                sales_data = []
-                for i in range(12):
-                    month_start = (timezone.now().replace(day=1) - timedelta(days=30*i)).replace(day=1)
-                    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-                    
-                    month_transactions = Transaction.objects.filter(
-                        timestamp__date__gte=month_start,
-                        timestamp__date__lte=month_end,
-                        status='completed',
-                        **store_filter
-                    )
-                    
-                    monthly_sales = month_transactions.aggregate(total=Sum('total'))['total'] or 0
-                    monthly_orders = month_transactions.count()
-                    
-                    sales_data.append({
-                        'name': month_start.strftime('%b'),
-                        'sales': float(monthly_sales),
-                        'orders': monthly_orders,
-                        'date': month_start.isoformat()
-                    })
-                
-                sales_data.reverse()  # Show chronological order
+                # Last 12 calendar months
+                start = today.replace(day=1)
+                for _ in range(11):
+                    start = (start - timedelta(days=1)).replace(day=1)
+                granularity, label = 'month', '%b'
+            series = analytics.source(start).series(granularity, start, today, selected_store, ['completed'])
+
+            sales_data = [{
+                'name': point['bucket'].strftime(label),
+                'sales': float(point['sales']),
+                'orders': point['orders'],
+                'date': point['bucket'].isoformat()
+            } for point in series]
 
             return Response(sales_data)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=False, methods=['get'])
+    @cache_response(60, tags=[SALES, STORES], stale_ttl=300)
     def store_performance(self, request):
         """Get store performance data"""
         try:
             # Get sales by store for the last 30 days
             thirty_days_ago = timezone.now().date() - timedelta(days=30)
             
-            store_sales = Transaction.objects.filter(
-                timestamp__date__gte=thirty_days_ago,
-                status='completed'
-            ).values('store_id__name').annotate(
-                total_sales=Sum('total')
-            ).order_by('-total_sales')
-
-            total_all_stores = sum(store['total_sales'] for store in store_sales)
+            store_sales = analytics.source(thirty_days_ago).by_store(thirty_days_ago, statuses=['completed'])
+            names = dict(Store.objects.filter(pk__in=[pk for pk, _ in store_sales[:6]]).values_list('id', 'name'))
+
+            total_all_stores = sum(total for _, total in store_sales)
             
             colors = ['#FF6B35', '#3498DB', '#27AE60', '#F39C12', '#8B5CF6', '#E74C3C']
             performance_data = []
             
-            for i, store in enumerate(store_sales[:6]):  # Top 6 stores
-                percentage = (store['total_sales'] / max(total_all_stores, 1)) * 100
+            for i, (store_id, total_sales) in enumerate(store_sales[:6]):  # Top 6 stores
+                percentage = (total_sales / max(total_all_stores, 1)) * 100
                 performance_data.append({
-                    'name': store['store_id__name'] or f'Store #{i+1}',
+                    'name': names.get(store_id) or f'Store #{i+1}',
                     'value': round(percentage, 1),
-                    'sales': float(store['total_sales']),
+                    'sales': total_sales,
                     'color': colors[i % len(colors)]
                 })
 
@@ -416,6 +611,7 @@ class ManagerDashboardViewSet(viewsets.ViewSet):
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=False, methods=['get'])
+    @cache_response(30, tags=[CATALOG, INVENTORY])
     def inventory_alerts(self, request):
         """Get inventory alerts"""
         try:
@@ -423,7 +619,7 @@ class ManagerDashboardViewSet(viewsets.ViewSet):
             low_stock_products = Product.objects.filter(
                 Q(stock__lte=F('min_stock_level')) | Q(stock__lt=10),
                 is_active=True
-            ).order_by('stock')[:10]
+            ).select_related('category', 'reorder_suggestion').order_by('stock')[:10]
 
             alerts = []
             for product in low_stock_products:
@@ -433,7 +629,7 @@ class ManagerDashboardViewSet(viewsets.ViewSet):
                     'product': product.name,
                     'sku': product.sku,
                     'stock': product.stock,
-                    'reorder': product.min_stock_level or 20,
+                    'reorder': self._reorder_quantity(product),
                     'status': status_level,
                     'category': product.category.name if product.category else 'Uncategorized'
                 })
@@ -443,91 +639,73 @@ class ManagerDashboardViewSet(viewsets.ViewSet):
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=False, methods=['get'])
+    @cache_response(30, tags=[SALES, STORES, CUSTOMERS])
     def recent_orders(self, request):
         """Get recent orders"""
         try:
-            recent_orders = Transaction.objects.filter(
-                status__in=['completed', 'pending', 'processing']
+            recent_orders = ActivityEvent.objects.filter(
+                kind=activity.TRANSACTION, status__in=['completed', 'pending', 'processing']
             ).order_by('-timestamp')[:10]
 
             orders_data = []
             for order in recent_orders:
                 orders_data.append({
-                    'id': order.receipt_number,
-                    'customer': order.customer.name if order.customer else 'Walk-in Customer',
-                    'amount': float(order.total),
+                    'id': order.reference,
+                    'customer': order.customer_name or 'Walk-in Customer',
+                    'amount': float(order.amount),
                     'status': order.status,
-                    'store': order.store_id.name if order.store_id else 'Unknown Store',
+                    'store': order.store_name or 'Unknown Store',
                     'timestamp': order.timestamp.isoformat(),
                     'time_ago': self._time_ago(order.timestamp),
-                    'items_count': order.transactionitem_set.count()
+                    'items_count': order.items_count
                 })
 
             return Response(orders_data)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    @action(detail=False, methods=['post'])
-    def approve_request(self, request, pk=None):
-        """Approve a pending request"""
+    def _find_approval(self, data):
+        """The pending ApprovalRequest named by approval_id, or by the widget's type and id"""
+        if data.get('approval_id'):
+            return ApprovalRequest.objects.filter(pk=data['approval_id'], status='pending').first()
+        request_type, request_id = data.get('type'), str(data.get('id', ''))
+        if request_type == 'Return':
+            return approvals.find_pending(approvals.RETURN_APPROVAL, int(request_id))
+        if request_type == 'Large Transaction':
+            return approvals.find_pending(approvals.LARGE_TRANSACTION, int(request_id.replace('transaction_', '')))
+        raise approvals.ApprovalError('Invalid request type')
+
+    def _resolve(self, request, decision):
         try:
-            request_id = request.data.get('id')
-            request_type = request.data.get('type')
-            
-            if request_type == 'Return':
-                return_item = Return.objects.get(id=request_id)
-                return_item.status = 'approved'
-                return_item.processed_by = request.user
-                return_item.save()
-                
-                # Update product stock
-                for item in return_item.original_transaction.transactionitem_set.all():
-                    if item.product:
-                        item.product.stock += item.quantity
-                        item.product.save()
-                
-                return Response({'message': 'Return approved successfully'})
-            
-            elif request_type == 'Large Transaction':
-                transaction_id = request_id.replace('transaction_', '')
-                transaction = Transaction.objects.get(id=transaction_id)
-                transaction.status = 'completed'
-                transaction.save()
-                
-                return Response({'message': 'Transaction approved successfully'})
-            
-            return Response({'error': 'Invalid request type'}, status=status.HTTP_400_BAD_REQUEST)
-            
+            approval = self._find_approval(request.data)
+            if approval is None:
+                return Response({'error': 'No pending request found'}, status=status.HTTP_404_NOT_FOUND)
+            approvals.resolve([approval.pk], decision, request.user, comment=request.data.get('comment', ''))
+            audit.record_request(request, f'approval.{approvals.DECISIONS[decision]}', f'approval:{approval.pk}',
+                                 type=approval.type, target_id=approval.target_id)
+            label = 'Return' if approval.type == approvals.RETURN_APPROVAL else 'Transaction'
+            return Response({'message': f'{label} {approvals.DECISIONS[decision]} successfully'})
+        except (approvals.ApprovalError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'])
+    def approve_request(self, request, pk=None):
+        """Approve a pending request"""
+        return self._resolve(request, 'approve')
+
     @action(detail=False, methods=['post'])
     def reject_request(self, request, pk=None):
         """Reject a pending request"""
+        return self._resolve(request, 'reject')
+
+    def _reorder_quantity(self, product):
+        """Forecast reorder quantity when forecast_demand has run, else the old rule of thumb"""
         try:
-            request_id = request.data.get('id')
-            request_type = request.data.get('type')
-            
-            if request_type == 'Return':
-                return_item = Return.objects.get(id=request_id)
-                return_item.status = 'rejected'
-                return_item.processed_by = request.user
-                return_item.save()
-                
-                return Response({'message': 'Return rejected successfully'})
-            
-            elif request_type == 'Large Transaction':
-                transaction_id = request_id.replace('transaction_', '')
-                transaction = Transaction.objects.get(id=transaction_id)
-                transaction.status = 'cancelled'
-                transaction.save()
-                
-                return Response({'message': 'Transaction rejected successfully'})
-            
-            return Response({'error': 'Invalid request type'}, status=status.HTTP_400_BAD_REQUEST)
-            
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return product.reorder_suggestion.reorder_quantity
+        except ReorderSuggestion.DoesNotExist:
+            return product.min_stock_level or 20
 
     def _time_ago(self, timestamp):
         """Helper method to calculate time ago"""
@@ -555,6 +733,7 @@ class RealTimeDataViewSet(viewsets.ViewSet):
     permission_classes = []  # Allow public access for real-time updates
 
     @action(detail=False, methods=['get'])
+    @cache_response(30, tags=[CATALOG, INVENTORY])
     def product_updates(self, request):
         """Get real-time product updates"""
         try:
@@ -594,6 +773,7 @@ class RealTimeDataViewSet(viewsets.ViewSet):
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=False, methods=['get'])
+    @cache_response(300, tags=[CATALOG])
     def category_updates(self, request):
         """Get real-time category updates"""
         try:
@@ -620,6 +800,7 @@ class RealTimeDataViewSet(viewsets.ViewSet):
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=False, methods=['get'])
+    @cache_response(30, tags=[CATALOG, INVENTORY])
     def inventory_status(self, request):
         """Get real-time inventory status"""
         try:
@@ -658,17 +839,15 @@ class PaymentViewSet(viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-created_at', '-id')
     
-    def create(self, request, *args, **kwargs):
-        """Create a new payment"""
-        import uuid
-        
-        # Generate unique reference number
-        reference_number = f"PAY-{uuid.uuid4().hex[:8].upper()}"
-        request.data['reference_number'] = reference_number
-        request.data['processed_by'] = request.user.id
-        
-        return super().create(request, *args, **kwargs)
+    def perform_create(self, serializer):
+        """Create a new payment with a block-allocated reference number"""
+        serializer.save(
+            reference_number=next_number('payment'),
+            processed_by=self.request.user
+        )
     
     @action(detail=True, methods=['post'])
     def process_payment(self, request, pk=None):
@@ -688,8 +867,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
             
             # Update transaction status based on payment status
             if new_status == 'completed':
-                payment.transaction.status = 'completed'
-                payment.transaction.save()
+                change_status(payment.transaction, 'completed')
             
             return Response(PaymentSerializer(payment).data)
             
@@ -715,17 +893,15 @@ class DeliveryViewSet(viewsets.ModelViewSet):
     queryset = Delivery.objects.all()
     serializer_class = DeliverySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-created_at', '-id')
     
-    def create(self, request, *args, **kwargs):
-        """Create a new delivery"""
-        import uuid
-        
-        # Generate unique tracking number
-        tracking_number = f"TRK-{uuid.uuid4().hex[:8].upper()}"
-        request.data['tracking_number'] = tracking_number
-        request.data['updated_by'] = request.user.id
-        
-        return super().create(request, *args, **kwargs)
+    def perform_create(self, serializer):
+        """Create a new delivery with a block-allocated tracking number"""
+        serializer.save(
+            tracking_number=next_number('tracking'),
+            updated_by=self.request.user
+        )
     
     def get_queryset(self):
         queryset = Delivery.objects.all()
@@ -789,6 +965,8 @@ class DeliveryUpdateViewSet(viewsets.ModelViewSet):
     queryset = DeliveryUpdate.objects.all()
     serializer_class = DeliveryUpdateSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-id',)
     
     def perform_create(self, serializer):
         serializer.save(updated_by=self.request.user)
\ No newline at end of file
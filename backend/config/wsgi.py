@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Autocomplete answers from memory; build its index before the first keystroke
+from cashierdashboard.suggest import warm_in_background  # noqa: E402
+
+warm_in_background()
@@ -4,7 +4,7 @@ from .views import (
     CustomerCategoryViewSet, CustomerSubCategoryViewSet, CustomerProductViewSet,
     CustomerAdvertisementViewSet, CustomerProfileViewSet, CustomerOrderViewSet,
     CustomerSearchViewSet, CustomerNotificationViewSet, CustomerStoreViewSet,
-    CustomerPaymentViewSet, CustomerDeliveryViewSet
+    CustomerPaymentViewSet, CustomerDeliveryViewSet, CustomerSuggestViewSet
 )
 
 router = DefaultRouter()
@@ -15,6 +15,7 @@ router.register(r'advertisements', CustomerAdvertisementViewSet)
 router.register(r'profile', CustomerProfileViewSet, basename='customer-profile')
 router.register(r'orders', CustomerOrderViewSet, basename='customer-orders')
 router.register(r'search', CustomerSearchViewSet, basename='customer-search')
+router.register(r'suggest', CustomerSuggestViewSet, basename='customer-suggest')
 router.register(r'notifications', CustomerNotificationViewSet, basename='customer-notifications')
 router.register(r'stores', CustomerStoreViewSet)
 router.register(r'payments', CustomerPaymentViewSet, basename='customer-payments')
@@ -16,6 +16,12 @@ from cashierdashboard.serializers import (
     AdvertisementSerializer, CustomerSerializer, TransactionSerializer,
     PaymentSerializer, DeliverySerializer, DeliveryUpdateSerializer
 )
+from cashierdashboard.numbering import next_number
+from cashierdashboard import segmentation
+from cashierdashboard.search import search_products
+from cashierdashboard.facets import facet_counts
+from cashierdashboard.pagination import KeysetPagination, paginate
+from cashierdashboard.suggest import suggester
 from member.models import CustomUser
 from member.serializers import CustomerProfileSerializer
 
@@ -53,19 +59,19 @@ class CustomerProductViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Product.objects.filter(is_active=True, stock__gt=0)
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]  # Allow guest browsing
+    pagination_class = KeysetPagination
+    
+    def get_keyset(self):
+        # Search results keep their relevance order, paged by offset
+        return None if self.request.query_params.get('search') else ('-id',)
     
     def get_queryset(self):
-        queryset = Product.objects.filter(is_active=True)
+        queryset = Product.objects.filter(is_active=True).select_related('category', 'subcategory').order_by('-id')
         
-        # Search functionality
+        # Search functionality: one ranked full-text query, best match first
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search) |
-                Q(category__name__icontains=search) |
-                Q(subcategory__name__icontains=search)
-            )
+            queryset = search_products(queryset, search)
         
         # Category filter
         category = self.request.query_params.get('category', None)
@@ -90,7 +96,14 @@ class CustomerProductViewSet(viewsets.ReadOnlyModelViewSet):
         if in_stock_only == 'true':
             queryset = queryset.filter(stock__gt=0)
             
-        return queryset.order_by('-id')
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        """Products; with ?facets=true, also their counts per category, subcategory, price and stock"""
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get('facets') == 'true':
+            response.data['facets'] = facet_counts(self.filter_queryset(self.get_queryset()))
+        return response
 
 class CustomerAdvertisementViewSet(viewsets.ReadOnlyModelViewSet):
     """Read-only advertisements for customers"""
@@ -123,6 +136,15 @@ class CustomerProfileViewSet(viewsets.ViewSet):
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['get'])
+    def segment(self, request):
+        """Get the customer's RFM segment"""
+        if request.user.role != 'customer':
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        customer = Customer.objects.filter(email=request.user.email).values_list('id', flat=True).first()
+        return Response(segmentation.segment_of(customer))
 
 class CustomerOrderViewSet(viewsets.ViewSet):
     """Customer order management"""
@@ -136,7 +158,10 @@ class CustomerOrderViewSet(viewsets.ViewSet):
         # Get customer record
         try:
             customer = Customer.objects.get(email=request.user.email)
-            transactions = Transaction.objects.filter(customer=customer).order_by('-timestamp')
+            transactions, next_cursor = paginate(
+                Transaction.objects.filter(customer=customer), request.query_params.get('cursor'),
+                request.query_params.get('limit'), keyset=('-timestamp', '-id')
+            )
             
             orders_data = []
             for transaction in transactions:
@@ -158,10 +183,10 @@ class CustomerOrderViewSet(viewsets.ViewSet):
                     ]
                 })
             
-            return Response({'orders': orders_data})
+            return Response({'orders': orders_data, 'next': next_cursor})
             
         except Customer.DoesNotExist:
-            return Response({'orders': []})
+            return Response({'orders': [], 'next': None})
     
     def retrieve(self, request, pk=None):
         """Get specific order details"""
@@ -212,24 +237,35 @@ class CustomerSearchViewSet(viewsets.ViewSet):
                 'total_results': 0
             })
         
-        # Search products
-        products = Product.objects.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query),
-            is_active=True
-        )[:20]  # Limit results
+        # Search products, ranked by the full-text index
+        products = list(search_products(
+            Product.objects.filter(is_active=True).select_related('category', 'subcategory'), query
+        )[:20])  # Limit results
         
         # Search categories
-        categories = Category.objects.filter(
+        categories = list(Category.objects.filter(
             name__icontains=query
-        )[:10]  # Limit results
+        )[:10])  # Limit results
         
         return Response({
             'products': ProductSerializer(products, many=True).data,
             'categories': CategorySerializer(categories, many=True).data,
-            'total_results': products.count() + categories.count()
+            'total_results': len(products) + len(categories)
         })
 
+class CustomerSuggestViewSet(viewsets.ViewSet):
+    """Search-box autocomplete from the in-memory index"""
+    permission_classes = [AllowAny]  # Allow guest searching
+    throttle_classes = []  # one request per keystroke
+    
+    def list(self, request):
+        """Top suggestions for ?q= (typo-tolerant), at most ?limit="""
+        try:
+            limit = int(request.query_params.get('limit', 8))
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'suggestions': suggester.suggest(request.query_params.get('q', ''), limit)})
+
 class CustomerNotificationViewSet(viewsets.ViewSet):
     """Customer notifications (placeholder for future implementation)"""
     permission_classes = [IsAuthenticated]
@@ -281,14 +317,18 @@ class CustomerPaymentViewSet(viewsets.ViewSet):
             # Get customer record
             customer = Customer.objects.get(email=request.user.email)
             transactions = Transaction.objects.filter(customer=customer)
-            payments = Payment.objects.filter(transaction__in=transactions).order_by('-created_at')
+            payments, next_cursor = paginate(
+                Payment.objects.filter(transaction__in=transactions), request.query_params.get('cursor'),
+                request.query_params.get('limit'), keyset=('-created_at', '-id')
+            )
             
             return Response({
-                'payments': PaymentSerializer(payments, many=True).data
+                'payments': PaymentSerializer(payments, many=True).data,
+                'next': next_cursor
             })
             
         except Customer.DoesNotExist:
-            return Response({'payments': []})
+            return Response({'payments': [], 'next': None})
     
     def create(self, request):
         """Create a payment for an order"""
@@ -313,18 +353,16 @@ class CustomerPaymentViewSet(viewsets.ViewSet):
                               status=status.HTTP_400_BAD_REQUEST)
             
             # Create payment
-            import uuid
             payment_data = {
                 'transaction': transaction.id,
                 'payment_method': payment_method,
                 'amount': transaction.total,
-                'reference_number': f"PAY-{uuid.uuid4().hex[:8].upper()}",
                 'status': 'pending'
             }
             
             serializer = PaymentSerializer(data=payment_data)
             if serializer.is_valid():
-                payment = serializer.save()
+                payment = serializer.save(reference_number=next_number('payment'))
                 return Response(PaymentSerializer(payment).data, status=status.HTTP_201_CREATED)
             else:
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -364,14 +402,18 @@ class CustomerDeliveryViewSet(viewsets.ViewSet):
             # Get customer record
             customer = Customer.objects.get(email=request.user.email)
             transactions = Transaction.objects.filter(customer=customer)
-            deliveries = Delivery.objects.filter(transaction__in=transactions).order_by('-created_at')
+            deliveries, next_cursor = paginate(
+                Delivery.objects.filter(transaction__in=transactions), request.query_params.get('cursor'),
+                request.query_params.get('limit'), keyset=('-created_at', '-id')
+            )
             
             return Response({
-                'deliveries': DeliverySerializer(deliveries, many=True).data
+                'deliveries': DeliverySerializer(deliveries, many=True).data,
+                'next': next_cursor
             })
             
         except Customer.DoesNotExist:
-            return Response({'deliveries': []})
+            return Response({'deliveries': [], 'next': None})
     
     def retrieve(self, request, pk=None):
         """Get specific delivery details"""
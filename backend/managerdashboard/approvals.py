@@ -0,0 +1,202 @@
+"""
+Manager approval queue.
+
+Everything that needs a manager's sign-off (returns, large transactions,
+voids, ...) is an ApprovalRequest row carrying the fields the queue
+displays. Pending requests are read through the (store|manager, status,
+created_at) indexes with keyset pagination, so a page costs the same
+however much history the table holds. resolve() approves or rejects any
+number of requests in one database transaction and applies their side
+effects with set-based updates grouped by request type.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from cashierdashboard import activity
+from cashierdashboard.caching import invalidate_tags, SALES
+from cashierdashboard.inventory import record_movements, return_movements
+from cashierdashboard.models import Transaction, TransactionItem, Return
+from cashierdashboard.sales import change_statuses
+from .models import ApprovalRequest
+
+LARGE_TRANSACTION_THRESHOLD = getattr(settings, 'LARGE_TRANSACTION_THRESHOLD', 500)
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+RETURN_APPROVAL = 'return_approval'
+LARGE_TRANSACTION = 'large_transaction'
+TRANSACTION_VOID = 'transaction_void'
+
+APPROVED, REJECTED = 'approved', 'rejected'
+DECISIONS = {'approve': APPROVED, 'approved': APPROVED, 'reject': REJECTED, 'rejected': REJECTED}
+
+
+class ApprovalError(Exception):
+    """Raised for an unknown decision or malformed cursor"""
+
+
+def _open(requests):
+    # The partial unique constraint keeps one pending request per target
+    ApprovalRequest.objects.bulk_create(requests, ignore_conflicts=True)
+    invalidate_tags(SALES)
+
+
+def request_return(ret, requestor=None):
+    """Queue a pending Return for approval"""
+    original = ret.original_transaction
+    _open([ApprovalRequest(
+        type=RETURN_APPROVAL, target_id=ret.pk, requestor=requestor, store_id=original.store_id_id,
+        amount=ret.refund_amount, details={'reason': ret.reason, 'transaction_id': original.receipt_number},
+    )])
+
+
+def request_transactions(sales, requestor=None):
+    """Queue the sales that are waiting for approval above the large-transaction threshold"""
+    sales = [sale for sale in sales if sale.status == 'pending_approval' and sale.total > LARGE_TRANSACTION_THRESHOLD]
+    if not sales:
+        return
+    customers = dict(Transaction.objects.filter(pk__in=[sale.pk for sale in sales], customer__isnull=False)
+                     .values_list('id', 'customer__name'))
+    _open([
+        ApprovalRequest(
+            type=LARGE_TRANSACTION, target_id=sale.pk, requestor_id=getattr(requestor, 'pk', None) or sale.cashier_id,
+            store_id=sale.store_id_id,
+            amount=sale.total, details={'receipt_number': sale.receipt_number, 'customer': customers.get(sale.pk, 'Walk-in')},
+        )
+        for sale in sales
+    ])
+
+
+def find_pending(request_type, target_id):
+    """
+    The open request for a target, or None. A pending Return or large
+    transaction written without going through the API (admin, shell) gets
+    its request opened here.
+    """
+    found = ApprovalRequest.objects.filter(type=request_type, target_id=target_id, status='pending').first()
+    if found is None and request_type == RETURN_APPROVAL:
+        ret = Return.objects.filter(pk=target_id, status='pending').select_related('original_transaction').first()
+        if ret:
+            request_return(ret)
+    elif found is None and request_type == LARGE_TRANSACTION:
+        request_transactions(Transaction.objects.filter(pk=target_id))
+    else:
+        return found
+    return ApprovalRequest.objects.filter(type=request_type, target_id=target_id, status='pending').first()
+
+
+# ---- reading the queue ----
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_cursor(row, field='created_at'):
+    """URL-safe keyset cursor: microseconds since the epoch and id of the last row on a page"""
+    return f'{(getattr(row, field) - EPOCH) // timedelta(microseconds=1)}_{row.pk}'
+
+
+def decode_cursor(cursor):
+    try:
+        micros, pk = cursor.split('_')
+        return EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except ValueError:
+        raise ApprovalError('Invalid cursor')
+
+
+def page(status='pending', store=None, manager=None, cursor=None, limit=PAGE_SIZE, types=None):
+    """
+    One page of requests in `status`, newest first, for a store or for the
+    manager who resolved them. Returns (rows, next_cursor); next_cursor is
+    None on the last page.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    rows = ApprovalRequest.objects.filter(status=status)
+    if store:
+        rows = rows.filter(store_id=store)
+    if manager:
+        rows = rows.filter(manager=manager)
+    if types:
+        rows = rows.filter(type__in=types)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        # The leading created_at bound lets the index range-scan; the OR breaks ties on id
+        rows = rows.filter(Q(created_at__lte=created_at), Q(created_at__lt=created_at) | Q(id__lt=pk))
+    rows = list(rows.select_related('store', 'requestor', 'manager').order_by('-created_at', '-id')[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+# ---- resolving ----
+
+def _resolve_returns(return_ids, decision, manager):
+    returns = list(Return.objects.filter(pk__in=return_ids, status='pending').select_related('original_transaction__store_id'))
+    if not returns:
+        return
+    ids = [ret.pk for ret in returns]
+    Return.objects.filter(pk__in=ids).update(status=decision, processed_by=manager)
+    activity.set_statuses(activity.RETURN, ids, decision)
+    if decision != APPROVED:
+        return
+
+    # Every approved return's items go back into stock through one ledger write
+    items = {}
+    for item in TransactionItem.objects.filter(
+        transaction_id__in={ret.original_transaction_id for ret in returns}
+    ).only('transaction_id', 'product_id', 'quantity'):
+        items.setdefault(item.transaction_id, []).append(item)
+    movements = []
+    for ret in returns:
+        original = ret.original_transaction
+        movements += return_movements(items.get(original.pk, []), store=original.store_id,
+                                      reference=f'return:{ret.pk}', user=manager)
+    record_movements(movements)
+
+
+def _transaction_resolver(approved_status, rejected_status, from_statuses):
+    def resolve_transactions(transaction_ids, decision, manager):
+        new_status = approved_status if decision == APPROVED else rejected_status
+        if new_status:
+            change_statuses(Transaction.objects.filter(pk__in=transaction_ids, status__in=from_statuses), new_status)
+    return resolve_transactions
+
+
+SIDE_EFFECTS = {
+    RETURN_APPROVAL: _resolve_returns,
+    LARGE_TRANSACTION: _transaction_resolver('completed', 'cancelled', ['pending_approval']),
+    TRANSACTION_VOID: _transaction_resolver('voided', None, ['completed', 'paid', 'pending', 'processing']),
+}
+
+
+def resolve(request_ids, decision, manager, comment='', store=None):
+    """
+    Approve or reject pending requests (ids not pending, or outside
+    `store`, are skipped) and apply their side effects atomically.
+    Returns the ids that were resolved.
+    """
+    if decision not in DECISIONS:
+        raise ApprovalError("decision must be 'approve' or 'reject'")
+    decision = DECISIONS[decision]
+
+    with db_transaction.atomic():
+        claimed = ApprovalRequest.objects.select_for_update().filter(pk__in=request_ids, status='pending')
+        if store:
+            claimed = claimed.filter(store_id=store)
+        claimed = list(claimed.values_list('id', 'type', 'target_id'))
+        if not claimed:
+            return []
+        ApprovalRequest.objects.filter(pk__in=[pk for pk, _, _ in claimed]).update(
+            status=decision, manager=manager, comment=comment, resolved_at=timezone.now()
+        )
+        targets = {}
+        for _, request_type, target_id in claimed:
+            targets.setdefault(request_type, []).append(target_id)
+        for request_type, target_ids in targets.items():
+            side_effect = SIDE_EFFECTS.get(request_type)
+            if side_effect:
+                side_effect(target_ids, decision, manager)
+        invalidate_tags(SALES)
+    return [pk for pk, _, _ in claimed]
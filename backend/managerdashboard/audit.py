@@ -0,0 +1,238 @@
+"""
+Audit trail for manager actions.
+
+record() never touches the database on the request path. Entries are
+queued when the surrounding database transaction commits (an action that
+rolls back is not audited) into a per-process AuditBuffer, which writes
+them with one bulk_create when AUDIT_BUFFER_SIZE entries are waiting,
+every AUDIT_FLUSH_INTERVAL seconds from a daemon thread, and at process
+exit.
+
+AuditLog holds the recent months and is indexed for the questions asked
+of it: by user, by action type and by time range. compact() is the
+retention job (manage.py compact_audit_log): each month older than
+AUDIT_HOT_MONTHS is folded into one gzipped AuditArchive row per user and
+action type and deleted from AuditLog with a single range DELETE, and
+archives older than AUDIT_RETENTION_MONTHS are dropped.
+"""
+import atexit
+import gzip
+import json
+import logging
+import threading
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.db import connection, transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .approvals import ApprovalError, encode_cursor, decode_cursor
+from .models import AuditLog, AuditArchive
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = getattr(settings, 'AUDIT_BUFFER_SIZE', 200)
+FLUSH_INTERVAL = getattr(settings, 'AUDIT_FLUSH_INTERVAL', 2.0)
+MAX_PENDING = getattr(settings, 'AUDIT_MAX_PENDING', 10000)
+HOT_MONTHS = getattr(settings, 'AUDIT_HOT_MONTHS', 3)
+RETENTION_MONTHS = getattr(settings, 'AUDIT_RETENTION_MONTHS', 24)
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class AuditBuffer:
+    """Collects AuditLog rows and writes them in batches"""
+
+    def __init__(self, size=BUFFER_SIZE, interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.size = size
+        self.interval = interval
+        self.max_pending = max_pending
+        self._entries = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            full = len(self._entries) >= self.size
+        if not self.interval:
+            if full:
+                self.flush()
+            return
+        self._start()
+        if full:
+            self._wake.set()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def flush(self):
+        """Write everything queued so far; returns the number of rows written"""
+        with self._lock:
+            entries, self._entries = self._entries, []
+        if not entries:
+            return 0
+        try:
+            AuditLog.objects.bulk_create(entries, batch_size=self.size)
+        except Exception:
+            logger.exception('Writing %d audit entries failed; keeping them for the next flush', len(entries))
+            with self._lock:
+                # Oldest entries go first if the database stays unavailable
+                self._entries = (entries + self._entries)[-self.max_pending:]
+            return 0
+        return len(entries)
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='audit-flush', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            finally:
+                # This thread's connection is not managed by the request cycle
+                connection.close()
+
+
+buffer = AuditBuffer()
+atexit.register(lambda: buffer.flush())
+
+
+def record(user, action_type, target='', metadata=None, source_ip=None):
+    """Queue an audit entry; it is written once the current transaction commits"""
+    if user is None or not user.is_authenticated:
+        return
+    entry = AuditLog(
+        user_id=user.pk, action_type=action_type, target=str(target)[:100],
+        metadata=metadata or {}, timestamp=timezone.now(), source_ip=source_ip,
+    )
+    db_transaction.on_commit(lambda: buffer.add(entry))
+
+
+def record_request(request, action_type, target='', **metadata):
+    """record() for the user and client address of a DRF request"""
+    record(request.user, action_type, target, metadata, request.META.get('REMOTE_ADDR'))
+
+
+# ---- queries ----
+
+class AuditQueryError(ValueError):
+    """A search parameter that cannot be used: bad cursor, limit or user id"""
+
+
+def _number(value, name):
+    try:
+        return int(getattr(value, 'pk', value))
+    except (TypeError, ValueError):
+        raise AuditQueryError(f'Invalid {name}')
+
+
+def search(user=None, action_type=None, start=None, end=None, cursor=None, limit=PAGE_SIZE, store=None):
+    """
+    Recent (uncompacted) entries newest first, filtered by user, action
+    type and [start, end) time range; with `store`, only entries by that
+    store's users. Returns (rows, next_cursor).
+    """
+    limit = max(1, min(_number(limit, 'limit'), MAX_PAGE_SIZE))
+    rows = AuditLog.objects.all()
+    if store:
+        rows = rows.filter(user__store_id=store)
+    if user:
+        rows = rows.filter(user_id=_number(user, 'user'))
+    if action_type:
+        rows = rows.filter(action_type=action_type)
+    if start:
+        rows = rows.filter(timestamp__gte=start)
+    if end:
+        rows = rows.filter(timestamp__lt=end)
+    if cursor:
+        try:
+            moment, pk = decode_cursor(cursor)
+        except ApprovalError:
+            raise AuditQueryError('Invalid cursor')
+        rows = rows.filter(Q(timestamp__lte=moment), Q(timestamp__lt=moment) | Q(id__lt=pk))
+    rows = list(rows.select_related('user').order_by('-timestamp', '-id')[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1], 'timestamp') if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def archived_entries(archive):
+    """Decompressed entries of an AuditArchive row, oldest first"""
+    return [json.loads(line) for line in gzip.decompress(bytes(archive.entries)).decode().splitlines()]
+
+
+# ---- retention ----
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _aware(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _archive(month, user_id, action_type, rows):
+    payload = '\n'.join(json.dumps({
+        'id': pk, 'target': target, 'metadata': metadata, 'timestamp': timestamp.isoformat(), 'source_ip': source_ip,
+    }) for pk, _, _, target, metadata, timestamp, source_ip in rows)
+    return AuditArchive(
+        month=month, user_id=user_id, action_type=action_type, count=len(rows),
+        first_at=rows[0][5], last_at=rows[-1][5], entries=gzip.compress(payload.encode()),
+    )
+
+
+def compact_month(month):
+    """Fold one month of AuditLog into AuditArchive rows and delete it; returns the number of rows moved"""
+    start, end = _aware(month), _aware(add_months(month, 1))
+    moved = 0
+    with db_transaction.atomic():
+        rows = AuditLog.objects.filter(timestamp__gte=start, timestamp__lt=end).order_by(
+            'user_id', 'action_type', 'timestamp', 'id'
+        ).values_list('id', 'user_id', 'action_type', 'target', 'metadata', 'timestamp', 'source_ip')
+        archives, group, key = [], [], None
+        for row in rows.iterator(chunk_size=2000):
+            if (row[1], row[2]) != key and group:
+                archives.append(_archive(month, key[0], key[1], group))
+                group = []
+            key = (row[1], row[2])
+            group.append(row)
+            moved += 1
+        if group:
+            archives.append(_archive(month, key[0], key[1], group))
+        AuditArchive.objects.bulk_create(archives, batch_size=500)
+        AuditLog.objects.filter(timestamp__gte=start, timestamp__lt=end).delete()
+    return moved
+
+
+def compact(hot_months=None, retention_months=None, today=None):
+    """
+    Compact every month older than the hot window and drop archives past
+    retention. Returns (rows_compacted, archives_dropped).
+    """
+    current = month_start(today or timezone.localdate())
+    cutoff = add_months(current, -(hot_months or HOT_MONTHS))
+    oldest = AuditLog.objects.filter(timestamp__lt=_aware(cutoff)).order_by('timestamp').values_list(
+        'timestamp', flat=True
+    ).first()
+    moved = 0
+    month = month_start(timezone.localdate(oldest)) if oldest else cutoff
+    while month < cutoff:
+        moved += compact_month(month)
+        month = add_months(month, 1)
+    dropped = AuditArchive.objects.filter(
+        month__lt=add_months(current, -(retention_months or RETENTION_MONTHS))
+    ).delete()[0]
+    return moved, dropped
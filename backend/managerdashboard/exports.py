@@ -0,0 +1,130 @@
+"""
+Streaming CSV / NDJSON exports for manager reports.
+
+Rows are read with values_list(...).iterator(chunk_size=...) so related
+names come from the same JOINed query and no model instances are built.
+They are written to the client in batches through StreamingHttpResponse,
+so worker memory stays flat however many rows a report has.
+"""
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from cashierdashboard.aggregation import day_bounds
+
+CHUNK_SIZE = getattr(settings, 'REPORT_EXPORT_CHUNK_SIZE', 2000)
+STREAM_FORMATS = ('csv', 'ndjson')
+
+
+class CSVRenderer(BaseRenderer):
+    """Lets DRF accept ?format=csv; report rows bypass it via stream_rows()"""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only error payloads are rendered here
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for key, value in (data or {}).items():
+            writer.writerow([key, value])
+        return buffer.getvalue().encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Lets DRF accept ?format=ndjson; report rows bypass it via stream_rows()"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return (json.dumps(data, default=str) + '\n').encode(self.charset)
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def _csv_lines(columns, rows, batch_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_lines(columns, rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(json.dumps({column: _json_value(value) for column, value in zip(columns, row)}))
+        if len(batch) >= batch_size:
+            yield '\n'.join(batch) + '\n'
+            batch = []
+    if batch:
+        yield '\n'.join(batch) + '\n'
+
+
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+
+
+def render_rows(columns, rows, export_format, batch_size=500):
+    """Yield `rows` (tuples in `columns` order) as CSV or NDJSON text in batches"""
+    if export_format == 'csv':
+        return _csv_lines(columns, rows, batch_size)
+    return _ndjson_lines(columns, rows, batch_size)
+
+
+def stream_rows(columns, rows, export_format, filename, batch_size=500):
+    """StreamingHttpResponse writing `rows` (tuples in `columns` order) as CSV or NDJSON"""
+    response = StreamingHttpResponse(
+        render_rows(columns, rows, export_format, batch_size), content_type=CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+# ---- report row sources ----
+
+SALES_COLUMNS = [
+    'receipt_number', 'timestamp', 'store', 'cashier', 'customer',
+    'payment_method', 'status', 'subtotal', 'tax_amount', 'total',
+]
+
+
+def sales_rows(transactions, start_date, end_date, chunk_size=CHUNK_SIZE):
+    """One row per transaction in the date range, oldest first"""
+    return transactions.filter(**day_bounds('timestamp', start_date, end_date)).order_by('timestamp', 'id').values_list(
+        'receipt_number', 'timestamp', 'store_id__name', 'cashier__username', 'customer__name',
+        'payment_method', 'status', 'subtotal', 'tax_amount', 'total',
+    ).iterator(chunk_size=chunk_size)
+
+
+INVENTORY_COLUMNS = [
+    'name', 'sku', 'category', 'stock', 'min_stock_level', 'cost_price',
+    'selling_price', 'inventory_value', 'status',
+]
+
+
+def inventory_rows(products, chunk_size=CHUNK_SIZE):
+    """One row per product, same fields as the JSON inventory report"""
+    for name, sku, category, stock, min_stock_level, cost_price, price in products.order_by('id').values_list(
+        'name', 'sku', 'category__name', 'stock', 'min_stock_level', 'cost_price', 'price'
+    ).iterator(chunk_size=chunk_size):
+        yield (
+            name, sku, category or 'Uncategorized', stock, min_stock_level, cost_price, price,
+            stock * cost_price, 'Low Stock' if stock <= min_stock_level else 'In Stock',
+        )
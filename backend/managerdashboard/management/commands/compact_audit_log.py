@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from managerdashboard.audit import compact
+
+
+class Command(BaseCommand):
+    help = 'Archives AuditLog months older than the hot window and drops archives past retention'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hot-months', type=int, help='Months kept in AuditLog (default AUDIT_HOT_MONTHS)')
+        parser.add_argument('--retention-months', type=int, help='Months of archives kept (default AUDIT_RETENTION_MONTHS)')
+
+    def handle(self, *args, **options):
+        moved, dropped = compact(options['hot_months'], options['retention_months'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} audit entries, dropped {dropped} expired archives'))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from managerdashboard.models import ReportConfig
+from managerdashboard.scheduling import run_due, run_report, claim
+
+
+class Command(BaseCommand):
+    help = 'Runs scheduled ReportConfig reports and stores their artifacts on disk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run due reports once and exit')
+        parser.add_argument('--interval', type=int, default=60, help='Seconds between schedule checks')
+        parser.add_argument('--config', type=int, help='Run this ReportConfig now, ignoring its schedule')
+
+    def handle(self, *args, **options):
+        if options['config']:
+            try:
+                config = ReportConfig.objects.select_related('manager__user').get(pk=options['config'])
+            except ReportConfig.DoesNotExist:
+                raise CommandError(f"ReportConfig {options['config']} does not exist")
+            claim(config)
+            artifact = run_report(config)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {artifact} ({artifact.row_count} rows)'))
+            return
+
+        while True:
+            ran, failed = run_due()
+            if ran or failed:
+                self.stdout.write(f'Ran {ran} scheduled report(s), {failed} failed')
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('managerdashboard', '0002_remove_store_inventory_remove_store_managers_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('path', models.CharField(max_length=255)),
+                ('content_type', models.CharField(max_length=100)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('generated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('config', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='artifacts', to='managerdashboard.reportconfig')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='reportartifact',
+            constraint=models.UniqueConstraint(fields=('config', 'version'), name='unique_report_artifact_version'),
+        ),
+    ]
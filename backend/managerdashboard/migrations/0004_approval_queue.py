@@ -0,0 +1,89 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+LARGE_TRANSACTION_THRESHOLD = 500
+
+
+def open_pending_requests(apps, schema_editor):
+    """Queue the returns and large transactions that were awaiting approval before the queue existed"""
+    ApprovalRequest = apps.get_model('managerdashboard', 'ApprovalRequest')
+    Return = apps.get_model('cashierdashboard', 'Return')
+    Transaction = apps.get_model('cashierdashboard', 'Transaction')
+    requests = [
+        ApprovalRequest(
+            type='return_approval', target_id=ret.pk, store_id=ret.original_transaction.store_id_id,
+            amount=ret.refund_amount, details={'reason': ret.reason, 'transaction_id': ret.original_transaction.receipt_number},
+        )
+        for ret in Return.objects.filter(status='pending').select_related('original_transaction')
+    ] + [
+        ApprovalRequest(
+            type='large_transaction', target_id=sale.pk, store_id=sale.store_id_id, amount=sale.total,
+            requestor_id=sale.cashier_id,
+            details={'receipt_number': sale.receipt_number, 'customer': sale.customer.name if sale.customer else 'Walk-in'},
+        )
+        for sale in Transaction.objects.filter(status='pending_approval', total__gt=LARGE_TRANSACTION_THRESHOLD).select_related('customer')
+    ]
+    ApprovalRequest.objects.bulk_create(requests, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashierdashboard', '0014_activity_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('managerdashboard', '0003_report_artifact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='approvalrequest',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='approvalrequest',
+            name='details',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='approvalrequest',
+            name='store',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='approval_requests', to='cashierdashboard.store'),
+        ),
+        migrations.AlterField(
+            model_name='approvalrequest',
+            name='manager',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requests_handled', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='approvalrequest',
+            name='requestor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requests_made', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='approvalrequest',
+            name='type',
+            field=models.CharField(choices=[('transaction_void', 'Transaction Void'), ('discount_approval', 'Discount Approval'), ('return_approval', 'Return Approval'), ('inventory_transfer', 'Inventory Transfer'), ('large_transaction', 'Large Transaction')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='approvalrequest',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='approval_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='approvalrequest',
+            index=models.Index(fields=['store', 'status', '-created_at', '-id'], name='approval_store_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='approvalrequest',
+            index=models.Index(fields=['manager', 'status', '-created_at', '-id'], name='approval_manager_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='approvalrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('type', 'target_id'), name='unique_pending_approval_target'),
+        ),
+        migrations.RunPython(open_pending_requests, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 # Import shared models from cashierdashboard
 # Note: Store, Transaction, and other core models are defined in cashierdashboard
@@ -20,34 +21,78 @@ class Manager(models.Model):
         return f"{self.user.username} - {self.role}"
 
 class ApprovalRequest(models.Model):
+    """One item in the manager approval queue; resolved through managerdashboard.approvals"""
     type = models.CharField(max_length=20, choices=[
         ('transaction_void', 'Transaction Void'),
         ('discount_approval', 'Discount Approval'),
         ('return_approval', 'Return Approval'),
-        ('inventory_transfer', 'Inventory Transfer')
+        ('inventory_transfer', 'Inventory Transfer'),
+        ('large_transaction', 'Large Transaction')
     ])
     target_id = models.IntegerField()
-    requestor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='requests_made')
-    manager = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='requests_handled')
+    requestor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='requests_made')
+    manager = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='requests_handled')
+    store = models.ForeignKey('cashierdashboard.Store', on_delete=models.SET_NULL, null=True, blank=True, related_name='approval_requests')
+    amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    details = models.JSONField(default=dict, blank=True)  # display fields captured when the request is opened
     status = models.CharField(max_length=20, default='pending')
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     resolved_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['type', 'target_id'], condition=models.Q(status='pending'),
+                                    name='unique_pending_approval_target'),
+        ]
+        indexes = [
+            models.Index(fields=['status', '-created_at', '-id'], name='approval_status_created_idx'),
+            models.Index(fields=['store', 'status', '-created_at', '-id'], name='approval_store_status_idx'),
+            models.Index(fields=['manager', 'status', '-created_at', '-id'], name='approval_manager_status_idx'),
+        ]
+
     def __str__(self):
         return f"{self.type} - {self.status}"
 
 class AuditLog(models.Model):
+    """Recent audited actions, written in batches by managerdashboard.audit"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     action_type = models.CharField(max_length=50)
     target = models.CharField(max_length=100)
     metadata = models.JSONField(default=dict)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)  # when the action happened, not when the batch was flushed
     source_ip = models.GenericIPAddressField(null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='audit_time_idx'),
+            models.Index(fields=['user', 'timestamp', 'id'], name='audit_user_time_idx'),
+            models.Index(fields=['action_type', 'timestamp', 'id'], name='audit_action_time_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.action_type}"
 
+class AuditArchive(models.Model):
+    """One compacted month of AuditLog rows for a user and action type; entries is gzipped NDJSON"""
+    month = models.DateField()  # first day of the month
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='audit_archives')
+    action_type = models.CharField(max_length=50)
+    count = models.PositiveIntegerField()
+    first_at = models.DateTimeField()
+    last_at = models.DateTimeField()
+    entries = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['month', 'user', 'action_type'], name='audit_archive_month_idx'),
+            models.Index(fields=['user', 'month'], name='audit_archive_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.action_type} x{self.count}"
+
 class ReportConfig(models.Model):
     manager = models.ForeignKey(Manager, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
@@ -59,4 +104,21 @@ class ReportConfig(models.Model):
 
     def __str__(self):
         return self.name
- 
\ No newline at end of file
+ 
+class ReportArtifact(models.Model):
+    """A generated ReportConfig output stored on disk; versions count up per config"""
+    config = models.ForeignKey(ReportConfig, on_delete=models.CASCADE, related_name='artifacts')
+    version = models.PositiveIntegerField()
+    path = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField(default=0)
+    row_count = models.PositiveIntegerField(default=0)
+    generated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['config', 'version'], name='unique_report_artifact_version'),
+        ]
+
+    def __str__(self):
+        return f"{self.config.name} v{self.version}"
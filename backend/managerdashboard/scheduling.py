@@ -0,0 +1,301 @@
+"""
+Scheduled execution of ReportConfig definitions.
+
+The run_report_scheduler management command polls for configs whose
+schedule has a slot between their last_run and now, claims each one with a
+conditional UPDATE on last_run (so two scheduler processes never run the
+same slot), and writes the report to disk as a numbered ReportArtifact.
+The download endpoint then serves the newest artifact as a file instead of
+recomputing the report.
+
+Schedules are "<frequency>[@<when>]":
+
+    hourly          hourly@15           (minute past the hour)
+    daily           daily@03:30
+    weekly          weekly@sun          weekly@sun 04:00
+    monthly         monthly@1           monthly@15 01:00
+
+Without an explicit time, reports run at REPORT_SCHEDULE_DEFAULT_TIME
+(02:00 local), outside trading hours. An empty schedule means on demand only.
+"""
+import logging
+import os
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from cashierdashboard.aggregation import bucketed, TRUNCATORS
+from cashierdashboard.models import Product, Store, Transaction
+from .exports import CHUNK_SIZE, render_rows, sales_rows, SALES_COLUMNS, inventory_rows, INVENTORY_COLUMNS
+from .models import ReportConfig, ReportArtifact
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_ROOT = getattr(settings, 'REPORT_ARTIFACT_ROOT', os.path.join(settings.MEDIA_ROOT, 'reports'))
+KEEP_VERSIONS = getattr(settings, 'REPORT_ARTIFACT_KEEP', 5)
+DEFAULT_TIME = getattr(settings, 'REPORT_SCHEDULE_DEFAULT_TIME', '02:00')
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+# Formats without a writer here (e.g. the model's 'pdf' default) are written as CSV
+ARTIFACT_FORMATS = {'csv': ('csv', 'text/csv; charset=utf-8'), 'ndjson': ('ndjson', 'application/x-ndjson')}
+
+
+REPORT_KINDS = ('sales', 'transactions', 'inventory')
+MAX_REPORT_DAYS = getattr(settings, 'REPORT_MAX_DAYS', 3660)
+
+
+class ScheduleError(ValueError):
+    """Raised for a ReportConfig.schedule that cannot be parsed"""
+
+
+class ReportFilterError(ValueError):
+    """Raised for ReportConfig.filters that a report cannot run with"""
+
+
+def _parse_time(value):
+    try:
+        hour, minute = value.split(':')
+        return time(int(hour), int(minute))
+    except ValueError:
+        raise ScheduleError(f'Invalid time {value!r}; use HH:MM')
+
+
+def parse_schedule(schedule):
+    """
+    Returns (frequency, day, time) for a schedule string, or None when the
+    schedule is empty. `day` is a weekday index for weekly schedules and a
+    day of month for monthly ones.
+    """
+    schedule = (schedule or '').strip().lower()
+    if not schedule:
+        return None
+    frequency, _, when = schedule.partition('@')
+    parts = when.split()
+
+    if frequency == 'hourly':
+        minute = int(parts[0]) if parts and parts[0].isdigit() else 0
+        if len(parts) > 1 or (parts and not parts[0].isdigit()) or minute > 59:
+            raise ScheduleError(f'Invalid hourly schedule {schedule!r}')
+        return 'hourly', None, time(0, minute)
+
+    if frequency == 'daily':
+        if len(parts) > 1:
+            raise ScheduleError(f'Invalid daily schedule {schedule!r}')
+        return 'daily', None, _parse_time(parts[0] if parts else DEFAULT_TIME)
+
+    if frequency in ('weekly', 'monthly'):
+        day_part = parts[0] if parts else ('mon' if frequency == 'weekly' else '1')
+        if frequency == 'weekly':
+            if day_part not in WEEKDAYS:
+                raise ScheduleError(f'Invalid weekday {day_part!r}')
+            day = WEEKDAYS.index(day_part)
+        else:
+            if not day_part.isdigit() or not 1 <= int(day_part) <= 28:
+                raise ScheduleError(f'Monthly schedules run on day 1-28, got {day_part!r}')
+            day = int(day_part)
+        if len(parts) > 2:
+            raise ScheduleError(f'Invalid {frequency} schedule {schedule!r}')
+        return frequency, day, _parse_time(parts[1] if len(parts) > 1 else DEFAULT_TIME)
+
+    raise ScheduleError(f'Unknown schedule frequency {frequency!r}')
+
+
+def previous_slot(schedule, now=None):
+    """Latest scheduled run time at or before `now`, or None for on-demand configs"""
+    parsed = parse_schedule(schedule)
+    if parsed is None:
+        return None
+    frequency, day, at = parsed
+    now = timezone.localtime(now or timezone.now())
+
+    if frequency == 'hourly':
+        slot = now.replace(minute=at.minute, second=0, microsecond=0)
+        return slot if slot <= now else slot - timedelta(hours=1)
+
+    today = now.date()
+    if frequency == 'daily':
+        candidate = today
+    elif frequency == 'weekly':
+        candidate = today - timedelta(days=(today.weekday() - day) % 7)
+    else:
+        candidate = today.replace(day=day) if today.day >= day else (today.replace(day=1) - timedelta(days=1)).replace(day=day)
+    slot = timezone.make_aware(datetime.combine(candidate, at))
+    if slot <= now:
+        return slot
+    if frequency == 'daily':
+        return slot - timedelta(days=1)
+    if frequency == 'weekly':
+        return slot - timedelta(days=7)
+    # Slot later today: the one before is in the previous month (days are capped at 28, so it exists)
+    return timezone.make_aware(datetime.combine((candidate.replace(day=1) - timedelta(days=1)).replace(day=day), at))
+
+
+def is_due(config, now=None):
+    try:
+        slot = previous_slot(config.schedule, now)
+    except ScheduleError:
+        return False
+    return slot is not None and (config.last_run is None or config.last_run < slot)
+
+
+def due_configs(now=None):
+    """Scheduled configs with a slot they have not run for yet"""
+    now = now or timezone.now()
+    return [config for config in ReportConfig.objects.exclude(schedule='').select_related('manager__user')
+            if is_due(config, now)]
+
+
+def claim(config, now=None):
+    """Mark the config as run; False if another scheduler claimed it first"""
+    now = now or timezone.now()
+    claimed = ReportConfig.objects.filter(pk=config.pk, last_run=config.last_run).update(last_run=now)
+    if claimed:
+        config.last_run = now
+    return bool(claimed)
+
+
+# ---- report generation ----
+
+def report_period(filters, now=None):
+    """(start, end) dates from filters: start_date/end_date (YYYY-MM-DD) or the last `days` days"""
+    today = timezone.localdate(now)
+    if filters.get('start_date'):
+        start = datetime.strptime(filters['start_date'], '%Y-%m-%d').date()
+        end = datetime.strptime(filters['end_date'], '%Y-%m-%d').date() if filters.get('end_date') else today
+        return start, end
+    return today - timedelta(days=int(filters.get('days', 30))), today
+
+
+def _date(filters, name):
+    try:
+        return datetime.strptime(str(filters[name]), '%Y-%m-%d').date()
+    except ValueError:
+        raise ReportFilterError(f'{name} must be a YYYY-MM-DD date')
+
+
+def validate_filters(filters, user):
+    """
+    Check ReportConfig.filters before they are saved, so a config never
+    fails at every scheduled slot. Only admin managers (no store) may pick
+    a store; a store manager's reports always cover their own store.
+    """
+    if not isinstance(filters, dict):
+        raise ReportFilterError('filters must be an object')
+    if filters.get('report', 'sales') not in REPORT_KINDS:
+        raise ReportFilterError(f'report must be one of {list(REPORT_KINDS)}')
+    if filters.get('granularity', 'day') not in TRUNCATORS:
+        raise ReportFilterError(f'granularity must be one of {sorted(TRUNCATORS)}')
+    if 'days' in filters:
+        days = filters['days']
+        if isinstance(days, bool) or not isinstance(days, int) or not 1 <= days <= MAX_REPORT_DAYS:
+            raise ReportFilterError(f'days must be a whole number from 1 to {MAX_REPORT_DAYS}')
+    if 'end_date' in filters and 'start_date' not in filters:
+        raise ReportFilterError('end_date needs a start_date')
+    if 'start_date' in filters:
+        start = _date(filters, 'start_date')
+        if 'end_date' in filters and _date(filters, 'end_date') < start:
+            raise ReportFilterError('end_date is before start_date')
+    if filters.get('store') is not None:
+        if user.store_id:
+            raise ReportFilterError("Store managers' reports always cover their own store")
+        if isinstance(filters['store'], bool) or not isinstance(filters['store'], int) \
+                or not Store.objects.filter(pk=filters['store']).exists():
+            raise ReportFilterError('Unknown store')
+    return filters
+
+
+def report_rows(config, now=None):
+    """(columns, rows) for a config; filters['report'] picks sales (default), transactions or inventory"""
+    filters = config.filters or {}
+    # A store manager's reports are pinned to their store, whatever the filters say
+    store_id = config.manager.user.store_id or filters.get('store')
+    store_filter = {'store_id': store_id} if store_id else {}
+    kind = filters.get('report', 'sales')
+
+    if kind == 'inventory':
+        return INVENTORY_COLUMNS, inventory_rows(Product.objects.filter(is_active=True, **store_filter))
+
+    start, end = report_period(filters, now)
+    transactions = Transaction.objects.filter(**store_filter)
+    if kind == 'transactions':
+        return SALES_COLUMNS, sales_rows(transactions, start, end)
+
+    metrics = [name for name in config.metrics or [] if name in ('sales', 'orders', 'avg_order_value')] or ['sales', 'orders']
+    series = bucketed(transactions, filters.get('granularity', 'day'), start, end)
+    for point in series:
+        point['avg_order_value'] = point['sales'] / point['orders'] if point['orders'] else 0
+    return ['period'] + metrics, ([point['bucket']] + [point[name] for name in metrics] for point in series)
+
+
+def artifact_path(config, version, extension):
+    return os.path.join(ARTIFACT_ROOT, str(config.pk), f'v{version}.{extension}')
+
+
+def artifact_file(artifact):
+    """Absolute path of a stored artifact"""
+    return os.path.join(ARTIFACT_ROOT, artifact.path)
+
+
+def run_report(config, now=None):
+    """Generate the config's report into the next artifact version and prune old versions"""
+    extension, content_type = ARTIFACT_FORMATS.get(config.export_format, ARTIFACT_FORMATS['csv'])
+    latest = config.artifacts.order_by('-version').values_list('version', flat=True).first() or 0
+    version = latest + 1
+    path = artifact_path(config, version, extension)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    columns, rows = report_rows(config, now)
+    counted = _counting(rows)
+    # Written to a temp name and renamed so downloads never see a partial file
+    with open(path + '.tmp', 'w', encoding='utf-8', newline='') as handle:
+        for chunk in render_rows(columns, counted, extension, batch_size=CHUNK_SIZE):
+            handle.write(chunk)
+    os.replace(path + '.tmp', path)
+
+    artifact = ReportArtifact.objects.create(
+        config=config, version=version, path=os.path.relpath(path, ARTIFACT_ROOT), content_type=content_type,
+        size=os.path.getsize(path), row_count=counted.count, generated_at=now or timezone.now()
+    )
+    prune(config)
+    return artifact
+
+
+class _counting:
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
+
+
+def prune(config, keep=None):
+    """Delete all but the newest `keep` (REPORT_ARTIFACT_KEEP) artifacts of a config"""
+    stale = list(config.artifacts.order_by('-version')[keep or KEEP_VERSIONS:])
+    for artifact in stale:
+        try:
+            os.remove(artifact_file(artifact))
+        except FileNotFoundError:
+            pass
+    ReportArtifact.objects.filter(pk__in=[artifact.pk for artifact in stale]).delete()
+
+
+def run_due(now=None):
+    """Run every due report once; returns (ran, failed) counts"""
+    ran = failed = 0
+    for config in due_configs(now):
+        if not claim(config, now):
+            continue
+        try:
+            with db_transaction.atomic():
+                run_report(config, now)
+            ran += 1
+        except Exception:
+            # last_run stays claimed; the config retries at its next slot
+            logger.exception('Scheduled report %s failed', config.pk)
+            failed += 1
+    return ran, failed
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Manager, ApprovalRequest, AuditLog, ReportConfig
+from .models import Manager, ApprovalRequest, AuditLog, ReportConfig, ReportArtifact
+from .scheduling import parse_schedule, validate_filters, ScheduleError, ReportFilterError
 from member.models import CustomUser
 
 class ManagerSerializer(serializers.ModelSerializer):
@@ -16,15 +17,16 @@ class ManagerSerializer(serializers.ModelSerializer):
         ]
 
 class ApprovalRequestSerializer(serializers.ModelSerializer):
-    requestor_name = serializers.CharField(source='requestor.username', read_only=True)
-    manager_name = serializers.CharField(source='manager.username', read_only=True)
+    requestor_name = serializers.CharField(source='requestor.username', read_only=True, allow_null=True)
+    manager_name = serializers.CharField(source='manager.username', read_only=True, allow_null=True)
+    store_name = serializers.CharField(source='store.name', read_only=True, allow_null=True)
     
     class Meta:
         model = ApprovalRequest
         fields = [
             'id', 'type', 'target_id', 'requestor', 'requestor_name',
-            'manager', 'manager_name', 'status', 'comment',
-            'created_at', 'resolved_at'
+            'manager', 'manager_name', 'store', 'store_name', 'amount', 'details',
+            'status', 'comment', 'created_at', 'resolved_at'
         ]
 
 class AuditLogSerializer(serializers.ModelSerializer):
@@ -45,4 +47,25 @@ class ReportConfigSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'manager', 'manager_name', 'name', 'metrics',
             'filters', 'schedule', 'export_format', 'last_run'
-        ]
\ No newline at end of file
+        ]
+        read_only_fields = ['manager', 'last_run']
+
+    def validate_schedule(self, value):
+        try:
+            parse_schedule(value)
+        except ScheduleError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+    def validate_filters(self, value):
+        # Store scoping follows the config's owner; on update that is the manager who created it
+        user = self.instance.manager.user if self.instance else self.context['request'].user
+        try:
+            return validate_filters(value, user)
+        except ReportFilterError as e:
+            raise serializers.ValidationError(str(e))
+
+class ReportArtifactSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReportArtifact
+        fields = ['id', 'version', 'content_type', 'size', 'row_count', 'generated_at']
\ No newline at end of file
@@ -2,7 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     ManagerDashboardViewSet, ManagerUserViewSet, ManagerProductViewSet,
-    ManagerStoreViewSet, ManagerReportViewSet
+    ManagerStoreViewSet, ManagerReportViewSet, ManagerReportConfigViewSet, ManagerApprovalViewSet,
+    ManagerAuditLogViewSet, ManagerCustomerSegmentViewSet
 )
 
 router = DefaultRouter()
@@ -11,6 +12,10 @@ router.register(r'users', ManagerUserViewSet, basename='manager-users')
 router.register(r'products', ManagerProductViewSet, basename='manager-products')
 router.register(r'stores', ManagerStoreViewSet, basename='manager-stores')
 router.register(r'reports', ManagerReportViewSet, basename='manager-reports')
+router.register(r'report-configs', ManagerReportConfigViewSet, basename='manager-report-configs')
+router.register(r'approvals', ManagerApprovalViewSet, basename='manager-approvals')
+router.register(r'audit-log', ManagerAuditLogViewSet, basename='manager-audit-log')
+router.register(r'customer-segments', ManagerCustomerSegmentViewSet, basename='manager-customer-segments')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -3,8 +3,12 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q, Sum, Count, Avg, F
+from django.http import FileResponse, HttpResponseNotModified
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
 from datetime import datetime, timedelta
+import os
 
 # Import shared models from cashierdashboard
 from cashierdashboard.models import (
@@ -12,13 +16,30 @@ from cashierdashboard.models import (
     Customer, Transaction, TransactionItem, Return
 )
 from .models import Manager, ApprovalRequest, AuditLog, ReportConfig
+from .serializers import ApprovalRequestSerializer, AuditLogSerializer, ReportConfigSerializer, ReportArtifactSerializer
+from . import approvals, audit
+from .scheduling import artifact_file
 from cashierdashboard.serializers import (
     StoreSerializer, CategorySerializer, SubCategorySerializer, ProductSerializer, 
     AdvertisementSerializer, CustomerSerializer, TransactionSerializer, ReturnSerializer
 )
+from cashierdashboard.inventory import adjust_to_count
+from cashierdashboard.sales import store_sales_summary
+from cashierdashboard.aggregation import bucketed, totals
+from cashierdashboard import analytics, segmentation
+from cashierdashboard.caching import cache_response, CATALOG, INVENTORY, SALES, STORES, CUSTOMERS
+from cashierdashboard.pagination import KeysetPagination
+from rest_framework.settings import api_settings
+from .exports import (
+    CSVRenderer, NDJSONRenderer, STREAM_FORMATS, stream_rows,
+    SALES_COLUMNS, sales_rows, INVENTORY_COLUMNS, inventory_rows
+)
 from member.models import CustomUser
+from member.permissions import IsManagerRole
 from member.serializers import CustomUserSerializer, StaffUserSerializer
 
+REPORT_RENDERERS = api_settings.DEFAULT_RENDERER_CLASSES + [CSVRenderer, NDJSONRenderer]
+
 class ManagerPermissionMixin:
     """Mixin to ensure only managers can access these views"""
     
@@ -35,6 +56,7 @@ class ManagerDashboardViewSet(viewsets.ViewSet, ManagerPermissionMixin):
     """Manager dashboard with comprehensive analytics"""
     permission_classes = [IsAuthenticated]
     
+    @cache_response(60, tags=[SALES, STORES, CUSTOMERS, INVENTORY], per_user=True, stale_ttl=300)
     def list(self, request):
         """Get dashboard overview"""
         permission_error = self.check_manager_permission(request)
@@ -51,16 +73,13 @@ class ManagerDashboardViewSet(viewsets.ViewSet, ManagerPermissionMixin):
         active_products = Product.objects.filter(is_active=True, **store_filter).count()
         low_stock_products = Product.objects.filter(stock__lte=F('min_stock_level'), **store_filter).count()
         
-        # Sales metrics (last 30 days)
+        # Sales metrics (last 30 days) from the DailyStoreSales rollup
         thirty_days_ago = timezone.now() - timedelta(days=30)
-        recent_transactions = Transaction.objects.filter(
-            timestamp__gte=thirty_days_ago,
-            **store_filter
-        )
+        recent_sales = store_sales_summary(timezone.localdate(thirty_days_ago), store=request.user.store_id)
         
-        total_sales = recent_transactions.aggregate(total=Sum('total'))['total'] or 0
-        total_orders = recent_transactions.count()
-        avg_order_value = recent_transactions.aggregate(avg=Avg('total'))['avg'] or 0
+        total_sales = recent_sales['sales']
+        total_orders = recent_sales['orders']
+        avg_order_value = recent_sales['avg_order_value']
         
         # Customer metrics
         total_customers = Customer.objects.count()
@@ -78,11 +97,13 @@ class ManagerDashboardViewSet(viewsets.ViewSet, ManagerPermissionMixin):
                 'total_orders': total_orders,
                 'avg_order_value': float(avg_order_value),
                 'total_customers': total_customers,
+                'unique_customers': recent_sales['customers'],
                 'new_customers': new_customers
             }
         })
     
     @action(detail=False, methods=['get'])
+    @cache_response(60, tags=[SALES], per_user=True, stale_ttl=300)
     def sales_analytics(self, request):
         """Get detailed sales analytics"""
         permission_error = self.check_manager_permission(request)
@@ -102,45 +123,37 @@ class ManagerDashboardViewSet(viewsets.ViewSet, ManagerPermissionMixin):
         else:
             start_date = now - timedelta(days=7)
         
-        # Get transactions in period
-        store_filter = {}
-        if request.user.store_id:
-            store_filter['store_id'] = request.user.store_id
-            
-        transactions = Transaction.objects.filter(
-            timestamp__gte=start_date,
-            **store_filter
-        )
-        
-        # Daily sales data
-        daily_sales = []
-        for i in range((now.date() - start_date.date()).days + 1):
-            day = start_date.date() + timedelta(days=i)
-            day_transactions = transactions.filter(timestamp__date=day)
-            daily_sales.append({
-                'date': day.isoformat(),
-                'sales': float(day_transactions.aggregate(total=Sum('total'))['total'] or 0),
-                'orders': day_transactions.count()
-            })
-        
+        # Served from the in-memory columnar snapshot (no queries beyond product names)
+        # unless the period reaches back past its window
+        sales = analytics.source(start_date)
+        store = request.user.store_id or None
+        daily_sales = [{
+            'date': point['bucket'].isoformat(),
+            'sales': point['sales'],
+            'orders': point['orders']
+        } for point in sales.series('day', start_date, now, store)]
+
         # Top products
-        top_products = TransactionItem.objects.filter(
-            transaction__timestamp__gte=start_date,
-            **({'transaction__' + k: v for k, v in store_filter.items()} if store_filter else {})
-        ).values('product__name').annotate(
-            total_sold=Sum('quantity'),
-            revenue=Sum('total')
-        ).order_by('-revenue')[:10]
+        top_products = sales.top_products(start_date, store=store, limit=10)
+        names = dict(Product.objects.filter(
+            pk__in=[row['product_id'] for row in top_products]
+        ).values_list('id', 'name'))
+        top_products = [{
+            'product__name': names.get(row['product_id']),
+            'total_sold': row['total_sold'],
+            'revenue': row['revenue']
+        } for row in top_products]
         
         return Response({
             'period': period,
             'daily_sales': daily_sales,
-            'top_products': list(top_products),
-            'total_revenue': float(transactions.aggregate(total=Sum('total'))['total'] or 0),
-            'total_orders': transactions.count()
+            'top_products': top_products,
+            'total_revenue': round(sum(day['sales'] for day in daily_sales), 2),
+            'total_orders': sum(day['orders'] for day in daily_sales)
         })
     
     @action(detail=False, methods=['get'])
+    @cache_response(30, tags=[CATALOG, INVENTORY], per_user=True)
     def inventory_status(self, request):
         """Get inventory status and alerts"""
         permission_error = self.check_manager_permission(request)
@@ -186,6 +199,8 @@ class ManagerUserViewSet(viewsets.ModelViewSet, ManagerPermissionMixin):
     queryset = CustomUser.objects.all()
     serializer_class = StaffUserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-id',)
     
     def get_queryset(self):
         permission_error = self.check_manager_permission(self.request)
@@ -210,6 +225,7 @@ class ManagerUserViewSet(viewsets.ModelViewSet, ManagerPermissionMixin):
             user = self.get_queryset().get(pk=pk)
             user.is_approved = True
             user.save()
+            audit.record_request(request, 'user.approve', f'user:{user.pk}')
             return Response({'message': 'User approved successfully'})
         except CustomUser.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -225,6 +241,7 @@ class ManagerUserViewSet(viewsets.ModelViewSet, ManagerPermissionMixin):
             user = self.get_queryset().get(pk=pk)
             user.is_active = False
             user.save()
+            audit.record_request(request, 'user.deactivate', f'user:{user.pk}')
             return Response({'message': 'User deactivated successfully'})
         except CustomUser.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -234,6 +251,8 @@ class ManagerProductViewSet(viewsets.ModelViewSet, ManagerPermissionMixin):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = ('-id',)
     
     def get_queryset(self):
         permission_error = self.check_manager_permission(self.request)
@@ -246,6 +265,34 @@ class ManagerProductViewSet(viewsets.ModelViewSet, ManagerPermissionMixin):
         else:
             return Product.objects.all()
 
+    @action(detail=False, methods=['get'])
+    def reorder(self, request):
+        """Active products at or below their forecast reorder point, with the suggested order quantity"""
+        products = self.get_queryset().filter(
+            is_active=True, stock__lte=F('reorder_suggestion__reorder_point')
+        ).order_by('stock').values(
+            'id', 'name', 'sku', 'stock', 'min_stock_level', 'reorder_suggestion__reorder_point',
+            'reorder_suggestion__reorder_quantity', 'reorder_suggestion__daily_demand'
+        )[:int(request.query_params.get('limit', 100))]
+        return Response([{
+            'id': row['id'],
+            'name': row['name'],
+            'sku': row['sku'],
+            'stock': row['stock'],
+            'min_stock_level': row['min_stock_level'],
+            'reorder_point': row['reorder_suggestion__reorder_point'],
+            'reorder_quantity': row['reorder_suggestion__reorder_quantity'],
+            'daily_demand': round(row['reorder_suggestion__daily_demand'], 2),
+        } for row in products])
+
+    def perform_update(self, serializer):
+        # Stock edits go through the ledger as adjustments
+        if 'stock' in serializer.validated_data:
+            count = serializer.validated_data.pop('stock')
+            adjust_to_count(serializer.instance, count, user=self.request.user)
+            audit.record_request(self.request, 'stock.count', f'product:{serializer.instance.pk}', count=count)
+        serializer.save()
+
 class ManagerStoreViewSet(viewsets.ModelViewSet, ManagerPermissionMixin):
     """Manager store management"""
     queryset = Store.objects.all()
@@ -268,7 +315,7 @@ class ManagerReportViewSet(viewsets.ViewSet, ManagerPermissionMixin):
     """Manager reporting system"""
     permission_classes = [IsAuthenticated]
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], renderer_classes=REPORT_RENDERERS)
     def sales_report(self, request):
         """Generate sales report"""
         permission_error = self.check_manager_permission(request)
@@ -294,40 +341,40 @@ class ManagerReportViewSet(viewsets.ViewSet, ManagerPermissionMixin):
         if request.user.store_id:
             store_filter['store_id'] = request.user.store_id
             
-        transactions = Transaction.objects.filter(
-            timestamp__date__gte=start_date,
-            timestamp__date__lte=end_date,
-            **store_filter
-        )
+        transactions = Transaction.objects.filter(**store_filter)
+        
+        # ?format=csv|ndjson streams one row per transaction instead of the JSON summary
+        export_format = request.accepted_renderer.format
+        if export_format in STREAM_FORMATS:
+            return stream_rows(
+                SALES_COLUMNS, sales_rows(transactions, start_date, end_date), export_format,
+                f'sales-{start_date.isoformat()}-{end_date.isoformat()}'
+            )
+        
+        # One grouped query yields both the breakdown and the summary
+        daily = bucketed(transactions, 'day', start_date, end_date)
+        summary = totals(daily, 'sales', 'orders')
         
-        # Generate report data
         report_data = {
             'period': {
                 'start_date': start_date.isoformat(),
                 'end_date': end_date.isoformat()
             },
             'summary': {
-                'total_sales': float(transactions.aggregate(total=Sum('total'))['total'] or 0),
-                'total_orders': transactions.count(),
-                'avg_order_value': float(transactions.aggregate(avg=Avg('total'))['avg'] or 0)
+                'total_sales': float(summary['sales']),
+                'total_orders': summary['orders'],
+                'avg_order_value': float(summary['sales'] / summary['orders']) if summary['orders'] else 0
             },
-            'daily_breakdown': []
+            'daily_breakdown': [{
+                'date': point['bucket'].isoformat(),
+                'sales': float(point['sales']),
+                'orders': point['orders']
+            } for point in daily]
         }
         
-        # Daily breakdown
-        current_date = start_date
-        while current_date <= end_date:
-            day_transactions = transactions.filter(timestamp__date=current_date)
-            report_data['daily_breakdown'].append({
-                'date': current_date.isoformat(),
-                'sales': float(day_transactions.aggregate(total=Sum('total'))['total'] or 0),
-                'orders': day_transactions.count()
-            })
-            current_date += timedelta(days=1)
-        
         return Response(report_data)
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], renderer_classes=REPORT_RENDERERS)
     def inventory_report(self, request):
         """Generate inventory report"""
         permission_error = self.check_manager_permission(request)
@@ -340,6 +387,10 @@ class ManagerReportViewSet(viewsets.ViewSet, ManagerPermissionMixin):
         
         products = Product.objects.filter(is_active=True, **store_filter)
         
+        export_format = request.accepted_renderer.format
+        if export_format in STREAM_FORMATS:
+            return stream_rows(INVENTORY_COLUMNS, inventory_rows(products), export_format, 'inventory')
+        
         report_data = {
             'summary': {
                 'total_products': products.count(),
@@ -352,7 +403,7 @@ class ManagerReportViewSet(viewsets.ViewSet, ManagerPermissionMixin):
             'products': []
         }
         
-        for product in products:
+        for product in products.select_related('category'):
             report_data['products'].append({
                 'name': product.name,
                 'sku': product.sku,
@@ -365,4 +416,163 @@ class ManagerReportViewSet(viewsets.ViewSet, ManagerPermissionMixin):
                 'status': 'Low Stock' if product.stock <= product.min_stock_level else 'In Stock'
             })
         
-        return Response(report_data)
\ No newline at end of file
+        return Response(report_data)
+
+class ManagerReportConfigViewSet(viewsets.ModelViewSet, ManagerPermissionMixin):
+    """Saved report definitions and the artifacts the scheduler generated for them"""
+    queryset = ReportConfig.objects.all()
+    serializer_class = ReportConfigSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        permission_error = self.check_manager_permission(self.request)
+        if permission_error:
+            return ReportConfig.objects.none()
+        
+        configs = ReportConfig.objects.select_related('manager__user')
+        # Store managers see their own reports; admin managers see all
+        if self.request.user.store_id:
+            return configs.filter(manager__user=self.request.user)
+        return configs
+    
+    def perform_create(self, serializer):
+        manager, _ = Manager.objects.get_or_create(user=self.request.user, defaults={'role': 'store_manager'})
+        serializer.save(manager=manager)
+    
+    @action(detail=True, methods=['get'])
+    def artifacts(self, request, pk=None):
+        """List stored artifact versions, newest first"""
+        config = self.get_object()
+        return Response(ReportArtifactSerializer(config.artifacts.order_by('-version'), many=True).data)
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Serve the newest (or ?version=N) stored artifact without rerunning the report"""
+        config = self.get_object()
+        artifacts = config.artifacts.order_by('-version')
+        if request.query_params.get('version'):
+            artifacts = artifacts.filter(version=request.query_params['version'])
+        artifact = artifacts.first()
+        if artifact is None:
+            return Response({'error': 'No artifact has been generated for this report yet'},
+                          status=status.HTTP_404_NOT_FOUND)
+        
+        # Versions are immutable, so the version number is a strong validator
+        etag = f'"report-{config.pk}-v{artifact.version}"'
+        if request.headers.get('If-None-Match') == etag:
+            return HttpResponseNotModified(headers={'ETag': etag})
+        try:
+            handle = open(artifact_file(artifact), 'rb')
+        except FileNotFoundError:
+            return Response({'error': 'Artifact file is missing'}, status=status.HTTP_404_NOT_FOUND)
+        
+        extension = os.path.splitext(artifact.path)[1]
+        response = FileResponse(handle, content_type=artifact.content_type, as_attachment=True,
+                                filename=f'report-{config.pk}-v{artifact.version}{extension}')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(artifact.generated_at.timestamp())
+        return response
+
+class ManagerApprovalViewSet(viewsets.ViewSet, ManagerPermissionMixin):
+    """Approval queue: keyset-paginated listing and bulk approve/reject"""
+    permission_classes = [IsAuthenticated]
+    
+    def list(self, request):
+        """Pending requests newest first; pass ?cursor= from the previous page's `next`"""
+        permission_error = self.check_manager_permission(request)
+        if permission_error:
+            return permission_error
+        
+        params = request.query_params
+        # ?status=approved|rejected lists what this manager resolved instead
+        queue_status = params.get('status', 'pending')
+        scope = {'store': request.user.store_id} if queue_status == 'pending' else {'manager': request.user}
+        try:
+            rows, next_cursor = approvals.page(
+                status=queue_status, cursor=params.get('cursor'), limit=params.get('limit', approvals.PAGE_SIZE),
+                types=params.getlist('type') or None, **scope
+            )
+        except (approvals.ApprovalError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': ApprovalRequestSerializer(rows, many=True).data, 'next': next_cursor})
+    
+    @action(detail=False, methods=['post'])
+    def bulk_resolve(self, request):
+        """Approve or reject many requests at once: {"ids": [...], "decision": "approve"|"reject", "comment": ""}"""
+        permission_error = self.check_manager_permission(request)
+        if permission_error:
+            return permission_error
+        
+        ids = request.data.get('ids') or []
+        if not isinstance(ids, list):
+            return Response({'error': 'ids must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            resolved = approvals.resolve(
+                ids, request.data.get('decision'), request.user,
+                comment=request.data.get('comment', ''), store=request.user.store_id
+            )
+        except approvals.ApprovalError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if resolved:
+            decision = approvals.DECISIONS[request.data['decision']]
+            audit.record_request(request, f'approval.{decision}', f'{len(resolved)} request(s)', ids=resolved)
+        skipped = [pk for pk in ids if pk not in set(resolved)]
+        return Response({'resolved': resolved, 'skipped': skipped})
+
+class ManagerAuditLogViewSet(viewsets.ViewSet, ManagerPermissionMixin):
+    """Audit trail of the caller's store (every store for admin managers), newest first, filtered by ?user, ?action_type and ?start/?end (ISO datetimes)"""
+    permission_classes = [IsAuthenticated]
+    
+    def list(self, request):
+        permission_error = self.check_manager_permission(request)
+        if permission_error:
+            return permission_error
+        
+        params = request.query_params
+        try:
+            start = parse_datetime(params['start']) if params.get('start') else None
+            end = parse_datetime(params['end']) if params.get('end') else None
+            # Store managers see their own store's users; admin managers (no store) see everyone
+            rows, next_cursor = audit.search(
+                user=params.get('user'), action_type=params.get('action_type'), start=start, end=end,
+                cursor=params.get('cursor'), limit=params.get('limit', audit.PAGE_SIZE),
+                store=request.user.store_id or None
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': AuditLogSerializer(rows, many=True).data, 'next': next_cursor})
+
+class ManagerCustomerSegmentViewSet(viewsets.ViewSet, ManagerPermissionMixin):
+    """RFM customer segments: per-segment summary, and each segment's customers by id (?after, ?limit)"""
+    permission_classes = [IsAuthenticated, IsManagerRole]
+    
+    @cache_response(300, tags=[CUSTOMERS])
+    def list(self, request):
+        return Response([{
+            'segment': row['segment'],
+            'customers': row['customers'],
+            'spend': float(row['spend'] or 0),
+            'average_orders': round(row['average_orders'] or 0, 1)
+        } for row in segmentation.segment_summary()])
+    
+    def retrieve(self, request, pk=None):
+        if pk not in segmentation.SEGMENTS:
+            return Response({'error': f'Unknown segment {pk}'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            rows, next_after = segmentation.segment_members(
+                pk, after=request.query_params.get('after'),
+                limit=request.query_params.get('limit', segmentation.PAGE_SIZE)
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': [{
+            'id': row['customer_id'],
+            'name': row['customer__name'],
+            'email': row['customer__email'],
+            'rfm': f"{row['recency']}{row['frequency']}{row['monetary']}",
+            'orders': row['orders'],
+            'spend': float(row['spend']),
+            'last_purchase': row['last_purchase']
+        } for row in rows], 'next': next_after})
@@ -9,6 +9,20 @@ class IsManager(BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.role == 'MANAGER'
 
+def is_manager(user):
+    return user.is_authenticated and str(user.role).lower() in ('manager', 'admin')
+
+class IsManagerRole(BasePermission):
+    """
+    Manager or admin, in either spelling of the role (the dashboards compare
+    lowercase names). Runs before the action, so shared response caches and
+    stock-changing actions stay behind it.
+    """
+    message = 'Manager access required'
+
+    def has_permission(self, request, view):
+        return is_manager(request.user)
+
 class IsCashier(BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.role == 'CASHIER'
@@ -20,6 +20,8 @@ import re
 import jwt
 from datetime import datetime, timedelta
 
+from cashierdashboard.pagination import paginate
+
 from .serializers import RegisterSerializer
 from .models import CustomUser
 from .permissions import IsAdmin, IsManager, IsCashier, IsClient
@@ -643,6 +645,9 @@ def manage_users(request):
         elif status_filter == 'inactive':
             users = users.filter(is_active=False)
         
+        total = users.count()
+        users, next_cursor = paginate(users, request.GET.get('cursor'), request.GET.get('limit'))
+        
         user_data = []
         for user in users:
             user_data.append({
@@ -659,7 +664,8 @@ def manage_users(request):
         
         return Response({
             'users': user_data,
-            'total': len(user_data)
+            'total': total,
+            'next': next_cursor
         }, status=status.HTTP_200_OK)
     
     elif request.method == 'POST':
@@ -1,6 +1,16 @@
 // Cashier API Service
 const API_BASE_URL = 'http://localhost:8000/api';
 
+// Paginated lists answer {results, next}; hand callers the rows, with the next-page cursor as `.next`
+const unwrapPage = (data) => (
+  data && Array.isArray(data.results) && 'next' in data && Object.keys(data).length === 2
+    ? Object.assign(data.results, { next: data.next })
+    : data
+);
+
+// Largest page the server returns (API_MAX_PAGE_SIZE); lists that render every row fetch all pages
+const MAX_PAGE_SIZE = 500;
+
 class CashierApiService {
   constructor() {
     this.baseURL = API_BASE_URL;
@@ -34,7 +44,7 @@ class CashierApiService {
       // Handle empty responses
       const contentType = response.headers.get('content-type');
       if (contentType && contentType.includes('application/json')) {
-        return await response.json();
+        return unwrapPage(await response.json());
       }
       
       return {};
@@ -44,6 +54,22 @@ class CashierApiService {
     }
   }
 
+  // Follow `next` cursors so lists that render every row are not cut off at the first page.
+  // `key` names the list in responses shaped {<key>: [...], next}; the result keeps that shape.
+  async apiCallAllPages(endpoint, key = null) {
+    const separator = endpoint.includes('?') ? '&' : '?';
+    const rows = [];
+    let cursor = null;
+    do {
+      const page = await this.apiCall(
+        `${endpoint}${separator}limit=${MAX_PAGE_SIZE}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`
+      );
+      rows.push(...(key ? page[key] || [] : page));
+      cursor = page.next;
+    } while (cursor);
+    return key ? { [key]: rows } : rows;
+  }
+
   // Categories
   async getCategories() {
     return await this.apiCall('/cashier/categories/');
@@ -109,7 +135,7 @@ class CashierApiService {
       endpoint += `?${params.toString()}`;
     }
     
-    return await this.apiCall(endpoint);
+    return await this.apiCallAllPages(endpoint);
   }
 
   async createProduct(productData) {
@@ -206,7 +232,7 @@ class CashierApiService {
   }
 
   async getReturns() {
-    return await this.apiCall('/cashier/returns/');
+    return await this.apiCallAllPages('/cashier/returns/');
   }
 
   // Customers
@@ -214,7 +240,7 @@ class CashierApiService {
     const endpoint = search 
       ? `/cashier/customers/?search=${encodeURIComponent(search)}`
       : '/cashier/customers/';
-    return await this.apiCall(endpoint);
+    return await this.apiCallAllPages(endpoint);
   }
 
   async createCustomer(customerData) {
@@ -286,7 +312,7 @@ class CashierApiService {
 
   // Payments
   async getPayments() {
-    return await this.apiCall('/cashier/payments/');
+    return await this.apiCallAllPages('/cashier/payments/');
   }
 
   async createPayment(paymentData) {
@@ -338,7 +364,7 @@ class CashierApiService {
     if (status) {
       endpoint += `?status=${status}`;
     }
-    return await this.apiCall(endpoint);
+    return await this.apiCallAllPages(endpoint);
   }
 
   async createDelivery(deliveryData) {
@@ -1,6 +1,16 @@
 // Real-time API service for cross-dashboard communication
 const API_BASE_URL = 'http://localhost:8000/api';
 
+// Paginated lists answer {results, next}; hand callers the rows, with the next-page cursor as `.next`
+const unwrapPage = (data) => (
+  data && Array.isArray(data.results) && 'next' in data && Object.keys(data).length === 2
+    ? Object.assign(data.results, { next: data.next })
+    : data
+);
+
+// Largest page the server returns (API_MAX_PAGE_SIZE); lists that render every row fetch all pages
+const MAX_PAGE_SIZE = 500;
+
 class RealTimeApiService {
   constructor() {
     this.baseURL = API_BASE_URL;
@@ -35,7 +45,7 @@ class RealTimeApiService {
 
       const contentType = response.headers.get('content-type');
       if (contentType && contentType.includes('application/json')) {
-        return await response.json();
+        return unwrapPage(await response.json());
       }
       
       return {};
@@ -45,9 +55,25 @@ class RealTimeApiService {
     }
   }
 
+  // Follow `next` cursors so lists that render every row are not cut off at the first page.
+  // `key` names the list in responses shaped {<key>: [...], next}; the result keeps that shape.
+  async apiCallAllPages(endpoint, key = null) {
+    const separator = endpoint.includes('?') ? '&' : '?';
+    const rows = [];
+    let cursor = null;
+    do {
+      const page = await this.apiCall(
+        `${endpoint}${separator}limit=${MAX_PAGE_SIZE}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`
+      );
+      rows.push(...(key ? page[key] || [] : page));
+      cursor = page.next;
+    } while (cursor);
+    return key ? { [key]: rows } : rows;
+  }
+
   // Get product updates for real-time sync
   async getProductUpdates() {
-    return await this.apiCall('/cashier/products/');
+    return await this.apiCallAllPages('/cashier/products/');
   }
 
   // Get category updates for real-time sync
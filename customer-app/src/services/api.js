@@ -1,6 +1,16 @@
 // Customer API Service
 const API_BASE_URL = 'http://localhost:8000/api';
 
+// Paginated lists answer {results, next}; hand callers the rows, with the next-page cursor as `.next`
+const unwrapPage = (data) => (
+  data && Array.isArray(data.results) && 'next' in data && Object.keys(data).length === 2
+    ? Object.assign(data.results, { next: data.next })
+    : data
+);
+
+// Largest page the server returns (API_MAX_PAGE_SIZE); lists that render every row fetch all pages
+const MAX_PAGE_SIZE = 500;
+
 class CustomerApiService {
   constructor() {
     this.baseURL = API_BASE_URL;
@@ -34,7 +44,7 @@ class CustomerApiService {
       // Handle empty responses
       const contentType = response.headers.get('content-type');
       if (contentType && contentType.includes('application/json')) {
-        return await response.json();
+        return unwrapPage(await response.json());
       }
       
       return {};
@@ -44,6 +54,22 @@ class CustomerApiService {
     }
   }
 
+  // Follow `next` cursors so lists that render every row are not cut off at the first page.
+  // `key` names the list in responses shaped {<key>: [...], next}; the result keeps that shape.
+  async apiCallAllPages(endpoint, key = null) {
+    const separator = endpoint.includes('?') ? '&' : '?';
+    const rows = [];
+    let cursor = null;
+    do {
+      const page = await this.apiCall(
+        `${endpoint}${separator}limit=${MAX_PAGE_SIZE}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`
+      );
+      rows.push(...(key ? page[key] || [] : page));
+      cursor = page.next;
+    } while (cursor);
+    return key ? { [key]: rows } : rows;
+  }
+
   // Products (Read-only for customers)
   async getProducts(search = '', categoryId = null) {
     let endpoint = '/customer/products/';
@@ -56,7 +82,7 @@ class CustomerApiService {
       endpoint += `?${params.toString()}`;
     }
     
-    return await this.apiCall(endpoint);
+    return await this.apiCallAllPages(endpoint);
   }
 
   async getProduct(productId) {
@@ -82,7 +108,7 @@ class CustomerApiService {
 
   // Orders (Customer-specific)
   async getOrders() {
-    return await this.apiCall('/customer/orders/');
+    return await this.apiCallAllPages('/customer/orders/', 'orders');
   }
 
   async getOrder(orderId) {
@@ -256,7 +282,7 @@ class CustomerApiService {
 
   // Payments
   async getPayments() {
-    return await this.apiCall('/customer/payments/');
+    return await this.apiCallAllPages('/customer/payments/', 'payments');
   }
 
   async createPayment(paymentData) {
@@ -272,7 +298,7 @@ class CustomerApiService {
 
   // Delivery Tracking
   async getDeliveries() {
-    return await this.apiCall('/customer/deliveries/');
+    return await this.apiCallAllPages('/customer/deliveries/', 'deliveries');
   }
 
   async getDelivery(deliveryId) {
@@ -306,7 +332,7 @@ class FallbackApiService extends CustomerApiService {
         endpoint += `?${params.toString()}`;
       }
       
-      return await this.apiCall(endpoint);
+      return await this.apiCallAllPages(endpoint);
     }
   }
 
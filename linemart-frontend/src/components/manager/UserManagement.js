@@ -31,19 +31,27 @@ const UserManagement = () => {
   const fetchUsers = async () => {
     try {
       setLoading(true);
-      const response = await fetch('http://localhost:8000/api/member/users/', {
-        headers: {
-          'Authorization': `Bearer ${localStorage.getItem('access_token')}`,
-          'Content-Type': 'application/json',
-        },
-      });
-
-      if (response.ok) {
+      // The list is paged; follow `next` so every staff account is shown
+      const allUsers = [];
+      let cursor = null;
+      do {
+        const response = await fetch(
+          `http://localhost:8000/api/member/users/?limit=500${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`,
+          {
+            headers: {
+              'Authorization': `Bearer ${localStorage.getItem('access_token')}`,
+              'Content-Type': 'application/json',
+            },
+          }
+        );
+        if (!response.ok) {
+          throw new Error('Failed to fetch users');
+        }
         const data = await response.json();
-        setUsers(data.users || []);
-      } else {
-        throw new Error('Failed to fetch users');
-      }
+        allUsers.push(...(data.users || []));
+        cursor = data.next;
+      } while (cursor);
+      setUsers(allUsers);
     } catch (error) {
       console.error('Error fetching users:', error);
       setError('Failed to load users');
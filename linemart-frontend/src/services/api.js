@@ -1,6 +1,16 @@
 // API service for LineMart application
 const API_URL = 'http://localhost:8000/api';
 
+// Paginated lists answer {results, next}; hand callers the rows, with the next-page cursor as `.next`
+const unwrapPage = (data) => (
+  data && Array.isArray(data.results) && 'next' in data && Object.keys(data).length === 2
+    ? Object.assign(data.results, { next: data.next })
+    : data
+);
+
+// Largest page the server returns (API_MAX_PAGE_SIZE); lists that render every row fetch all pages
+const MAX_PAGE_SIZE = 500;
+
 // Helper function for handling fetch responses
 const handleResponse = async (response) => {
   if (!response.ok) {
@@ -34,7 +44,24 @@ const handleResponse = async (response) => {
     }
     throw new Error(errorMessage);
   }
-  return response.json();
+  return unwrapPage(await response.json());
+};
+
+// Follow `next` cursors so lists that render every row are not cut off at the first page
+const fetchAllPages = async (url, headers) => {
+  const separator = url.includes('?') ? '&' : '?';
+  const rows = [];
+  let cursor = null;
+  do {
+    const response = await fetch(
+      `${url}${separator}limit=${MAX_PAGE_SIZE}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`,
+      { headers }
+    );
+    const page = await handleResponse(response);
+    rows.push(...page);
+    cursor = page.next;
+  } while (cursor);
+  return rows;
 };
 
 // JWT Token Management
@@ -362,10 +389,7 @@ export const customerApi = {
       url += `?category=${category}`;
     }
     
-    const response = await fetch(url, {
-      headers: getHeaders(),
-    });
-    return handleResponse(response);
+    return fetchAllPages(url, getHeaders());
   },
   
   getProductCategories: async () => {
@@ -510,10 +534,7 @@ export const cashierApi = {
       url += `?${params.join('&')}`;
     }
     
-    const response = await fetch(url, {
-      headers: getHeadersNoAuth(), // Use no-auth headers for testing
-    });
-    return handleResponse(response);
+    return fetchAllPages(url, getHeadersNoAuth()); // Use no-auth headers for testing
   },
   
   getProductById: async (productId) => {
@@ -9,6 +9,18 @@ const managerApi = axios.create({
   }
 });
 
+// Follow `next` cursors so lists that render every row are not cut off at the first page
+const getAllPages = async (url) => {
+  const rows = [];
+  let cursor = null;
+  do {
+    const { data } = await axios.get(url, { params: { limit: 500, ...(cursor && { cursor }) } });
+    rows.push(...data.results);
+    cursor = data.next;
+  } while (cursor);
+  return rows;
+};
+
 // Add request interceptor for authentication
 managerApi.interceptors.request.use(
   (config) => {
@@ -210,8 +222,7 @@ export const realTimeApiService = {
       console.error('Error fetching product updates:', error);
       // Fallback to cashier API
       try {
-        const response = await axios.get('http://localhost:8000/api/cashier/products/');
-        return { products: response.data };
+        return { products: await getAllPages('http://localhost:8000/api/cashier/products/') };
       } catch (fallbackError) {
         throw error;
       }
@@ -253,8 +264,7 @@ export const realTimeApiService = {
       console.error('Error fetching inventory status:', error);
       // Fallback to cashier API
       try {
-        const response = await axios.get('http://localhost:8000/api/cashier/products/');
-        const products = response.data;
+        const products = await getAllPages('http://localhost:8000/api/cashier/products/');
         
         const lowStockProducts = products.filter(product => 
           product.stock <= (product.min_stock_level || 10)